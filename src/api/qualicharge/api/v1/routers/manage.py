@@ -1,29 +1,39 @@
 """QualiCharge API v1 manage router."""
 
+import base64
+import binascii
+import json
 import logging
-from typing import Annotated, List, cast
+from datetime import datetime
+from typing import Annotated, Dict, List, Optional, Tuple, cast
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     Path,
+    Query,
+    Request,
     Security,
     status,
 )
 from pydantic import (
+    AnyHttpUrl,
     BaseModel,
     Field,
     PastDatetime,
+    StringConstraints,
 )
+from sqlalchemy import tuple_
 from sqlalchemy.schema import Column as SAColumn
 from sqlmodel import Session, select
 
 from qualicharge.api.utils import GzipRoute
 from qualicharge.auth.oidc import get_user
 from qualicharge.auth.schemas import ScopesEnum, User
+from qualicharge.conf import settings
 from qualicharge.db import get_session
-from qualicharge.schemas.core import Station
+from qualicharge.schemas.core import Amenageur, Station
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +56,123 @@ class DashboardStation(BaseModel):
     updated_at: PastDatetime
 
 
+class PaginatedDashboardStationsResponse(BaseModel):
+    """Stations grouped by SIREN, paginated using a cursor."""
+
+    items: Dict[str, List[DashboardStation]]
+    watermark: Optional[datetime] = Field(
+        description=(
+            "Latest update of the stations listed in this page (use the latest "
+            "watermark of all pages as the next `after`)"
+        )
+    )
+    cursor: Optional[str] = Field(description="Cursor of the next page (if any)")
+    next: Optional[AnyHttpUrl]
+
+
+Siren = Annotated[str, StringConstraints(pattern=r"^\d{9}$")]
+
+
+def encode_cursor(siren: str, id_station_itinerance: str) -> str:
+    """Encode the position of a station in the stations list as a cursor."""
+    position = json.dumps([siren, id_station_itinerance]).encode()
+    return base64.urlsafe_b64encode(position).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a stations list cursor."""
+    try:
+        siren, id_station_itinerance = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as err:
+        raise HTTPException(
+            status_code=422,
+            detail="Invalid cursor",
+        ) from err
+    return siren, id_station_itinerance
+
+
+@router.get("/station")
+async def stations_by_sirens(  # noqa: PLR0913
+    user: Annotated[User, Security(get_user, scopes=[ScopesEnum.MANAGE_READ.value])],
+    request: Request,
+    siren: Annotated[
+        List[Siren],
+        Query(
+            description="Numéros SIREN des entreprises en charge des stations",
+            min_length=1,
+            max_length=settings.API_MANAGE_STATION_MAX_SIREN,
+        ),
+    ],
+    after: PastDatetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(
+        default=settings.API_MANAGE_STATION_PAGE_SIZE,
+        le=settings.API_MANAGE_STATION_PAGE_MAX_SIZE,
+        ge=1,
+    ),
+    session: Session = Depends(get_session),
+) -> PaginatedDashboardStationsResponse:
+    """List stations for many companies identified by their SIREN.
+
+    Stations are grouped by SIREN. Use the returned `cursor` (or the `next` url) to
+    get the next page. The `watermark` is the latest update of the stations listed
+    in the page: once all pages have been fetched, use the latest watermark of all
+    pages as the `after` parameter of the next synchronization.
+    """
+    siren_column = cast(SAColumn, Amenageur.siren_amenageur)
+    id_column = cast(SAColumn, Station.id_station_itinerance)
+    statement = (
+        select(
+            siren_column,
+            id_column,
+            Station.nom_station,
+            Station.num_pdl,
+            Station.updated_at,
+        )
+        .join_from(
+            Station, Amenageur, cast(SAColumn, Station.amenageur_id) == Amenageur.id
+        )
+        .where(
+            siren_column.in_(set(siren))
+            & (Station.num_pdl != None)  # noqa: E711
+            & (Station.num_pdl != "")
+        )
+    )
+    if after is not None:
+        statement = statement.where(Station.updated_at >= after)
+    if cursor is not None:
+        statement = statement.where(
+            tuple_(siren_column, id_column) > tuple_(*decode_cursor(cursor))
+        )
+    # Fetch an extra row to know if there is a next page
+    statement = statement.order_by(siren_column, id_column).limit(limit + 1)
+    rows = session.exec(statement).all()
+
+    next_cursor = next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], rows[-1][1])
+        next_url = str(request.url.include_query_params(cursor=next_cursor))
+
+    items: Dict[str, List[DashboardStation]] = {}
+    for row_siren, id_station_itinerance, nom_station, num_pdl, updated_at in rows:
+        items.setdefault(row_siren, []).append(
+            DashboardStation(
+                id_station_itinerance=id_station_itinerance,
+                nom_station=nom_station,
+                num_pdl=num_pdl,
+                updated_at=updated_at,
+            )
+        )
+
+    return PaginatedDashboardStationsResponse(
+        items=items,
+        watermark=max((row[4] for row in rows), default=None),
+        cursor=next_cursor,
+        next=next_url,
+    )
+
+
 @router.get("/station/siren/{siren}")
 async def stations_by_siren(
     user: Annotated[User, Security(get_user, scopes=[ScopesEnum.MANAGE_READ.value])],
@@ -24,6 +24,7 @@ from .conf import settings
 from .db import get_session
 from .exceptions import IntegrityError as QCIntegrityError
 from .schemas.core import (
+    PDC_LEVELS_MV_TABLE_NAME,
     STATIQUE_MV_TABLE_NAME,
     OperationalUnit,
     OperationalUnitStatusEnum,
@@ -673,7 +674,7 @@ def import_static(ctx: typer.Context, input_file: Path):
 
 @statics_app.command("refresh")
 def refresh_static(ctx: typer.Context, concurrently: bool = False):
-    """Refresh the Statique materialized view."""
+    """Refresh the Statique (and related) materialized views."""
     session: SMSession = ctx.obj
 
     # Refresh the database
@@ -681,8 +682,11 @@ def refresh_static(ctx: typer.Context, concurrently: bool = False):
     refresh_materialized_view(
         session, STATIQUE_MV_TABLE_NAME, concurrently=concurrently
     )
+    refresh_materialized_view(
+        session, PDC_LEVELS_MV_TABLE_NAME, concurrently=concurrently
+    )
     session.commit()
-    console.log("Statique Materalized View has been refreshed.")
+    console.log("Statique Materalized Views have been refreshed.")
 
 
 @app.callback()
@@ -135,6 +135,9 @@ class Settings(BaseSettings):
     API_GET_PDC_ID_CACHE_MAXSIZE: int = 5000
     API_GET_PDC_ID_CACHE_TTL: int = 24 * 60 * 60
     API_GET_PDC_ID_CACHE_INFO: bool = False
+    API_MANAGE_STATION_MAX_SIREN: int = 100
+    API_MANAGE_STATION_PAGE_MAX_SIZE: int = 5000
+    API_MANAGE_STATION_PAGE_SIZE: int = 1000
     # Dynamic data maximal age in seconds
     API_MAX_SESSION_AGE: int = 365 * 24 * 60 * 60  # 1 year
     API_MAX_STATUS_AGE: int = 24 * 60 * 60  # 1 day
@@ -0,0 +1,110 @@
+"""Add points of charge levels materialized view
+
+Revision ID: 5c1d7e3a9b42
+Revises: 2b6539a6fc40
+Create Date: 2026-10-19 10:12:31.457162
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1d7e3a9b42"
+down_revision: Union[str, None] = "2b6539a6fc40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The view definition is frozen: it should not follow later changes of the
+# `_PdcLevelsMV` model (a new migration is required to change the view).
+#
+# A station is considered as a DC station if one of its (active) points of charge
+# is (power >= 50 kW or CCS/CHAdeMO plugs).
+IS_DC = (
+    "bool_or("
+    "_pointdecharge.puissance_nominale >= 50 "
+    "OR _pointdecharge.prise_type_combo_ccs "
+    "OR _pointdecharge.prise_type_chademo"
+    ") OVER (PARTITION BY _station.id)"
+)
+IS_VALID_PDL = (
+    "NOT ("
+    "_station.num_pdl IS NULL "
+    "OR _station.num_pdl LIKE '% %' "
+    "OR _station.num_pdl LIKE '%123456789%' "
+    "OR _station.num_pdl LIKE '000%' "
+    "OR _station.num_pdl IN ('', '11111111111111', '99999999999999') "
+    "OR _station.num_pdl !~ '[0-9]'"
+    ")"
+)
+IS_DIRECT = "_station.raccordement = 'Direct'"
+
+PDC_LEVELS_VIEW = f"""
+CREATE MATERIALIZED VIEW pdclevels AS
+SELECT
+  _pointdecharge.id AS pdc_id,
+  _pointdecharge.id_pdc_itinerance,
+  _pointdecharge.puissance_nominale,
+  CASE
+    WHEN _pointdecharge.puissance_nominale < 0 THEN NULL
+    WHEN _pointdecharge.puissance_nominale < 7.4 THEN 1
+    WHEN _pointdecharge.puissance_nominale <= 22 THEN 2
+    WHEN _pointdecharge.puissance_nominale < 50 THEN 3
+    WHEN _pointdecharge.puissance_nominale < 150 THEN 4
+    WHEN _pointdecharge.puissance_nominale < 350 THEN 5
+    WHEN _pointdecharge.puissance_nominale >= 350 THEN 6
+  END AS p_cat,
+  {IS_DC} AS is_dc,
+  CASE
+    WHEN {IS_DC} AND {IS_DIRECT} AND {IS_VALID_PDL} THEN 'DC_direct_valid'
+    WHEN {IS_DC} AND {IS_DIRECT} AND NOT {IS_VALID_PDL} THEN 'DC_direct_invalid'
+    WHEN {IS_DC} AND _station.raccordement != 'Direct' THEN 'DC_indirect'
+    WHEN NOT {IS_DC} AND {IS_DIRECT} AND {IS_VALID_PDL} THEN 'AC_direct_valid'
+    WHEN NOT {IS_DC} AND {IS_DIRECT} AND NOT {IS_VALID_PDL}
+      THEN 'AC_direct_invalid'
+    ELSE 'AC_indirect'
+  END AS alimentation,
+  city.id AS city_id,
+  city.code AS city_code,
+  epci.id AS epci_id,
+  epci.code AS epci_code,
+  department.id AS department_id,
+  department.code AS department_code,
+  region.id AS region_id,
+  region.code AS region_code,
+  operationalunit.id AS operational_unit_id,
+  operationalunit.code AS operational_unit_code
+FROM _pointdecharge
+JOIN _station ON _station.id = _pointdecharge.station_id
+JOIN localisation ON localisation.id = _station.localisation_id
+LEFT OUTER JOIN city ON localisation.code_insee_commune = city.code
+LEFT OUTER JOIN epci ON city.epci_id = epci.id
+LEFT OUTER JOIN department ON city.department_id = department.id
+LEFT OUTER JOIN region ON department.region_id = region.id
+LEFT OUTER JOIN operationalunit
+  ON _station.operational_unit_id = operationalunit.id
+WHERE _pointdecharge.deleted_at IS NULL AND _station.deleted_at IS NULL
+"""  # noqa: S608
+
+PDC_LEVELS_INDEXES = [
+    "CREATE UNIQUE INDEX idx_pdclevels_pdc_id ON pdclevels (pdc_id)",
+    "CREATE INDEX idx_pdclevels_city_id ON pdclevels (city_id)",
+    "CREATE INDEX idx_pdclevels_epci_id ON pdclevels (epci_id)",
+    "CREATE INDEX idx_pdclevels_department_id ON pdclevels (department_id)",
+    "CREATE INDEX idx_pdclevels_region_id ON pdclevels (region_id)",
+    "CREATE INDEX idx_pdclevels_operational_unit_id "
+    "ON pdclevels (operational_unit_id)",
+]
+
+
+def upgrade() -> None:
+    """Create the PdcLevels materialized view and related indexes."""
+    op.execute(PDC_LEVELS_VIEW)
+    for index in PDC_LEVELS_INDEXES:
+        op.execute(index)
+
+
+def downgrade() -> None:
+    """Drop the PdcLevels materialized view."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS pdclevels CASCADE")
@@ -0,0 +1,29 @@
+"""Add amenageur SIREN index
+
+Revision ID: 8e3b1f6a2c70
+Revises: 5c1d7e3a9b42
+Create Date: 2026-10-19 14:32:08.518302
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3b1f6a2c70"
+down_revision: Union[str, None] = "5c1d7e3a9b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the amenageur SIREN index."""
+    op.create_index(
+        op.f("ix_amenageur_siren_amenageur"), "amenageur", ["siren_amenageur"]
+    )
+
+
+def downgrade() -> None:
+    """Drop the amenageur SIREN index."""
+    op.drop_index(op.f("ix_amenageur_siren_amenageur"), table_name="amenageur")
@@ -19,7 +19,16 @@ from pydantic import (
 )
 from pydantic_extra_types.coordinate import Coordinate
 from shapely.geometry import mapping
-from sqlalchemy import PrimaryKeyConstraint, Select, event
+from sqlalchemy import (
+    PrimaryKeyConstraint,
+    Select,
+    and_,
+    case,
+    event,
+    func,
+    not_,
+    or_,
+)
 from sqlalchemy import cast as SA_cast
 from sqlalchemy.dialects.postgresql import ENUM as PgEnum
 from sqlalchemy.orm import registry
@@ -52,6 +61,7 @@ from ..models.static import (
     Statique,
 )
 from . import BaseAuditableSQLModel, BaseTimestampedSQLModel, SoftDeleteMixin
+from .geo import EPCI, City, Department, Region
 
 if TYPE_CHECKING:
     from qualicharge.auth.schemas import Group
@@ -59,6 +69,7 @@ if TYPE_CHECKING:
 mapper_registry = registry()
 
 STATIQUE_MV_TABLE_NAME: str = "statique"
+PDC_LEVELS_MV_TABLE_NAME: str = "pdclevels"
 
 DEFAULT_SRID: int = 4326
 
@@ -141,7 +152,7 @@ class Amenageur(BaseAuditableSQLModel, table=True):
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     nom_amenageur: Optional[str]
-    siren_amenageur: Optional[str] = Field(regex=r"^\d{9}$")
+    siren_amenageur: Optional[str] = Field(regex=r"^\d{9}$", index=True)
     contact_amenageur: Optional[EmailStr] = Field(sa_type=String)
 
     # Relationships
@@ -746,3 +757,141 @@ class _StatiqueMV(SQLModel):
 
 
 mapper_registry.map_imperatively(StatiqueMV, _StatiqueMV.__table__)
+
+
+class PdcLevelsMV(SQLModel):
+    """Points of charge levels Materialized View.
+
+    Maps every active point of charge to its administrative levels (city, EPCI,
+    department and region), its operational unit and pre-calculated categories
+    (power category, DC charging and power supply). It is used by indicators to
+    avoid joining administrative boundaries for every query.
+    """
+
+    __tablename__ = PDC_LEVELS_MV_TABLE_NAME
+
+    pdc_id: UUID
+    id_pdc_itinerance: str
+    puissance_nominale: float
+    p_cat: Optional[int]
+    is_dc: bool
+    alimentation: str
+    city_id: Optional[UUID]
+    city_code: Optional[str]
+    epci_id: Optional[UUID]
+    epci_code: Optional[str]
+    department_id: Optional[UUID]
+    department_code: Optional[str]
+    region_id: Optional[UUID]
+    region_code: Optional[str]
+    operational_unit_id: Optional[UUID]
+    operational_unit_code: Optional[str]
+
+
+def _pdc_levels_selectable() -> Select:
+    """Points of charge levels materialized view selectable."""
+    puissance_nominale = cast(SAColumn, PointDeCharge.puissance_nominale)
+    num_pdl = cast(SAColumn, Station.num_pdl)
+
+    # In AFIR regulation, 22 kw belongs interval [7.4, 22] and not [22, 50]
+    p_cat = case(
+        (puissance_nominale < 0, None),
+        (puissance_nominale < 7.4, 1),  # noqa: PLR2004
+        (puissance_nominale <= 22, 2),  # noqa: PLR2004
+        (puissance_nominale < 50, 3),  # noqa: PLR2004
+        (puissance_nominale < 150, 4),  # noqa: PLR2004
+        (puissance_nominale < 350, 5),  # noqa: PLR2004
+        (puissance_nominale >= 350, 6),  # noqa: PLR2004
+    )
+    # A station is considered as a DC station if one of its points of charge is
+    is_dc = func.bool_or(
+        or_(
+            puissance_nominale >= 50,  # noqa: PLR2004
+            cast(SAColumn, PointDeCharge.prise_type_combo_ccs),
+            cast(SAColumn, PointDeCharge.prise_type_chademo),
+        )
+    ).over(partition_by=cast(SAColumn, Station.id))
+    is_direct = cast(SAColumn, Station.raccordement) == RaccordementEnum.DIRECT
+    is_valid_pdl = not_(
+        or_(
+            num_pdl.is_(None),
+            num_pdl.like("% %"),
+            num_pdl.like("%123456789%"),
+            num_pdl.like("000%"),
+            num_pdl.in_(["", "11111111111111", "99999999999999"]),
+            not_(num_pdl.regexp_match("[0-9]")),
+        )
+    )
+    alimentation = case(
+        (and_(is_dc, is_direct, is_valid_pdl), "DC_direct_valid"),
+        (and_(is_dc, is_direct, not_(is_valid_pdl)), "DC_direct_invalid"),
+        (and_(is_dc, not_(is_direct)), "DC_indirect"),
+        (and_(not_(is_dc), is_direct, is_valid_pdl), "AC_direct_valid"),
+        (and_(not_(is_dc), is_direct, not_(is_valid_pdl)), "AC_direct_invalid"),
+        else_="AC_indirect",
+    )
+
+    return (
+        select(  # type: ignore[call-overload, misc]
+            cast(SAColumn, PointDeCharge.id).label("pdc_id"),
+            PointDeCharge.id_pdc_itinerance,
+            PointDeCharge.puissance_nominale,
+            p_cat.label("p_cat"),
+            is_dc.label("is_dc"),
+            alimentation.label("alimentation"),
+            cast(SAColumn, City.id).label("city_id"),
+            cast(SAColumn, City.code).label("city_code"),
+            cast(SAColumn, EPCI.id).label("epci_id"),
+            cast(SAColumn, EPCI.code).label("epci_code"),
+            cast(SAColumn, Department.id).label("department_id"),
+            cast(SAColumn, Department.code).label("department_code"),
+            cast(SAColumn, Region.id).label("region_id"),
+            cast(SAColumn, Region.code).label("region_code"),
+            cast(SAColumn, OperationalUnit.id).label("operational_unit_id"),
+            cast(SAColumn, OperationalUnit.code).label("operational_unit_code"),
+        )
+        .select_from(PointDeCharge)
+        .join(Station)
+        .join(Localisation)
+        .outerjoin(
+            City,
+            cast(SAColumn, Localisation.code_insee_commune) == City.code,
+        )
+        .outerjoin(EPCI, cast(SAColumn, City.epci_id) == EPCI.id)
+        .outerjoin(Department, cast(SAColumn, City.department_id) == Department.id)
+        .outerjoin(Region, cast(SAColumn, Department.region_id) == Region.id)
+        .outerjoin(
+            OperationalUnit,
+            cast(SAColumn, Station.operational_unit_id) == OperationalUnit.id,
+        )
+        .where(
+            cast(SAColumn, PointDeCharge.deleted_at).is_(None),
+            cast(SAColumn, Station.deleted_at).is_(None),
+        )
+    )
+
+
+class _PdcLevelsMV(SQLModel):
+    """Points of charge levels Materialized view.
+
+    NOTE: This is an internal model used **ONLY** for creating the materialized view.
+    """
+
+    selectable: ClassVar[Select] = _pdc_levels_selectable()
+
+    __table__ = create_materialized_view(
+        name=PDC_LEVELS_MV_TABLE_NAME,
+        selectable=selectable,
+        metadata=SQLModel.metadata,
+        indexes=[
+            Index("idx_pdclevels_pdc_id", "pdc_id", unique=True),
+            Index("idx_pdclevels_city_id", "city_id"),
+            Index("idx_pdclevels_epci_id", "epci_id"),
+            Index("idx_pdclevels_department_id", "department_id"),
+            Index("idx_pdclevels_region_id", "region_id"),
+            Index("idx_pdclevels_operational_unit_id", "operational_unit_id"),
+        ],
+    )
+
+
+mapper_registry.map_imperatively(PdcLevelsMV, _PdcLevelsMV.__table__)
@@ -3,12 +3,18 @@
 from typing import cast
 
 import pytest
-from fastapi import status
+from fastapi import HTTPException, status
 from sqlalchemy.schema import Column as SAColumn
 from sqlmodel import select
 
-from qualicharge.api.v1.routers.manage import DashboardStation
+from qualicharge.api.v1.routers.manage import (
+    DashboardStation,
+    PaginatedDashboardStationsResponse,
+    decode_cursor,
+    encode_cursor,
+)
 from qualicharge.auth.schemas import ScopesEnum
+from qualicharge.conf import settings
 from qualicharge.factories.static import (
     StatiqueFactory,
 )
@@ -149,3 +155,161 @@ def test_stations_by_siren_with_no_pdl_declared(db_session, client_auth):
     assert station.nom_station == db_station.nom_station
     assert station.num_pdl == db_station.num_pdl
     assert station.updated_at == db_station.updated_at
+
+
+def test_stations_cursor():
+    """Test stations list cursor encoding."""
+    cursor = encode_cursor("732829320", "FRS63P0001")
+    assert decode_cursor(cursor) == ("732829320", "FRS63P0001")
+
+
+@pytest.mark.parametrize("cursor", ("foo", "Zm9v", "WzFd"))
+def test_stations_invalid_cursor(cursor):
+    """Test stations list invalid cursor decoding."""
+    with pytest.raises(HTTPException, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "client_auth",
+    (
+        (True, {"is_superuser": False, "scopes": []}),
+        *[
+            (True, {"is_superuser": False, "scopes": [scope]})
+            for scope in ScopesEnum
+            if scope != ScopesEnum.MANAGE_READ
+        ],
+    ),
+    indirect=True,
+)
+def test_stations_by_sirens_with_missing_scopes(client_auth):
+    """Test the /manage/station get endpoint scopes."""
+    response = client_auth.get("/manage/station?siren=123456789")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_stations_by_sirens_validation(client_auth):
+    """Test the /manage/station get endpoint parameters validation."""
+    response = client_auth.get("/manage/station")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = client_auth.get("/manage/station?siren=1234")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    too_many = "&".join(
+        f"siren={x:09d}" for x in range(settings.API_MANAGE_STATION_MAX_SIREN + 1)
+    )
+    response = client_auth.get(f"/manage/station?{too_many}")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = client_auth.get("/manage/station?siren=123456789&cursor=foo")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.parametrize(
+    "client_auth",
+    (
+        (True, {"is_superuser": True, "scopes": []}),
+        (True, {"is_superuser": False, "scopes": [ScopesEnum.MANAGE_READ]}),
+    ),
+    indirect=True,
+)
+def test_stations_by_sirens_for_user(db_session, client_auth):
+    """Test the /manage/station get endpoint."""
+    # No station found
+    response = client_auth.get("/manage/station?siren=732829320")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "items": {},
+        "watermark": None,
+        "cursor": None,
+        "next": None,
+    }
+
+    # Create statique entries using three amenageurs and related stations
+    batches = ((3, "732829320"), (2, "842718512"), (1, "552032534"))
+    for size, siren in batches:
+        save_statiques(
+            db_session,
+            [
+                StatiqueFactory.build(
+                    siren_amenageur=siren,
+                    num_pdl=StatiqueFactory.__faker__.pystr_format("##############"),
+                )
+                for _ in range(size)
+            ],
+        )
+    # A station without PDL number is ignored
+    save_statiques(
+        db_session,
+        [
+            StatiqueFactory.build(
+                siren_amenageur="732829320",
+                raccordement=RaccordementEnum.INDIRECT,
+                num_pdl=None,
+            ),
+        ],
+    )
+
+    response = client_auth.get(
+        "/manage/station?siren=732829320&siren=842718512&siren=111111111"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    page = PaginatedDashboardStationsResponse(**response.json())
+    assert page.cursor is None
+    assert page.next is None
+    assert sorted(page.items.keys()) == ["732829320", "842718512"]
+    for size, siren in batches[:2]:
+        db_stations = db_session.exec(
+            select(Station)
+            .where(cast(SAColumn, Station.amenageur).has(siren_amenageur=siren))
+            .where(Station.num_pdl != None)  # noqa: E711
+            .order_by(Station.id_station_itinerance)
+        ).all()
+        assert len(page.items[siren]) == size
+        assert page.items[siren] == [
+            DashboardStation(
+                id_station_itinerance=s.id_station_itinerance,
+                nom_station=s.nom_station,
+                num_pdl=s.num_pdl,
+                updated_at=s.updated_at,
+            )
+            for s in db_stations
+        ]
+    assert page.watermark == max(
+        station.updated_at for stations in page.items.values() for station in stations
+    )
+
+    # Follow pages
+    stations = []
+    url = "/manage/station?siren=732829320&siren=842718512&siren=552032534&limit=2"
+    pages = 0
+    while url is not None:
+        response = client_auth.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        page = PaginatedDashboardStationsResponse(**response.json())
+        stations += [
+            (siren, station.id_station_itinerance)
+            for siren, items in page.items.items()
+            for station in items
+        ]
+        url = str(page.next) if page.next else None
+        pages += 1
+    expected_pages = 3
+    assert pages == expected_pages
+    assert len(stations) == sum(size for size, _ in batches)
+    assert stations == sorted(stations)
+
+    # Filter on the last update
+    response = client_auth.get(
+        "/manage/station?siren=732829320&siren=842718512&siren=552032534",
+        params={"after": page.watermark.isoformat()},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    page = PaginatedDashboardStationsResponse(**response.json())
+    assert all(
+        station.updated_at >= page.watermark
+        for stations in page.items.values()
+        for station in stations
+    )
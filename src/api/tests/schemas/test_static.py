@@ -25,12 +25,14 @@ from qualicharge.factories.static import (
     StatiqueFactory,
 )
 from qualicharge.schemas.core import (
+    PDC_LEVELS_MV_TABLE_NAME,
     STATIQUE_MV_TABLE_NAME,
     ActivePointsDeChargeView,
     ActiveStationsView,
     Amenageur,
     Localisation,
     OperationalUnit,
+    PdcLevelsMV,
     PointDeCharge,
     Station,
     StatiqueMV,
@@ -549,3 +551,36 @@ def test_statique_materialized_view_coordonneesXY_field(db_session):
     crds = Coordinate(**db_statique.model_dump()["coordonneesXY"])
     assert hasattr(crds, "latitude")
     assert hasattr(crds, "longitude")
+
+
+def test_pdc_levels_materialized_view(db_session):
+    """Test the PdcLevelsMV schema."""
+    n_pdc = 4
+    statiques = StatiqueFactory.batch(
+        n_pdc,
+        puissance_nominale=60.0,
+        raccordement="Direct",
+        num_pdl="50012345678012",
+    )
+    save_statiques(db_session, statiques)
+
+    assert db_session.exec(select(func.count(PdcLevelsMV.pdc_id))).one() == 0
+
+    refresh_materialized_view(db_session, STATIQUE_MV_TABLE_NAME)
+    refresh_materialized_view(db_session, PDC_LEVELS_MV_TABLE_NAME)
+    db_statiques = db_session.exec(select(StatiqueMV)).all()
+    db_levels = db_session.exec(select(PdcLevelsMV)).all()
+    assert len(db_levels) == n_pdc
+
+    assert {s.pdc_id for s in db_statiques} == {s.pdc_id for s in db_levels}
+    for db_level in db_levels:
+        pdc = db_session.exec(
+            select(PointDeCharge).where(PointDeCharge.id == db_level.pdc_id)
+        ).one()
+        station = pdc.station
+        assert db_level.id_pdc_itinerance == pdc.id_pdc_itinerance
+        assert db_level.operational_unit_id == station.operational_unit_id
+        assert db_level.operational_unit_code == station.id_station_itinerance[:5]
+        assert db_level.p_cat == 4  # noqa: PLR2004
+        assert db_level.is_dc
+        assert db_level.alimentation == "DC_direct_valid"
@@ -28,6 +28,7 @@ from qualicharge.schemas.core import (
     OperationalUnit,
     OperationalUnitStatusEnum,
     OperationalUnitTypeEnum,
+    PdcLevelsMV,
     PointDeCharge,
     Station,
     StatiqueMV,
@@ -837,3 +838,4 @@ def test_refresh_static(runner, db_session):
     )
     assert result.exit_code == 0
     assert db_session.exec(select(func.count(StatiqueMV.pdc_id))).one() == n_pdc
+    assert db_session.exec(select(func.count(PdcLevelsMV.pdc_id))).one() == n_pdc
@@ -1,7 +1,8 @@
 """QualiCharge API client CLI: api."""
 
-from typing import Any
+from typing import Any, Optional
 
+import httpx
 import typer
 from anyio import run
 from rich import print
@@ -9,13 +10,35 @@ from rich import print
 from ..exceptions import APIRequestError
 from .codes import QCCExitCodes
 
+API_ERRORS = (APIRequestError, httpx.TransportError)
+
+
+def get_api_error(err: BaseException) -> Optional[BaseException]:
+    """Get the API error raised by a query, if any.
+
+    Exception groups (raised from task groups) are searched for a nested API error.
+    """
+    if isinstance(err, API_ERRORS):
+        return err
+    for nested in getattr(err, "exceptions", ()):
+        if (api_error := get_api_error(nested)) is not None:
+            return api_error
+    return None
+
 
 def async_run_api_query(*args) -> Any:
-    """An anyio.run wrapper to handle APIRequestError."""
+    """An anyio.run wrapper to handle API errors.
+
+    API request errors and transport errors (e.g. the API cannot be reached) exit
+    with the `API_EXCEPTION` code.
+    """
     try:
         return_value = run(*args)
-    except APIRequestError as err:
+    except Exception as exc:
+        err = get_api_error(exc)
+        if err is None:
+            raise
         print("[red]An error occurred while querying the API! More details follow.")
-        print(err.args[0])
+        print(err.args[0] if isinstance(err, APIRequestError) else repr(err))
         raise typer.Exit(QCCExitCodes.API_EXCEPTION) from err
     return return_value
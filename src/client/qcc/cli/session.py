@@ -1,18 +1,30 @@
 """QualiCharge API client CLI: statuc."""
 
+from functools import partial
+from pathlib import Path
 from typing import Annotated, Optional
 from uuid import UUID
 
-import click
 import typer
 from rich import print
 
 from ..client import QCC
+from ..conf import settings
+from ..models import BulkProgress
+from ..spool import SpoolKind
 from .api import async_run_api_query
-from .utils import parse_input_json_lines, parse_json_parameter
+from .spool import spool_and_flush
+from .utils import (
+    get_bulk_input,
+    parse_json_parameter,
+    print_bulk_progress,
+)
 
 app = typer.Typer(name="session", no_args_is_help=True)
 
+# Fields checked for each row of bulk input files
+REQUIRED_FIELDS = ["id_pdc_itinerance", "start", "end", "energy"]
+
 
 @app.command()
 def create(
@@ -39,25 +51,56 @@ def create(
 
 
 @app.command()
-def bulk(
+def bulk(  # noqa: PLR0913
     ctx: typer.Context,
     chunk_size: int = 10,
     ignore_errors: bool = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests")
+    ] = settings.API_BULK_CONCURRENCY,
+    file: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Read objects from an NDJSON, CSV or Parquet file",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
+    spool: Annotated[
+        bool, typer.Option(help="Spool objects locally before sending them")
+    ] = False,
 ):
     """Bulk create new sessions.
 
-    Sessions will be read from the standard input (one JSON per line).
+    Sessions will be read from the standard input (one JSON per line), or from
+    the `--file` input file. With the `--spool` option, objects are stored in the
+    local spool first, and all spooled objects are sent: objects that could not be
+    sent stay in the spool until the next `qcc spool flush` command.
     """
     client: QCC = ctx.obj
 
-    n_created = async_run_api_query(
-        client.session.bulk,
-        parse_input_json_lines(click.get_text_stream("stdin"), ignore_errors),
-        chunk_size,
-        ignore_errors,
-    )
+    progress = BulkProgress(chunk_size=chunk_size)
+    objs = get_bulk_input(file, REQUIRED_FIELDS, ignore_errors)
+    if spool:
+        n_created = spool_and_flush(
+            client.session,
+            SpoolKind.SESSION,
+            objs,
+            chunk_size,
+            ignore_errors,
+            concurrency,
+            progress,
+        )
+    else:
+        n_created = async_run_api_query(
+            partial(client.session.bulk, concurrency=concurrency, progress=progress),
+            objs,
+            chunk_size,
+            ignore_errors,
+        )
 
     print(f"[green]Created {n_created} sessions successfully.[/green]")
+    print_bulk_progress(progress, "sessions")
 
 
 @app.command()
@@ -0,0 +1,160 @@
+"""QualiCharge API client CLI: spool."""
+
+import json
+from functools import partial
+from typing import Annotated, Iterable, List, Optional
+
+import typer
+from rich import print
+
+from ..client import QCC
+from ..conf import settings
+from ..endpoints.base import BaseCreateEndpoint
+from ..models import BulkProgress
+from ..spool import Spool, SpoolKind, flush
+from .api import async_run_api_query
+from .utils import print_bulk_progress
+
+app = typer.Typer(name="spool", no_args_is_help=True)
+
+NAMES = {
+    SpoolKind.STATUS: "statuses",
+    SpoolKind.SESSION: "sessions",
+}
+
+
+KindOption = Annotated[
+    Optional[List[SpoolKind]],
+    typer.Option("--kind", help="Kind of rejected objects (all kinds by default)"),
+]
+
+
+def print_spooled(spool: Spool):
+    """Print the number of objects left in the spool (or rejected by the API)."""
+    for kind, name in NAMES.items():
+        if count := spool.count(kind):
+            print(f"[orange]{count} {name} remain spooled.[/orange]")
+        if count := spool.count_rejected(kind):
+            print(
+                f"[red]{count} {name} have been rejected by the API "
+                "(see `qcc spool rejected`).[/red]"
+            )
+
+
+def spool_and_flush(  # noqa: PLR0913
+    endpoint: BaseCreateEndpoint,
+    kind: SpoolKind,
+    objs: Iterable[dict | str],
+    chunk_size: int,
+    ignore_errors: bool,
+    concurrency: int,
+    progress: BulkProgress,
+) -> int:
+    """Spool objects, then send all spooled objects of this kind.
+
+    If the API cannot be reached, objects stay in the spool: they will be sent by
+    the next `spool flush` command. Objects rejected by the API are moved out of
+    the spool (see the `spool rejected` command).
+    """
+    with Spool(settings.SPOOL_PATH) as spool:
+        spool.put(kind, objs)
+        try:
+            n_created = async_run_api_query(
+                partial(
+                    flush,
+                    spool,
+                    kind,
+                    endpoint,
+                    chunk_size,
+                    ignore_errors=ignore_errors,
+                    concurrency=concurrency,
+                    progress=progress,
+                )
+            )
+        except typer.Exit:
+            print_spooled(spool)
+            print("Run the `qcc spool flush` command to send them.")
+            raise
+        print_spooled(spool)
+        return n_created
+
+
+@app.command(name="flush")
+def flush_command(
+    ctx: typer.Context,
+    chunk_size: int = 10,
+    ignore_errors: bool = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests")
+    ] = settings.API_BULK_CONCURRENCY,
+):
+    """Send spooled statuses and sessions.
+
+    Sent objects are removed from the spool, and objects rejected by the API are
+    moved to the rejected objects. If the API cannot be reached, the command can be
+    run again later: remaining objects will be sent.
+    """
+    client: QCC = ctx.obj
+    endpoints = {
+        SpoolKind.STATUS: client.status,
+        SpoolKind.SESSION: client.session,
+    }
+
+    async def flush_all(spool: Spool):
+        for kind, endpoint in endpoints.items():
+            progress = BulkProgress(chunk_size=chunk_size)
+            n_created = await flush(
+                spool,
+                kind,
+                endpoint,
+                chunk_size,
+                ignore_errors=ignore_errors,
+                concurrency=concurrency,
+                progress=progress,
+            )
+            print(f"[green]Created {n_created} {NAMES[kind]} successfully.[/green]")
+            print_bulk_progress(progress, NAMES[kind])
+
+    with Spool(settings.SPOOL_PATH) as spool:
+        try:
+            async_run_api_query(flush_all, spool)
+        finally:
+            print_spooled(spool)
+
+
+@app.command()
+def info():
+    """Print the number of spooled (and rejected) statuses and sessions."""
+    with Spool(settings.SPOOL_PATH) as spool:
+        for kind, name in NAMES.items():
+            print(f"{name}: {spool.count(kind)}")
+            print(f"rejected {name}: {spool.count_rejected(kind)}")
+
+
+@app.command()
+def rejected(kind: KindOption = None):
+    """Print statuses and sessions rejected by the API (with the API response)."""
+    with Spool(settings.SPOOL_PATH) as spool:
+        for k in kind or NAMES:
+            for payload, reason in spool.iter_rejected(k):
+                typer.echo(
+                    json.dumps(
+                        {"kind": k, "reason": reason, "obj": json.loads(payload)}
+                    )
+                )
+
+
+@app.command()
+def requeue(kind: KindOption = None):
+    """Move rejected statuses and sessions back to the spool (to send them again)."""
+    with Spool(settings.SPOOL_PATH) as spool:
+        for k in kind or NAMES:
+            print(f"[green]Requeued {spool.requeue(k)} {NAMES[k]}.[/green]")
+
+
+@app.command()
+def purge(kind: KindOption = None):
+    """Delete rejected statuses and sessions."""
+    with Spool(settings.SPOOL_PATH) as spool:
+        for k in kind or NAMES:
+            print(f"[green]Purged {spool.purge(k)} {NAMES[k]}.[/green]")
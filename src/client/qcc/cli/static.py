@@ -1,28 +1,48 @@
 """QualiCharge API client CLI: static."""
 
 import json
+from functools import partial
+from pathlib import Path
 from typing import Optional
 
-import click
 import typer
 from rich import print
 from typing_extensions import Annotated
 
 from ..client import QCC
+from ..conf import settings
+from ..models import BulkProgress
 from .api import async_run_api_query
 from .codes import QCCExitCodes
-from .utils import parse_input_json_lines, parse_json_parameter
+from .utils import (
+    get_bulk_input,
+    parse_json_parameter,
+    print_bulk_progress,
+)
 
 app = typer.Typer(name="static", no_args_is_help=True)
 
+# Fields checked for each row of bulk input files
+REQUIRED_FIELDS = ["id_pdc_itinerance", "id_station_itinerance"]
+
 
 @app.command()
-def list(ctx: typer.Context):
+def list(
+    ctx: typer.Context,
+    page_size: Annotated[
+        int, typer.Option(help="Number of entries per page (100 at most)")
+    ] = 100,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests")
+    ] = settings.API_BULK_CONCURRENCY,
+):
     """Get all statique entries."""
     client: QCC = ctx.obj
 
     async def statiques():
-        async for statique in client.static.list():
+        async for statique in client.static.list(
+            page_size=page_size, concurrency=concurrency
+        ):
             typer.echo(json.dumps(statique))
 
     async_run_api_query(statiques)
@@ -96,21 +116,35 @@ def bulk(
     ctx: typer.Context,
     chunk_size: int = 10,
     ignore_errors: bool = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests")
+    ] = settings.API_BULK_CONCURRENCY,
+    file: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Read objects from an NDJSON, CSV or Parquet file",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
 ):
     """Bulk create new Statique entries.
 
-    Statiques entries will be read from the standard input (one JSON per line).
+    Statiques entries will be read from the standard input (one JSON per line), or from
+    the `--file` input file.
     """
     client: QCC = ctx.obj
 
+    progress = BulkProgress(chunk_size=chunk_size)
     n_created = async_run_api_query(
-        client.static.bulk,
-        parse_input_json_lines(click.get_text_stream("stdin"), ignore_errors),
+        partial(client.static.bulk, concurrency=concurrency, progress=progress),
+        get_bulk_input(file, REQUIRED_FIELDS, ignore_errors),
         chunk_size,
         ignore_errors,
     )
 
     print(f"[green]Created {n_created} statiques successfully.[/green]")
+    print_bulk_progress(progress, "statiques")
 
 
 if __name__ == "__main__":
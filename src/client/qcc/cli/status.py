@@ -1,19 +1,32 @@
 """QualiCharge API client CLI: status."""
 
 import json
-from datetime import datetime
-from typing import Annotated, List, Optional
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Annotated, Iterable, List, Optional
 
-import click
 import typer
 from rich import print
 
 from ..client import QCC
+from ..conf import settings
+from ..dedup import StatusDeduplicator
+from ..models import BulkProgress
+from ..spool import SpoolKind
 from .api import async_run_api_query
-from .utils import parse_input_json_lines, parse_json_parameter
+from .spool import spool_and_flush
+from .utils import (
+    get_bulk_input,
+    parse_json_parameter,
+    print_bulk_progress,
+)
 
 app = typer.Typer(name="status", no_args_is_help=True)
 
+# Fields checked for each row of bulk input files
+REQUIRED_FIELDS = ["id_pdc_itinerance", "etat_pdc", "occupation_pdc", "horodatage"]
+
 
 @app.command()
 def list(
@@ -82,22 +95,74 @@ def history(
 
 
 @app.command()
-def bulk(
+def bulk(  # noqa: PLR0913
     ctx: typer.Context,
     chunk_size: int = 10,
     ignore_errors: bool = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests")
+    ] = settings.API_BULK_CONCURRENCY,
+    file: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Read objects from an NDJSON, CSV or Parquet file",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
+    spool: Annotated[
+        bool, typer.Option(help="Spool objects locally before sending them")
+    ] = False,
+    dedup_window: Annotated[
+        Optional[int],
+        typer.Option(
+            help=(
+                "Skip unchanged statuses of a point of charge sent less than this "
+                "number of seconds ago"
+            ),
+            min=0,
+        ),
+    ] = None,
 ):
     """Bulk create new statuses.
 
-    Statuses will be read from the standard input (one JSON per line).
+    Statuses will be read from the standard input (one JSON per line), or from
+    the `--file` input file. With the `--spool` option, objects are stored in the
+    local spool first, and all spooled objects are sent: objects that could not be
+    sent stay in the spool until the next `qcc spool flush` command.
+
+    With the `--dedup-window` option, duplicated statuses and unchanged states of
+    a point of charge are not sent again during this time window.
     """
     client: QCC = ctx.obj
 
-    n_created = async_run_api_query(
-        client.status.bulk,
-        parse_input_json_lines(click.get_text_stream("stdin"), ignore_errors),
-        chunk_size,
-        ignore_errors,
-    )
+    progress = BulkProgress(chunk_size=chunk_size)
+    objs: Iterable[dict | str] = get_bulk_input(file, REQUIRED_FIELDS, ignore_errors)
+    dedup = None
+    if dedup_window is not None:
+        dedup = StatusDeduplicator(
+            settings.STATUS_DEDUP_MAX_SIZE, timedelta(seconds=dedup_window)
+        )
+        objs = dedup.filter(objs)
+    if spool:
+        n_created = spool_and_flush(
+            client.status,
+            SpoolKind.STATUS,
+            objs,
+            chunk_size,
+            ignore_errors,
+            concurrency,
+            progress,
+        )
+    else:
+        n_created = async_run_api_query(
+            partial(client.status.bulk, concurrency=concurrency, progress=progress),
+            objs,
+            chunk_size,
+            ignore_errors,
+        )
 
     print(f"[green]Created {n_created} statuses successfully.[/green]")
+    if dedup is not None:
+        print(f"Skipped {dedup.skipped} duplicated statuses")
+    print_bulk_progress(progress, "statuses")
@@ -1,12 +1,24 @@
 """QualiCharge API client CLI: utils."""
 
 import json
-from typing import Generator, TextIO
+from pathlib import Path
+from typing import Generator, Optional, Sequence, TextIO
 
 import click
 import typer
 from rich import print
 
+from ..files import (
+    FileFormat,
+    get_file_format,
+    parse_ndjson,
+    read_csv,
+    read_ndjson,
+    read_parquet,
+    serialize_rows,
+    validate_rows,
+)
+from ..models import BulkProgress
 from .codes import QCCExitCodes
 
 
@@ -48,3 +60,72 @@ def parse_input_json_lines(
             print("[red]Invalid JSON input string[/red]")
             raise typer.Exit(QCCExitCodes.PARAMETER_EXCEPTION) from err
         yield data
+
+
+def _check_rows(
+    rows: list[dict], required: Sequence[str], ignore_errors: bool
+) -> list[int]:
+    """Check a batch of rows, returning valid rows indexes."""
+    valid, errors = validate_rows(rows, required)
+    for error in errors:
+        if not ignore_errors:
+            print(f"[red]Invalid row[/red]\n{error}")
+            raise typer.Exit(QCCExitCodes.PARAMETER_EXCEPTION)
+        print(f"[orange]Ignored invalid row:[/orange]\n{error}")
+    return valid
+
+
+def _parse_ndjson_file(
+    path: Path, required: Sequence[str], ignore_errors: bool
+) -> Generator[str, None, None]:
+    """Parse NDJSON file lines by batch and yield valid lines as is."""
+    for batch in read_ndjson(path):
+        rows, lines = parse_ndjson(batch)
+        if len(lines) < len(batch):
+            if not ignore_errors:
+                print("[red]Invalid JSON input string[/red]")
+                raise typer.Exit(QCCExitCodes.PARAMETER_EXCEPTION)
+            print(f"[orange]Ignored {len(batch) - len(lines)} invalid lines[/orange]")
+        for index in _check_rows(rows, required, ignore_errors):
+            yield lines[index]
+
+
+def parse_input_file(
+    path: Path, required: Sequence[str], ignore_errors: bool
+) -> Generator[str, None, None]:
+    """Read, validate and serialize input file rows by batch.
+
+    `required` fields should be set for all rows. Rows are yielded as JSON object
+    strings.
+    """
+    try:
+        file_format = get_file_format(path)
+        if file_format == FileFormat.NDJSON:
+            yield from _parse_ndjson_file(path, required, ignore_errors)
+            return
+        reader = read_csv if file_format == FileFormat.CSV else read_parquet
+        for rows in reader(path):
+            valid = _check_rows(rows, required, ignore_errors)
+            yield from serialize_rows([rows[index] for index in valid])
+    except ValueError as err:
+        print(f"[red]{err}[/red]")
+        raise typer.Exit(QCCExitCodes.PARAMETER_EXCEPTION) from err
+
+
+def get_bulk_input(
+    file: Optional[Path], required: Sequence[str], ignore_errors: bool
+) -> Generator[dict | str, None, None]:
+    """Get bulk objects from the input file if any, or from the standard input."""
+    if file is None:
+        yield from parse_input_json_lines(click.get_text_stream("stdin"), ignore_errors)
+        return
+    yield from parse_input_file(file, required, ignore_errors)
+
+
+def print_bulk_progress(progress: BulkProgress, name: str):
+    """Print bulk create progress summary."""
+    retries = f", {progress.retries} retries" if progress.retries else ""
+    print(
+        f"Sent {progress.sent} {name} in {progress.chunks} chunks{retries} "
+        f"({progress.elapsed:.1f}s, {progress.throughput:.1f} {name}/s)"
+    )
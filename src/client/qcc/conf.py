@@ -1,5 +1,6 @@
 """QualiCharge API client settings."""
 
+from pathlib import Path
 from typing import Optional
 
 from pydantic import AnyHttpUrl
@@ -18,9 +19,26 @@ class Settings(BaseSettings):
     API_LOGIN_USERNAME: Optional[str] = None
     API_LOGIN_PASSWORD: Optional[str] = None
 
+    # API connection
+    API_MAX_CONNECTIONS: int = 100
+    API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    API_KEEPALIVE_EXPIRY: float = 5.0
+    # HTTP/2 requires the `h2` package (`httpx[http2]`)
+    API_HTTP2: bool = False
+    # Access token is renewed when it expires in less than this margin (seconds)
+    API_TOKEN_REFRESH_MARGIN: int = 30
+
     # API usage
     API_BULK_CREATE_MAX_SIZE: int = 10
+    API_BULK_CONCURRENCY: int = 4
+    API_BULK_MAX_RETRIES: int = 3
+    API_BULK_RETRY_BACKOFF: float = 0.5
     GZIP_COMPRESSION_LEVEL: int = 9
+    # Maximum number of points of charge remembered to deduplicate statuses
+    STATUS_DEDUP_MAX_SIZE: int = 100_000
+
+    # Offline spool (SQLite database)
+    SPOOL_PATH: Path = Path("~/.qcc/spool.sqlite3")
 
     model_config = SettingsConfigDict(
         case_sensitive=True,
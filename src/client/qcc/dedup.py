@@ -0,0 +1,75 @@
+"""QualiCharge API client statuses deduplication module."""
+
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+
+# Status fields describing the state of a point of charge
+STATE_FIELDS = ("etat_pdc", "occupation_pdc")
+
+
+def get_horodatage(status: dict) -> Optional[datetime]:
+    """Get the status timestamp (if valid).
+
+    Naive timestamps are considered as UTC so that all timestamps can be compared.
+    """
+    try:
+        horodatage = datetime.fromisoformat(status["horodatage"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if horodatage.tzinfo is None:
+        return horodatage.replace(tzinfo=timezone.utc)
+    return horodatage
+
+
+class StatusDeduplicator:
+    """Drop statuses that do not change the last sent state of a point of charge.
+
+    The last sent state of at most `maxsize` points of charge is kept (least
+    recently updated ones are forgotten). A status is dropped if it is a duplicate,
+    or if its state is unchanged and it has been sent less than `window` ago: state
+    changes are always sent, and unchanged states are sent once per `window`.
+    """
+
+    def __init__(self, maxsize: int, window: timedelta) -> None:
+        """Set the deduplication cache size and time window."""
+        self.maxsize = maxsize
+        self.window = window
+        self.skipped: int = 0
+        self._states: OrderedDict[str, Tuple[tuple, datetime]] = OrderedDict()
+
+    def is_duplicate(self, status: dict) -> bool:
+        """Check if the status should be dropped, else remember it as sent."""
+        id_pdc_itinerance = status.get("id_pdc_itinerance")
+        horodatage = get_horodatage(status)
+        # Let the server validate incomplete statuses
+        if not isinstance(id_pdc_itinerance, str) or horodatage is None:
+            return False
+        state = tuple(status.get(field) for field in STATE_FIELDS)
+
+        if id_pdc_itinerance in self._states:
+            last_state, last_horodatage = self._states[id_pdc_itinerance]
+            # Late statuses are part of the history
+            if horodatage < last_horodatage:
+                return False
+            if state == last_state and horodatage - last_horodatage < self.window:
+                return True
+
+        self._states[id_pdc_itinerance] = (state, horodatage)
+        self._states.move_to_end(id_pdc_itinerance)
+        if len(self._states) > self.maxsize:
+            self._states.popitem(last=False)
+        return False
+
+    def filter(self, objs: Iterable[dict | str]) -> Iterator[dict | str]:
+        """Yield statuses that should be sent.
+
+        Statuses are dictionaries or JSON object strings (yielded as is).
+        """
+        for obj in objs:
+            status = json.loads(obj) if isinstance(obj, str) else obj
+            if isinstance(status, dict) and self.is_duplicate(status):
+                self.skipped += 1
+                continue
+            yield obj
@@ -3,17 +3,63 @@
 import gzip
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Sequence
+from typing import AsyncIterator, Callable, Iterable, Optional
 
 import httpx
+from anyio import Semaphore, create_task_group, sleep, to_thread
+from anyio.abc import TaskGroup
 
 from qcc.conf import settings
 from qcc.exceptions import APIRequestError
 from qcc.http import HTTPClient
+from qcc.models import BulkProgress
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = {
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.INTERNAL_SERVER_ERROR,
+    httpx.codes.BAD_GATEWAY,
+    httpx.codes.SERVICE_UNAVAILABLE,
+    httpx.codes.GATEWAY_TIMEOUT,
+}
+# Permanent errors caused by submitted objects (sending them again would fail)
+REJECT_STATUS_CODES = {
+    httpx.codes.BAD_REQUEST,
+    httpx.codes.FORBIDDEN,
+    httpx.codes.NOT_FOUND,
+    httpx.codes.CONFLICT,
+    httpx.codes.REQUEST_ENTITY_TOO_LARGE,
+    httpx.codes.UNPROCESSABLE_ENTITY,
+}
+
+OnRejected = Callable[[list[dict | str], str], None]
+
+
+def compress_chunk(chunk: list[dict | str]) -> bytes:
+    """Serialize and gzip compress a chunk of objects.
+
+    Objects may be pre-serialized (JSON object strings).
+    """
+    content = ",".join(o if isinstance(o, str) else json.dumps(o) for o in chunk)
+    return gzip.compress(
+        f"[{content}]".encode("utf-8"),
+        compresslevel=settings.GZIP_COMPRESSION_LEVEL,
+    )
+
+
+def get_retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Get the delay before retrying a request (in seconds).
+
+    `response` is None when the request failed without response (transport error).
+    """
+    retry_after = response.headers.get("Retry-After", "") if response else ""
+    if retry_after.isdigit():
+        return float(retry_after)
+    return settings.API_BULK_RETRY_BACKOFF * 2**attempt
+
 
 class BaseCreateEndpoint:
     """Base create endpoint."""
@@ -38,50 +84,152 @@ class BaseCreateEndpoint:
 
         return response.json()
 
-    async def bulk(
+    async def _send_chunk(
+        self,
+        chunk: list[dict | str],
+        ignore_errors: bool,
+        progress: BulkProgress,
+        on_rejected: Optional[OnRejected] = None,
+    ) -> int:
+        """Submit a chunk to the /{endpoint}/bulk endpoint.
+
+        Transport errors (e.g. the API cannot be reached), server errors and rate
+        limited requests are retried with an exponential backoff (or after the
+        `Retry-After` delay). Chunks too large for the server are split and the
+        chunk size is halved for next chunks.
+
+        If `on_rejected` is given, a chunk rejected by the API (see
+        `REJECT_STATUS_CODES`) is split until rejected objects are isolated: they
+        are passed to `on_rejected` (with the API response) while others are sent.
+        """
+        # Zip chunk (in a worker thread not to block the event loop)
+        content = await to_thread.run_sync(compress_chunk, chunk)
+        for attempt in range(settings.API_BULK_MAX_RETRIES + 1):
+            last_attempt = attempt == settings.API_BULK_MAX_RETRIES
+            try:
+                response = await self.client.post(
+                    f"{self.endpoint}/bulk",
+                    content=content,
+                    headers={
+                        "Content-Encoding": "gzip",
+                        "Content-Type": "application/json",
+                    },
+                )
+            except httpx.TransportError as err:
+                if last_attempt:
+                    raise APIRequestError(f"API request failed: {err!r}") from err
+                delay = get_retry_delay(None, attempt)
+                logger.info("Retrying chunk in %.1fs (%r)", delay, err)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                    break
+                delay = get_retry_delay(response, attempt)
+                logger.info("Retrying chunk in %.1fs (%s)", delay, response)
+            progress.retries += 1
+            await sleep(delay)
+
+        if (
+            response.status_code == httpx.codes.REQUEST_ENTITY_TOO_LARGE
+            and len(chunk) > 1
+        ):
+            half = len(chunk) // 2
+            progress.chunk_size = max(1, min(progress.chunk_size, half))
+            logger.info("Chunk too large, chunk size is now %d", progress.chunk_size)
+            return await self._send_chunk(
+                chunk[:half], ignore_errors, progress, on_rejected
+            ) + await self._send_chunk(
+                chunk[half:], ignore_errors, progress, on_rejected
+            )
+
+        if on_rejected is not None and response.status_code in REJECT_STATUS_CODES:
+            if len(chunk) > 1:
+                half = len(chunk) // 2
+                logger.info("Chunk rejected, splitting it (%s)", response)
+                return await self._send_chunk(
+                    chunk[:half], ignore_errors, progress, on_rejected
+                ) + await self._send_chunk(
+                    chunk[half:], ignore_errors, progress, on_rejected
+                )
+            logger.warning("Rejected object: %s (%s)", chunk[0], response.text)
+            on_rejected(chunk, response.text)
+            return 0
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as err:
+            if ignore_errors:
+                logger.debug("Ignored chunk: %s", chunk)
+                logger.warning("Ignored query error: %s", response)
+                return 0
+            raise APIRequestError(response.json()) from err
+        return response.json()["size"]
+
+    async def bulk(  # noqa: PLR0913
         self,
-        objs: Sequence[dict],
+        objs: Iterable[dict | str],
         chunk_size: int = settings.API_BULK_CREATE_MAX_SIZE,
         ignore_errors: bool = False,
+        concurrency: Optional[int] = None,
+        progress: Optional[BulkProgress] = None,
+        on_sent: Optional[Callable[[list[dict | str]], None]] = None,
+        on_rejected: Optional[OnRejected] = None,
     ) -> int:
-        """Query the /{endpoint}/bulk endpoint (POST)."""
-        chunk: list = []
-        n_created = 0
-
-        async def send_chunk(client, chunk: list[dict]) -> int:
-            """Submit a chunk to the API."""
-            # Zip chunk
-            content = gzip.compress(
-                json.dumps(chunk).encode("utf-8"),
-                compresslevel=settings.GZIP_COMPRESSION_LEVEL,
-            )
-            response = await client.post(
-                f"{self.endpoint}/bulk",
-                content=content,
-                headers={
-                    "Content-Encoding": "gzip",
-                    "Content-Type": "application/json",
-                },
-            )
+        """Query the /{endpoint}/bulk endpoint (POST).
+
+        Objects are dictionaries or pre-serialized JSON object strings. Chunks are
+        sent while next ones are read, with up to `concurrency` requests in flight
+        (`API_BULK_CONCURRENCY` by default). The optional `progress` object is
+        updated after each sent chunk, and the optional `on_sent` callback is
+        called with each chunk that has been sent (or ignored). If the optional
+        `on_rejected` callback is given, objects rejected by the API are passed to
+        it instead of failing (see `_send_chunk`).
+        """
+        if progress is None:
+            progress = BulkProgress(chunk_size=chunk_size)
+        progress.chunk_size = chunk_size
+        limiter = Semaphore(concurrency or settings.API_BULK_CONCURRENCY)
+        errors: list[APIRequestError] = []
+        started = time.monotonic()
+
+        async def send(chunk: list[dict | str], task_group: TaskGroup):
+            """Send a chunk and update progress."""
             try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as err:
-                if ignore_errors:
-                    logger.debug("Ignored chunk: %s", chunk)
-                    logger.warning("Ignored query error: %s", response)
-                    return 0
-                raise APIRequestError(response.json()) from err
-            return response.json()["size"]
-
-        for obj in objs:
-            chunk.append(obj)
-            if len(chunk) == chunk_size:
-                n_created += await send_chunk(self.client, chunk)
-                chunk = []
-
-        if chunk:
-            n_created += await send_chunk(self.client, chunk)
-        return n_created
+                n_created = await self._send_chunk(
+                    chunk, ignore_errors, progress, on_rejected
+                )
+            except APIRequestError as err:
+                errors.append(err)
+                task_group.cancel_scope.cancel()
+                return
+            finally:
+                limiter.release()
+            if on_sent is not None:
+                on_sent(chunk)
+            progress.created += n_created
+            progress.sent += len(chunk)
+            progress.chunks += 1
+            progress.elapsed = time.monotonic() - started
+            logger.debug(
+                "Sent %d objects (%.1f objects/s)", progress.sent, progress.throughput
+            )
+
+        async with create_task_group() as task_group:
+            chunk: list = []
+            for obj in objs:
+                chunk.append(obj)
+                if len(chunk) >= progress.chunk_size:
+                    # Wait for a free slot before reading next objects
+                    await limiter.acquire()
+                    task_group.start_soon(send, chunk, task_group)
+                    chunk = []
+
+            if chunk:
+                await limiter.acquire()
+                task_group.start_soon(send, chunk, task_group)
+
+        if errors:
+            raise errors[0]
+        return progress.created
 
 
 class BaseEndpoint(ABC, BaseCreateEndpoint):
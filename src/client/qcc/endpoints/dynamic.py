@@ -10,6 +10,7 @@ import httpx
 from qcc.endpoints.base import BaseCreateEndpoint
 
 from ..exceptions import APIRequestError
+from ..streaming import iter_json_items
 from .base import BaseEndpoint
 
 logger = logging.getLogger(__name__)
@@ -37,14 +38,17 @@ class Status(BaseEndpoint):
             if p[1] is not None
         )
 
-        response = await self.client.get(f"{self.endpoint}/", params=params)
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as err:
-            raise APIRequestError(response.json()) from err
+        async with self.client.stream(
+            "GET", f"{self.endpoint}/", params=params
+        ) as response:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as err:
+                await response.aread()
+                raise APIRequestError(response.json()) from err
 
-        for status in response.json():
-            yield status
+            async for status in iter_json_items(response):
+                yield status
 
     async def history(
         self, id_: str, from_: Optional[datetime] = None
@@ -54,16 +58,17 @@ class Status(BaseEndpoint):
         from_str = from_.isoformat() if from_ else None
         params = {"from": from_str} if from_str else {}
 
-        response = await self.client.get(
-            f"{self.endpoint}/{id_}/history", params=params
-        )
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as err:
-            raise APIRequestError(response.json()) from err
-
-        for status in response.json():
-            yield status
+        async with self.client.stream(
+            "GET", f"{self.endpoint}/{id_}/history", params=params
+        ) as response:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as err:
+                await response.aread()
+                raise APIRequestError(response.json()) from err
+
+            async for status in iter_json_items(response):
+                yield status
 
 
 class Session(BaseCreateEndpoint):
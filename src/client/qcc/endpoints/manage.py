@@ -2,13 +2,15 @@
 
 import logging
 from datetime import datetime
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
 import httpx
 
 from qcc.http import HTTPClient
 
 from ..exceptions import APIRequestError
+from ..models import StationsSync
+from ..streaming import iter_json_items
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +37,53 @@ class Manage:
         params = dict(p for p in (("after", after_str),) if p[1] is not None)
 
         url = f"{self.endpoint}/station/siren/{siren}"
-        response = await self.client.get(url, params=params)
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as err:
-            raise APIRequestError(response.json()) from err
-
-        for station in response.json():
-            yield station
+        async with self.client.stream("GET", url, params=params) as response:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as err:
+                await response.aread()
+                raise APIRequestError(response.json()) from err
+
+            async for station in iter_json_items(response):
+                yield station
+
+    async def read_stations_by_sirens(
+        self,
+        sirens: List[str],
+        after: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        sync: Optional[StationsSync] = None,
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """Query the /station endpoint (GET), following the next page cursors.
+
+        Yields (SIREN, station) tuples. The API watermark is computed per page: if
+        a `sync` object is given, it is updated with the latest watermark over all
+        pages, to be used as the `after` parameter of the next synchronization.
+        """
+        params: dict = {"siren": sirens}
+        if after is not None:
+            params["after"] = after.isoformat()
+        if limit is not None:
+            params["limit"] = limit
+
+        while True:
+            response = await self.client.get(f"{self.endpoint}/station", params=params)
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as err:
+                raise APIRequestError(response.json()) from err
+
+            page = response.json()
+            if sync is not None:
+                sync.pages += 1
+                if page["watermark"] is not None:
+                    watermark = datetime.fromisoformat(page["watermark"])
+                    if sync.watermark is None or watermark > sync.watermark:
+                        sync.watermark = watermark
+            for siren, stations in page["items"].items():
+                for station in stations:
+                    yield siren, station
+
+            if page["cursor"] is None:
+                return
+            params["cursor"] = page["cursor"]
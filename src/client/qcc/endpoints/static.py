@@ -1,10 +1,12 @@
 """QualiCharge API client static endpoints."""
 
 import logging
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 
 import httpx
+from anyio import create_task_group
 
+from ..conf import settings
 from ..exceptions import APIRequestError
 from .base import BaseEndpoint
 
@@ -16,26 +18,75 @@ class Static(BaseEndpoint):
 
     endpoint: str = "/statique"
 
-    async def list(self) -> AsyncIterator[dict]:
-        """Query the /statique/ endpoint (GET)."""
+    async def _get_page(self, url: str, params: Optional[dict] = None) -> dict:
+        """Get a statique items page."""
+        response = await self.client.get(url, params=params)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as err:
+            raise APIRequestError(response.json()) from err
+        return response.json()
+
+    async def _get_pages(
+        self, url: str, offsets: list[int], limit: int
+    ) -> list[list[dict]]:
+        """Get statique items pages concurrently (in the `offsets` order)."""
+        pages: list[list[dict]] = [[] for _ in offsets]
+        errors: list[APIRequestError] = []
 
-        async def get_statiques(url=f"{self.endpoint}/"):
-            """Get statique items."""
-            response = await self.client.get(url)
+        async def fetch(index: int, offset: int):
+            """Fetch a page in the reordering buffer."""
             try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as err:
-                raise APIRequestError(response.json()) from err
-            json_response = response.json()
-            for statique in json_response["items"]:
-                yield statique
-            if "next" in json_response and json_response["next"]:
-                async for statique in get_statiques(json_response["next"]):
-                    yield statique
+                page = await self._get_page(url, {"offset": offset, "limit": limit})
+            except APIRequestError as err:
+                errors.append(err)
+                task_group.cancel_scope.cancel()
+                return
+            pages[index] = page["items"]
 
-        async for statique in get_statiques():
+        async with create_task_group() as task_group:
+            for index, offset in enumerate(offsets):
+                task_group.start_soon(fetch, index, offset)
+
+        if errors:
+            raise errors[0]
+        return pages
+
+    async def list(
+        self,
+        page_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Query the /statique/ endpoint (GET).
+
+        Once the first page has been received, next pages are fetched concurrently
+        (up to `concurrency` requests, `API_BULK_CONCURRENCY` by default) using
+        the total number of items, and items are yielded in order. If the total is
+        unknown, `next` page links are followed. Pages contain `page_size` items
+        (the server default if not set).
+        """
+        url = f"{self.endpoint}/"
+        params = {"limit": page_size} if page_size else None
+        page = await self._get_page(url, params)
+        for statique in page["items"]:
             yield statique
 
+        total, limit = page.get("total"), page.get("limit")
+        if not total or not limit:
+            while page.get("next"):
+                page = await self._get_page(page["next"])
+                for statique in page["items"]:
+                    yield statique
+            return
+
+        offsets = list(range(page.get("offset", 0) + limit, total, limit))
+        window = concurrency or settings.API_BULK_CONCURRENCY
+        for start in range(0, len(offsets), window):
+            pages = await self._get_pages(url, offsets[start : start + window], limit)
+            for items in pages:
+                for statique in items:
+                    yield statique
+
     async def update(self, id_: str, obj: dict) -> dict:
         """Query the /{endpoint}/{id_} endpoint (PUT)."""
         response = await self.client.put(f"{self.endpoint}/{id_}", json=obj)
@@ -0,0 +1,142 @@
+"""QualiCharge API client input files module.
+
+Input files are read by batches of rows. Supported formats are NDJSON (one JSON
+object per line), CSV (with a header row) and Parquet (requires `pyarrow`).
+"""
+
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, Iterator, List, Sequence, Tuple
+
+BATCH_SIZE: int = 1000
+
+
+class FileFormat(StrEnum):
+    """Supported input file formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+FILE_EXTENSIONS = {
+    ".ndjson": FileFormat.NDJSON,
+    ".jsonl": FileFormat.NDJSON,
+    ".json": FileFormat.NDJSON,
+    ".csv": FileFormat.CSV,
+    ".parquet": FileFormat.PARQUET,
+    ".pq": FileFormat.PARQUET,
+}
+
+
+def get_file_format(path: Path) -> FileFormat:
+    """Guess the input file format from its extension."""
+    try:
+        return FILE_EXTENSIONS[path.suffix.lower()]
+    except KeyError as err:
+        raise ValueError(f"Unsupported file format: {path.name}") from err
+
+
+def _serialize_value(value: Any) -> Any:
+    """Serialize values that are not natively JSON serializable."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def serialize_rows(rows: Sequence[dict]) -> List[str]:
+    """Serialize rows as JSON objects strings."""
+    return [json.dumps(row, default=_serialize_value) for row in rows]
+
+
+def read_ndjson(path: Path, batch_size: int = BATCH_SIZE) -> Iterator[List[str]]:
+    """Read NDJSON lines by batch (empty lines are skipped)."""
+    with path.open(encoding="utf-8") as lines:
+        batch: List[str] = []
+        for line in lines:
+            if line.strip():
+                batch.append(line.strip())
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def parse_ndjson(lines: List[str]) -> Tuple[List[dict], List[str]]:
+    """Parse a batch of NDJSON lines at once.
+
+    Returns parsed rows and the source lines that could be parsed. If the batch is
+    not valid (or a line holds more than one value), lines are parsed one by one
+    and invalid ones are skipped.
+    """
+    try:
+        rows = json.loads(f"[{','.join(lines)}]")
+    except json.JSONDecodeError:
+        pass
+    else:
+        if len(rows) == len(lines):
+            return rows, lines
+    rows, valid = [], []
+    for line in lines:
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+        valid.append(line)
+    return rows, valid
+
+
+def read_csv(path: Path, batch_size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    """Read CSV rows by batch.
+
+    CSV cannot represent null values: empty fields are considered as null.
+    """
+    with path.open(encoding="utf-8", newline="") as stream:
+        batch: List[dict] = []
+        for row in csv.DictReader(stream):
+            batch.append({k: (v if v != "" else None) for k, v in row.items()})
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def read_parquet(path: Path, batch_size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    """Read Parquet rows by batch (row groups are streamed)."""
+    try:
+        from pyarrow import parquet as pq  # type: ignore  # noqa: PLC0415
+    except ImportError as err:
+        raise ValueError("Reading Parquet files requires the pyarrow package") from err
+
+    parquet_file = pq.ParquetFile(path)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield record_batch.to_pylist()
+
+
+def validate_rows(
+    rows: Sequence[dict], required: Sequence[str]
+) -> Tuple[List[int], List[str]]:
+    """Check that required fields are set for a batch of rows.
+
+    Returns the indexes of valid rows and error messages for invalid ones.
+    """
+    valid: List[int] = []
+    errors: List[str] = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(f"Not an object: {row}")
+            continue
+        missing = [field for field in required if row.get(field) is None]
+        if missing:
+            errors.append(f"Missing {', '.join(missing)} field(s): {row}")
+            continue
+        valid.append(index)
+    return valid, errors
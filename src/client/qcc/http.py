@@ -1,20 +1,52 @@
 """QualiCharge API client HTTP module."""
 
+import base64
+import binascii
+import json
+import time
+from contextlib import asynccontextmanager
 from json import JSONDecodeError
+from typing import AsyncIterator, Optional
 
 import httpx
+from anyio import Lock
 from pydantic import ValidationError
 
+from .conf import settings
 from .exceptions import AuthenticationError, ConfigurationError
 from .models import Token
 
 
+def get_token_expiration(access_token: str) -> Optional[float]:
+    """Get the access token expiration timestamp (if any).
+
+    The access token is expected to be a JWT: its payload is decoded (not
+    verified) to read the `exp` claim.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError, binascii.Error):
+        return None
+
+
 class OAuth2AccessToken(httpx.Auth):
     """Add OAuth2 access token to HTTP API requests header."""
 
     def __init__(self, access_token):
         """Instantiate requests Auth object with generated access_token."""
         self.access_token = access_token
+        self.expires_at = get_token_expiration(access_token)
+
+    @property
+    def expires_soon(self) -> bool:
+        """Check if the access token expires in less than the refresh margin."""
+        if self.expires_at is None:
+            return False
+        return time.time() + settings.API_TOKEN_REFRESH_MARGIN >= self.expires_at
 
     def auth_flow(self, request):
         """Modify and return the request."""
@@ -34,19 +66,30 @@ class HTTPClient(httpx.AsyncClient):
                 "The `base_url` argument should be set to your root API url"
             )
 
+        kwargs.setdefault(
+            "limits",
+            httpx.Limits(
+                max_connections=settings.API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.API_KEEPALIVE_EXPIRY,
+            ),
+        )
+        kwargs.setdefault("http2", settings.API_HTTP2)
         super().__init__(*args, base_url=base_url, **kwargs)
 
         self.username: str = username
         self.password: str = password
         self.headers = httpx.Headers({b"Content-Type": b"application/json"})
+        self._auth_lock = Lock()
 
-    def _get_auth(self) -> OAuth2AccessToken:
+    async def _get_auth(self) -> OAuth2AccessToken:
         """Request OAuth2 access token from the API."""
-        response = httpx.post(
-            self._merge_url("/auth/token"),
-            data={"username": self.username, "password": self.password},
-            timeout=10,
-        )
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                self._merge_url("/auth/token"),
+                data={"username": self.username, "password": self.password},
+                timeout=10,
+            )
         try:
             token = Token(**response.json())
         except JSONDecodeError as exc:
@@ -63,25 +106,63 @@ class HTTPClient(httpx.AsyncClient):
 
         return OAuth2AccessToken(token.access_token)
 
+    async def _refresh_auth(self, stale: Optional[httpx.Auth]):
+        """Get a new access token unless another request already did it.
+
+        `stale` is the access token that should be replaced: concurrent requests
+        wait for a single refresh and share the new access token.
+        """
+        async with self._auth_lock:
+            if self._auth is not stale and isinstance(self._auth, OAuth2AccessToken):
+                return
+            self._auth = await self._get_auth()
+
+    async def _ensure_auth(self) -> Optional[httpx.Auth]:
+        """Get an access token if not set yet or if it is about to expire."""
+        auth = self._auth
+        if not auth or (isinstance(auth, OAuth2AccessToken) and auth.expires_soon):
+            await self._refresh_auth(auth)
+        return self._auth
+
+    @staticmethod
+    async def _is_token_expired(response: httpx.Response) -> bool:
+        """Check if the request failed because the access token expired."""
+        if response.status_code != httpx.codes.UNAUTHORIZED:
+            return False
+        # Streamed responses body has not been read yet
+        await response.aread()
+        try:
+            json_response = response.json()
+        except JSONDecodeError:
+            return False
+        return "Token signature expired" in json_response["message"]
+
     async def request(self, method, url, **kwargs) -> httpx.Response:
         """Automatically renew access token when expired."""
-        # Get access token if it has not been set yet
-        if not self._auth:
-            self._auth = self._get_auth()
+        auth = await self._ensure_auth()
 
         response = await super().request(method, url, **kwargs)
 
-        # Try to regenerate the access token in case of 401 response
-        if response.status_code == httpx.codes.UNAUTHORIZED:
-            try:
-                json_response = response.json()
-            except JSONDecodeError:
-                return response
-
-            # Token expired, let's get a new one
-            if "Token signature expired" in json_response["message"]:
-                self.auth = self._get_auth()
-                # Perform the request with the new token
-                return await super().request(method, url, **kwargs)
+        # Token expired, let's get a new one
+        if await self._is_token_expired(response):
+            await self._refresh_auth(auth)
+            # Perform the request with the new token
+            return await super().request(method, url, **kwargs)
 
         return response
+
+    @asynccontextmanager
+    async def stream(  # type: ignore[override]
+        self, method, url, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Stream a response, automatically renewing access token when expired."""
+        auth = await self._ensure_auth()
+
+        async with super().stream(method, url, **kwargs) as response:
+            if not await self._is_token_expired(response):
+                yield response
+                return
+
+        await self._refresh_auth(auth)
+        async with super().stream(method, url, **kwargs) as response:
+            yield response
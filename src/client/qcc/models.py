@@ -1,5 +1,8 @@
 """QualiCharge API client models."""
 
+from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -8,3 +11,26 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+
+
+class BulkProgress(BaseModel):
+    """Bulk create progress."""
+
+    chunk_size: int
+    sent: int = 0
+    created: int = 0
+    chunks: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Sent objects per second."""
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+
+class StationsSync(BaseModel):
+    """Stations listing progress."""
+
+    pages: int = 0
+    watermark: Optional[datetime] = None
@@ -0,0 +1,208 @@
+"""QualiCharge API client offline spool module.
+
+Objects to submit are first stored in a local SQLite database, then forwarded to
+the API by chunks. Spooled objects are only removed once they have been sent, so
+that nothing is lost if the API is unreachable or if the client crashes. Objects
+rejected by the API (e.g. an undeclared point of charge) are moved to a
+dead-letter table so that they do not block objects spooled after them.
+"""
+
+import hashlib
+import json
+import sqlite3
+from enum import StrEnum
+from functools import partial
+from itertools import batched
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Self, Tuple
+
+from .endpoints.base import BaseCreateEndpoint
+from .models import BulkProgress
+
+BATCH_SIZE: int = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  key TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS spool_kind_id ON spool (kind, id);
+CREATE TABLE IF NOT EXISTS rejected (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  key TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  reason TEXT NOT NULL,
+  UNIQUE (kind, key)
+);
+"""
+
+
+class SpoolKind(StrEnum):
+    """Spooled objects kinds."""
+
+    STATUS = "status"
+    SESSION = "session"
+
+
+def serialize(obj: dict | str) -> str:
+    """Serialize an object as a JSON object string (if not already)."""
+    return obj if isinstance(obj, str) else json.dumps(obj, sort_keys=True)
+
+
+def get_key(payload: str) -> str:
+    """Get the idempotency key of a serialized object."""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Spool:
+    """Durable queue of objects to submit to the API.
+
+    Each object is identified by an idempotency key (the hash of its JSON
+    serialization): the same object is spooled once per kind, and sent objects are
+    removed using their key.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open (or create) the spool database."""
+        path = path.expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        # Write-ahead logging allows to spool while flushing
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> Self:
+        """Use the spool as a context manager."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the spool database."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the spool database."""
+        self.connection.close()
+
+    def put(self, kind: SpoolKind, objs: Iterable[dict | str]) -> int:
+        """Add objects to the spool, returning the number of new objects.
+
+        Objects are committed by batch: already spooled objects are ignored.
+        """
+        spooled = 0
+        for batch in batched(objs, BATCH_SIZE):
+            payloads = [serialize(obj) for obj in batch]
+            with self.connection:
+                cursor = self.connection.executemany(
+                    "INSERT OR IGNORE INTO spool (kind, key, payload) VALUES (?, ?, ?)",
+                    [(kind, get_key(payload), payload) for payload in payloads],
+                )
+            spooled += cursor.rowcount
+        return spooled
+
+    def count(self, kind: SpoolKind) -> int:
+        """Get the number of spooled objects."""
+        cursor = self.connection.execute(
+            "SELECT count(*) FROM spool WHERE kind = ?", (kind,)
+        )
+        return cursor.fetchone()[0]
+
+    def iter_pending(self, kind: SpoolKind) -> Iterator[str]:
+        """Iterate over spooled objects in insertion order (read by batch)."""
+        last_id = 0
+        while True:
+            rows = self.connection.execute(
+                "SELECT id, payload FROM spool WHERE kind = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (kind, last_id, BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, payload in rows:
+                yield payload
+
+    def ack(self, kind: SpoolKind, objs: List[dict | str]) -> None:
+        """Remove sent objects from the spool."""
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM spool WHERE kind = ? AND key = ?",
+                [(kind, get_key(serialize(obj))) for obj in objs],
+            )
+
+    def reject(self, kind: SpoolKind, objs: List[dict | str], reason: str) -> None:
+        """Move objects rejected by the API from the spool to the rejected table."""
+        payloads = [serialize(obj) for obj in objs]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO rejected (kind, key, payload, reason) "
+                "VALUES (?, ?, ?, ?)",
+                [(kind, get_key(payload), payload, reason) for payload in payloads],
+            )
+            self.connection.executemany(
+                "DELETE FROM spool WHERE kind = ? AND key = ?",
+                [(kind, get_key(payload)) for payload in payloads],
+            )
+
+    def count_rejected(self, kind: SpoolKind) -> int:
+        """Get the number of rejected objects."""
+        cursor = self.connection.execute(
+            "SELECT count(*) FROM rejected WHERE kind = ?", (kind,)
+        )
+        return cursor.fetchone()[0]
+
+    def iter_rejected(self, kind: SpoolKind) -> Iterator[Tuple[str, str]]:
+        """Iterate over rejected (payload, reason) tuples in rejection order."""
+        yield from self.connection.execute(
+            "SELECT payload, reason FROM rejected WHERE kind = ? ORDER BY id", (kind,)
+        )
+
+    def requeue(self, kind: SpoolKind) -> int:
+        """Move rejected objects back to the spool, returning their number."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO spool (kind, key, payload) "
+                "SELECT kind, key, payload FROM rejected WHERE kind = ? ORDER BY id",
+                (kind,),
+            )
+            self.connection.execute("DELETE FROM rejected WHERE kind = ?", (kind,))
+        return cursor.rowcount
+
+    def purge(self, kind: SpoolKind) -> int:
+        """Delete rejected objects, returning their number."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM rejected WHERE kind = ?", (kind,)
+            )
+        return cursor.rowcount
+
+
+async def flush(  # noqa: PLR0913
+    spool: Spool,
+    kind: SpoolKind,
+    endpoint: BaseCreateEndpoint,
+    chunk_size: int,
+    ignore_errors: bool = False,
+    concurrency: Optional[int] = None,
+    progress: Optional[BulkProgress] = None,
+) -> int:
+    """Forward spooled objects to the endpoint.
+
+    Objects are removed from the spool as soon as their chunk has been sent (or
+    ignored). Objects rejected by the API are moved to the rejected table. If a
+    chunk cannot be sent (e.g. the API is unreachable), remaining objects stay in
+    the spool and will be sent by the next flush.
+    """
+    return await endpoint.bulk(
+        spool.iter_pending(kind),
+        chunk_size,
+        ignore_errors=ignore_errors,
+        concurrency=concurrency,
+        progress=progress,
+        on_sent=partial(spool.ack, kind),
+        on_rejected=partial(spool.reject, kind),
+    )
@@ -0,0 +1,123 @@
+"""QualiCharge API client streaming module."""
+
+import json
+from enum import Enum
+from typing import Any, AsyncIterator, List, Tuple
+
+import httpx
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+WHITESPACE = " \t\n\r"
+# Characters that may continue a number
+NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _State(Enum):
+    """JSON array decoder states."""
+
+    START = "start"
+    ITEM_OR_END = "item-or-end"
+    ITEM = "item"
+    SEPARATOR = "separator"
+    DONE = "done"
+
+
+ERRORS = {
+    _State.START: "Expecting a JSON array",
+    _State.SEPARATOR: "Expecting ',' delimiter",
+    _State.DONE: "Extra data",
+}
+
+
+class JSONArrayDecoder:
+    """Incremental JSON array decoder.
+
+    Text chunks are fed to the decoder that returns array items as soon as they
+    are complete. Only the pending (incomplete) item is kept in memory.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty decoder."""
+        self._decoder = json.JSONDecoder()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._state = _State.START
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        """Get a decoding error at the current position."""
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _skip_whitespace(self) -> bool:
+        """Move to the next non whitespace character (if any)."""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self._buffer)
+
+    def _may_be_truncated(self, end: int) -> bool:
+        """Check if the buffer from `end` may only be the beginning of a number."""
+        while end < len(self._buffer) and self._buffer[end] in NUMBER_CHARS:
+            end += 1
+        return end == len(self._buffer)
+
+    def _decode_item(self, final: bool) -> Tuple[bool, Any]:
+        """Decode the next array item, unless it has not been fully received."""
+        try:
+            item, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        # An item ending the buffer, or followed by characters that may continue a
+        # number (e.g. `1.` or `1e`), may be truncated
+        if not final and self._may_be_truncated(end):
+            return False, None
+        self._pos = end
+        return True, item
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        """Feed a text chunk and get decoded items.
+
+        Set `final` for the last chunk to check that the array is complete.
+        """
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        items: List[Any] = []
+        while self._skip_whitespace():
+            char = self._buffer[self._pos]
+            if self._state == _State.START and char == "[":
+                self._state = _State.ITEM_OR_END
+            elif self._state == _State.ITEM_OR_END and char == "]":
+                self._state = _State.DONE
+            elif self._state in (_State.ITEM, _State.ITEM_OR_END):
+                decoded, item = self._decode_item(final)
+                if not decoded:
+                    break
+                items.append(item)
+                self._state = _State.SEPARATOR
+                continue
+            elif self._state == _State.SEPARATOR and char in ",]":
+                self._state = _State.ITEM if char == "," else _State.DONE
+            else:
+                raise self._error(ERRORS[self._state])
+            self._pos += 1
+
+        if final and self._state != _State.DONE:
+            raise self._error("Unterminated JSON array")
+        return items
+
+
+async def iter_json_items(response: httpx.Response) -> AsyncIterator[Any]:
+    """Decode items of a streamed JSON array (or NDJSON) response."""
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.startswith(NDJSON_CONTENT_TYPES):
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    decoder = JSONArrayDecoder()
+    async for text in response.aiter_text():
+        for item in decoder.feed(text):
+            yield item
+    for item in decoder.feed("", final=True):
+        yield item
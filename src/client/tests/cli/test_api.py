@@ -0,0 +1,49 @@
+"""Tests for the qcc.cli.api module."""
+
+import anyio
+import httpx
+import pytest
+import typer
+
+from qcc.cli.api import async_run_api_query, get_api_error
+from qcc.cli.codes import QCCExitCodes
+from qcc.exceptions import APIRequestError
+
+
+async def raise_in_task_group(error: Exception):
+    """Raise an error from a task group (wrapped in an exception group)."""
+
+    async def fail():
+        raise error
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(fail)
+
+
+def test_get_api_error():
+    """Test the `get_api_error` utility."""
+    error = APIRequestError("Bad request")
+    assert get_api_error(error) is error
+    assert get_api_error(ValueError()) is None
+
+    error = httpx.ConnectError("Connection refused")
+    try:
+        anyio.run(raise_in_task_group, error)
+    except Exception as group:
+        assert group is not error
+        assert get_api_error(group) is error
+
+
+def test_async_run_api_query_task_group():
+    """Test the `async_run_api_query` wrapper handles task groups errors."""
+    error = httpx.ConnectError("Connection refused")
+    with pytest.raises(typer.Exit) as exc_info:
+        async_run_api_query(raise_in_task_group, error)
+    assert exc_info.value.exit_code == QCCExitCodes.API_EXCEPTION
+
+    # Other errors are not handled
+    async def query():
+        raise ValueError("Unexpected")
+
+    with pytest.raises(ValueError, match="Unexpected"):
+        async_run_api_query(query)
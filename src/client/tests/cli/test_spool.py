@@ -0,0 +1,192 @@
+"""Tests for the qcc.cli.spool module."""
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from qcc.cli.codes import QCCExitCodes
+from qcc.cli.spool import app
+from qcc.cli.status import app as status_app
+from qcc.conf import settings
+from qcc.spool import Spool, SpoolKind
+
+
+@pytest.fixture(autouse=True)
+def spool_path(tmp_path, monkeypatch):
+    """Use a temporary spool."""
+    path = tmp_path / "spool.sqlite3"
+    monkeypatch.setattr(settings, "SPOOL_PATH", path)
+    yield path
+
+
+def test_cli_spool_info(runner, qcc, spool_path):
+    """Test the `spool info` command."""
+    with Spool(spool_path) as spool:
+        spool.put(SpoolKind.STATUS, [{"id": 1}, {"id": 2}])
+
+    result = runner.invoke(app, ["info"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "statuses: 2" in result.stdout
+    assert "sessions: 0" in result.stdout
+
+
+def test_cli_spool_flush(runner, qcc, httpx_mock, spool_path, monkeypatch):
+    """Test the `spool flush` command."""
+    monkeypatch.setattr(settings, "API_BULK_MAX_RETRIES", 0)
+    with Spool(spool_path) as spool:
+        spool.put(SpoolKind.STATUS, [{"id": x} for x in range(3)])
+        spool.put(SpoolKind.SESSION, [{"id": x} for x in range(2)])
+
+    # The API is unavailable
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        status_code=503,
+        json={"message": "Service unavailable"},
+    )
+    result = runner.invoke(app, ["flush"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.API_EXCEPTION
+    assert "3 statuses remain spooled" in result.stdout
+    assert "2 sessions remain spooled" in result.stdout
+
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        json={"size": 3},
+    )
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/session/bulk",
+        json={"size": 2},
+    )
+    result = runner.invoke(app, ["flush"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 3 statuses successfully" in result.stdout
+    assert "Created 2 sessions successfully" in result.stdout
+    with Spool(spool_path) as spool:
+        assert spool.count(SpoolKind.STATUS) == 0
+        assert spool.count(SpoolKind.SESSION) == 0
+
+
+def test_cli_status_bulk_spool_unreachable(runner, qcc, httpx_mock, monkeypatch):
+    """Test the `status bulk` command with the `--spool` option (API unreachable)."""
+    monkeypatch.setattr(settings, "API_BULK_MAX_RETRIES", 1)
+    input = "\n".join(json.dumps({"id": x}) for x in range(12)) + "\n"
+
+    httpx_mock.add_exception(
+        httpx.ConnectError("Connection refused"),
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        is_reusable=True,
+    )
+    result = runner.invoke(status_app, ["bulk", "--spool"], obj=qcc, input=input)
+    assert result.exit_code == QCCExitCodes.API_EXCEPTION
+    assert "ConnectError('Connection refused')" in result.stdout
+    assert "12 statuses remain spooled" in result.stdout
+    assert "qcc spool flush" in result.stdout
+
+
+def test_cli_status_bulk_spool(runner, qcc, httpx_mock, spool_path, monkeypatch):
+    """Test the `status bulk` command with the `--spool` option."""
+    monkeypatch.setattr(settings, "API_BULK_MAX_RETRIES", 0)
+    input = "\n".join(json.dumps({"id": x}) for x in range(12)) + "\n"
+
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        json={"size": 10},
+    )
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        status_code=503,
+        json={"message": "Service unavailable"},
+    )
+    result = runner.invoke(
+        status_app, ["bulk", "--spool", "--concurrency", 1], obj=qcc, input=input
+    )
+    assert result.exit_code == QCCExitCodes.API_EXCEPTION
+    assert "2 statuses remain spooled" in result.stdout
+    assert "qcc spool flush" in result.stdout
+
+    # Spooled statuses are sent with new ones
+    input = json.dumps({"id": 12}) + "\n"
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        json={"size": 3},
+    )
+    result = runner.invoke(status_app, ["bulk", "--spool"], obj=qcc, input=input)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 3 statuses successfully" in result.stdout
+
+
+def test_cli_status_bulk_spool_rejected(runner, qcc, httpx_mock, spool_path):
+    """Test the `status bulk --spool` command with a status rejected by the API."""
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+    invalid = {"id": 1}
+
+    def bulk_create(request: httpx.Request):
+        chunk = json.loads(gzip.decompress(request.content))
+        if invalid in chunk:
+            return httpx.Response(422, json={"message": "Invalid status"})
+        return httpx.Response(201, json={"size": len(chunk)})
+
+    httpx_mock.add_callback(bulk_create, method="POST", url=url, is_reusable=True)
+
+    input = "\n".join(json.dumps({"id": x}) for x in range(3)) + "\n"
+    result = runner.invoke(
+        status_app, ["bulk", "--spool", "--chunk-size", 2], obj=qcc, input=input
+    )
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 2 statuses successfully" in result.stdout
+    assert "1 statuses have been rejected by the API" in result.stdout
+
+    # The rejected status does not block next statuses
+    input = json.dumps({"id": 3}) + "\n"
+    result = runner.invoke(status_app, ["bulk", "--spool"], obj=qcc, input=input)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 1 statuses successfully" in result.stdout
+    with Spool(spool_path) as spool:
+        assert spool.count(SpoolKind.STATUS) == 0
+        assert spool.count_rejected(SpoolKind.STATUS) == 1
+
+
+def test_cli_spool_rejected(runner, qcc, spool_path):
+    """Test the `spool rejected`, `requeue` and `purge` commands."""
+    with Spool(spool_path) as spool:
+        spool.put(SpoolKind.STATUS, [{"id": 1}, {"id": 2}])
+        spool.put(SpoolKind.SESSION, [{"id": 3}])
+        spool.reject(SpoolKind.STATUS, [{"id": 1}], '{"message":"Invalid status"}')
+        spool.reject(SpoolKind.SESSION, [{"id": 3}], '{"message":"Invalid session"}')
+
+    result = runner.invoke(app, ["info"], obj=qcc)
+    assert "rejected statuses: 1" in result.stdout
+    assert "rejected sessions: 1" in result.stdout
+
+    result = runner.invoke(app, ["rejected"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"kind": "status", "reason": '{"message":"Invalid status"}', "obj": {"id": 1}},
+        {
+            "kind": "session",
+            "reason": '{"message":"Invalid session"}',
+            "obj": {"id": 3},
+        },
+    ]
+    result = runner.invoke(app, ["rejected", "--kind", "session"], obj=qcc)
+    assert len(result.stdout.splitlines()) == 1
+
+    result = runner.invoke(app, ["requeue", "--kind", "status"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Requeued 1 statuses" in result.stdout
+
+    result = runner.invoke(app, ["purge"], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Purged 0 statuses" in result.stdout
+    assert "Purged 1 sessions" in result.stdout
+    with Spool(spool_path) as spool:
+        assert spool.count(SpoolKind.STATUS) == 2  # noqa: PLR2004
+        assert spool.count_rejected(SpoolKind.STATUS) == 0
+        assert spool.count_rejected(SpoolKind.SESSION) == 0
@@ -12,7 +12,7 @@ def test_cli_static_list(runner, qcc, httpx_mock):
     """Test the `static list` command."""
     httpx_mock.add_response(
         method="GET",
-        url="http://example.com/api/v1/statique/",
+        url="http://example.com/api/v1/statique/?limit=100",
         json={
             "items": list(range(0, 10)),
             "next": "http://example.com/api/v1/statique/?offset=10&limit=10",
@@ -31,7 +31,7 @@ def test_cli_static_list(runner, qcc, httpx_mock):
     # Raise an HTTP 500 error
     httpx_mock.add_response(
         method="GET",
-        url="http://example.com/api/v1/statique/",
+        url="http://example.com/api/v1/statique/?limit=100",
         status_code=500,
         json={"message": "An unknown error occured."},
     )
@@ -42,6 +42,26 @@ def test_cli_static_list(runner, qcc, httpx_mock):
     assert "An unknown error occured" in result.stdout
 
 
+def test_cli_static_list_concurrent_pages(runner, qcc, httpx_mock):
+    """Test the `static list` command with concurrent pages requests."""
+    total = 25
+    httpx_mock.add_response(
+        method="GET",
+        url="http://example.com/api/v1/statique/?limit=5",
+        json={"items": list(range(5)), "total": total, "limit": 5, "offset": 0},
+    )
+    for offset in range(5, total, 5):
+        httpx_mock.add_response(
+            method="GET",
+            url=f"http://example.com/api/v1/statique/?offset={offset}&limit=5",
+            json={"items": list(range(offset, offset + 5))},
+        )
+
+    result = runner.invoke(app, ["list", "--page-size", 5, "--concurrency", 3], obj=qcc)
+    assert result.exit_code == QCCExitCodes.OK
+    assert result.stdout == "\n".join(str(x) for x in range(total)) + "\n"
+
+
 def test_cli_static_create(runner, qcc, httpx_mock):
     """Test the `static create` command."""
     # Empty interactive statique
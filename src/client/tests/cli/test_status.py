@@ -1,5 +1,6 @@
 """Tests for the qcc.cli.status module."""
 
+import gzip
 import json
 
 import pytest
@@ -230,6 +231,7 @@ def test_cli_status_create_bulk(runner, qcc, httpx_mock):
     result = runner.invoke(app, ["bulk"], obj=qcc, input=input)
     assert result.exit_code == QCCExitCodes.OK
     assert "Created 12 statuses successfully" in result.stdout
+    assert "Sent 12 statuses in 2 chunks" in result.stdout
 
     # Insert invalid row in input
     input = "foo\n" + input
@@ -277,3 +279,105 @@ def test_cli_status_bulk_chunks(runner, qcc, httpx_mock, chunk_size):
     )
     assert result.exit_code == QCCExitCodes.OK
     assert "Created 30 statuses successfully" in result.stdout
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+def test_cli_status_bulk_file(runner, qcc, httpx_mock, tmp_path):
+    """Test the `status bulk` command with an input file."""
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        json={"size": 2},
+    )
+    statuses = [
+        {
+            "id_pdc_itinerance": f"FRS63E00{x:02d}",
+            "etat_pdc": "en_service",
+            "occupation_pdc": "libre",
+            "horodatage": "2024-10-01T12:00:00+00:00",
+        }
+        for x in range(4)
+    ]
+
+    # NDJSON file
+    path = tmp_path / "statuses.ndjson"
+    path.write_text("\n".join(json.dumps(status) for status in statuses))
+    result = runner.invoke(
+        app, ["bulk", "--chunk-size", 2, "--file", str(path)], obj=qcc
+    )
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 4 statuses successfully" in result.stdout
+    sent = [
+        item
+        for request in httpx_mock.get_requests()
+        for item in json.loads(gzip.decompress(request.content))
+    ]
+    assert sent == statuses
+
+    # CSV file
+    path = tmp_path / "statuses.csv"
+    path.write_text(
+        ",".join(statuses[0].keys())
+        + "\n"
+        + "\n".join(",".join(status.values()) for status in statuses)
+    )
+    result = runner.invoke(
+        app, ["bulk", "--chunk-size", 2, "--file", str(path)], obj=qcc
+    )
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 4 statuses successfully" in result.stdout
+
+    # Missing required field
+    path.write_text(
+        "id_pdc_itinerance,etat_pdc,occupation_pdc,horodatage\n"
+        "FRS63E0001,en_service,,2024-10-01T12:00:00+00:00\n"
+    )
+    result = runner.invoke(app, ["bulk", "--file", str(path)], obj=qcc)
+    assert result.exit_code == QCCExitCodes.PARAMETER_EXCEPTION
+    assert "Invalid row" in result.stdout
+    assert "Missing occupation_pdc field(s)" in result.stdout
+
+    # Badger mode: ignore all errors!
+    result = runner.invoke(
+        app, ["bulk", "--ignore-errors", "--file", str(path)], obj=qcc
+    )
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Ignored invalid row" in result.stdout
+    assert "Created 0 statuses successfully" in result.stdout
+
+    # Unsupported file format
+    path = tmp_path / "statuses.txt"
+    path.write_text("foo")
+    result = runner.invoke(app, ["bulk", "--file", str(path)], obj=qcc)
+    assert result.exit_code == QCCExitCodes.PARAMETER_EXCEPTION
+    assert "Unsupported file format: statuses.txt" in result.stdout
+
+
+def test_cli_status_bulk_dedup(runner, qcc, httpx_mock):
+    """Test the `status bulk` command with the `--dedup-window` option."""
+    httpx_mock.add_response(
+        method="POST",
+        url="http://example.com/api/v1/dynamique/status/bulk",
+        json={"size": 2},
+    )
+    status = {
+        "id_pdc_itinerance": "FRS63E0001",
+        "etat_pdc": "en_service",
+        "occupation_pdc": "libre",
+        "horodatage": "2024-10-01T12:00:00+00:00",
+    }
+    statuses = [
+        status,
+        status,
+        status | {"horodatage": "2024-10-01T12:00:30+00:00"},
+        status
+        | {"horodatage": "2024-10-01T12:01:00+00:00", "etat_pdc": "hors_service"},
+    ]
+    input = "\n".join(json.dumps(s) for s in statuses) + "\n"
+
+    result = runner.invoke(app, ["bulk", "--dedup-window", 60], obj=qcc, input=input)
+    assert result.exit_code == QCCExitCodes.OK
+    assert "Created 2 statuses successfully" in result.stdout
+    assert "Skipped 2 duplicated statuses" in result.stdout
+    request = httpx_mock.get_request()
+    assert json.loads(gzip.decompress(request.content)) == [statuses[0], statuses[3]]
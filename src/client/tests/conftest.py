@@ -4,9 +4,16 @@ import pytest
 from typer.testing import CliRunner
 
 from qcc.client import QCC
+from qcc.conf import settings
 from qcc.http import HTTPClient, OAuth2AccessToken
 
 
+@pytest.fixture(autouse=True)
+def no_retry_backoff(monkeypatch):
+    """Do not wait before retrying failed requests."""
+    monkeypatch.setattr(settings, "API_BULK_RETRY_BACKOFF", 0.0)
+
+
 @pytest.fixture
 def client():
     """The async HTTP client."""
@@ -3,10 +3,14 @@
 from datetime import datetime
 from uuid import UUID
 
+import anyio
+import httpx
 import pytest
 
+from qcc.conf import settings
 from qcc.endpoints.dynamic import Session, Status
 from qcc.exceptions import APIRequestError
+from qcc.models import BulkProgress
 
 
 def test_dynamic_status_initialization(client):
@@ -255,6 +259,104 @@ async def test_dynamic_status_bulk_gzip_compression(client, httpx_mock):
     assert await status.bulk(statuses, chunk_size=10) == total
 
 
+@pytest.mark.anyio
+async def test_dynamic_status_bulk_retries(client, httpx_mock):
+    """Test the /dynamique/status/bulk endpoint call retries."""
+    status = Status(client)
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+
+    total = 5
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+    httpx_mock.add_response(method="POST", url=url, status_code=503)
+    httpx_mock.add_response(
+        method="POST", url=url, status_code=429, headers={"Retry-After": "0"}
+    )
+    httpx_mock.add_response(method="POST", url=url, json={"size": total})
+    progress = BulkProgress(chunk_size=10)
+    assert await status.bulk(statuses, chunk_size=10, progress=progress) == total
+    assert progress.retries == 2  # noqa: PLR2004
+    assert progress.sent == total
+    assert progress.chunks == 1
+
+    # Client errors are not retried
+    httpx_mock.add_response(
+        method="POST", url=url, status_code=422, json={"message": "Invalid data"}
+    )
+    with pytest.raises(APIRequestError, match="Invalid data"):
+        await status.bulk(statuses, chunk_size=10)
+
+
+@pytest.mark.anyio
+async def test_dynamic_status_bulk_transport_errors(client, httpx_mock, monkeypatch):
+    """Test the /dynamique/status/bulk endpoint call retries transport errors."""
+    status = Status(client)
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+    monkeypatch.setattr(settings, "API_BULK_MAX_RETRIES", 1)
+
+    total = 5
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+    httpx_mock.add_exception(httpx.ConnectError("Connection refused"), url=url)
+    httpx_mock.add_response(method="POST", url=url, json={"size": total})
+    progress = BulkProgress(chunk_size=10)
+    assert await status.bulk(statuses, chunk_size=10, progress=progress) == total
+    assert progress.retries == 1
+
+    # The API cannot be reached
+    for _ in range(2):
+        httpx_mock.add_exception(httpx.ConnectError("Connection refused"), url=url)
+    with pytest.raises(APIRequestError, match="Connection refused"):
+        await status.bulk(statuses, chunk_size=10)
+
+
+@pytest.mark.anyio
+async def test_dynamic_status_bulk_too_large(client, httpx_mock):
+    """Test the /dynamique/status/bulk endpoint call with too large chunks."""
+    status = Status(client)
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+
+    total = 8
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+    httpx_mock.add_response(method="POST", url=url, status_code=413)
+    httpx_mock.add_response(method="POST", url=url, json={"size": 4})
+    httpx_mock.add_response(method="POST", url=url, json={"size": 4})
+    progress = BulkProgress(chunk_size=10)
+    assert await status.bulk(statuses, chunk_size=10, progress=progress) == total
+    # The chunk has been split and the chunk size halved
+    assert progress.chunk_size == 4  # noqa: PLR2004
+    assert len(httpx_mock.get_requests()) == 3  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_dynamic_status_bulk_concurrency(client, httpx_mock):
+    """Test the /dynamique/status/bulk endpoint concurrent calls."""
+    status = Status(client)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def respond(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(201, json={"size": 2})
+
+    httpx_mock.add_callback(
+        respond, method="POST", url="http://example.com/api/v1/dynamique/status/bulk"
+    )
+    total = 20
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+    progress = BulkProgress(chunk_size=2)
+    assert (
+        await status.bulk(statuses, chunk_size=2, concurrency=3, progress=progress)
+        == total
+    )
+    assert max_in_flight == 3  # noqa: PLR2004
+    assert progress.chunks == total // 2
+    assert progress.throughput > 0
+
+
 @pytest.mark.anyio
 async def test_dynamic_session_create(client, httpx_mock):
     """Test the /dynamique/session endpoint call."""
@@ -6,6 +6,7 @@ import pytest
 
 from qcc.endpoints.manage import Manage
 from qcc.exceptions import APIRequestError
+from qcc.models import StationsSync
 
 
 def test_manage_initialization(client):
@@ -61,3 +62,59 @@ async def test_manage_read_stations(client, httpx_mock):
     )
     with pytest.raises(APIRequestError, match="No station found."):
         assert await anext(manage.read_stations("123456789"))
+
+
+@pytest.mark.anyio
+async def test_manage_read_stations_by_sirens(client, httpx_mock):
+    """Test the /manage/station endpoint call."""
+    manage = Manage(client)
+    url = "http://example.com/api/v1/manage/station"
+
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{url}?siren=123456789&siren=987654321&after=2024-06-13T12%3A02%3A33&limit=2",
+        json={
+            "items": {"123456789": [1, 2]},
+            "watermark": "2024-06-15T08:00:00",
+            "cursor": "abc",
+            "next": None,
+        },
+    )
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{url}?siren=123456789&siren=987654321&after=2024-06-13T12%3A02%3A33&limit=2&cursor=abc",
+        json={
+            "items": {"123456789": [3], "987654321": [4]},
+            "watermark": "2024-06-14T12:00:00",
+            "cursor": None,
+            "next": None,
+        },
+    )
+    sync = StationsSync()
+    assert [
+        item
+        async for item in manage.read_stations_by_sirens(
+            ["123456789", "987654321"],
+            after=datetime(2024, 6, 13, 12, 2, 33),
+            limit=2,
+            sync=sync,
+        )
+    ] == [
+        ("123456789", 1),
+        ("123456789", 2),
+        ("123456789", 3),
+        ("987654321", 4),
+    ]
+    # The watermark is the latest one over all pages
+    assert sync.pages == 2  # noqa: PLR2004
+    assert sync.watermark == datetime(2024, 6, 15, 8, 0, 0)
+
+    # Raise an HTTP 500 error
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{url}?siren=123456789",
+        status_code=500,
+        json={"message": "An unknown error occured."},
+    )
+    with pytest.raises(APIRequestError, match="An unknown error occured"):
+        assert await anext(manage.read_stations_by_sirens(["123456789"]))
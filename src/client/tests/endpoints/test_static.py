@@ -1,5 +1,7 @@
 """Tests for the qcc.endpoints.static module."""
 
+import anyio
+import httpx
 import pytest
 
 from qcc.endpoints.static import Static
@@ -52,6 +54,51 @@ async def test_static_list(client, httpx_mock):
         assert await anext(static.list())
 
 
+@pytest.mark.anyio
+async def test_static_list_concurrent_pages(client, httpx_mock):
+    """Test the /statique endpoint concurrent pages requests."""
+    static = Static(client)
+    url = "http://example.com/api/v1/statique/"
+
+    total = 23
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{url}?limit=5",
+        json={"items": list(range(5)), "total": total, "limit": 5, "offset": 0},
+    )
+
+    async def respond(request):
+        offset = int(request.url.params["offset"])
+        # Last pages are served first
+        await anyio.sleep((total - offset) / 1000)
+        return httpx.Response(
+            200, json={"items": list(range(offset, min(offset + 5, total)))}
+        )
+
+    httpx_mock.add_callback(respond, method="GET", is_reusable=True)
+    items = [item async for item in static.list(page_size=5, concurrency=2)]
+    assert items == list(range(total))
+    offsets = [r.url.params.get("offset") for r in httpx_mock.get_requests()]
+    assert offsets[0] is None
+    assert sorted(offsets[1:], key=int) == ["5", "10", "15", "20"]
+
+    # API errors
+    httpx_mock.reset()
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{url}?limit=5",
+        json={"items": list(range(5)), "total": total, "limit": 5, "offset": 0},
+    )
+    httpx_mock.add_response(
+        method="GET",
+        status_code=500,
+        json={"message": "An unknown error occured."},
+        is_reusable=True,
+    )
+    with pytest.raises(APIRequestError, match="An unknown error occured"):
+        assert [item async for item in static.list(page_size=5)]
+
+
 @pytest.mark.anyio
 async def test_static_create(client, httpx_mock):
     """Test the /statique/ POST endpoint call."""
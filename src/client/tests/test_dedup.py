@@ -0,0 +1,87 @@
+"""Tests for the qcc.dedup module."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from qcc.dedup import StatusDeduplicator, get_horodatage
+
+NOW = datetime(2024, 10, 1, 12, tzinfo=timezone.utc)
+
+
+def make_status(pdc: str, seconds: int, etat: str = "en_service") -> dict:
+    """Get a status of the `pdc` point of charge, `seconds` after NOW."""
+    return {
+        "id_pdc_itinerance": pdc,
+        "etat_pdc": etat,
+        "occupation_pdc": "libre",
+        "horodatage": (NOW + timedelta(seconds=seconds)).isoformat(),
+    }
+
+
+def test_get_horodatage():
+    """Test the `get_horodatage` utility."""
+    assert get_horodatage({"horodatage": NOW.isoformat()}) == NOW
+    assert get_horodatage({"horodatage": "2024-10-01T12:00:00Z"}) == NOW
+    # Naive timestamps are UTC
+    assert get_horodatage({"horodatage": "2024-10-01T12:00:00"}) == NOW
+    assert get_horodatage({"horodatage": "foo"}) is None
+    assert get_horodatage({"horodatage": None}) is None
+    assert get_horodatage({}) is None
+
+
+def test_status_deduplicator_filter():
+    """Test the `StatusDeduplicator.filter` method."""
+    dedup = StatusDeduplicator(maxsize=10, window=timedelta(seconds=60))
+    statuses = [
+        make_status("FRS63E0001", 0),
+        # Duplicate
+        make_status("FRS63E0001", 0),
+        # Unchanged state within the time window
+        make_status("FRS63E0001", 30),
+        # State change
+        make_status("FRS63E0001", 40, etat="hors_service"),
+        make_status("FRS63E0002", 40),
+        # Unchanged state after the time window
+        make_status("FRS63E0001", 100, etat="hors_service"),
+        # Late status
+        make_status("FRS63E0001", 10),
+        # Incomplete status
+        {"id_pdc_itinerance": "FRS63E0001"},
+    ]
+    expected = [0, 3, 4, 5, 6, 7]
+
+    assert list(dedup.filter(statuses)) == [statuses[i] for i in expected]
+    assert dedup.skipped == len(statuses) - len(expected)
+
+    # JSON strings are yielded as is
+    dedup = StatusDeduplicator(maxsize=10, window=timedelta(seconds=60))
+    lines = [json.dumps(status) for status in statuses]
+    assert list(dedup.filter(lines)) == [lines[i] for i in expected]
+
+
+def test_status_deduplicator_maxsize():
+    """Test the `StatusDeduplicator` forgets least recently updated PDCs."""
+    dedup = StatusDeduplicator(maxsize=2, window=timedelta(seconds=60))
+    statuses = [
+        make_status("FRS63E0001", 0),
+        make_status("FRS63E0002", 0),
+        make_status("FRS63E0001", 10, etat="hors_service"),
+        make_status("FRS63E0003", 0),
+        # Forgotten
+        make_status("FRS63E0002", 10),
+        # Remembered
+        make_status("FRS63E0003", 10),
+    ]
+
+    assert list(dedup.filter(statuses)) == statuses[:5]
+
+
+def test_status_deduplicator_naive_horodatage():
+    """Test the `StatusDeduplicator` compares naive and aware timestamps."""
+    dedup = StatusDeduplicator(maxsize=10, window=timedelta(seconds=60))
+    naive = make_status("FRS63E0001", 30)
+    naive["horodatage"] = (NOW + timedelta(seconds=30)).replace(tzinfo=None).isoformat()
+    statuses = [make_status("FRS63E0001", 0), naive, make_status("FRS63E0001", 40)]
+
+    # The naive status is within the time window (UTC)
+    assert list(dedup.filter(statuses)) == statuses[:1]
@@ -0,0 +1,163 @@
+"""Tests for the qcc.files module."""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from qcc.files import (
+    FileFormat,
+    get_file_format,
+    parse_ndjson,
+    read_csv,
+    read_ndjson,
+    read_parquet,
+    serialize_rows,
+    validate_rows,
+)
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    (
+        ("statuses.ndjson", FileFormat.NDJSON),
+        ("statuses.jsonl", FileFormat.NDJSON),
+        ("statuses.JSON", FileFormat.NDJSON),
+        ("statuses.csv", FileFormat.CSV),
+        ("statuses.parquet", FileFormat.PARQUET),
+        ("statuses.pq", FileFormat.PARQUET),
+    ),
+)
+def test_get_file_format(name, expected):
+    """Test the `get_file_format` utility."""
+    assert get_file_format(Path(name)) == expected
+
+
+def test_get_file_format_unsupported():
+    """Test the `get_file_format` utility with unsupported formats."""
+    with pytest.raises(ValueError, match="Unsupported file format: statuses.xlsx"):
+        get_file_format(Path("statuses.xlsx"))
+
+
+def test_serialize_rows():
+    """Test the `serialize_rows` utility."""
+    rows = [
+        {
+            "id_pdc_itinerance": "FRS63E0001",
+            "horodatage": datetime(2024, 10, 1, 12, tzinfo=timezone.utc),
+            "energy": Decimal("12.5"),
+        }
+    ]
+    assert serialize_rows(rows) == [
+        json.dumps(
+            {
+                "id_pdc_itinerance": "FRS63E0001",
+                "horodatage": "2024-10-01T12:00:00+00:00",
+                "energy": 12.5,
+            }
+        )
+    ]
+
+    with pytest.raises(TypeError, match="Object of type set is not JSON"):
+        serialize_rows([{"foo": {1, 2}}])
+
+
+def test_read_ndjson(tmp_path):
+    """Test the `read_ndjson` reader."""
+    path = tmp_path / "statuses.ndjson"
+    path.write_text(
+        "\n".join(json.dumps({"id": x}) for x in range(5)) + "\n\n", encoding="utf-8"
+    )
+
+    assert list(read_ndjson(path, batch_size=2)) == [
+        ['{"id": 0}', '{"id": 1}'],
+        ['{"id": 2}', '{"id": 3}'],
+        ['{"id": 4}'],
+    ]
+    assert len(list(read_ndjson(path))) == 1
+
+
+def test_parse_ndjson():
+    """Test the `parse_ndjson` utility."""
+    lines = ['{"id": 0}', '{"id": 1}']
+    assert parse_ndjson(lines) == ([{"id": 0}, {"id": 1}], lines)
+
+    # Invalid lines are skipped
+    lines = ['{"id": 0}', "foo", '{"id": 1}', '{"id": ']
+    assert parse_ndjson(lines) == ([{"id": 0}, {"id": 1}], ['{"id": 0}', '{"id": 1}'])
+
+    # Lines with many values are skipped (the batch is valid JSON)
+    lines = ['{"id": 0}', '{"id": 1}, {"id": 2}']
+    assert parse_ndjson(lines) == ([{"id": 0}], ['{"id": 0}'])
+
+
+def test_read_csv(tmp_path):
+    """Test the `read_csv` reader."""
+    path = tmp_path / "statuses.csv"
+    path.write_text(
+        "id_pdc_itinerance,etat_pdc,occupation_pdc\n"
+        "FRS63E0001,en_service,libre\n"
+        "FRS63E0002,,occupe\n"
+        "FRS63E0003,hors_service,libre\n",
+        encoding="utf-8",
+    )
+
+    assert list(read_csv(path, batch_size=2)) == [
+        [
+            {
+                "id_pdc_itinerance": "FRS63E0001",
+                "etat_pdc": "en_service",
+                "occupation_pdc": "libre",
+            },
+            {
+                "id_pdc_itinerance": "FRS63E0002",
+                "etat_pdc": None,
+                "occupation_pdc": "occupe",
+            },
+        ],
+        [
+            {
+                "id_pdc_itinerance": "FRS63E0003",
+                "etat_pdc": "hors_service",
+                "occupation_pdc": "libre",
+            },
+        ],
+    ]
+
+
+def test_read_parquet(tmp_path):
+    """Test the `read_parquet` reader."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = tmp_path / "statuses.parquet"
+    rows = [
+        {"id_pdc_itinerance": f"FRS63E000{x}", "etat_pdc": "en_service"}
+        for x in range(5)
+    ]
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=2)
+
+    batches = list(read_parquet(path, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row for batch in batches for row in batch] == rows
+
+
+def test_validate_rows():
+    """Test the `validate_rows` utility."""
+    rows = [
+        {"id_pdc_itinerance": "FRS63E0001", "etat_pdc": "en_service"},
+        {"id_pdc_itinerance": "FRS63E0002", "etat_pdc": None},
+        {"etat_pdc": "en_service"},
+        "foo",
+        {"id_pdc_itinerance": "FRS63E0003", "etat_pdc": "en_service"},
+    ]
+    valid, errors = validate_rows(rows, ["id_pdc_itinerance", "etat_pdc"])
+    assert valid == [0, 4]
+    assert errors == [
+        "Missing etat_pdc field(s): "
+        "{'id_pdc_itinerance': 'FRS63E0002', 'etat_pdc': None}",
+        "Missing id_pdc_itinerance field(s): {'etat_pdc': 'en_service'}",
+        "Not an object: foo",
+    ]
@@ -1,15 +1,22 @@
 """Tests for the qcc.http module."""
 
+import base64
+import json
+import time
+
+import anyio
 import httpx
 import pytest
 
+from qcc.conf import settings
 from qcc.exceptions import AuthenticationError, ConfigurationError
-from qcc.http import HTTPClient, OAuth2AccessToken
+from qcc.http import HTTPClient, OAuth2AccessToken, get_token_expiration
 
 # ruff: noqa: S105, S106
 
 
-def test_client_init(httpx_mock):
+@pytest.mark.anyio
+async def test_client_init(httpx_mock):
     """Test the HTTPClient instantiation."""
     httpx_mock.add_response(
         method="POST", json={"access_token": "foo", "token_type": "bearer"}
@@ -33,12 +40,13 @@ def test_client_init(httpx_mock):
 
     # Explicit login
     client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
-    client._auth = client._get_auth()
+    client._auth = await client._get_auth()
     assert isinstance(client._auth, OAuth2AccessToken)
     assert client._auth.access_token == "foo"
 
 
-def test_client_get_auth_with_invalid_api_response(httpx_mock):
+@pytest.mark.anyio
+async def test_client_get_auth_with_invalid_api_response(httpx_mock):
     """Test the HTTPClient get_auth method when API response is not valid."""
     client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
 
@@ -48,7 +56,7 @@ def test_client_get_auth_with_invalid_api_response(httpx_mock):
         AuthenticationError,
         match=("Invalid response from the API server with provided credentials"),
     ):
-        client._get_auth()
+        await client._get_auth()
 
     # token_type is missing in the response
     httpx_mock.add_response(method="POST", json={"access_token": "foo"})
@@ -58,7 +66,7 @@ def test_client_get_auth_with_invalid_api_response(httpx_mock):
             "Cannot get an access token from the API server with provided credentials"
         ),
     ):
-        client._get_auth()
+        await client._get_auth()
 
 
 @pytest.mark.anyio
@@ -105,3 +113,96 @@ async def test_client_expired_token_renewal(httpx_mock):
     assert requests[1].method == "GET"  # 401: token expired
     assert requests[2].method == "POST"  # second (new) token
     assert requests[3].method == "GET"  # 200: valid request
+
+
+def _get_jwt(exp: float) -> str:
+    """Get a fake JWT access token expiring at `exp`."""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+def test_get_token_expiration():
+    """Test the get_token_expiration utility."""
+    assert get_token_expiration(_get_jwt(1700000000)) == 1700000000  # noqa: PLR2004
+    assert get_token_expiration("foo") is None
+    assert get_token_expiration("foo.bar.baz") is None
+    assert OAuth2AccessToken("foo").expires_soon is False
+    assert OAuth2AccessToken(_get_jwt(time.time() + 10)).expires_soon is True
+    assert OAuth2AccessToken(_get_jwt(time.time() + 3600)).expires_soon is False
+
+
+@pytest.mark.anyio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_client_proactive_token_renewal(httpx_mock):
+    """Test client request when the access token is about to expire."""
+    expiring = _get_jwt(time.time() + 10)
+    fresh = _get_jwt(time.time() + 3600)
+    httpx_mock.add_response(
+        method="POST", json={"access_token": fresh, "token_type": "bearer"}
+    )
+    httpx_mock.add_response(method="GET", json={"fake": 1})
+    client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
+    client._auth = OAuth2AccessToken(expiring)
+
+    response = await client.get("/auth/whoami")
+    assert response.status_code == httpx.codes.OK
+    requests = httpx_mock.get_requests()
+    assert [r.method for r in requests] == ["POST", "GET"]
+    assert requests[1].headers["Authorization"] == f"Bearer {fresh}"
+
+
+@pytest.mark.anyio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_client_single_flight_token_renewal(httpx_mock):
+    """Test concurrent requests share a single access token renewal."""
+    httpx_mock.add_response(
+        method="POST", json={"access_token": "foo", "token_type": "bearer"}
+    )
+
+    def respond(request):
+        if request.headers["Authorization"] == "Bearer expired":
+            return httpx.Response(
+                401, json={"message": "Authentication failed: Token signature expired"}
+            )
+        return httpx.Response(200, json={"fake": 1})
+
+    httpx_mock.add_callback(respond, method="GET")
+    client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
+    client._auth = OAuth2AccessToken("expired")
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(10):
+            task_group.start_soon(client.get, "/auth/whoami")
+
+    methods = [r.method for r in httpx_mock.get_requests()]
+    assert methods.count("POST") == 1
+    assert methods.count("GET") == 20  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_client_stream_expired_token_renewal(httpx_mock):
+    """Test client streamed request when the access token expired."""
+    httpx_mock.add_response(
+        method="POST", json={"access_token": "foo", "token_type": "bearer"}
+    )
+    httpx_mock.add_response(
+        method="GET",
+        status_code=401,
+        json={"message": "Authentication failed: Token signature expired"},
+    )
+    httpx_mock.add_response(method="GET", json=[{"fake": 1}])
+    client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
+    client._auth = OAuth2AccessToken("expired")
+
+    async with client.stream("GET", "/dynamique/status/") as response:
+        assert response.status_code == httpx.codes.OK
+        assert await response.aread() == b'[{"fake":1}]'
+    assert [r.method for r in httpx_mock.get_requests()] == ["GET", "POST", "GET"]
+
+
+def test_client_connection_settings(monkeypatch):
+    """Test the HTTPClient connection pool settings."""
+    monkeypatch.setattr(settings, "API_MAX_CONNECTIONS", 7)
+    client = HTTPClient(username="johndoe", password="fake", base_url="http://fake")
+    assert client._transport._pool._max_connections == 7  # noqa: PLR2004
@@ -0,0 +1,193 @@
+"""Tests for the qcc.spool module."""
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from qcc.conf import settings
+from qcc.endpoints.dynamic import Status
+from qcc.exceptions import APIRequestError
+from qcc.models import BulkProgress
+from qcc.spool import Spool, SpoolKind, flush, get_key, serialize
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """An empty spool."""
+    with Spool(tmp_path / "spool.sqlite3") as spool:
+        yield spool
+
+
+def test_serialize():
+    """Test the `serialize` utility."""
+    assert serialize('{"b": 1, "a": 2}') == '{"b": 1, "a": 2}'
+    assert serialize({"b": 1, "a": 2}) == '{"a": 2, "b": 1}'
+    assert get_key(serialize({"b": 1, "a": 2})) == get_key(serialize({"a": 2, "b": 1}))
+
+
+def test_spool_put(spool):
+    """Test the `Spool.put` method."""
+    total = 5
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+
+    assert spool.put(SpoolKind.STATUS, statuses) == total
+    assert spool.count(SpoolKind.STATUS) == total
+    assert spool.count(SpoolKind.SESSION) == 0
+
+    # Objects are spooled once (per kind)
+    assert spool.put(SpoolKind.STATUS, statuses[:3] + [json.dumps({"id": 1})]) == 1
+    assert spool.count(SpoolKind.STATUS) == total + 1
+    assert spool.put(SpoolKind.SESSION, [{"id": 1}]) == 1
+
+    assert list(spool.iter_pending(SpoolKind.STATUS)) == [
+        serialize(status) for status in statuses
+    ] + ['{"id": 1}']
+
+
+def test_spool_put_batches(spool, monkeypatch):
+    """Test the `Spool.put` and `Spool.iter_pending` methods with batches."""
+    monkeypatch.setattr("qcc.spool.BATCH_SIZE", 2)
+    total = 5
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(total)]
+
+    assert spool.put(SpoolKind.STATUS, statuses) == total
+    assert list(spool.iter_pending(SpoolKind.STATUS)) == [
+        serialize(status) for status in statuses
+    ]
+
+
+def test_spool_ack(spool):
+    """Test the `Spool.ack` method."""
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(5)]
+    spool.put(SpoolKind.STATUS, statuses)
+
+    spool.ack(SpoolKind.SESSION, statuses[:2])
+    assert spool.count(SpoolKind.STATUS) == len(statuses)
+    spool.ack(SpoolKind.STATUS, statuses[:2])
+    assert spool.count(SpoolKind.STATUS) == len(statuses[2:])
+    spool.ack(SpoolKind.STATUS, [serialize(status) for status in statuses[2:4]])
+    assert list(spool.iter_pending(SpoolKind.STATUS)) == [serialize(statuses[4])]
+
+
+def test_spool_persistence(tmp_path):
+    """Test spooled objects are persisted."""
+    path = tmp_path / "qcc" / "spool.sqlite3"
+    sessions = [{"id": 1}, {"id": 2}]
+    with Spool(path) as spool:
+        spool.put(SpoolKind.SESSION, sessions)
+
+    with Spool(path) as spool:
+        assert spool.count(SpoolKind.SESSION) == len(sessions)
+
+
+def test_spool_reject(spool):
+    """Test the `Spool.reject`, `requeue` and `purge` methods."""
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(5)]
+    spool.put(SpoolKind.STATUS, statuses)
+
+    spool.reject(SpoolKind.STATUS, statuses[1:3], "Undeclared PDC")
+    assert spool.count(SpoolKind.STATUS) == len(statuses) - 2
+    assert spool.count_rejected(SpoolKind.STATUS) == 2  # noqa: PLR2004
+    assert spool.count_rejected(SpoolKind.SESSION) == 0
+    assert list(spool.iter_rejected(SpoolKind.STATUS)) == [
+        (serialize(status), "Undeclared PDC") for status in statuses[1:3]
+    ]
+
+    # Rejected objects are moved back at the end of the spool
+    assert spool.requeue(SpoolKind.STATUS) == 2  # noqa: PLR2004
+    assert spool.count_rejected(SpoolKind.STATUS) == 0
+    assert list(spool.iter_pending(SpoolKind.STATUS)) == [
+        serialize(status) for status in statuses[:1] + statuses[3:] + statuses[1:3]
+    ]
+
+    spool.reject(SpoolKind.STATUS, statuses[:1], "Undeclared PDC")
+    assert spool.purge(SpoolKind.STATUS) == 1
+    assert spool.count_rejected(SpoolKind.STATUS) == 0
+    assert spool.count(SpoolKind.STATUS) == len(statuses) - 1
+
+
+@pytest.mark.anyio
+async def test_spool_flush(client, httpx_mock, spool, monkeypatch):
+    """Test the `flush` function."""
+    monkeypatch.setattr(settings, "API_BULK_MAX_RETRIES", 0)
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(5)]
+    spool.put(SpoolKind.STATUS, statuses)
+
+    # First chunk is sent, the second one fails (temporarily)
+    httpx_mock.add_response(method="POST", url=url, json={"size": 2})
+    httpx_mock.add_response(method="POST", url=url, status_code=503, json={})
+    with pytest.raises(APIRequestError):
+        await flush(spool, SpoolKind.STATUS, Status(client), 2, concurrency=1)
+    assert list(spool.iter_pending(SpoolKind.STATUS)) == [
+        serialize(status) for status in statuses[2:]
+    ]
+
+    # Remaining objects are sent by the next flush
+    httpx_mock.add_response(method="POST", url=url, json={"size": 2})
+    httpx_mock.add_response(method="POST", url=url, json={"size": 1})
+    progress = BulkProgress(chunk_size=2)
+    n_created = await flush(
+        spool, SpoolKind.STATUS, Status(client), 2, concurrency=1, progress=progress
+    )
+    assert n_created == len(statuses[2:])
+    assert progress.chunks == len(statuses[2:]) // 2 + 1
+    assert spool.count(SpoolKind.STATUS) == 0
+    sent = [
+        item
+        for request in httpx_mock.get_requests()[2:]
+        for item in json.loads(gzip.decompress(request.content))
+    ]
+    assert sent == statuses[2:]
+
+
+@pytest.mark.anyio
+async def test_spool_flush_rejected(client, httpx_mock, spool):
+    """Test the `flush` function with objects rejected by the API."""
+    url = "http://example.com/api/v1/dynamique/status/bulk"
+    statuses = [{"id_pdc_itinerance": f"FRS63E00{x:02d}"} for x in range(5)]
+    invalid = statuses[1]
+    spool.put(SpoolKind.STATUS, statuses)
+
+    def bulk_create(request: httpx.Request):
+        chunk = json.loads(gzip.decompress(request.content))
+        if invalid in chunk:
+            return httpx.Response(404, json={"detail": "Undeclared PDC"})
+        return httpx.Response(201, json={"size": len(chunk)})
+
+    httpx_mock.add_callback(bulk_create, method="POST", url=url, is_reusable=True)
+    progress = BulkProgress(chunk_size=2)
+    n_created = await flush(
+        spool, SpoolKind.STATUS, Status(client), 2, concurrency=1, progress=progress
+    )
+
+    # The invalid status does not block statuses spooled after it
+    assert n_created == len(statuses) - 1
+    assert progress.sent == len(statuses)
+    assert spool.count(SpoolKind.STATUS) == 0
+    assert list(spool.iter_rejected(SpoolKind.STATUS)) == [
+        (serialize(invalid), '{"detail":"Undeclared PDC"}')
+    ]
+    sent = [
+        json.loads(gzip.decompress(request.content))
+        for request in httpx_mock.get_requests()
+    ]
+    # The rejected chunk is split to isolate the invalid status
+    assert sent == [
+        statuses[:2],
+        statuses[:1],
+        statuses[1:2],
+        statuses[2:4],
+        statuses[4:],
+    ]
+
+    # Other client errors (unrelated to submitted objects) are not rejections
+    spool.put(SpoolKind.STATUS, statuses[2:3])
+    httpx_mock.add_response(
+        method="POST", url=url, status_code=405, json={"message": "Not allowed"}
+    )
+    with pytest.raises(APIRequestError):
+        await flush(spool, SpoolKind.STATUS, Status(client), 2, concurrency=1)
+    assert spool.count(SpoolKind.STATUS) == 1
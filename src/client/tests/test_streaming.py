@@ -0,0 +1,84 @@
+"""Tests for the qcc.streaming module."""
+
+import json
+
+import httpx
+import pytest
+
+from qcc.streaming import JSONArrayDecoder, iter_json_items
+
+ITEMS = [
+    {"id_pdc_itinerance": "FRS63E0001", "etat_pdc": "en_service"},
+    {"id_pdc_itinerance": "FRS63E0002", "commentaire": 'é, ] "}'},
+    12345,
+    -1.5e-3,
+    [1, 2.25, {"nested": True}],
+    None,
+]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 3, 7, 1000))
+def test_json_array_decoder(chunk_size):
+    """Test the JSONArrayDecoder with various chunk sizes."""
+    text = json.dumps(ITEMS, indent=2)
+    decoder = JSONArrayDecoder()
+    items = []
+    for start in range(0, len(text), chunk_size):
+        items += decoder.feed(text[start : start + chunk_size])
+    items += decoder.feed("", final=True)
+    assert items == ITEMS
+
+
+def test_json_array_decoder_yields_complete_items():
+    """Test the JSONArrayDecoder returns items as soon as they are complete."""
+    decoder = JSONArrayDecoder()
+    assert decoder.feed('[{"a": 1}, {"b":') == [{"a": 1}]
+    # Numbers may be truncated
+    assert decoder.feed(" 2}, 12") == [{"b": 2}]
+    assert decoder.feed("3, 1.") == [123]
+    assert decoder.feed("5, 2e") == [1.5]
+    assert decoder.feed("-1]") == [0.2]
+    assert decoder.feed(" \n", final=True) == []
+
+    assert JSONArrayDecoder().feed("[]", final=True) == []
+
+
+@pytest.mark.parametrize(
+    "text,message",
+    (
+        ('{"a": 1}', "Expecting a JSON array"),
+        ('[{"a": 1} {"b": 2}]', "Expecting ',' delimiter"),
+        ('[{"a": 1}] []', "Extra data"),
+        ('[{"a": 1},', "Unterminated JSON array"),
+        ('[{"a": 1}, {"b"', "Expecting ':' delimiter"),
+    ),
+)
+def test_json_array_decoder_errors(text, message):
+    """Test the JSONArrayDecoder with invalid JSON arrays."""
+    decoder = JSONArrayDecoder()
+    with pytest.raises(json.JSONDecodeError, match=message):
+        decoder.feed(text)
+        decoder.feed("", final=True)
+
+
+@pytest.mark.anyio
+async def test_iter_json_items():
+    """Test the iter_json_items utility."""
+
+    async def stream(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    content = json.dumps(ITEMS).encode("utf-8")
+    # Split a multi-bytes character
+    chunks = [content[i : i + 5] for i in range(0, len(content), 5)]
+    response = httpx.Response(200, content=stream(chunks))
+    assert [item async for item in iter_json_items(response)] == ITEMS
+
+    content = "\n".join(json.dumps(item) for item in ITEMS).encode("utf-8")
+    response = httpx.Response(
+        200,
+        headers={"Content-Type": "application/x-ndjson"},
+        content=stream([content[:10], content[10:]]),
+    )
+    assert [item async for item in iter_json_items(response)] == ITEMS
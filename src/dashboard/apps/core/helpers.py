@@ -3,6 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
+from django.db import transaction
 from django.utils import timezone
 
 from apps.auth.models import DashboardUser
@@ -17,6 +18,9 @@ from apps.core.qualicharge_api.adapters import ManageStationsAdapter
 from apps.core.qualicharge_api.clients import QualiChargeApi
 from apps.core.utils import siret2siren
 
+# Number of rows inserted or updated per statement when syncing delivery points
+SYNC_BATCH_SIZE = 1000
+
 
 def sync_entity_from_siret(siret: str, user: Optional[DashboardUser] = None) -> Entity:
     """Retrieve, Update or create and populate entity.
@@ -63,18 +67,59 @@ def sync_entity_from_siret(siret: str, user: Optional[DashboardUser] = None) ->
     return entity
 
 
+def _get_stations_query(entity: Entity) -> tuple[str, datetime | None]:
+    """Get the SIREN and the last sync date used to query the entity stations."""
+    if not entity.siret:
+        raise ValueError("SIRET should be defined when syncing delivery points.")
+
+    siren: str = siret2siren(entity.siret)
+    after: datetime | None = None if not entity.synced_at else entity.synced_at
+    return siren, after
+
+
+def fetch_stations_from_qualicharge_api(
+    entities: list[Entity],
+) -> dict[int, list[ManageStationsAdapter] | Exception]:
+    """Fetch stations of many entities from QualiCharge API concurrently.
+
+    All queries share the same API client (connection pool and access token).
+    Entities without SIRET are skipped.
+
+    Parameters:
+        entities (list[Entity]): The entities for which stations are fetched.
+
+    Returns:
+        A dictionary of station lists indexed by entity primary key. If the query
+        failed for an entity, the raised exception is returned instead.
+    """
+    entities = [entity for entity in entities if entity.siret]
+    if not entities:
+        return {}
+
+    with QualiChargeApi() as qcc:
+        results = qcc.manage_stations_lists(
+            [_get_stations_query(entity) for entity in entities]
+        )
+    return {entity.pk: result for entity, result in zip(entities, results, strict=True)}
+
+
 def sync_from_qualicharge_api(
     entity: Entity,
+    stations_list: list[ManageStationsAdapter] | None = None,
 ) -> tuple[list[DeliveryPoint], list[Consent] | None]:
     """Synchronize delivery points from QualiCharge API for a given entity.
 
     This function retrieves station data from the QualiCharge API based on the
-    entity's SIRET and creates delivery points and associated consents, and stations
-    in the database if they do not already exist.
+    entity's SIRET and creates delivery points and associated consents if they do
+    not already exist, and creates or updates stations in the database. All changes
+    are committed in a single transaction.
 
     Parameters:
         entity (Entity): The entity object for which delivery points need to be
         synchronized. The entity must have a valid SIRET.
+        stations_list (list[ManageStationsAdapter] | None): Stations already
+        fetched from the API (see `fetch_stations_from_qualicharge_api`). If None,
+        stations are fetched from the API.
 
     Raises:
         ValueError: If the SIRET of the provided entity is None.
@@ -83,19 +128,17 @@ def sync_from_qualicharge_api(
         A list of created delivery points, and a list of their associated consents
         or None if no consents were created.
     """
-    if not entity.siret:
-        raise ValueError("SIRET should be defined when syncing delivery points.")
+    siren, after = _get_stations_query(entity)
 
-    siren: str = siret2siren(entity.siret)
-    after: datetime | None = None if not entity.synced_at else entity.synced_at
-
-    qcc = QualiChargeApi()
-    stations_list = qcc.manage_stations_list(siren=siren, after=after)
+    if stations_list is None:
+        qcc = QualiChargeApi()
+        stations_list = qcc.manage_stations_list(siren=siren, after=after)
 
-    created_delivery_points, consents = _create_delivery_points_from_stations_list(
-        entity, stations_list
-    )
-    _create_stations_from_station_list(stations_list)
+    with transaction.atomic():
+        created_delivery_points, consents = _create_delivery_points_from_stations_list(
+            entity, stations_list
+        )
+        _create_stations_from_station_list(stations_list)
 
     return created_delivery_points, consents
 
@@ -111,6 +154,10 @@ def _create_delivery_points_from_stations_list(
     points are excluded based on their provider-assigned IDs. The function then
     updates the `synced_at` timestamp of the associated entity.
 
+    Delivery points are inserted by batches with a single statement per batch:
+    delivery points created concurrently (e.g. by another sync) are skipped, and
+    consents are only created for delivery points inserted by this sync.
+
     Parameters:
         entity (Entity): The entity to which the delivery points are associated.
         stations_list (list[ManageStationsAdapter]): List of station data from
@@ -124,32 +171,48 @@ def _create_delivery_points_from_stations_list(
             - list[Consent] | None: A list of associated consents if any were
               created. Returns None if no consents were created.
     """
-    created_delivery_points = consents = []
+    created_delivery_points: list[DeliveryPoint] = []
+    consents: list[Consent] = []
 
-    # retrieve only unique PDLs from the station list
-    pdls_in_stations_list = list(
-        {item.num_pdl: item for item in stations_list}.values()
-    )
+    # retrieve only unique PDLs from the station list (preserving their order)
+    pdls_in_stations_list = list(dict.fromkeys(item.num_pdl for item in stations_list))
 
-    # get existing delivery points
-    existing_delivery_points = DeliveryPoint.objects.filter(
-        provider_assigned_id__in=[pdl.num_pdl for pdl in pdls_in_stations_list]
-    ).values_list("provider_assigned_id", flat=True)
+    # get existing delivery points (as a set for constant time lookups)
+    existing_delivery_points = set(
+        DeliveryPoint.objects.filter(
+            provider_assigned_id__in=pdls_in_stations_list
+        ).values_list("provider_assigned_id", flat=True)
+    )
 
     # deduce delivery points that should be created
+    now = timezone.now()
     delivery_points_to_create = [
-        DeliveryPoint(
-            entity=entity,
-            provider_assigned_id=pdl.num_pdl,
-        )
+        DeliveryPoint(entity=entity, provider_assigned_id=pdl, updated_at=now)
         for pdl in pdls_in_stations_list
-        if pdl.num_pdl not in existing_delivery_points
+        if pdl not in existing_delivery_points
     ]
 
     if delivery_points_to_create:
-        created_delivery_points = DeliveryPoint.objects.bulk_create(
-            delivery_points_to_create
+        # Conflicting delivery points (created concurrently) are ignored.
+        DeliveryPoint.objects.bulk_create(
+            delivery_points_to_create,
+            batch_size=SYNC_BATCH_SIZE,
+            ignore_conflicts=True,
         )
+        # Primary keys are generated before insertion: ignored delivery points are
+        # not found in the database.
+        inserted_pks = set(
+            DeliveryPoint.objects.filter(
+                pk__in=[
+                    delivery_point.pk for delivery_point in delivery_points_to_create
+                ]
+            ).values_list("pk", flat=True)
+        )
+        created_delivery_points = [
+            delivery_point
+            for delivery_point in delivery_points_to_create
+            if delivery_point.pk in inserted_pks
+        ]
 
         # `Signals` don't work with `bulk_create`, so we manually create the
         # associated consents.
@@ -163,7 +226,9 @@ def _create_delivery_points_from_stations_list(
         ]
 
         if consents_to_create:
-            consents = Consent.objects.bulk_create(consents_to_create)
+            consents = Consent.objects.bulk_create(
+                consents_to_create, batch_size=SYNC_BATCH_SIZE
+            )
 
     entity.synced_at = timezone.now()
     entity.save(update_fields=["synced_at"])
@@ -176,9 +241,10 @@ def _create_stations_from_station_list(
 ) -> list[Station]:
     """Create stations from station list.
 
-    Creates new stations from a given list of station adapter objects if they do not
-    already exist in the database. It ensures that each new station is associated with
-    its corresponding delivery point.
+    Creates new stations from a given list of station adapter objects, and updates
+    existing ones: each station is (re)linked to its corresponding delivery point.
+    Stations are upserted by batches with a single statement per batch. Stations
+    whose delivery point does not exist are skipped.
 
     Parameters:
         stations_list (list[ManageStationsAdapter]): A list of station adapter objects
@@ -188,33 +254,48 @@ def _create_stations_from_station_list(
         list[Station]: A list of Station objects that have been newly created in the
             database.
     """
-    created_stations = []
-
-    # get existing stations
-    existing_stations = Station.objects.filter(
-        id_station_itinerance__in=[st.id_station_itinerance for st in stations_list]
-    ).values_list("id_station_itinerance", flat=True)
-
-    # Preload all necessary DeliveryPoints
-    delivery_points_dict = {
-        dp.provider_assigned_id: dp
-        for dp in DeliveryPoint.objects.filter(
-            provider_assigned_id__in=[station.num_pdl for station in stations_list]
+    # retrieve only unique stations from the station list (the last one wins)
+    stations = {station.id_station_itinerance: station for station in stations_list}
+
+    # get existing stations (as a set for constant time lookups)
+    existing_stations = set(
+        Station.objects.filter(id_station_itinerance__in=stations.keys()).values_list(
+            "id_station_itinerance", flat=True
         )
-    }
+    )
+
+    # Preload all necessary DeliveryPoints primary keys
+    delivery_points_dict = dict(
+        DeliveryPoint.objects.filter(
+            provider_assigned_id__in={station.num_pdl for station in stations.values()}
+        ).values_list("provider_assigned_id", "id")
+    )
 
-    # deduce stations that should be created
-    stations_to_create = [
+    now = timezone.now()
+    stations_to_upsert = [
         Station(
             id_station_itinerance=station.id_station_itinerance,
             station_name=station.nom_station,
-            delivery_point=delivery_points_dict.get(station.num_pdl),
+            delivery_point_id=delivery_points_dict[station.num_pdl],
+            updated_at=now,
         )
-        for station in stations_list
-        if station.id_station_itinerance not in existing_stations
+        for station in stations.values()
+        if station.num_pdl in delivery_points_dict
     ]
 
-    if stations_to_create:
-        created_stations = Station.objects.bulk_create(stations_to_create)
+    if not stations_to_upsert:
+        return []
+
+    upserted_stations = Station.objects.bulk_create(
+        stations_to_upsert,
+        batch_size=SYNC_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["id_station_itinerance"],
+        update_fields=["station_name", "delivery_point", "updated_at"],
+    )
 
-    return created_stations
+    return [
+        station
+        for station in upserted_stations
+        if station.id_station_itinerance not in existing_stations
+    ]
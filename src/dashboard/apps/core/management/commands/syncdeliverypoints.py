@@ -7,7 +7,10 @@ from django.db.models import QuerySet
 
 from apps.consent.helpers import send_notification_for_awaiting_consents
 from apps.consent.models import Consent
-from apps.core.helpers import sync_from_qualicharge_api
+from apps.core.helpers import (
+    fetch_stations_from_qualicharge_api,
+    sync_from_qualicharge_api,
+)
 from apps.core.management.commands.base_command import DashboardBaseCommand
 from apps.core.models import DeliveryPoint, Entity
 
@@ -18,8 +21,9 @@ class Command(DashboardBaseCommand):
     Synchronizes delivery points by querying the external "QualiCharge" API and
     updating related data for all entities in the database.
 
-    This method fetches all the entities, processes each entity by updating its
-    delivery points data from the "QualiCharge" API.
+    This method fetches all the entities, queries the "QualiCharge" API for all
+    entities concurrently, then processes each entity by updating its delivery
+    points data.
     If any error occurs during the synchronization process for a specific entity,
     the exception is logged using Sentry and an error message is displayed.
 
@@ -55,11 +59,17 @@ class Command(DashboardBaseCommand):
         entities: QuerySet = (
             Entity.objects.filter(siret__in=siret) if siret else Entity.objects.all()
         )
+        stations = fetch_stations_from_qualicharge_api(list(entities))
 
         for entity in entities:
             self._log_notice(f"⚙️ Processing SIRET: {entity.siret}...")
             try:
-                delivery_points, consents = sync_from_qualicharge_api(entity)
+                stations_list = stations.get(entity.pk)
+                if isinstance(stations_list, Exception):
+                    raise stations_list
+                delivery_points, consents = sync_from_qualicharge_api(
+                    entity, stations_list
+                )
             except Exception as e:
                 sentry_sdk.capture_exception(e)
                 self._log_error(
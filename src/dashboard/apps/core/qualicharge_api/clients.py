@@ -1,27 +1,70 @@
 """Dashboard core qualicharge clients."""
 
 import asyncio
-from datetime import datetime
-from typing import Optional
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from itertools import batched
+from typing import List, Optional
 
+from anyio import CapacityLimiter, create_task_group
+from anyio.from_thread import BlockingPortal, start_blocking_portal
 from django.conf import settings
 from qcc.client import QCC
 
 from apps.core.qualicharge_api.adapters import ManageStationsAdapter
 
+StationsQuery = tuple[str, Optional[datetime]]
+StationsResult = list[ManageStationsAdapter] | Exception
+
 
 class QualiChargeApi:
-    """Facade class to simplify usage of the QualiCharge API."""
+    """Facade class to simplify usage of the QualiCharge API.
+
+    Used as a context manager, the facade runs API calls in a long-lived event loop:
+    the connection pool and the access token of the client are shared by all calls.
+    """
 
     def __init__(self):
         """Initialize the clients."""
         self.manage_station_client = ManageStationClient()
+        self._exit_stack = ExitStack()
+        self._portal: Optional[BlockingPortal] = None
+
+    def __enter__(self) -> "QualiChargeApi":
+        """Start the event loop shared by API calls."""
+        self._portal = self._exit_stack.enter_context(start_blocking_portal())
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the API client and stop the event loop."""
+        try:
+            if self._portal is not None:
+                self._portal.call(self.manage_station_client.aclose)
+        finally:
+            self._portal = None
+            self._exit_stack.close()
+
+    def _run(self, func, *args):
+        """Run an API call in the shared event loop (if any)."""
+        if self._portal is None:
+            return asyncio.run(func(*args))
+        return self._portal.call(func, *args)
 
     def manage_stations_list(
         self, siren: str, after: Optional[datetime] = None
     ) -> list[ManageStationsAdapter]:
         """Get station information from a SIREN number."""
-        return asyncio.run(self.manage_station_client.list(siren, after))
+        return self._run(self.manage_station_client.list, siren, after)
+
+    def manage_stations_lists(
+        self, queries: list[StationsQuery]
+    ) -> list[StationsResult]:
+        """Get station information from many SIREN numbers concurrently.
+
+        Results are returned in the queries order: a query that failed returns the
+        raised exception.
+        """
+        return self._run(self.manage_station_client.list_many, queries)
 
 
 class QualiChargeBaseClient:
@@ -37,6 +80,10 @@ class QualiChargeBaseClient:
         self.api_root_url = settings.QCC_API_ROOT_URL
         self.client = QCC(self.username, self.password, self.api_root_url)
 
+    async def aclose(self):
+        """Close the API client connections."""
+        await self.client.client.aclose()
+
 
 class ManageStationClient(QualiChargeBaseClient):
     """Client for the `manage/station` endpoint."""
@@ -49,3 +96,93 @@ class ManageStationClient(QualiChargeBaseClient):
             ManageStationsAdapter.from_api_response(station)
             async for station in self.client.manage.read_stations(siren, after)
         ]
+
+    # `list` builtin is shadowed by the `list` method in the class namespace
+    async def list_by_sirens(
+        self, sirens: List[str], after: Optional[datetime] = None
+    ) -> dict[str, List[ManageStationsAdapter]]:
+        """Retrieves stations of many SIREN with a single paginated query."""
+        stations: dict[str, List[ManageStationsAdapter]] = {
+            siren: [] for siren in sirens
+        }
+        async for siren, station in self.client.manage.read_stations_by_sirens(
+            sirens, after
+        ):
+            stations.setdefault(siren, []).append(
+                ManageStationsAdapter.from_api_response(station)
+            )
+        return stations
+
+    async def list_many(self, queries: List[StationsQuery]) -> List[StationsResult]:
+        """Retrieves company information for many SIREN concurrently.
+
+        When supported by the API client, queries are grouped by batches of
+        `QCC_API_MAX_SIREN` SIREN listed with a single paginated query (using the
+        earliest `after` date of the batch), else each SIREN is queried on its own.
+        At most `QCC_API_CONCURRENCY` queries are performed at the same time. A
+        failing query does not cancel others: its exception is returned instead.
+        """
+        if not hasattr(self.client.manage, "read_stations_by_sirens"):
+            return await self._list_each(queries)
+
+        limiter = CapacityLimiter(settings.QCC_API_CONCURRENCY)
+        results: List[StationsResult] = [[] for _ in queries]
+
+        async def fetch(indexes: tuple[int, ...]):
+            batch = [queries[index] for index in indexes]
+            sirens = list(dict.fromkeys(siren for siren, _ in batch))
+            afters = [after for _, after in batch]
+            # a SIREN never synced requires all its stations
+            after = None if None in afters else min(afters)
+            async with limiter:
+                try:
+                    stations = await self.list_by_sirens(sirens, after)
+                except Exception as err:
+                    for index in indexes:
+                        results[index] = err
+                    return
+            for index, (siren, siren_after) in zip(indexes, batch, strict=True):
+                results[index] = [
+                    station
+                    for station in stations[siren]
+                    if siren_after is None
+                    or _parse_updated_at(station.updated_at) >= siren_after
+                ]
+
+        # Sort queries by `after` date so that batches fetch as few extra stations
+        # as possible
+        indexes = sorted(
+            range(len(queries)),
+            key=lambda index: (queries[index][1] is not None, queries[index][1]),
+        )
+        async with create_task_group() as task_group:
+            for batch in batched(indexes, settings.QCC_API_MAX_SIREN):
+                task_group.start_soon(fetch, batch)
+
+        return results
+
+    async def _list_each(self, queries: List[StationsQuery]) -> List[StationsResult]:
+        """Retrieves company information for many SIREN, one query per SIREN."""
+        limiter = CapacityLimiter(settings.QCC_API_CONCURRENCY)
+        results: List[StationsResult] = [[] for _ in queries]
+
+        async def fetch(index: int, siren: str, after: Optional[datetime]):
+            async with limiter:
+                try:
+                    results[index] = await self.list(siren, after)
+                except Exception as err:
+                    results[index] = err
+
+        async with create_task_group() as task_group:
+            for index, (siren, after) in enumerate(queries):
+                task_group.start_soon(fetch, index, siren, after)
+
+        return results
+
+
+def _parse_updated_at(updated_at: str) -> datetime:
+    """Parse a station update date returned by the API (UTC if naive)."""
+    parsed = datetime.fromisoformat(updated_at)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
@@ -24,23 +24,37 @@ def test_sync_delivery_points_invoked_on_entities(monkeypatch):
         "apps.core.management.commands.syncdeliverypoints.sync_from_qualicharge_api",
         mock_sync,
     )
+    stations_1, stations_2 = MagicMock(), MagicMock()
+    mock_fetch = MagicMock(
+        return_value={entity_1.pk: stations_1, entity_2.pk: stations_2}
+    )
+    monkeypatch.setattr(
+        "apps.core.management.commands.syncdeliverypoints."
+        "fetch_stations_from_qualicharge_api",
+        mock_fetch,
+    )
 
     # Execute command
     command = Command()
     command.sync_delivery_points()
 
-    # Ensure the mocked sync was called for both entities
+    # Ensure stations were fetched at once, and the mocked sync was called for
+    # both entities
+    mock_fetch.assert_called_once()
+    assert set(mock_fetch.call_args.args[0]) == {entity_1, entity_2}
     assert mock_sync.call_count == expected_entities_count
-    mock_sync.assert_any_call(entity_1)
-    mock_sync.assert_any_call(entity_2)
+    mock_sync.assert_any_call(entity_1, stations_1)
+    mock_sync.assert_any_call(entity_2, stations_2)
 
     # Execute command with one siret
     mock_sync.reset_mock()
+    mock_fetch.reset_mock()
     command.sync_delivery_points([entity_1.siret])
 
     # Ensure the mocked sync was called for both entities
+    mock_fetch.assert_called_once_with([entity_1])
     assert mock_sync.call_count == 1
-    mock_sync.assert_any_call(entity_1)
+    mock_sync.assert_any_call(entity_1, stations_1)
 
     # Execute command with 2 siret
     mock_sync.reset_mock()
@@ -48,11 +62,16 @@ def test_sync_delivery_points_invoked_on_entities(monkeypatch):
 
     # Ensure the mocked sync was called for both entities
     assert mock_sync.call_count == expected_entities_count
-    mock_sync.assert_any_call(entity_1)
-    mock_sync.assert_any_call(entity_2)
+    mock_sync.assert_any_call(entity_1, stations_1)
+    mock_sync.assert_any_call(entity_2, stations_2)
 
 
 @pytest.mark.django_db
+@patch(
+    "apps.core.management.commands.syncdeliverypoints."
+    "fetch_stations_from_qualicharge_api",
+    MagicMock(return_value={}),
+)
 @patch("apps.core.management.commands.syncdeliverypoints.sync_from_qualicharge_api")
 def test_sync_delivery_points_handles_exception(mock_sync_dp):
     """Tests exceptions in `sync_from_qualicharge_api` are handled."""
@@ -73,6 +92,29 @@ def test_sync_delivery_points_handles_exception(mock_sync_dp):
         mock_capture_exception.assert_called_once()
 
 
+@pytest.mark.django_db
+@patch("apps.core.management.commands.syncdeliverypoints.sync_from_qualicharge_api")
+def test_sync_delivery_points_handles_fetch_exception(mock_sync_dp):
+    """Tests exceptions raised when fetching stations are handled."""
+    entity = EntityFactory()
+
+    with (
+        patch(
+            "apps.core.management.commands.syncdeliverypoints."
+            "fetch_stations_from_qualicharge_api",
+            MagicMock(return_value={entity.pk: Exception("API error")}),
+        ),
+        patch("sentry_sdk.capture_exception") as mock_capture_exception,
+    ):
+        # Execute command
+        command = Command()
+        command.sync_delivery_points()
+
+        # The entity is not synced, and the exception was caught.
+        mock_sync_dp.assert_not_called()
+        mock_capture_exception.assert_called_once()
+
+
 @pytest.mark.django_db
 @patch("apps.core.management.commands.syncdeliverypoints.sync_from_qualicharge_api")
 def test_sync_delivery_points_no_entities(mock_sync_dp):
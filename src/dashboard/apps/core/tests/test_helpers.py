@@ -12,8 +12,9 @@ from apps.core.annuaire_entreprise_api.adapters import (
     CompanyAddressAdapter,
     CompanyInformationAdapter,
 )
-from apps.core.factories import EntityFactory
+from apps.core.factories import DeliveryPointFactory, EntityFactory
 from apps.core.helpers import (
+    fetch_stations_from_qualicharge_api,
     sync_entity_from_siret,
     sync_from_qualicharge_api,
 )
@@ -247,3 +248,146 @@ def test_create_station_from_qualicharge_api(mock_qualicharge_api):
 
     # run function with same delivery points should not create new stations.
     assert Station.objects.all().count() == 4  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+@patch("apps.core.helpers.QualiChargeApi")
+def test_create_deliverypoint_from_fetched_stations(mock_qualicharge_api):
+    """Test create delivery point from already fetched stations."""
+    entity = EntityFactory(siret="30119246401234")
+
+    delivery_points, consents = sync_from_qualicharge_api(entity, MOCK_RESPONSE)
+
+    # the API should not be queried
+    mock_qualicharge_api.assert_not_called()
+    expected_count = 3
+    assert len(delivery_points) == expected_count
+    assert len(consents) == expected_count
+    assert Station.objects.all().count() == len(MOCK_RESPONSE)
+
+
+@pytest.mark.django_db
+@patch("apps.core.helpers.QualiChargeApi")
+def test_fetch_stations_from_qualicharge_api(mock_qualicharge_api):
+    """Test fetch stations of many entities from QualiCharge API."""
+    entity_1 = EntityFactory(siret="30119246401234")
+    entity_2 = EntityFactory(siret="55203253400646")
+    entity_3 = EntityFactory(siret="")
+    error = Exception("API error")
+
+    # mock QualiChargeApi.manage_stations_lists()
+    mock_api = mock_qualicharge_api.return_value.__enter__.return_value
+    mock_api.manage_stations_lists.return_value = [MOCK_RESPONSE, error]
+
+    stations = fetch_stations_from_qualicharge_api([entity_1, entity_2, entity_3])
+
+    # entities without SIRET are skipped
+    mock_api.manage_stations_lists.assert_called_once_with(
+        [("301192464", None), ("552032534", None)]
+    )
+    assert stations == {entity_1.pk: MOCK_RESPONSE, entity_2.pk: error}
+
+    # no entity to sync
+    mock_qualicharge_api.reset_mock()
+    assert fetch_stations_from_qualicharge_api([entity_3]) == {}
+    mock_qualicharge_api.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_sync_from_qualicharge_api_relinks_stations():
+    """Test existing stations are updated and relinked to their delivery point."""
+    entity = EntityFactory(siret="30119246401234")
+    sync_from_qualicharge_api(entity, MOCK_RESPONSE)
+
+    # station C2 is renamed and moved to a new delivery point
+    moved_station = ManageStationsAdapter(
+        id_station_itinerance="FR073P02STC2",
+        nom_station="Station C2 bis",
+        num_pdl="50088800000003",
+        updated_at="2025-03-13T15:49:43.477800Z",
+    )
+    delivery_points, consents = sync_from_qualicharge_api(entity, [moved_station])
+
+    assert [dp.provider_assigned_id for dp in delivery_points] == ["50088800000003"]
+    assert len(consents) == 1
+    assert Station.objects.all().count() == len(MOCK_RESPONSE)
+    station = Station.objects.get(id_station_itinerance="FR073P02STC2")
+    assert station.station_name == "Station C2 bis"
+    assert station.delivery_point.provider_assigned_id == "50088800000003"
+    assert station.updated_at is not None
+
+
+@pytest.mark.django_db
+def test_sync_from_qualicharge_api_concurrent_delivery_point():
+    """Test a delivery point created concurrently is left untouched."""
+    entity = EntityFactory(siret="30119246401234")
+    other_entity = EntityFactory(siret="55203253400646")
+    bulk_create = DeliveryPoint.objects.bulk_create
+    concurrent_delivery_points = []
+
+    def concurrent_bulk_create(*args, **kwargs):
+        # another sync creates a delivery point after existing ones were fetched
+        concurrent_delivery_points.append(
+            DeliveryPointFactory(
+                provider_assigned_id="50088800000001", entity=other_entity
+            )
+        )
+        return bulk_create(*args, **kwargs)
+
+    with patch.object(
+        DeliveryPoint.objects, "bulk_create", side_effect=concurrent_bulk_create
+    ):
+        delivery_points, consents = sync_from_qualicharge_api(entity, MOCK_RESPONSE)
+
+    # the concurrent delivery point is neither returned nor given a new consent
+    assert [dp.provider_assigned_id for dp in delivery_points] == [
+        "50088800000000",
+        "50088800000002",
+    ]
+    assert [consent.delivery_point for consent in consents] == delivery_points
+    (concurrent_delivery_point,) = concurrent_delivery_points
+    updated = DeliveryPoint.objects.get(provider_assigned_id="50088800000001")
+    assert updated.entity == other_entity
+    assert updated.updated_at == concurrent_delivery_point.updated_at
+    # only the consent created by the `post_save` signal exists
+    assert Consent.objects.filter(delivery_point=concurrent_delivery_point).count() == 1
+
+
+@pytest.mark.django_db
+def test_sync_from_qualicharge_api_large_entity(django_assert_max_num_queries):
+    """Benchmark the synchronization of an entity with many delivery points.
+
+    The number of queries should not depend on the number of delivery points.
+    """
+    size = 20_000
+    # each delivery point has two stations
+    stations_list = [
+        ManageStationsAdapter(
+            id_station_itinerance=f"FR073P{i:08d}",
+            nom_station=f"Station {i}",
+            num_pdl=f"{i // 2:014d}",
+            updated_at="2025-03-12T15:49:43.477800Z",
+        )
+        for i in range(size * 2)
+    ]
+    entity = EntityFactory(siret="30119246401234")
+    # about one query per batch of delivery points, consents and stations
+    max_queries = 150
+
+    with django_assert_max_num_queries(max_queries):
+        delivery_points, consents = sync_from_qualicharge_api(entity, stations_list)
+
+    assert len(delivery_points) == size
+    assert len(consents) == size
+    assert DeliveryPoint.objects.filter(entity=entity).count() == size
+    assert Consent.objects.all().count() == size
+    assert Station.objects.all().count() == len(stations_list)
+
+    # a second sync should only update existing stations
+    with django_assert_max_num_queries(max_queries):
+        delivery_points, consents = sync_from_qualicharge_api(entity, stations_list)
+
+    assert delivery_points == []
+    assert consents == []
+    assert DeliveryPoint.objects.all().count() == size
+    assert Station.objects.all().count() == len(stations_list)
@@ -1,5 +1,7 @@
 """Dashboard core qualicharge api clients tests."""
 
+from datetime import datetime, timezone
+
 import pytest
 from mock import AsyncMock, patch
 
@@ -129,3 +131,118 @@ def test_qualicharge_api_facade_with_valid_data(monkeypatch):
         assert result_data.nom_station == expected.nom_station
         assert result_data.num_pdl == expected.num_pdl
         assert result_data.updated_at == expected.updated_at
+
+
+async def test_manage_stations_list_many(monkeypatch, settings):
+    """Tests ManageStationClient.list_many method queries all SIREN."""
+    settings.QCC_API_CONCURRENCY = 2
+    error = Exception("API error")
+
+    # mock ManageStationClient.list() response
+    async def mock_manage_stations_list(siren, after):
+        if siren == "000000000":
+            raise error
+        return [siren, after]
+
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.ManageStationClient.list",
+        AsyncMock(side_effect=mock_manage_stations_list),
+    )
+    # the API client does not support listing stations of many SIREN
+    mock_client = AsyncMock()
+    del mock_client.manage.read_stations_by_sirens
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.QCC",
+        lambda self, s, a: mock_client,
+    )
+
+    client = ManageStationClient()
+    queries = [("123456789", None), ("000000000", None), ("987654321", "after")]
+    results = await client.list_many(queries)
+
+    # results are returned in queries order, errors do not cancel other queries
+    assert results == [["123456789", None], error, ["987654321", "after"]]
+    assert ManageStationClient.list.call_count == len(queries)
+
+
+async def test_manage_stations_list_many_by_sirens(monkeypatch, settings):
+    """Tests ManageStationClient.list_many method queries SIREN by batches."""
+    settings.QCC_API_CONCURRENCY = 2
+    settings.QCC_API_MAX_SIREN = 2
+    error = Exception("API error")
+    calls = []
+
+    # mock qcc read_stations_by_sirens response
+    async def mock_read_stations_by_sirens(sirens, after):
+        calls.append((sirens, after))
+        if "000000000" in sirens:
+            raise error
+        for siren in sirens:
+            for station in API_RESPONSE_COMPANY_INFO:
+                updated_at = f"2025-03-1{siren[0]}T00:00:00Z"
+                yield siren, {**station, "updated_at": updated_at}
+
+    mock_client = AsyncMock()
+    mock_client.manage.read_stations_by_sirens = mock_read_stations_by_sirens
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.QCC",
+        lambda self, s, a: mock_client,
+    )
+
+    client = ManageStationClient()
+    after = datetime(2025, 3, 12, tzinfo=timezone.utc)
+    queries = [
+        ("123456789", None),
+        ("311111111", after),
+        ("211111111", datetime(2025, 3, 13, tzinfo=timezone.utc)),
+        ("000000000", None),
+        ("911111111", after),
+    ]
+    results = await client.list_many(queries)
+
+    # queries are batched by `after` date, with the earliest `after` date
+    assert sorted(calls) == [
+        (["123456789", "000000000"], None),
+        (["211111111"], datetime(2025, 3, 13, tzinfo=timezone.utc)),
+        (["311111111", "911111111"], after),
+    ]
+    # results are returned in queries order, errors only affect their batch
+    for index in (1, 4):
+        assert [station.id_station_itinerance for station in results[index]] == [
+            station["id_station_itinerance"] for station in API_RESPONSE_COMPANY_INFO
+        ]
+        assert all(
+            isinstance(station, ManageStationsAdapter) for station in results[index]
+        )
+    # stations updated before the `after` date of the SIREN are filtered out
+    assert results[2] == []
+    assert results[0] is results[3] is error
+
+
+def test_qualicharge_api_facade_shared_event_loop(monkeypatch):
+    """Tests QualiChargeApi used as a context manager shares its API client."""
+    mock_client = AsyncMock()
+    del mock_client.manage.read_stations_by_sirens
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.QCC",
+        lambda self, s, a: mock_client,
+    )
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.ManageStationClient.list",
+        AsyncMock(return_value=[]),
+    )
+    monkeypatch.setattr(
+        "apps.core.qualicharge_api.clients.ManageStationClient.aclose",
+        AsyncMock(),
+    )
+
+    with QualiChargeApi() as api:
+        assert api.manage_stations_list("123456789") == []
+        assert api.manage_stations_lists(
+            [("123456789", None), ("987654321", None)]
+        ) == [[], []]
+
+    expected_calls = 3
+    assert ManageStationClient.list.call_count == expected_calls
+    # the API client is closed with the event loop
+    ManageStationClient.aclose.assert_called_once()
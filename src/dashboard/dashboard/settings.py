@@ -361,6 +361,10 @@ ANNUAIRE_ENTREPRISE_API_CONTEXT = {
 QCC_API_LOGIN_USERNAME = env.str("QCC_API_LOGIN_USERNAME")
 QCC_API_LOGIN_PASSWORD = env.str("QCC_API_LOGIN_PASSWORD")
 QCC_API_ROOT_URL = env.str("QCC_API_ROOT_URL")
+# Maximum number of concurrent API queries
+QCC_API_CONCURRENCY = env.int("QCC_API_CONCURRENCY", default=8)
+# Maximum number of SIREN listed per API query (see `API_MANAGE_STATION_MAX_SIREN`)
+QCC_API_MAX_SIREN = env.int("QCC_API_MAX_SIREN", default=100)
 
 
 ## Debug-toolbar
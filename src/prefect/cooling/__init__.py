@@ -1,23 +1,32 @@
 """Prefect: cooling module."""
 
 import os
-from datetime import date, datetime, timedelta
+import re
+from datetime import date, datetime, time, timedelta
 from enum import StrEnum
+from functools import cache
 from string import Template
-from typing import List, Tuple
+from typing import List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
 
-from data7.models import Dataset
-from data7.streamers import sql2parquet
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from prefect import flow, task
+from prefect.artifacts import create_table_artifact
 from prefect.client.schemas.objects import State
 from prefect.exceptions import FailedRun
+from prefect.futures import PrefectFuture, as_completed, wait
 from prefect.logging import get_run_logger
 from prefect.states import Completed, Failed
-from pyarrow import fs
+from pyarrow import NativeFile, fs
+from pyarrow import dataset as ds
 from pyarrow import parquet as pq
-from pydantic import HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from sqlalchemy import Engine, text
 
+from indicators.conf import settings
 from indicators.db import get_api_db_engine
 from indicators.types import Environment
 
@@ -30,6 +39,44 @@ class IfExistStrategy(StrEnum):
     FAIL = "fail"
     OVERWRITE = "overwrite"
     APPEND = "append"
+    REPAIR = "repair"
+
+
+# Archives are stored using a Hive partitioning scheme:
+# <bucket>/year=YYYY/month=MM/day=DD/<environment>.parquet
+ARCHIVE_PARTITIONING = ds.partitioning(
+    pa.schema([("year", pa.int16()), ("month", pa.int8()), ("day", pa.int8())]),
+    flavor="hive",
+)
+
+
+ARCHIVE_DAY_PATTERN = re.compile(r"year=(\d+)/month=(\d+)/day=(\d+)/")
+
+# Late rows are rows created after the archive `created_at` watermark
+APPEND_WATERMARK_FIELD: str = "created_at"
+APPEND_DELTA_QUERY_TEMPLATE = Template("""
+    SELECT
+        *
+    FROM
+        ($query) AS day
+    WHERE
+        $watermark_field > '$watermark'
+    $order_by
+    """)
+
+
+class ArchiveOptions(BaseModel):
+    """Parquet archive writer options.
+
+    Rows are expected to be sorted by the `sort_by` columns (using the select
+    query `ORDER BY` clause): this ordering is recorded in the parquet metadata and
+    makes row groups and pages statistics selective for predicate pushdown.
+    """
+
+    sort_by: List[str] = []
+    dictionary_columns: List[str] = []
+    row_group_size: int = Field(default_factory=lambda: settings.COOLING_ROW_GROUP_SIZE)
+    compression: str = Field(default_factory=lambda: settings.COOLING_COMPRESSION)
 
 
 @task
@@ -40,37 +87,346 @@ def get_s3_endpoint_url() -> HttpUrl:
     return HttpUrl(s3_endpoint_url)
 
 
+@cache
+def get_s3_filesystem(s3_endpoint_url: str) -> fs.S3FileSystem:
+    """Get the (shared) S3 filesystem for an endpoint URL."""
+    return fs.S3FileSystem(endpoint_override=s3_endpoint_url)
+
+
+def get_archive_dir(bucket: str, day: date) -> str:
+    """Get a day archives (Hive partition) directory."""
+    return f"{bucket}/year={day.year}/month={day.month:02d}/day={day.day:02d}"
+
+
+def get_archive_path(bucket: str, day: date, environment: Environment) -> str:
+    """Get an environment day archive path."""
+    return f"{get_archive_dir(bucket, day)}/{environment}.parquet"
+
+
+def get_archive_metadata_path(bucket: str, environment: Environment) -> str:
+    """Get an environment archives `_metadata` summary file path."""
+    return f"{bucket}/_{environment}_metadata"
+
+
+def get_delta_path(
+    bucket: str, day: date, environment: Environment, watermark: datetime
+) -> str:
+    """Get an environment day archive delta path (for a watermark)."""
+    return (
+        f"{get_archive_dir(bucket, day)}/"
+        f"{environment}.delta-{watermark:%Y%m%dT%H%M%S%f}.parquet"
+    )
+
+
+def get_delta_paths(
+    bucket: str, day: date, environment: Environment, filesystem: fs.FileSystem
+) -> List[str]:
+    """Get an environment day archive delta paths (oldest first)."""
+    prefix = f"{environment}.delta-"
+    return sorted(
+        info.path
+        for info in filesystem.get_file_info(
+            fs.FileSelector(get_archive_dir(bucket, day), allow_not_found=True)
+        )
+        if info.type == fs.FileType.File
+        and info.base_name.startswith(prefix)
+        and info.base_name.endswith(".parquet")
+    )
+
+
 def get_daily_cooling_day(days: int) -> date:
     """Get target date for cooling."""
     return (datetime.today() - timedelta(days=days)).date()
 
 
-def _check_archive(
+def get_day_query_params(day: date) -> dict:
+    """Get a day query parameters.
+
+    The day is defined as an half-open [start, end) timestamps range in the
+    configured cooling timezone so that queries can use time column indexes (and
+    hypertables chunk exclusion) instead of casting it to a date.
+    """
+    tz = ZoneInfo(settings.COOLING_TIMEZONE)
+    start = datetime.combine(day, time(), tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time(), tzinfo=tz)
+    return {
+        "date": day.isoformat(),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+    }
+
+
+def _check_archive(  # noqa: PLR0913
     engine: Engine,
-    day_iso: str,
+    day: date,
     s3: fs.S3FileSystem,
     file_path: str,
     check_query: Template,
+    expected: int | None = None,
 ) -> Tuple[bool, int, int]:
-    """Check generated archive size."""
-    with engine.connect() as connection:
-        result = connection.execute(
-            text(check_query.substitute({"date": day_iso}))
-        ).first()
-
-        # No entry was found in database.
-        # We do not check archive even if it exists, but in this case we return:
-        # (False, 0, 0)
-        if not result:
-            return not s3.exists(file_path), 0, 0
-
-        expected = result._tuple()[0]
-    archive = pq.ParquetFile(file_path, filesystem=s3)
-    n_rows = archive.scan_contents()
-    archive.close()
+    """Check generated archive size.
+
+    The `expected` number of rows is counted in database using the `check_query`
+    unless given.
+    """
+    if expected is None:
+        with engine.connect() as connection:
+            result = connection.execute(
+                text(check_query.substitute(get_day_query_params(day)))
+            ).first()
+
+            # No entry was found in database.
+            # We do not check archive even if it exists, but in this case we return:
+            # (False, 0, 0)
+            if not result:
+                return not s3.exists(file_path), 0, 0
+
+            expected = result._tuple()[0]
+    # Only the parquet footer metadata is read
+    with pq.ParquetFile(file_path, filesystem=s3) as archive:
+        n_rows = archive.metadata.num_rows
     return n_rows == expected, n_rows, expected
 
 
+def stream_query_to_parquet(
+    engine: Engine,
+    query: str,
+    output: NativeFile,
+    chunk_size: int = 5000,
+    options: Optional[ArchiveOptions] = None,
+) -> int:
+    """Stream query results to a parquet output stream.
+
+    Rows are fetched by chunks using a server-side (named) cursor. The parquet
+    schema is inferred from the first chunk. Chunks are buffered so that written
+    row groups contain `options.row_group_size` rows (but the last one). Returns the
+    number of written rows.
+    """
+    options = options or ArchiveOptions()
+    n_rows = 0
+    writer: pq.ParquetWriter | None = None
+    pending: List[pa.Table] = []
+    n_pending = 0
+    with engine.connect().execution_options(
+        stream_results=True, max_row_buffer=chunk_size
+    ) as connection:
+        for chunk in pd.read_sql_query(
+            query, connection, chunksize=chunk_size, dtype_backend="pyarrow"
+        ):
+            if chunk.empty:
+                continue
+            table = pa.Table.from_pandas(
+                chunk,
+                schema=writer.schema if writer is not None else None,
+                preserve_index=False,
+            )
+            if writer is None:
+                writer = _get_parquet_writer(output, table.schema, options)
+            pending.append(table)
+            n_pending += table.num_rows
+            n_rows += table.num_rows
+            if n_pending < options.row_group_size:
+                continue
+            buffered = pa.concat_tables(pending)
+            full = n_pending - n_pending % options.row_group_size
+            writer.write_table(
+                buffered.slice(0, full), row_group_size=options.row_group_size
+            )
+            pending = [buffered.slice(full)]
+            n_pending -= full
+    if writer is not None:
+        if n_pending:
+            writer.write_table(
+                pa.concat_tables(pending), row_group_size=options.row_group_size
+            )
+        writer.close()
+    return n_rows
+
+
+def _get_parquet_writer(
+    output: NativeFile, schema: pa.Schema, options: ArchiveOptions
+) -> pq.ParquetWriter:
+    """Get a parquet writer configured with archive options."""
+    sorting_columns = None
+    if options.sort_by:
+        sorting_columns = list(
+            pq.SortingColumn.from_ordering(
+                schema, [(column, "ascending") for column in options.sort_by]
+            )
+        )
+    return pq.ParquetWriter(
+        output,
+        schema,
+        compression=options.compression,
+        use_dictionary=options.dictionary_columns or True,
+        write_statistics=True,
+        write_page_index=True,
+        sorting_columns=sorting_columns,
+    )
+
+
+def _get_column_max(path: str, field: str, filesystem: fs.FileSystem):
+    """Get a parquet file column maximal value.
+
+    The value is read from the footer column statistics when available.
+    """
+    metadata = pq.read_metadata(path, filesystem=filesystem)
+    index = metadata.schema.names.index(field)
+    maxima = []
+    for r in range(metadata.num_row_groups):
+        statistics = metadata.row_group(r).column(index).statistics
+        if statistics is None or not statistics.has_min_max:
+            column = pq.read_table(
+                path, columns=[field], filesystem=filesystem, partitioning=None
+            )[field]
+            return pc.max(column).as_py()
+        maxima.append(statistics.max)
+    return max(maxima, default=None)
+
+
+def get_archive_watermark(
+    paths: List[str],
+    filesystem: fs.FileSystem,
+    field: str = APPEND_WATERMARK_FIELD,
+) -> Optional[datetime]:
+    """Get the maximal `field` value of archives."""
+    maxima = [
+        maximum
+        for path in paths
+        if (maximum := _get_column_max(path, field, filesystem)) is not None
+    ]
+    return max(maxima, default=None)
+
+
+def _drop_duplicates(table: pa.Table, key: str) -> pa.Table:
+    """Drop duplicated `key` rows, keeping the last occurrence."""
+    rows = pa.table(
+        {key: table[key], "row": pa.array(np.arange(table.num_rows, dtype="int64"))}
+    )
+    last = rows.group_by(key, use_threads=False).aggregate([("row", "max")])
+    indices = last["row_max"]
+    return table.take(indices.take(pc.sort_indices(indices)))
+
+
+def _append_data_for_day(  # noqa: PLR0913
+    engine: Engine,
+    day: date,
+    environment: Environment,
+    bucket: str,
+    s3: fs.S3FileSystem,
+    query: str,
+    chunk_size: int,
+    options: ArchiveOptions,
+) -> State:
+    """Write late rows of an archived day to a delta archive.
+
+    Late rows are rows created after the archive (and existing deltas) watermark.
+    """
+    file_path = get_archive_path(bucket, day, environment)
+    watermark = get_archive_watermark(
+        [file_path, *get_delta_paths(bucket, day, environment, s3)], s3
+    )
+    if watermark is None:
+        return Failed(
+            message=(
+                f"{bucket} archive '{file_path}' has no {APPEND_WATERMARK_FIELD}"
+                " watermark, it cannot be appended."
+            )
+        )
+    order_by = ""
+    if options.sort_by:
+        order_by = f"ORDER BY {', '.join(options.sort_by)}"
+    delta_query = APPEND_DELTA_QUERY_TEMPLATE.substitute(
+        {
+            "query": query,
+            "watermark_field": APPEND_WATERMARK_FIELD,
+            "watermark": watermark.isoformat(),
+            "order_by": order_by,
+        }
+    )
+    delta_path = get_delta_path(bucket, day, environment, watermark)
+    with s3.open_output_stream(delta_path) as delta:
+        written = stream_query_to_parquet(
+            engine, delta_query, delta, chunk_size, options=options
+        )
+    if not written:
+        s3.delete_file(delta_path)
+        return Completed(message=f"{bucket} archive '{file_path}' is up to date")
+
+    with pq.ParquetFile(delta_path, filesystem=s3) as archive:
+        n_rows = archive.metadata.num_rows
+    if n_rows != written:
+        return Failed(
+            message=(
+                f"{bucket} archive delta '{delta_path}' and database content"
+                f" have diverged ({n_rows} vs {written} expected rows)"
+            )
+        )
+    return Completed(
+        message=(
+            f"{bucket} archive delta '{delta_path}' created with {written} late rows"
+        )
+    )
+
+
+def _delete_files(paths: List[str], filesystem: fs.FileSystem):
+    """Delete files (in order), ignoring already deleted files."""
+    for path in paths:
+        try:
+            filesystem.delete_file(path)
+        except FileNotFoundError:
+            continue
+
+
+def compact_archive(
+    bucket: str,
+    day: date,
+    environment: Environment,
+    filesystem: fs.FileSystem,
+    options: Optional[ArchiveOptions] = None,
+) -> Optional[int]:
+    """Merge a day archive deltas into the day archive.
+
+    Rows are deduplicated by `id` (keeping the most recent version) and sorted by
+    `options.sort_by` columns. The compacted archive is written to a temporary file
+    that is then moved to the day archive path, before deltas are deleted (oldest
+    first).
+
+    This is not atomic: on S3, a move is a copy followed by a delete. Readers get
+    either the former or the compacted archive, but remaining deltas are merged
+    with a compacted archive until they are deleted. As they are the most recent
+    versions of rows it already holds, merging them again gives the same rows: an
+    interrupted compaction can be run again.
+
+    Returns the compacted archive number of rows, or `None` if there is no delta.
+    """
+    deltas = get_delta_paths(bucket, day, environment, filesystem)
+    if not deltas:
+        return None
+    options = options or ArchiveOptions()
+    file_path = get_archive_path(bucket, day, environment)
+    table = pa.concat_tables(
+        [
+            pq.read_table(path, filesystem=filesystem, partitioning=None)
+            for path in [file_path, *deltas]
+        ],
+        promote_options="permissive",
+    )
+    table = _drop_duplicates(table, "id")
+    if options.sort_by:
+        table = table.sort_by([(column, "ascending") for column in options.sort_by])
+
+    # Files with a leading underscore are ignored by datasets readers
+    tmp_path = f"{get_archive_dir(bucket, day)}/_{environment}.compacting.parquet"
+    with filesystem.open_output_stream(tmp_path) as output:
+        writer = _get_parquet_writer(output, table.schema, options)
+        writer.write_table(table, row_group_size=options.row_group_size)
+        writer.close()
+    filesystem.move(tmp_path, file_path)
+    _delete_files(deltas, filesystem)
+    return table.num_rows
+
+
 @task
 def extract_data_for_day(  # noqa: PLR0913,PLR0911
     day: date,
@@ -81,27 +437,21 @@ def extract_data_for_day(  # noqa: PLR0913,PLR0911
     check_query: Template,
     if_exists: IfExistStrategy = IfExistStrategy.FAIL,
     chunk_size: int = 5000,
+    options: Optional[ArchiveOptions] = None,
 ) -> State:
     """Cool data from an environment on a particular day.
 
-    This task creates a parquet file per-environment per-day and save it in a S3 bucket.
+    This task creates a parquet file per-environment per-day and save it in a S3 bucket
+    day partition (see `get_archive_path`).
     """
-    day_iso: str = day.isoformat()
     logger = get_run_logger()
     engine = get_api_db_engine(environment)
-
-    # Dataset
-    basename = f"{bucket}-{day_iso}-{environment.value}"
-    query = select_query.substitute({"date": day_iso})
-    dataset = Dataset(basename=basename, query=query)
+    query = select_query.substitute(get_day_query_params(day))
 
     # Target bucket
-    s3 = fs.S3FileSystem(endpoint_override=str(s3_endpoint_url))
-    dir_path = f"{bucket}/{day.year}/{day.month}/{day.day}"
-    file_path = f"{dir_path}/{environment}.parquet"
-
-    # Default output stream method
-    s3_open_output_stream = s3.open_output_stream
+    s3 = get_s3_filesystem(str(s3_endpoint_url))
+    dir_path = get_archive_dir(bucket, day)
+    file_path = get_archive_path(bucket, day, environment)
 
     # Apply a strategy if the output file exists
     file_info = s3.get_file_info(file_path)
@@ -116,7 +466,7 @@ def extract_data_for_day(  # noqa: PLR0913,PLR0911
                 )
             case IfExistStrategy.CHECK:
                 ok, n_rows, expected = _check_archive(
-                    engine, day_iso, s3, file_path, check_query
+                    engine, day, s3, file_path, check_query
                 )
                 if not ok:
                     return Failed(
@@ -135,33 +485,60 @@ def extract_data_for_day(  # noqa: PLR0913,PLR0911
                 return Failed(
                     message=(f"{bucket} archive '{file_path}' already exists!")
                 )
+            case IfExistStrategy.REPAIR:
+                ok, n_rows, expected = _check_archive(
+                    engine, day, s3, file_path, check_query
+                )
+                if ok:
+                    return Completed(
+                        message=(
+                            f"{bucket} archive '{file_path}' already exists and"
+                            f" is valid. It contains {n_rows} rows."
+                        )
+                    )
+                logger.warning(
+                    f"{bucket} archive '{file_path}' and database content have"
+                    f" diverged ({n_rows} vs {expected} expected rows) and will be"
+                    " overwritten."
+                )
             case IfExistStrategy.OVERWRITE:
                 logger.warning(
                     f"{bucket} archive '{file_path}' already exists and "
                     "will be overwritten."
                 )
             case IfExistStrategy.APPEND:
-                s3_open_output_stream = s3.open_append_stream
-                logger.warning(
-                    f"{bucket} archive '{file_path}' already exists and "
-                    "will be concatenated with hot data."
+                logger.info(
+                    f"{bucket} archive '{file_path}' already exists, late rows "
+                    "will be written to a delta archive."
                 )
-                # FIXME
-                return Failed(
-                    message=(
-                        f"{bucket} archive '{file_path}' already exists and "
-                        "concatenation for S3 has not been implemented yet."
-                    )
+                return _append_data_for_day(
+                    engine,
+                    day,
+                    environment,
+                    bucket,
+                    s3,
+                    query,
+                    chunk_size,
+                    options or ArchiveOptions(),
                 )
 
     # Start writing dataset to the target bucket
     s3.create_dir(dir_path)
-    with s3_open_output_stream(file_path) as archive:
-        for chunk in sql2parquet(engine, dataset, chunksize=chunk_size):
-            archive.write(chunk)
+    with s3.open_output_stream(file_path) as archive:
+        written = stream_query_to_parquet(
+            engine, query, archive, chunk_size, options=options
+        )
 
-    # Check that the archive contains expected number of records
-    ok, n_rows, expected = _check_archive(engine, day_iso, s3, file_path, check_query)
+    if not written:
+        s3.delete_file(file_path)
+        return Completed(
+            message=f"No {bucket} data for {day.isoformat()}, no archive created"
+        )
+
+    # Check that the archive contains the number of streamed records
+    ok, n_rows, expected = _check_archive(
+        engine, day, s3, file_path, check_query, expected=written
+    )
     if not ok:
         return Failed(
             message=(
@@ -173,6 +550,200 @@ def extract_data_for_day(  # noqa: PLR0913,PLR0911
     return Completed(message=f"{bucket} archive '{file_path}' created")
 
 
+def write_archive_metadata(
+    bucket: str, environment: Environment, filesystem: fs.FileSystem
+) -> int:
+    """Write an environment archives `_metadata` summary file.
+
+    Footers of the environment daily archives are gathered in a single parquet
+    `_metadata` file (with archives paths relative to the bucket), so that readers
+    can plan a scan over the whole archive without opening every file. Archives
+    with a schema that differs from the most recent one are not referenced.
+
+    Returns the number of referenced archives.
+    """
+    logger = get_run_logger()
+    file_name = f"{environment}.parquet"
+    paths = sorted(
+        info.path
+        for info in filesystem.get_file_info(
+            fs.FileSelector(bucket, allow_not_found=True, recursive=True)
+        )
+        if info.type == fs.FileType.File
+        and info.base_name == file_name
+        and "/year=" in info.path
+    )
+    if not paths:
+        return 0
+
+    footers = [pq.read_metadata(path, filesystem=filesystem) for path in paths]
+    reference = footers[-1].schema
+    referenced = []
+    for path, footer in zip(paths, footers, strict=True):
+        if not footer.schema.equals(reference):
+            logger.warning(f"Archive '{path}' schema differs, it will be ignored")
+            continue
+        footer.set_file_path(path.removeprefix(f"{bucket}/"))
+        referenced.append(footer)
+
+    summary = referenced[0]
+    for footer in referenced[1:]:
+        summary.append_row_groups(footer)
+    with filesystem.open_output_stream(
+        get_archive_metadata_path(bucket, environment)
+    ) as output:
+        summary.write_metadata_file(output)
+    return len(referenced)
+
+
+@task
+def update_archive_metadata(
+    bucket: str, environment: Environment, s3_endpoint_url: HttpUrl
+) -> int:
+    """Update an environment archives `_metadata` summary file."""
+    return write_archive_metadata(
+        bucket, environment, get_s3_filesystem(str(s3_endpoint_url))
+    )
+
+
+def get_archive_dataset(  # noqa: PLR0913
+    bucket: str,
+    environment: Environment,
+    from_date: date,
+    to_date: date,
+    filesystem: fs.FileSystem,
+    use_metadata: bool = False,
+    include_deltas: bool = False,
+) -> ds.FileSystemDataset:
+    """Get a dataset of an environment daily archives for a period.
+
+    Year, month and day partition fields are added to archives columns. If
+    `use_metadata` is set, archives footers are read from the `_metadata` summary
+    file (that may not reference recently created archives). If `include_deltas`
+    is set, not yet compacted archives deltas follow their day archive (oldest
+    first): use `read_archive_dataset` to merge them.
+
+    Note that dates from the period interval are both included.
+    """
+    if use_metadata and include_deltas:
+        raise ValueError("Archives deltas are not referenced by the metadata file.")
+    days = [
+        from_date + timedelta(days=d) for d in range((to_date - from_date).days + 1)
+    ]
+    paths = [get_archive_path(bucket, day, environment) for day in days]
+    if include_deltas:
+        paths = [
+            path
+            for day, archive in zip(days, paths, strict=True)
+            for path in [
+                archive,
+                *get_delta_paths(bucket, day, environment, filesystem),
+            ]
+        ]
+    if use_metadata:
+        summary = ds.parquet_dataset(
+            get_archive_metadata_path(bucket, environment),
+            filesystem=filesystem,
+            partitioning=ARCHIVE_PARTITIONING,
+        )
+        wanted = set(paths)
+        return ds.FileSystemDataset(
+            [f for f in summary.get_fragments() if f.path in wanted],
+            summary.schema,
+            summary.format,
+            filesystem,
+        )
+    return ds.dataset(
+        [
+            info.path
+            for info in filesystem.get_file_info(paths)
+            if info.type == fs.FileType.File
+        ],
+        format="parquet",
+        filesystem=filesystem,
+        partitioning=ARCHIVE_PARTITIONING,
+        partition_base_dir=bucket,
+    )
+
+
+def is_delta_path(path: str) -> bool:
+    """Check if an archive path is an archive delta path."""
+    return ".delta-" in path.rsplit("/", 1)[-1]
+
+
+def read_archive_dataset(
+    dataset: ds.FileSystemDataset,
+    columns: Optional[List[str]] = None,
+    filter: Optional[ds.Expression] = None,
+    key: str = "id",
+) -> pa.Table:
+    """Read an archives dataset, merging archives deltas (if any).
+
+    Dataset files are read in order and rows are deduplicated by `key` (keeping the
+    most recent version) the same way deltas are merged by `compact_archive`.
+    """
+    has_deltas = any(is_delta_path(path) for path in dataset.files)
+    if not has_deltas or key not in dataset.schema.names:
+        return dataset.to_table(columns=columns, filter=filter)
+
+    read_columns = columns
+    if columns is not None and key not in columns:
+        read_columns = [*columns, key]
+    table = pa.concat_tables(
+        [
+            fragment.to_table(
+                schema=dataset.schema, columns=read_columns, filter=filter
+            )
+            for fragment in dataset.get_fragments()
+        ]
+    )
+    table = _drop_duplicates(table, key)
+    return table if columns is None else table.select(columns)
+
+
+def read_archives(  # noqa: PLR0913
+    bucket: str,
+    environment: Environment,
+    from_date: date,
+    to_date: date,
+    columns: Optional[List[str]] = None,
+    filter: Optional[ds.Expression] = None,
+    filesystem: Optional[fs.FileSystem] = None,
+    use_metadata: bool = False,
+) -> pa.Table:
+    """Read an environment daily archives for a period.
+
+    The `filter` expression (e.g. `ds.field("id_pdc_itinerance") == "FRXXX"`) is
+    pushed down to the parquet reader: row groups (and pages) are skipped using
+    their column statistics. Not yet compacted archives deltas are merged (see
+    `read_archive_dataset`), unless archives are read from the `_metadata` summary
+    file (`use_metadata`) that does not reference them. The S3 filesystem is used
+    by default.
+
+    Note that dates from the period interval are both included.
+    """
+    if filesystem is None:
+        filesystem = get_s3_filesystem(str(get_s3_endpoint_url.fn()))
+    dataset = get_archive_dataset(
+        bucket,
+        environment,
+        from_date,
+        to_date,
+        filesystem,
+        use_metadata,
+        include_deltas=not use_metadata,
+    )
+    return read_archive_dataset(dataset, columns=columns, filter=filter)
+
+
+def _summarize(days: List[date], states: List[State]) -> List[dict]:
+    """Build a cooling summary report (one row per day)."""
+    return [
+        {"day": day.isoformat(), "state": state.type.value, "message": state.message}
+        for day, state in zip(days, states, strict=True)
+    ]
+
+
 @flow
 def extract_data_for_period(  # noqa: PLR0913
     from_date: date,
@@ -185,17 +756,37 @@ def extract_data_for_period(  # noqa: PLR0913
     if_exists: IfExistStrategy = IfExistStrategy.FAIL,
     chunk_size: int = 5000,
     ignore_errors: bool = False,
+    max_concurrency: int = 4,
+    options: Optional[ArchiveOptions] = None,
 ) -> List[State]:
     """Extract data to daily archives for a period.
 
+    Daily extraction tasks are submitted concurrently, with at most
+    `max_concurrency` days being extracted at the same time: a day is submitted as
+    soon as any running extraction is done. Unless `ignore_errors` is set, no more
+    day is submitted once an extraction failed. The archives `_metadata` summary
+    file is updated once extractions are done.
+
     Note that dates from the period interval are both included.
     """
+    if max_concurrency < 1:
+        raise ValueError(
+            f"max_concurrency should be a positive integer (got {max_concurrency})"
+        )
+    logger = get_run_logger()
     days = [
         from_date + timedelta(days=d) for d in range((to_date - from_date).days + 1)
     ]
-    tasks_state: List[State] = []
+    futures: List[PrefectFuture] = []
+    running: Set[PrefectFuture] = set()
     for day in days:
-        state = extract_data_for_day(
+        # Wait for any running extraction to free a slot
+        if len(running) >= max_concurrency:
+            done = next(as_completed(list(running)))
+            running.remove(done)
+            if not ignore_errors and done.state.is_failed():
+                break
+        future = extract_data_for_day.submit(
             day,
             environment,
             bucket,
@@ -204,10 +795,91 @@ def extract_data_for_period(  # noqa: PLR0913
             check_query,
             if_exists=if_exists,
             chunk_size=chunk_size,
+            options=options,
         )
+        futures.append(future)
+        running.add(future)
+    wait(futures)
+    tasks_state: List[State] = [future.state for future in futures]
+
+    # Summary report
+    n_failed = sum(state.is_failed() for state in tasks_state)
+    description = (
+        f"{bucket} cooling ({environment}) from {from_date} to {to_date}: "
+        f"{len(tasks_state) - n_failed} completed, {n_failed} failed, "
+        f"{len(days) - len(tasks_state)} skipped"
+    )
+    logger.info(description)
+    create_table_artifact(
+        key=f"{bucket}-cooling-{environment}",
+        table=_summarize(days[: len(tasks_state)], tasks_state),
+        description=description,
+    )
+    if n_failed < len(tasks_state):
+        update_archive_metadata(bucket, environment, s3_endpoint_url)
+
+    for day, state in zip(days, tasks_state, strict=False):
         if not ignore_errors and state.is_failed():
             raise FailedRun(
                 f"Extraction failed for day: {str(day)}. Reason: {state.message}"
             )
-        tasks_state.append(state)
     return tasks_state
+
+
+@task
+def compact_data_for_day(
+    day: date,
+    environment: Environment,
+    bucket: str,
+    s3_endpoint_url: HttpUrl,
+    options: Optional[ArchiveOptions] = None,
+) -> State:
+    """Compact a day archive deltas."""
+    s3 = get_s3_filesystem(str(s3_endpoint_url))
+    file_path = get_archive_path(bucket, day, environment)
+    n_rows = compact_archive(bucket, day, environment, s3, options)
+    if n_rows is None:
+        return Completed(message=f"{bucket} archive '{file_path}' has no delta")
+    return Completed(
+        message=f"{bucket} archive '{file_path}' compacted ({n_rows} rows)"
+    )
+
+
+def get_days_with_deltas(
+    bucket: str, environment: Environment, filesystem: fs.FileSystem
+) -> List[date]:
+    """Get days with archive deltas."""
+    prefix = f"{environment}.delta-"
+    days = set()
+    for info in filesystem.get_file_info(
+        fs.FileSelector(bucket, allow_not_found=True, recursive=True)
+    ):
+        if info.type != fs.FileType.File or not info.base_name.startswith(prefix):
+            continue
+        if match := ARCHIVE_DAY_PATTERN.search(info.path):
+            days.add(date(*(int(part) for part in match.groups())))
+    return sorted(days)
+
+
+@flow
+def compact_data(
+    environment: Environment,
+    bucket: str,
+    s3_endpoint_url: HttpUrl,
+    options: Optional[ArchiveOptions] = None,
+) -> List[State]:
+    """Compact all archives with deltas (see the `APPEND` strategy)."""
+    days = get_days_with_deltas(
+        bucket, environment, get_s3_filesystem(str(s3_endpoint_url))
+    )
+    futures = [
+        compact_data_for_day.submit(
+            day, environment, bucket, s3_endpoint_url, options=options
+        )
+        for day in days
+    ]
+    wait(futures)
+    states: List[State] = [future.state for future in futures]
+    if days:
+        update_archive_metadata(bucket, environment, s3_endpoint_url)
+    return states
@@ -8,11 +8,14 @@ from prefect import flow
 from prefect.client.schemas.objects import State
 
 from cooling import (
+    ArchiveOptions,
     IfExistStrategy,
+    compact_data,
     extract_data_for_day,
     extract_data_for_period,
     get_daily_cooling_day,
     get_s3_endpoint_url,
+    update_archive_metadata,
 )
 from indicators.types import Environment
 
@@ -24,7 +27,11 @@ SESSIONS_FOR_A_DAY_QUERY_TEMPLATE = Template("""
         Session
     INNER JOIN _PointDeCharge ON Session.point_de_charge_id = _PointDeCharge.id
     WHERE
-        start::DATE = '$date'
+        start >= '$start'
+        AND start < '$end'
+    ORDER BY
+        _PointDeCharge.id_pdc_itinerance,
+        start
     """)
 SESSION_COUNT_FOR_A_DAY_QUERY_TEMPLATE = Template("""
     SELECT
@@ -32,10 +39,15 @@ SESSION_COUNT_FOR_A_DAY_QUERY_TEMPLATE = Template("""
     FROM
         Session
     WHERE
-        start::DATE = '$date'
+        start >= '$start'
+        AND start < '$end'
     """)
 BUCKET_NAME = "qualicharge-sessions"
 COOL_AFTER_DAYS: int = 21
+ARCHIVE_OPTIONS = ArchiveOptions(
+    sort_by=["id_pdc_itinerance", "start"],
+    dictionary_columns=["id_pdc_itinerance"],
+)
 
 
 @flow(
@@ -48,6 +60,7 @@ def cool_sessions_for_period(  # noqa: PLR0913
     if_exists: IfExistStrategy = IfExistStrategy.FAIL,
     chunk_size: int = 5000,
     ignore_errors: bool = False,
+    max_concurrency: int = 4,
 ) -> List[State]:
     """Extract sessions to daily archives for a period.
 
@@ -64,6 +77,8 @@ def cool_sessions_for_period(  # noqa: PLR0913
         if_exists=if_exists,
         chunk_size=chunk_size,
         ignore_errors=ignore_errors,
+        max_concurrency=max_concurrency,
+        options=ARCHIVE_OPTIONS,
     )
 
 
@@ -75,13 +90,28 @@ def daily_cool_sessions(
     chunk_size: int = 5000,
 ) -> State:
     """Cool sessions for (today - `days`) day."""
-    return extract_data_for_day(
+    s3_endpoint_url = get_s3_endpoint_url()
+    state = extract_data_for_day(
         get_daily_cooling_day(days),
         environment,
         BUCKET_NAME,
-        get_s3_endpoint_url(),
+        s3_endpoint_url,
         SESSIONS_FOR_A_DAY_QUERY_TEMPLATE,
         SESSION_COUNT_FOR_A_DAY_QUERY_TEMPLATE,
         if_exists=if_exists,
         chunk_size=chunk_size,
+        options=ARCHIVE_OPTIONS,
+    )
+    if state.is_completed():
+        update_archive_metadata(BUCKET_NAME, environment, s3_endpoint_url)
+    return state
+
+
+@flow
+def compact_sessions(
+    environment: Environment = Environment.PRODUCTION,
+) -> List[State]:
+    """Compact sessions archives deltas (see the `append` strategy)."""
+    return compact_data(
+        environment, BUCKET_NAME, get_s3_endpoint_url(), options=ARCHIVE_OPTIONS
     )
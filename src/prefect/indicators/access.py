@@ -0,0 +1,275 @@
+"""QualiCharge prefect indicators: hot and cold data access.
+
+Statuses and sessions are daily cooled to parquet archives (see the `cooling`
+module). Readers from this module take a time range and a column projection and
+transparently read archived days from the archives (cold data) and other days from
+the API database (hot data). Backfills may only read cold data using the
+`DataSource.ARCHIVE` source, without touching the database.
+"""
+
+from datetime import date, datetime, time, timedelta
+from enum import StrEnum
+from string import Template
+from typing import Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore
+import pyarrow.dataset as ds  # type: ignore
+from pyarrow import fs
+from pydantic import BaseModel
+
+from cooling import (
+    get_archive_dataset,
+    get_archive_path,
+    get_s3_endpoint_url,
+    get_s3_filesystem,
+    read_archive_dataset,
+)
+from cooling.sessions import BUCKET_NAME as SESSIONS_BUCKET_NAME
+from cooling.sessions import SESSIONS_FOR_A_DAY_QUERY_TEMPLATE
+from cooling.statuses import BUCKET_NAME as STATUSES_BUCKET_NAME
+from cooling.statuses import STATUSES_FOR_A_DAY_QUERY_TEMPLATE
+from indicators.conf import settings
+from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
+from indicators.types import Environment
+
+PARTITION_FIELDS: List[str] = ["year", "month", "day"]
+
+PROJECTION_QUERY_TEMPLATE = Template("""
+SELECT
+    $columns
+FROM
+    ($query) AS hot
+""")
+
+
+class DataSource(StrEnum):
+    """Data sources."""
+
+    AUTO = "auto"
+    DATABASE = "database"
+    ARCHIVE = "archive"
+
+
+class ArchivedTable(BaseModel):
+    """An API database table that is daily cooled to archives.
+
+    `query` is the cooling select query template (with `$start` and `$end` range
+    bounds): it is also used to read hot data, so that both sources have the same
+    columns.
+    """
+
+    name: str
+    bucket: str
+    time_field: str
+    query: str
+
+
+STATUSES = ArchivedTable(
+    name="statuses",
+    bucket=STATUSES_BUCKET_NAME,
+    time_field="horodatage",
+    query=STATUSES_FOR_A_DAY_QUERY_TEMPLATE.template,
+)
+SESSIONS = ArchivedTable(
+    name="sessions",
+    bucket=SESSIONS_BUCKET_NAME,
+    time_field="start",
+    query=SESSIONS_FOR_A_DAY_QUERY_TEMPLATE.template,
+)
+
+
+class DataSpan(BaseModel):
+    """A [start, end) time range read from a single source."""
+
+    source: DataSource
+    start: datetime
+    end: datetime
+
+
+def _get_day_start(day: date) -> datetime:
+    """Get a day start in the cooling timezone."""
+    return datetime.combine(day, time(), tzinfo=ZoneInfo(settings.COOLING_TIMEZONE))
+
+
+def _get_days(start: datetime, end: datetime) -> List[date]:
+    """Get (cooling timezone) days overlapping the [start, end) range."""
+    tz = ZoneInfo(settings.COOLING_TIMEZONE)
+    first = start.astimezone(tz).date()
+    last = (end - timedelta(microseconds=1)).astimezone(tz).date()
+    return [first + timedelta(days=d) for d in range((last - first).days + 1)]
+
+
+def _as_aware(value: datetime) -> datetime:
+    """Make a datetime timezone aware (naive datetimes are UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo("UTC"))
+    return value
+
+
+def get_default_filesystem() -> fs.S3FileSystem:
+    """Get the (shared) S3 filesystem of archives and stored indicators."""
+    return get_s3_filesystem(str(get_s3_endpoint_url.fn()))
+
+
+def get_archived_days(
+    table: ArchivedTable,
+    environment: Environment,
+    days: List[date],
+    filesystem: fs.FileSystem,
+) -> List[date]:
+    """Get days with an existing archive."""
+    infos = filesystem.get_file_info(
+        [get_archive_path(table.bucket, day, environment) for day in days]
+    )
+    return [
+        day
+        for day, info in zip(days, infos, strict=True)
+        if info.type == fs.FileType.File
+    ]
+
+
+def get_spans(  # noqa: PLR0913
+    table: ArchivedTable,
+    environment: Environment,
+    start: datetime,
+    end: datetime,
+    source: DataSource = DataSource.AUTO,
+    filesystem: Optional[fs.FileSystem] = None,
+) -> List[DataSpan]:
+    """Plan the [start, end) range reading.
+
+    Using the `AUTO` source, archived days are read from the archives while other
+    days are read from the database. Contiguous days from the same source are
+    merged in a single span. Using the `ARCHIVE` source, days without archive are
+    ignored.
+    """
+    start, end = _as_aware(start), _as_aware(end)
+    if end <= start:
+        return []
+    if source == DataSource.DATABASE:
+        return [DataSpan(source=source, start=start, end=end)]
+
+    days = _get_days(start, end)
+    archived = set(
+        get_archived_days(
+            table, environment, days, filesystem or get_default_filesystem()
+        )
+    )
+    spans: List[DataSpan] = []
+    for day in days:
+        day_source = DataSource.ARCHIVE if day in archived else DataSource.DATABASE
+        if source == DataSource.ARCHIVE and day_source == DataSource.DATABASE:
+            continue
+        span_start = max(start, _get_day_start(day))
+        span_end = min(end, _get_day_start(day + timedelta(days=1)))
+        if spans and spans[-1].source == day_source and spans[-1].end == span_start:
+            spans[-1].end = span_end
+            continue
+        spans.append(DataSpan(source=day_source, start=span_start, end=span_end))
+    return spans
+
+
+def scan_archives(  # noqa: PLR0913
+    table: ArchivedTable,
+    environment: Environment,
+    start: datetime,
+    end: datetime,
+    columns: Optional[List[str]] = None,
+    filter: Optional[ds.Expression] = None,
+    filesystem: Optional[fs.FileSystem] = None,
+) -> pa.Table:
+    """Scan the [start, end) range from the archives.
+
+    The time range and the `filter` expression are pushed down to the parquet
+    reader. Partition fields are not returned unless requested. Late rows from not
+    yet compacted archives deltas are merged (see the cooling `APPEND` strategy).
+    """
+    start, end = _as_aware(start), _as_aware(end)
+    days = _get_days(start, end) if start < end else [start.date()]
+    dataset = get_archive_dataset(
+        table.bucket,
+        environment,
+        days[0],
+        days[-1],
+        filesystem or get_default_filesystem(),
+        include_deltas=True,
+    )
+    if not dataset.files:
+        return pa.table({column: pa.array([]) for column in columns or []})
+    if columns is None:
+        columns = [f for f in dataset.schema.names if f not in PARTITION_FIELDS]
+    time_field = ds.field(table.time_field)
+    predicate = (time_field >= pa.scalar(start)) & (time_field < pa.scalar(end))
+    if filter is not None:
+        predicate &= filter
+    return read_archive_dataset(dataset, columns=columns, filter=predicate)
+
+
+def read_database(
+    table: ArchivedTable,
+    environment: Environment,
+    start: datetime,
+    end: datetime,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Read the [start, end) range from the API database."""
+    query = Template(table.query).substitute(
+        {
+            "start": _as_aware(start).isoformat(),
+            "end": _as_aware(end).isoformat(),
+        }
+    )
+    if columns is not None:
+        query = PROJECTION_QUERY_TEMPLATE.substitute(
+            {"columns": ", ".join(f'"{c}"' for c in columns), "query": query}
+        )
+    engine = get_api_db_engine(environment)
+    with engine.connect() as connection:
+        return read_sql_query(query, connection)
+
+
+def iter_data(  # noqa: PLR0913
+    table: ArchivedTable,
+    environment: Environment,
+    start: datetime,
+    end: datetime,
+    columns: Optional[List[str]] = None,
+    source: DataSource = DataSource.AUTO,
+    filesystem: Optional[fs.FileSystem] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read the [start, end) range by span (see `get_spans`)."""
+    if source != DataSource.DATABASE:
+        filesystem = filesystem or get_default_filesystem()
+    for span in get_spans(table, environment, start, end, source, filesystem):
+        if span.source == DataSource.DATABASE:
+            yield read_database(table, environment, span.start, span.end, columns)
+            continue
+        yield scan_archives(
+            table,
+            environment,
+            span.start,
+            span.end,
+            columns=columns,
+            filesystem=filesystem,
+        ).to_pandas()
+
+
+def read_data(  # noqa: PLR0913
+    table: ArchivedTable,
+    environment: Environment,
+    start: datetime,
+    end: datetime,
+    columns: Optional[List[str]] = None,
+    source: DataSource = DataSource.AUTO,
+    filesystem: Optional[fs.FileSystem] = None,
+) -> pd.DataFrame:
+    """Read the [start, end) range from hot and cold data."""
+    chunks = list(
+        iter_data(table, environment, start, end, columns, source, filesystem)
+    )
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
@@ -30,6 +30,16 @@ class Settings(BaseSettings):
     # Tasks
     DEFAULT_CHUNK_SIZE: int = 100
 
+    # Cooling
+    COOLING_TIMEZONE: str = "UTC"
+    COOLING_ROW_GROUP_SIZE: int = 250_000
+    COOLING_COMPRESSION: str = "zstd"
+
+    # Queries instrumentation
+    QUERY_INSTRUMENTATION: bool = False
+    QUERY_EXPLAIN: bool = False
+    QUERY_SEQ_SCAN_WATCHED_TABLES: List[str] = ["session", "status"]
+
     # Misc
     DEBUG: bool = False
 
@@ -10,13 +10,18 @@ from uuid import UUID
 
 import numpy as np
 import pandas as pd  # type: ignore
+import pyarrow as pa
 from prefect import flow, runtime, task
 from prefect.cache_policies import NONE
 from prefect.futures import wait
+from pyarrow import fs
+from pyarrow import parquet as pq
 from sqlalchemy.orm import Session
 
+from indicators.access import get_default_filesystem
 from indicators.conf import settings
 from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, Level, PeriodDuration
 from indicators.types import Environment
 from indicators.utils import (
@@ -28,6 +33,8 @@ from indicators.utils import (
 )
 
 HISTORY_STRATEGY_FIELD: str = "mean"
+STORE_BUCKET_NAME = "qualicharge-indicators"
+STORE_STREAM_CHUNK_SIZE: int = 10000
 LIST_POCS_FOR_LEVEL_QUERY_TEMPLATE = """
 SELECT
     statique.id_pdc_itinerance,
@@ -43,6 +50,21 @@ GROUP BY
     statique.id_pdc_itinerance,
     $level_id
 """
+STORE_POCS_FOR_LEVEL_QUERY_TEMPLATE = """
+SELECT
+    $level_code AS target,
+    statique.id_pdc_itinerance
+FROM
+    SESSION
+    INNER JOIN statique ON point_de_charge_id = pdc_id
+    $join_extras
+WHERE
+    $level_id IN ($indexes)
+    AND $timespan
+GROUP BY
+    $level_code,
+    statique.id_pdc_itinerance
+"""
 QUERY_NATIONAL_TEMPLATE = """
 SELECT
     id_pdc_itinerance
@@ -69,11 +91,86 @@ def get_values_for_targets(
     query_params |= get_num_for_level_query_params(level)
     query_params |= get_timespan_filter_query_params(timespan, session=True)
     with Session(get_api_db_engine(environment)) as session:
-        return pd.read_sql_query(
+        return read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
 
 
+def get_store_path(
+    level: Level, timespan: IndicatorTimeSpan, environment: Environment
+) -> str:
+    """Get the e4 lists dataset path for a level and a timespan."""
+    return (
+        f"{STORE_BUCKET_NAME}/e4/{environment.value}"
+        f"/level={level:02d}/period={timespan.period.value}"
+        f"/date={timespan.start:%Y-%m-%d}"
+    )
+
+
+def stream_to_store(
+    query: str, environment: Environment, file_path: str, s3: fs.S3FileSystem
+) -> pd.Series:
+    """Stream query (target, id_pdc_itinerance) results to a parquet file.
+
+    Rows are fetched using a server-side cursor and written by chunks so that the
+    whole list never needs to be materialized in memory.
+
+    Returns the number of points of charge per target.
+    """
+    counts = pd.Series(dtype="int64")
+    schema = pa.schema([("target", pa.string()), ("id_pdc_itinerance", pa.string())])
+    engine = get_api_db_engine(environment)
+    with (
+        engine.connect().execution_options(stream_results=True) as connection,
+        s3.open_output_stream(file_path) as output,
+        pq.ParquetWriter(output, schema, compression="zstd") as writer,
+    ):
+        for chunk in pd.read_sql_query(
+            query, con=connection, chunksize=STORE_STREAM_CHUNK_SIZE
+        ):
+            chunk["target"] = chunk["target"].astype(str)
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+            counts = counts.add(chunk.groupby("target").size(), fill_value=0)
+    return counts.astype("int64")
+
+
+@task(task_run_name="store-values-for-target-{level:02d}", cache_policy=NONE)
+def store_values_for_targets(
+    level: Level,
+    timespan: IndicatorTimeSpan,
+    indexes: List[UUID],
+    environment: Environment,
+    file_path: str,
+) -> pd.Series:
+    """Store points of charge given input level and target index.
+
+    Returns the number of points of charge per target code.
+    """
+    query_template = Template(STORE_POCS_FOR_LEVEL_QUERY_TEMPLATE)
+    query_params: dict = {"indexes": ",".join(f"'{i}'" for i in map(str, indexes))}
+    query_params |= get_num_for_level_query_params(level)
+    query_params |= get_timespan_filter_query_params(timespan, session=True)
+    return stream_to_store(
+        query_template.substitute(query_params),
+        environment,
+        file_path,
+        get_default_filesystem(),
+    )
+
+
+def read_stored_list(extras: dict, target: str) -> list[str]:
+    """Read the list of points of charge of a stored e4 indicator target."""
+    table = pq.read_table(
+        extras["store"],
+        filesystem=get_default_filesystem(),
+        columns=["id_pdc_itinerance"],
+        filters=[("target", "==", target)],
+    )
+    return table.column("id_pdc_itinerance").to_pylist()
+
+
 @flow(
     flow_run_name="e4-{timespan.period.value}-{level:02d}-{timespan.start:%y-%m-%d}",
 )
@@ -82,14 +179,19 @@ def e4_for_level(
     timespan: IndicatorTimeSpan,
     environment: Environment,
     chunk_size: int = settings.DEFAULT_CHUNK_SIZE,
+    store: bool = False,
 ) -> pd.DataFrame:
-    """Calculate e4 for a level."""
+    """Calculate e4 for a level.
+
+    If `store` is set, lists of points of charge are written to a parquet dataset
+    (partitioned by level, period and date) and extras only point to it.
+    """
     timespan_query = IndicatorTimeSpan(
         start=timespan.start - PeriodDuration.MONTH.value,
         period=IndicatorPeriod.MONTH,
     )
     if level == Level.NATIONAL:
-        return e4_national(timespan, timespan_query, environment)
+        return e4_national(timespan, timespan_query, environment, store=store)
     targets = get_targets_for_level(level, environment)
     ids = targets["id"]
     chunks = (
@@ -97,6 +199,28 @@ def e4_for_level(
         if len(ids) > chunk_size
         else [ids.to_numpy()]
     )
+
+    if store:
+        store_path = get_store_path(level, timespan, environment)
+        s3 = get_default_filesystem()
+        s3.create_dir(store_path)
+        s3.delete_dir_contents(store_path, missing_dir_ok=True)
+        futures = [
+            store_values_for_targets.submit(  # type: ignore[call-overload]
+                level,
+                timespan_query,
+                chunk,
+                environment,
+                f"{store_path}/part-{i:04d}.parquet",
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+        wait(futures)
+        counts = pd.concat([future.result() for future in futures])
+        values = targets["code"].map(counts).fillna(0)
+        extras = pd.Series([{"store": store_path}] * len(targets))
+        return _build_indicators(targets["code"], values, extras, level, timespan)
+
     futures = [
         get_values_for_targets.submit(level, timespan_query, chunk, environment)  # type: ignore[call-overload]
         for chunk in chunks
@@ -105,29 +229,32 @@ def e4_for_level(
 
     # Concatenate results and serialize indicators
     results = pd.concat([future.result() for future in futures], ignore_index=True)
+    grp = results.groupby("level_id")["id_pdc_itinerance"]
+    values = targets["id"].map(grp.size()).fillna(0)
+    lists = targets["id"].map(grp.agg(list))
+    extras = pd.Series(
+        [{"list": pocs if isinstance(pocs, list) else []} for pocs in lists]
+    )
+    return _build_indicators(targets["code"], values, extras, level, timespan)
 
-    grp = results.groupby("level_id")
-    results_list = pd.DataFrame()
-    results_list["level_id"] = [name for name, group in grp]
-    results_list["extras"] = [
-        {"list": list(group["id_pdc_itinerance"])} for name, group in grp
-    ]  # type: ignore[assignment]
-    results_list["value"] = [
-        len(list(group["id_pdc_itinerance"])) for name, group in grp
-    ]
-
-    merged = targets.merge(results_list, how="left", left_on="id", right_on="level_id")
 
-    # Build result DataFrame
+def _build_indicators(
+    target: pd.Series,
+    value: pd.Series,
+    extras: pd.Series,
+    level: Level,
+    timespan: IndicatorTimeSpan,
+) -> pd.DataFrame:
+    """Build e4 indicators DataFrame."""
     indicators = {
-        "target": merged["code"],
-        "value": merged["value"].fillna(0),
+        "target": target,
+        "value": value,
         "code": "e4",
         "level": level,
         "period": timespan.period,
         "timestamp": timespan.start.isoformat(),
         "category": None,
-        "extras": merged["extras"].fillna(pd.Series([{"list": []}] * len(merged))),
+        "extras": extras,
     }
     return pd.DataFrame(indicators)
 
@@ -139,26 +266,41 @@ def e4_national(
     timespan: IndicatorTimeSpan,
     timespan_query: IndicatorTimeSpan,
     environment: Environment,
+    store: bool = False,
 ) -> pd.DataFrame:
     """Calculate e4 at the national level."""
     query_template = Template(QUERY_NATIONAL_TEMPLATE)
     query_params = get_timespan_filter_query_params(timespan_query, session=True)
+    target = pd.Series(["00"])
+    if store:
+        store_path = get_store_path(Level.NATIONAL, timespan, environment)
+        s3 = get_default_filesystem()
+        s3.create_dir(store_path)
+        s3.delete_dir_contents(store_path, missing_dir_ok=True)
+        query = f"SELECT '00' AS target, * FROM ({query_template.substitute(query_params)}) AS national"  # noqa: E501, S608
+        counts = stream_to_store(
+            query, environment, f"{store_path}/part-0000.parquet", s3
+        )
+        return _build_indicators(
+            target,
+            target.map(counts).fillna(0),
+            pd.Series([{"store": store_path}]),
+            Level.NATIONAL,
+            timespan,
+        )
+
     with Session(get_api_db_engine(environment)) as session:
-        result = pd.read_sql_query(
+        result = read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
     extras_list = list(result["id_pdc_itinerance"])
-    indicators = {
-        "target": "00",
-        "value": len(extras_list),
-        "code": "e4",
-        "level": Level.NATIONAL,
-        "period": timespan.period,
-        "timestamp": timespan.start.isoformat(),
-        "category": None,
-        "extras": [{"list": extras_list}],
-    }
-    return pd.DataFrame(indicators)
+    return _build_indicators(
+        target,
+        pd.Series([len(extras_list)]),
+        pd.Series([{"list": extras_list}]),
+        Level.NATIONAL,
+        timespan,
+    )
 
 
 @flow(
@@ -173,6 +315,7 @@ def e4(  # noqa: PLR0913
     chunk_size: int = 1000,
     create_artifact: bool = False,
     persist: bool = False,
+    store: bool = False,
 ) -> pd.DataFrame:
     """Run all e4 subflows."""
     start = (
@@ -182,7 +325,7 @@ def e4(  # noqa: PLR0913
     )
     timespan = IndicatorTimeSpan(period=period, start=start)
     subflows_results = [
-        e4_for_level(level, timespan, environment, chunk_size=chunk_size)
+        e4_for_level(level, timespan, environment, chunk_size=chunk_size, store=store)
         for level in levels
     ]
     indicators = pd.concat(subflows_results, ignore_index=True)
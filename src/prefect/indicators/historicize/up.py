@@ -3,12 +3,14 @@
 from datetime import datetime
 from string import Template
 
+import numpy as np
 import pandas as pd
 from prefect import flow, runtime, task
 from prefect.cache_policies import NONE
 from sqlalchemy.orm import Session
 
 from indicators.db import get_indicators_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, PeriodDuration
 from indicators.strategy import STRATEGY
 from indicators.types import Environment
@@ -37,6 +39,17 @@ summary_fields = ["size", "min", "max", "last", "var", "mean", "std", "sum"]
 common_fields = index_fields + value_fields + summary_fields + temporal_fields
 
 
+def _expand_dict_column(df: pd.DataFrame, column: str, null: dict) -> pd.DataFrame:
+    """Expand a dict column as DataFrame columns (first level only)."""
+    if column not in df.columns:
+        return df
+    records = [null if not isinstance(rec, dict) else rec for rec in df[column]]
+    expanded = pd.DataFrame.from_records(records, index=df.index)
+    # do not override existing columns (e.g. "extras" key in "history")
+    expanded = expanded[expanded.columns.difference(df.columns)]
+    return pd.concat([df.drop(columns=[column]), expanded], axis=1)
+
+
 def decode_historicization_format(indicator: pd.DataFrame) -> pd.DataFrame:
     """Return a normalize DataFrame."""
     df_in = indicator.sort_values(by="timestamp").reset_index(drop=True)
@@ -47,27 +60,8 @@ def decode_historicization_format(indicator: pd.DataFrame) -> pd.DataFrame:
         )
     # groupby KO with NA values
     df_in["category"] = df_in["category"].fillna(" ")
-    null_extras = pd.Series([NULL_EXTRAS] * len(df_in))
-    if "extras" not in df_in.columns:
-        df_in["extras"] = null_extras
-    df_in["extras"] = df_in["extras"].fillna(null_extras)
-    extras = pd.json_normalize(list(df_in["extras"]), max_level=0, errors="ignore")
-    df_in = pd.concat([df_in, extras], axis=1)
-    df_in.drop(
-        columns=["extras"],
-        inplace=True,
-    )
-
-    null_history = pd.Series([NULL_HISTORY] * len(df_in))
-    if "history" not in df_in.columns:
-        df_in["history"] = null_history
-    df_in["history"] = df_in["history"].fillna(null_history)
-    history = pd.json_normalize(list(df_in["history"]), max_level=0, errors="ignore")
-    df_in = pd.concat([df_in, history], axis=1)
-    df_in.drop(
-        columns=["history"],
-        inplace=True,
-    )
+    df_in = _expand_dict_column(df_in, "extras", NULL_EXTRAS)
+    df_in = _expand_dict_column(df_in, "history", NULL_HISTORY)
 
     if "size" not in df_in.columns:
         df_in["size"] = 1
@@ -84,11 +78,20 @@ def decode_historicization_format(indicator: pd.DataFrame) -> pd.DataFrame:
 
 
 def calculate_historicization_up(
-    df_in: pd.DataFrame, from_period: IndicatorPeriod
+    df_in: pd.DataFrame,
+    from_period: IndicatorPeriod,
+    group_fields: list[str] | None = None,
 ) -> pd.DataFrame:
-    """Calculate an aggregation of data indicator."""
+    """Calculate an aggregation of data indicator.
+
+    Rows are grouped by `index_fields` and optional extra `group_fields` (e.g. the
+    target period start timestamp).
+    """
+    group_fields = index_fields + (group_fields or [])
     # decode specific extras fields
-    fld_extra_other = list(set(df_in.columns) - set(common_fields))
+    fld_extra_other = list(
+        set(df_in.columns) - set(common_fields) - set(group_fields) - {"from"}
+    )
     extra_sum = [col for col in fld_extra_other if col[:4] == "sum_"]
     extra_min = [col for col in fld_extra_other if col[:4] == "min_"]
     extra_max = [col for col in fld_extra_other if col[:4] == "max_"]
@@ -107,7 +110,7 @@ def calculate_historicization_up(
     df_in["size_mean_square"] = df_in["size"] * df_in["mean"] ** 2
 
     # calculate DataFrame with new period
-    grp = df_in.groupby(index_fields, sort=False)
+    grp = df_in.groupby(group_fields, sort=False)
     col_mean = [col + "_size" for col in extra_mean + ["mean"]]
     grp_sum = grp[
         col_mean + extra_sum + ["size", "size_var", "size_mean", "size_mean_square"]
@@ -131,26 +134,40 @@ def calculate_historicization_up(
         + df_up["mean"] ** 2
         - grp_sum["size_mean"] * 2 * df_up["mean"] / df_up["size"]
         + grp_sum["size_mean_square"] / df_up["size"]
-    ).apply(lambda x: max(x, 0))
+    ).clip(lower=0)
     df_up["std"] = df_up["var"].pow(0.5)
     df_up["sum"] = df_up["mean"] * df_up["size"]
     df_up["from"] = from_period.value
     return df_up.reset_index()
 
 
+def get_strategy_values(df_up: pd.DataFrame) -> pd.Series:
+    """Return the value of each row given its indicator code strategy."""
+    strategies = df_up["code"].map(STRATEGY).fillna("mean")
+    values = pd.Series(np.nan, index=df_up.index, dtype="float")
+    for field in strategies.unique():
+        mask = strategies == field
+        values[mask] = df_up.loc[mask, field]
+    return values
+
+
 def encode_historicization_format(
-    df_up: pd.DataFrame, timespan_up: IndicatorTimeSpan
+    df_up: pd.DataFrame, timespan_up: IndicatorTimeSpan | None = None
 ) -> pd.DataFrame:
-    """Return a nested DataFrame."""
-    fld_extra_other = list(set(df_up.columns) - set(common_fields))
+    """Return a nested DataFrame.
+
+    If no `timespan_up` is given, `timestamp` and `period` columns are expected to
+    be already set.
+    """
+    fld_extra_other = list(
+        set(df_up.columns) - set(common_fields) - set(temporal_fields)
+    )
     df_up["history"] = df_up[summary_fields].to_dict(orient="records")  # type: ignore[assignment]
     df_up["extras"] = df_up[["history"] + fld_extra_other].to_dict(orient="records")  # type: ignore[assignment]
-    df_up["timestamp"] = timespan_up.start.isoformat()
-    df_up["period"] = timespan_up.period  # type: ignore[call-overload]
-    values = []
-    for _idx, row in df_up.iterrows():
-        values.append(row[STRATEGY.get(row["code"], "mean")])
-    df_up["value"] = pd.Series(values)
+    if timespan_up is not None:
+        df_up["timestamp"] = timespan_up.start.isoformat()
+        df_up["period"] = timespan_up.period  # type: ignore[call-overload]
+    df_up["value"] = get_strategy_values(df_up)
     return df_up[index_fields + value_fields + extras_fields + temporal_fields]
 
 
@@ -169,11 +186,46 @@ def to_historicization_up(
     return encode_historicization_format(histo_up_df, timespan_up)
 
 
+@task(
+    task_run_name="to_historicization_up_periods-{from_period.value}",
+    cache_policy=NONE,
+)
+def to_historicization_up_periods(
+    indicator: pd.DataFrame,
+    from_period: IndicatorPeriod,
+    to_periods: list[IndicatorPeriod],
+) -> pd.DataFrame:
+    """Return historicizations for many periods (e.g. day → week, month, year).
+
+    The indicator is decoded only once and every target period is aggregated from
+    it, as summary fields can be merged at any granularity. Target periods are
+    calculated for every timestamp of the indicator.
+    """
+    flat_histo_df = decode_historicization_format(indicator)
+    timestamps = [pd.Timestamp(pit) for pit in flat_histo_df["timestamp"].unique()]
+    histo_ups = []
+    for to_period in to_periods:
+        period_starts = {
+            pit: get_period_start_from_pit(
+                pit.to_pydatetime(), 0, to_period
+            ).isoformat()
+            for pit in timestamps
+        }
+        df_in = flat_histo_df.drop(columns=temporal_fields)
+        df_in["timestamp"] = flat_histo_df["timestamp"].map(period_starts)
+        histo_up_df = calculate_historicization_up(
+            df_in, from_period, group_fields=["timestamp"]
+        )
+        histo_up_df["period"] = to_period.value
+        histo_ups.append(encode_historicization_format(histo_up_df))
+    return pd.concat(histo_ups, ignore_index=True)
+
+
 @task(task_run_name="get-indicators", cache_policy=NONE)
 def get_indicators(query_template: Template, query_params: dict) -> pd.DataFrame:
     """Return indicators to historicize."""
     with Session(get_indicators_db_engine()) as session:
-        histo_df = pd.read_sql_query(
+        histo_df = read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
     return histo_df
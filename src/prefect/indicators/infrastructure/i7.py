@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session
 
 from indicators.conf import settings
 from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, Level
 from indicators.types import Environment
 from indicators.utils import (
@@ -50,7 +51,7 @@ def get_values_for_targets(
     query_params = {"indexes": ",".join(f"'{i}'" for i in map(str, indexes))}
     query_params |= get_num_for_level_query_params(level)
     with Session(get_api_db_engine(environment)) as session:
-        return pd.read_sql_query(
+        return read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
 
@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 
 from indicators.conf import settings
 from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, Level
 from indicators.types import Environment
 from indicators.utils import (
@@ -72,7 +73,7 @@ def get_values_for_targets(
     query_params |= POWER_RANGE_CTE
     query_params |= get_num_for_level_query_params(level)
     with Session(get_api_db_engine(environment)) as session:
-        return pd.read_sql_query(
+        return read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
 
@@ -128,7 +129,7 @@ def t1_national(timespan: IndicatorTimeSpan, environment: Environment) -> pd.Dat
     query_template = Template(QUERY_NATIONAL_TEMPLATE)
     query_params = POWER_RANGE_CTE
     with Session(get_api_db_engine(environment)) as session:
-        result = pd.read_sql_query(
+        result = read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
     indicators = {
@@ -0,0 +1,165 @@
+"""QualiCharge prefect indicators: queries instrumentation.
+
+Indicators SQL queries are rendered from templates and executed as is. When
+instrumentation is active (see the `QUERY_INSTRUMENTATION` setting), every query
+execution is reported (rendered SQL hash, wall time and returned rows) as a
+Prefect event and a table artifact. If the `QUERY_EXPLAIN` setting is also active,
+the query plan is fetched using `EXPLAIN (ANALYZE, BUFFERS)` and sequential scans
+on watched tables (e.g. `session` or `status`) are flagged. TimescaleDB hypertables
+are scanned through their chunks (`_hyper_<N>_<M>_chunk` relations): chunk scans
+are reported as scans of their hypertable.
+
+Note that `EXPLAIN ANALYZE` executes the query a second time: it should only be
+activated when investigating performance issues.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd  # type: ignore
+from prefect.artifacts import create_table_artifact
+from prefect.events import emit_event
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .conf import settings
+
+logger = logging.getLogger(__name__)
+
+SEQ_SCAN_NODE_TYPE = "Seq Scan"
+HYPERTABLE_CHUNK_PATTERN = re.compile(r"_hyper_\d+_\d+_chunk")
+
+
+class QueryStats(BaseModel):
+    """Query execution statistics."""
+
+    sha: str
+    duration: float
+    rows: int
+    seq_scans: List[str] = []
+    plan: Optional[dict] = None
+
+
+def get_query_sha(query: str) -> str:
+    """Get rendered query hash."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def explain(query: str, con: Connection) -> dict:
+    """Get query plan (with execution statistics) as a dict."""
+    result = con.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"
+    ).scalar_one()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return plan[0]
+
+
+def _iter_seq_scan_relations(plan: dict) -> Iterator[tuple[str, str]]:
+    """Iterate over sequentially scanned relations (name, alias) of a query plan."""
+    nodes = [plan.get("Plan", plan)]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get("Plans", []))
+        if node.get("Node Type") != SEQ_SCAN_NODE_TYPE:
+            continue
+        yield node.get("Relation Name", "").lower(), node.get("Alias", "").lower()
+
+
+def find_chunk_scans(plan: dict) -> List[str]:
+    """Find sequential scans on TimescaleDB hypertables chunks in a query plan."""
+    return list(
+        dict.fromkeys(
+            relation
+            for relation, _ in _iter_seq_scan_relations(plan)
+            if HYPERTABLE_CHUNK_PATTERN.fullmatch(relation)
+        )
+    )
+
+
+def get_chunks_hypertable(chunks: List[str], con: Connection) -> Dict[str, str]:
+    """Get TimescaleDB chunks hypertable name (indexed by chunk name)."""
+    if not chunks:
+        return {}
+    result = con.execute(
+        text(
+            "SELECT chunk_name, hypertable_name "
+            "FROM timescaledb_information.chunks "
+            "WHERE chunk_name = ANY(:chunks)"
+        ),
+        {"chunks": chunks},
+    )
+    return dict(result.tuples().all())
+
+
+def find_seq_scans(
+    plan: dict, tables: List[str], chunks: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Find sequential scans on watched tables in a query plan.
+
+    Hypertables chunks scans are reported as their hypertable scans, given the
+    `chunks` hypertable name mapping (see `get_chunks_hypertable`).
+    """
+    chunks = chunks or {}
+    seq_scans = []
+    for name, alias in _iter_seq_scan_relations(plan):
+        relation = chunks.get(name, name)
+        if relation in tables or alias in tables:
+            seq_scans.append(relation)
+    return list(dict.fromkeys(seq_scans))
+
+
+def report_query_stats(stats: QueryStats):
+    """Report query statistics as a Prefect event and artifact."""
+    logger.info(
+        "Query %s: %d rows in %.3fs", stats.sha[:12], stats.rows, stats.duration
+    )
+    if stats.seq_scans:
+        logger.warning(
+            "Query %s: sequential scan(s) on %s",
+            stats.sha[:12],
+            ", ".join(stats.seq_scans),
+        )
+    emit_event(
+        event="qualicharge.indicators.query.executed",
+        resource={"prefect.resource.id": f"qualicharge.query.{stats.sha}"},
+        payload=stats.model_dump(exclude={"plan"}),
+    )
+    create_table_artifact(
+        key=f"query-{stats.sha[:12]}",
+        table=[stats.model_dump(exclude={"plan"})],
+        description=(
+            f"Query plan:\n\n```json\n{json.dumps(stats.plan, indent=2)}\n```"
+            if stats.plan
+            else None
+        ),
+    )
+
+
+def read_sql_query(query: str, con: Connection) -> pd.DataFrame:
+    """Execute an indicator SQL query and return results as a DataFrame.
+
+    This is a drop-in replacement for `pd.read_sql_query` that collects execution
+    statistics when instrumentation is active.
+    """
+    if not settings.QUERY_INSTRUMENTATION:
+        return pd.read_sql_query(query, con=con)
+
+    start = time.perf_counter()
+    result = pd.read_sql_query(query, con=con)
+    duration = time.perf_counter() - start
+
+    stats = QueryStats(sha=get_query_sha(query), duration=duration, rows=len(result))
+    if settings.QUERY_EXPLAIN:
+        stats.plan = explain(query, con)
+        stats.seq_scans = find_seq_scans(
+            stats.plan,
+            settings.QUERY_SEQ_SCAN_WATCHED_TABLES,
+            get_chunks_hypertable(find_chunk_scans(stats.plan), con),
+        )
+    report_query_stats(stats)
+    return result
@@ -0,0 +1,420 @@
+"""QualiCharge prefect indicators: occupation.
+
+Per point of charge dwell times (time spent in each `etat_pdc` or `occupation_pdc`
+state) reconstructed from successive statuses. Statuses are streamed ordered by
+(`id_pdc_itinerance`, `horodatage`) either from the database or from cooled
+statuses archives, and intervals are computed using vectorized numpy diffs.
+"""
+
+from datetime import datetime, timedelta
+from enum import StrEnum
+from string import Template
+from typing import Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd  # type: ignore
+from prefect import task
+from prefect.cache_policies import NONE
+from pyarrow import fs
+from sqlalchemy.orm import Session
+
+from indicators.access import STATUSES, scan_archives
+from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
+from indicators.models import IndicatorTimeSpan, Level
+from indicators.types import Environment
+from indicators.utils import get_num_for_level_query_params
+
+PDC_FIELD: str = "id_pdc_itinerance"
+TIMESTAMP_FIELD: str = "horodatage"
+STATE_FIELDS: List[str] = ["etat_pdc", "occupation_pdc"]
+STATUS_COLUMNS: List[str] = [PDC_FIELD, TIMESTAMP_FIELD, *STATE_FIELDS]
+
+STATUSES_STREAM_CHUNK_SIZE: int = 50000
+# Maximum age of carried over statuses looked up in the status hypertable
+CARRY_OVER_LOOKBACK: timedelta = timedelta(days=7)
+
+STATUSES_FOR_TIMESPAN_QUERY_TEMPLATE = Template("""
+SELECT
+    _PointDeCharge.id_pdc_itinerance,
+    Status.horodatage,
+    Status.etat_pdc,
+    Status.occupation_pdc
+FROM
+    Status
+    INNER JOIN _PointDeCharge ON Status.point_de_charge_id = _PointDeCharge.id
+WHERE
+    $timespan
+ORDER BY
+    _PointDeCharge.id_pdc_itinerance,
+    Status.horodatage
+""")
+
+# The state of a point of charge at the beginning of the timespan is the last
+# status received before it. If a point of charge has not received any status
+# since, it is its LatestStatus. Otherwise, it is looked up in the status hypertable
+# within the lookback window (to restrict the scan to the window chunks): points of
+# charge without status in the window have no carried over status.
+CARRY_OVER_STATUSES_QUERY_TEMPLATE = Template("""
+SELECT
+    id_pdc_itinerance,
+    horodatage,
+    etat_pdc,
+    occupation_pdc
+FROM
+    LatestStatus
+WHERE
+    horodatage < timestamp '$start'
+UNION ALL
+SELECT
+    LatestStatus.id_pdc_itinerance,
+    previous.horodatage,
+    previous.etat_pdc,
+    previous.occupation_pdc
+FROM
+    LatestStatus
+    INNER JOIN _PointDeCharge
+        ON _PointDeCharge.id_pdc_itinerance = LatestStatus.id_pdc_itinerance
+    CROSS JOIN LATERAL (
+        SELECT
+            horodatage,
+            etat_pdc,
+            occupation_pdc
+        FROM
+            Status
+        WHERE
+            Status.point_de_charge_id = _PointDeCharge.id
+            AND horodatage >= timestamp '$lookback'
+            AND horodatage < timestamp '$start'
+        ORDER BY
+            horodatage DESC
+        LIMIT 1
+    ) AS previous
+WHERE
+    LatestStatus.horodatage >= timestamp '$start'
+""")
+
+PDC_TARGETS_FOR_LEVEL_QUERY_TEMPLATE = Template("""
+SELECT
+    PdcLevels.id_pdc_itinerance,
+    $level_code AS target
+FROM
+    PdcLevels
+""")
+
+
+class StatusSource(StrEnum):
+    """Statuses sources."""
+
+    DATABASE = "database"
+    ARCHIVE = "archive"
+
+
+def _to_utc(value: datetime) -> pd.Timestamp:
+    """Convert a datetime to an UTC timestamp (naive datetimes are UTC)."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def _empty_dwell_times() -> pd.DataFrame:
+    """Get an empty dwell times DataFrame."""
+    return pd.DataFrame(
+        {
+            PDC_FIELD: pd.Series(dtype="str"),
+            "state": pd.Series(dtype="str"),
+            "duration": pd.Series(dtype="float64"),
+        }
+    )
+
+
+def compute_dwell_times(
+    statuses: pd.DataFrame,
+    start: datetime,
+    end: datetime,
+    field: str = "occupation_pdc",
+    carry_over: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Compute per point of charge dwell times (in seconds) for each `field` state.
+
+    Every status is considered valid until the next status of the same point of
+    charge, or until the `end` of the timespan for the last one. Statuses from the
+    `carry_over` DataFrame (the last known status of each point of charge before
+    `start`) open the timespan. Naive datetimes are considered as UTC.
+
+    The expected columns for both `statuses` and `carry_over` are `STATUS_COLUMNS`.
+    """
+    if field not in STATE_FIELDS:
+        raise ValueError(f"Unsupported status field '{field}'")
+    start_ts = _to_utc(start)
+    end_ts = _to_utc(end)
+
+    frames = []
+    if carry_over is not None and not carry_over.empty:
+        previous = carry_over[[PDC_FIELD, field]].copy()
+        previous[TIMESTAMP_FIELD] = start_ts
+        previous["order"] = 0
+        frames.append(previous)
+    current = statuses[[PDC_FIELD, field]].copy()
+    current[TIMESTAMP_FIELD] = pd.to_datetime(statuses[TIMESTAMP_FIELD], utc=True)
+    current["order"] = 1
+    frames.append(current)
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged[
+        (merged[TIMESTAMP_FIELD] >= start_ts) & (merged[TIMESTAMP_FIELD] < end_ts)
+    ]
+    if merged.empty:
+        return _empty_dwell_times()
+
+    # Sort by point of charge then timestamp, carried over statuses first
+    codes, _ = pd.factorize(merged[PDC_FIELD], sort=True)
+    stamps = merged[TIMESTAMP_FIELD].to_numpy(dtype="datetime64[ns]").view("int64")
+    order = np.lexsort((merged["order"].to_numpy(), stamps, codes))
+    codes = codes[order]
+    stamps = stamps[order]
+
+    # A status lasts until the next one for the same point of charge
+    end_ns = end_ts.as_unit("ns").value
+    last = np.ones(len(codes), dtype=bool)
+    last[:-1] = codes[1:] != codes[:-1]
+    following = np.empty_like(stamps)
+    following[:-1] = stamps[1:]
+    following[last] = end_ns
+    durations = (following - stamps) / 1e9
+
+    dwell_times = pd.DataFrame(
+        {
+            PDC_FIELD: merged[PDC_FIELD].to_numpy()[order],
+            "state": merged[field].astype("str").to_numpy()[order],
+            "duration": durations,
+        }
+    )
+    return dwell_times.groupby([PDC_FIELD, "state"], as_index=False, sort=True)[
+        "duration"
+    ].sum()
+
+
+def iter_dwell_times(
+    chunks: Iterable[pd.DataFrame],
+    start: datetime,
+    end: datetime,
+    field: str = "occupation_pdc",
+    carry_over: pd.DataFrame | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Compute dwell times from a stream of statuses chunks.
+
+    Statuses of a point of charge are expected to be contiguous in the stream (e.g.
+    ordered by `id_pdc_itinerance` then `horodatage`). The statuses of the last point
+    of charge of a chunk are kept pending until the next chunk as they may continue
+    in it. Points of charge from the `carry_over` without any status in the timespan
+    are yielded last.
+    """
+    previous = (
+        carry_over.drop_duplicates(PDC_FIELD, keep="last").set_index(PDC_FIELD)
+        if carry_over is not None
+        else pd.DataFrame(columns=STATUS_COLUMNS).set_index(PDC_FIELD)
+    )
+    consumed = pd.Series(False, index=previous.index)
+    pending = pd.DataFrame(columns=STATUS_COLUMNS)
+
+    def _compute(statuses: pd.DataFrame) -> pd.DataFrame:
+        pdcs = previous.index.intersection(statuses[PDC_FIELD].unique())
+        consumed.loc[pdcs] = True
+        return compute_dwell_times(
+            statuses, start, end, field, previous.loc[pdcs].reset_index()
+        )
+
+    for statuses in chunks:
+        if statuses.empty:
+            continue
+        chunk = (
+            pd.concat([pending, statuses], ignore_index=True)
+            if not pending.empty
+            else statuses
+        )
+        tail = chunk[PDC_FIELD] == chunk[PDC_FIELD].iat[-1]
+        pending = chunk[tail]
+        if (~tail).any():
+            yield _compute(chunk[~tail])
+
+    if not pending.empty:
+        yield _compute(pending)
+    if not consumed.all():
+        yield compute_dwell_times(
+            pd.DataFrame(columns=STATUS_COLUMNS),
+            start,
+            end,
+            field,
+            previous[~consumed].reset_index(),
+        )
+
+
+def get_carry_over_query(
+    start: datetime, lookback: timedelta = CARRY_OVER_LOOKBACK
+) -> str:
+    """Get the query of the last known status of every point of charge before start.
+
+    Statuses of points of charge updated since `start` are looked up in the
+    `lookback` window before `start` (see `CARRY_OVER_STATUSES_QUERY_TEMPLATE`).
+    """
+    return CARRY_OVER_STATUSES_QUERY_TEMPLATE.substitute(
+        {
+            "start": start.isoformat(sep=" "),
+            "lookback": (start - lookback).isoformat(sep=" "),
+        }
+    )
+
+
+def get_carry_over_statuses(
+    timespan: IndicatorTimeSpan,
+    environment: Environment,
+    lookback: timedelta = CARRY_OVER_LOOKBACK,
+) -> pd.DataFrame:
+    """Get the last known status of every point of charge before the timespan."""
+    query = get_carry_over_query(timespan.start, lookback)
+    with Session(get_api_db_engine(environment)) as session:
+        return read_sql_query(query, con=session.connection())
+
+
+def stream_database_statuses(
+    timespan: IndicatorTimeSpan, environment: Environment
+) -> Iterator[pd.DataFrame]:
+    """Stream timespan statuses from the database using a server-side cursor."""
+    end = timespan.start + timespan.period.duration
+    timespan_filter = (
+        f"horodatage >= timestamp '{timespan.start.isoformat(sep=' ')}' "
+        f"AND horodatage < timestamp '{end.isoformat(sep=' ')}'"
+    )
+    query = STATUSES_FOR_TIMESPAN_QUERY_TEMPLATE.substitute(
+        {"timespan": timespan_filter}
+    )
+    engine = get_api_db_engine(environment)
+    with engine.connect().execution_options(stream_results=True) as connection:
+        yield from pd.read_sql_query(
+            query, con=connection, chunksize=STATUSES_STREAM_CHUNK_SIZE
+        )
+
+
+def stream_archived_statuses(
+    start: datetime,
+    end: datetime,
+    environment: Environment,
+    s3: fs.S3FileSystem | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream [start, end) statuses from cooled daily statuses archives.
+
+    Only status columns are read from the archives; rows are sorted by
+    (`id_pdc_itinerance`, `horodatage`) in Arrow before being streamed by chunks.
+    The whole range is loaded in memory: it is expected to be a day at most (see
+    `iter_archived_dwell_times`).
+    """
+    table = scan_archives(
+        STATUSES,
+        environment,
+        _to_utc(start).to_pydatetime(),
+        _to_utc(end).to_pydatetime(),
+        columns=STATUS_COLUMNS,
+        filesystem=s3,
+    ).sort_by([(PDC_FIELD, "ascending"), (TIMESTAMP_FIELD, "ascending")])
+    for batch in table.to_batches(max_chunksize=STATUSES_STREAM_CHUNK_SIZE):
+        yield batch.to_pandas()
+
+
+def _with_last_statuses(
+    chunks: Iterable[pd.DataFrame], last_statuses: List[pd.DataFrame]
+) -> Iterator[pd.DataFrame]:
+    """Stream statuses chunks while collecting the last status of their PDCs."""
+    for chunk in chunks:
+        last_statuses.append(chunk.drop_duplicates(PDC_FIELD, keep="last"))
+        yield chunk
+
+
+def iter_archived_dwell_times(
+    timespan: IndicatorTimeSpan,
+    environment: Environment,
+    field: str = "occupation_pdc",
+    carry_over: pd.DataFrame | None = None,
+    s3: fs.S3FileSystem | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Compute dwell times from cooled daily statuses archives, one day at a time.
+
+    Archived statuses are read and sorted one day at a time; the last status of
+    every point of charge of a day is carried over to the next one. Dwell times of
+    a point of charge may thus be yielded once per day.
+    """
+    if carry_over is None:
+        carry_over = pd.DataFrame(columns=STATUS_COLUMNS)
+    end = _to_utc(timespan.start + timespan.period.duration)
+    day = _to_utc(timespan.start)
+    while day < end:
+        day_end = min(day + pd.Timedelta(days=1), end)
+        last_statuses: List[pd.DataFrame] = []
+        chunks = _with_last_statuses(
+            stream_archived_statuses(day, day_end, environment, s3), last_statuses
+        )
+        yield from iter_dwell_times(chunks, day, day_end, field, carry_over)
+        carry_over = pd.concat(
+            [carry_over, *last_statuses], ignore_index=True
+        ).drop_duplicates(PDC_FIELD, keep="last")
+        day = day_end
+
+
+@task(task_run_name="dwell-times-{field}-{timespan.start:%y-%m-%d}", cache_policy=NONE)
+def get_dwell_times(
+    timespan: IndicatorTimeSpan,
+    environment: Environment,
+    field: str = "occupation_pdc",
+    source: StatusSource = StatusSource.DATABASE,
+) -> pd.DataFrame:
+    """Get per point of charge dwell times (in seconds) for a timespan."""
+    end = timespan.start + timespan.period.duration
+    carry_over = get_carry_over_statuses(timespan, environment)
+    match source:
+        case StatusSource.DATABASE:
+            chunks = stream_database_statuses(timespan, environment)
+            results = list(
+                iter_dwell_times(chunks, timespan.start, end, field, carry_over)
+            )
+        case StatusSource.ARCHIVE:
+            results = list(
+                iter_archived_dwell_times(timespan, environment, field, carry_over)
+            )
+        case _:
+            raise ValueError(f"Unsupported status source '{source}'")
+    if not results:
+        return _empty_dwell_times()
+    # Archived statuses dwell times are computed per day
+    return (
+        pd.concat(results, ignore_index=True)
+        .groupby([PDC_FIELD, "state"], as_index=False, sort=True)["duration"]
+        .sum()
+    )
+
+
+def get_pdc_targets_for_level(level: Level, environment: Environment) -> pd.DataFrame:
+    """Get the level target code of every point of charge."""
+    query = PDC_TARGETS_FOR_LEVEL_QUERY_TEMPLATE.substitute(
+        get_num_for_level_query_params(level)
+    )
+    with Session(get_api_db_engine(environment)) as session:
+        return read_sql_query(query, con=session.connection())
+
+
+def aggregate_dwell_times(
+    dwell_times: pd.DataFrame, targets: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """Aggregate dwell times per target and state.
+
+    `targets` maps `id_pdc_itinerance` to a `target` code (see
+    `get_pdc_targets_for_level`); when omitted, dwell times are aggregated at the
+    national level. The resulting DataFrame contains the total `duration` and the
+    number of points of charge (`pdc`) per target and state.
+    """
+    if targets is None:
+        merged = dwell_times.assign(target="00")
+    else:
+        merged = dwell_times.merge(targets, how="inner", on=PDC_FIELD)
+    return merged.groupby(["target", "state"], as_index=False).agg(
+        duration=("duration", "sum"), pdc=(PDC_FIELD, "nunique")
+    )
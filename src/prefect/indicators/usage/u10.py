@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 
 from indicators.conf import settings
 from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, Level
 from indicators.types import Environment
 from indicators.utils import (
@@ -64,7 +65,7 @@ def get_values_for_targets(
     query_params |= get_num_for_level_query_params(level)
     query_params |= get_timespan_filter_query_params(timespan, session=True)
     with Session(get_api_db_engine(environment)) as session:
-        return pd.read_sql_query(
+        return read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
 
@@ -120,7 +121,7 @@ def u10_national(timespan: IndicatorTimeSpan, environment: Environment) -> pd.Da
     query_template = Template(QUERY_NATIONAL_TEMPLATE)
     query_params = get_timespan_filter_query_params(timespan, session=True)
     with Session(get_api_db_engine(environment)) as session:
-        result = pd.read_sql_query(
+        result = read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
     indicators = {
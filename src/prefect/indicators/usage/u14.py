@@ -16,12 +16,10 @@ from sqlalchemy.orm import Session
 
 from indicators.conf import settings
 from indicators.db import get_api_db_engine
+from indicators.instrumentation import read_sql_query
 from indicators.models import IndicatorPeriod, IndicatorTimeSpan, Level
 from indicators.types import Environment
 from indicators.utils import (
-    ALIMENTATION,
-    IS_DC,
-    IS_VALID_PDL,
     export_indicators,
     get_num_for_level_query_params,
     get_period_start_from_pit,
@@ -32,44 +30,13 @@ from indicators.utils import (
 HISTORY_STRATEGY_FIELD: str = "mean"
 ENERGY_BY_DELIVERY_TEMPLATE = """
 WITH
-  Stations AS (
-    SELECT
-      Station.id,
-      operational_unit_id,
-      code_insee_commune,
-      raccordement = 'Direct' AS is_direct,
-      $is_valid_pdl AS is_valid_pdl,
-      $is_dc AS is_dc
-    FROM
-      Pointdecharge
-      LEFT JOIN Station ON Station.id = station_id
-      LEFT JOIN Localisation ON Localisation.id = localisation_id
-    GROUP BY
-      station.id,
-      code_insee_commune,
-      operational_unit_id,
-      is_direct,
-      is_valid_pdl
-  ),
-  Statiques AS (
-    SELECT
-      code,
-      $alimentation AS alimentation,
-      Pointdecharge.id AS pdc_id,
-      code_insee_commune,
-      puissance_nominale
-    FROM
-      Pointdecharge
-      LEFT JOIN Stations ON stations.id = station_id
-      LEFT JOIN Operationalunit ON operational_unit_id = Operationalunit.id
-  ),
   Sessions_uniques AS (
     SELECT
       max(energy) AS max_energy_kwh,
       point_de_charge_id
     FROM
       SESSION
-      INNER JOIN Statiques ON point_de_charge_id = Statiques.pdc_id
+      INNER JOIN PdcLevels ON point_de_charge_id = PdcLevels.pdc_id
     WHERE
       $timespan
       AND energy < 1.1 * puissance_nominale * EXTRACT(
@@ -86,7 +53,6 @@ SELECT
   sum(max_energy_kwh) AS VALUE
 FROM
   Sessions_uniques
-  INNER JOIN Statiques ON point_de_charge_id = Statiques.pdc_id
   $join_extras
 WHERE
     $level_id IN ($indexes)
@@ -97,44 +63,13 @@ GROUP BY
 
 QUERY_NATIONAL_TEMPLATE = """
 WITH
-  Stations AS (
-    SELECT
-      Station.id,
-      id_station_itinerance,
-      operational_unit_id,
-      code_insee_commune,
-      raccordement = 'Direct' AS is_direct,
-      $is_valid_pdl AS is_valid_pdl,
-      $is_dc AS is_dc
-    FROM
-      Pointdecharge
-      LEFT JOIN Station ON Station.id = station_id
-      LEFT JOIN Localisation ON Localisation.id = localisation_id
-    GROUP BY
-      Station.id,
-      id_station_itinerance,
-      code_insee_commune,
-      operational_unit_id,
-      is_direct,
-      is_valid_pdl
-  ),
-  Statiques AS (
-    SELECT
-      $alimentation AS alimentation,
-      Pointdecharge.id AS pdc_id,
-      station_id,
-      puissance_nominale
-    FROM
-      Pointdecharge
-      LEFT JOIN Stations ON stations.id = station_id
-  ),
   Sessions_uniques AS (
     SELECT
       max(energy) AS max_energy_kwh,
       point_de_charge_id
     FROM
       SESSION
-      INNER JOIN Statiques ON point_de_charge_id = Statiques.pdc_id
+      INNER JOIN PdcLevels ON point_de_charge_id = PdcLevels.pdc_id
     WHERE
       $timespan
       AND energy < 1.1 * puissance_nominale * EXTRACT(
@@ -150,7 +85,7 @@ SELECT
   sum(max_energy_kwh) AS VALUE
 FROM
   Sessions_uniques
-  INNER JOIN Statiques ON point_de_charge_id = Statiques.pdc_id
+  INNER JOIN PdcLevels ON point_de_charge_id = PdcLevels.pdc_id
 GROUP BY
   category
 """
@@ -166,11 +101,10 @@ def get_values_for_targets(
     """Fetch sessions given input level, timestamp and target index."""
     query_template = Template(ENERGY_BY_DELIVERY_TEMPLATE)
     query_params = {"indexes": ",".join(f"'{i}'" for i in map(str, indexes))}
-    query_params |= IS_VALID_PDL | IS_DC | ALIMENTATION
-    query_params |= get_num_for_level_query_params(level)
+    query_params |= get_num_for_level_query_params(level, pdc_id="point_de_charge_id")
     query_params |= get_timespan_filter_query_params(timespan, session=True)
     with Session(get_api_db_engine(environment)) as session:
-        return pd.read_sql_query(
+        return read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
 
@@ -225,9 +159,8 @@ def u14_national(timespan: IndicatorTimeSpan, environment: Environment) -> pd.Da
     """Calculate u14 at the national level."""
     query_template = Template(QUERY_NATIONAL_TEMPLATE)
     query_params = get_timespan_filter_query_params(timespan, session=True)
-    query_params |= IS_VALID_PDL | IS_DC | ALIMENTATION
     with Session(get_api_db_engine(environment)) as session:
-        result = pd.read_sql_query(
+        result = read_sql_query(
             query_template.substitute(query_params), con=session.connection()
         )
     indicators = {
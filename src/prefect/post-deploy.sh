@@ -6,6 +6,10 @@ set -eo pipefail
 echo "🗃️ Will run database migrations…"
 prefect server database upgrade -y
 
+# Create quality tables
+echo "🗃️ Will create quality database tables…"
+python -c "from quality.schemas import create_tables; create_tables()"
+
 # Create worker pool if the API is up and running
 if [ "$(curl -s "${PREFECT_API_URL}health")" == "true" ]; then
   echo "👷 Will create 'indicators' worker pool…"
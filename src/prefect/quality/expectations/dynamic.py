@@ -30,6 +30,7 @@ from .parameters import (
     RATS,
     SEST,
 )
+from .rules import ENEA_RULE, ENEU_RULE, ENEX_RULE, NEGS_RULE
 
 NAME: str = "dynamic"
 
@@ -56,10 +57,10 @@ FROM
   session
   INNER JOIN f_statique ON point_de_charge_id = f_statique.pdc_id
 WHERE
-  energy > $highest_energy_kwh
+  $rule
   AND start >= $start
   AND start < $end
-                """).substitute(date_params | ENERGY),  # type: ignore
+                """).substitute(date_params | {"rule": ENEU_RULE.to_sql()}),
             meta={"code": ENEU.code},
         ),
         # ODUR : Session of zero duration (rule 40)
@@ -114,21 +115,9 @@ WITH
       session
       INNER JOIN f_statique ON point_de_charge_id = f_statique.pdc_id
     WHERE
-      session.end != session.start
-      AND energy > $lowest_energy_kwh
-      AND energy <= $highest_energy_kwh
-      AND puissance_nominale > $min_power_kw
+      $rule
       AND start >= $start
       AND start < $end
-      AND energy > extract(
-        'epoch' FROM (session.end - start)
-      ) / 3600.0 * puissance_nominale * $abnormal_coef
-      AND (
-        energy < extract(
-          'epoch' FROM (session.end - start)
-        ) / 3600.0 * puissance_nominale * $excess_coef
-        OR energy <= $excess_threshold_kWh
-      )
   ),
   nb_sessions AS (
     SELECT
@@ -150,7 +139,9 @@ FROM
   nb_sessions
 WHERE
   n_max_ses::float > $threshold_percent * n_ses::float
-                """).substitute(date_params | ENEA.params | ENEX.params | ENERGY),
+                """).substitute(
+                date_params | ENEA.params | ENERGY | {"rule": ENEA_RULE.to_sql()}
+            ),
             meta={"code": ENEA.code},
         ),
         # ENEX : Session with excessive energy (rule 41)
@@ -168,15 +159,10 @@ FROM
   session
   INNER JOIN f_statique ON point_de_charge_id = f_statique.pdc_id
 WHERE
-  session.end != start
-  AND energy > $excess_threshold_kWh
-  AND energy <= $highest_energy_kwh
+  $rule
   AND start >= $start
   AND start < $end
-  AND energy > extract(
-    'epoch' FROM (session.end - start)
-  ) / 3600.0 * puissance_nominale * $excess_coef
-                """).substitute(date_params | ENEX.params | ENERGY),
+                """).substitute(date_params | {"rule": ENEX_RULE.to_sql()}),
             meta={"code": ENEX.code},
         ),
     ]
@@ -313,8 +299,8 @@ FROM
 WHERE
   start >= $start
   AND start < $end
-  AND start > session.end
-                """).substitute(date_params),
+  AND $rule
+                """).substitute(date_params | {"rule": NEGS_RULE.to_sql()}),
             meta={"code": NEGS.code},
         ),
         # FRES : freshness of sessions greater than max_duration days (rule 42)
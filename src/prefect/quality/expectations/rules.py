@@ -0,0 +1,229 @@
+"""Declarative session rules.
+
+A session rule is a boolean expression over session quantities (e.g. `duration`,
+`energy` or `max_energy`). The same rule definition is evaluated either as
+vectorized pandas column expressions on a sessions DataFrame, or rendered as a
+SQL predicate for expectations queries.
+"""
+
+import re
+from string import Template
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from .parameters import ENEA, ENERGY, ENEU, ENEX, NEGS
+
+
+class SessionQuantity(BaseModel):
+    """A session quantity used in rules expressions.
+
+    `compute` receives the sessions DataFrame and already computed quantities (in
+    `SESSION_QUANTITIES` order) and returns a Series. `requires` lists quantities
+    used by `compute`.
+    """
+
+    sql: str
+    compute: Callable[[pd.DataFrame, Dict[str, pd.Series]], pd.Series]
+    requires: List[str] = []
+
+
+# Sessions DataFrames are expected to use the TIRUERT sessions query column names
+# ("from", "to", "energy" and "max_power"), while SQL expressions use the Session
+# and PointDeCharge tables columns.
+SESSION_QUANTITIES: Dict[str, SessionQuantity] = {
+    "duration": SessionQuantity(
+        sql="extract('epoch' FROM (session.end - session.start))",
+        compute=lambda s, _: (s["to"] - s["from"]).dt.total_seconds(),
+    ),
+    "energy": SessionQuantity(
+        sql="energy",
+        compute=lambda s, _: s["energy"],
+    ),
+    "max_power": SessionQuantity(
+        sql="puissance_nominale",
+        compute=lambda s, _: s["max_power"],
+    ),
+    # Maximum energy : max_energy = puissance_nominale * session_duration
+    "max_energy": SessionQuantity(
+        sql=(
+            "extract('epoch' FROM (session.end - session.start))"
+            " / 3600.0 * puissance_nominale"
+        ),
+        compute=lambda _, q: q["duration"] / 3600.0 * q["max_power"],
+        requires=["duration", "max_power"],
+    ),
+}
+QUANTITY_PATTERN = re.compile(r"\b(" + "|".join(SESSION_QUANTITIES) + r")\b")
+
+
+class SessionRule(BaseModel):
+    """Model for session rules.
+
+    `expression` is a boolean expression over `SESSION_QUANTITIES` using numbers,
+    comparison operators, parenthesis and the `and`, `or` and `not` keywords.
+    """
+
+    code: str
+    expression: str
+
+    @property
+    def quantities(self) -> List[str]:
+        """Quantities required to evaluate the rule (dependencies included)."""
+        names = set(QUANTITY_PATTERN.findall(self.expression))
+        for name in list(names):
+            names.update(SESSION_QUANTITIES[name].requires)
+        return [name for name in SESSION_QUANTITIES if name in names]
+
+    def to_sql(self) -> str:
+        """Render the rule as a (parenthesized) SQL predicate."""
+        predicate = QUANTITY_PATTERN.sub(
+            lambda m: f"({SESSION_QUANTITIES[m.group(1)].sql})", self.expression
+        )
+        return f"({predicate})"
+
+    def evaluate(
+        self,
+        sessions: pd.DataFrame,
+        quantities: Dict[str, pd.Series] | None = None,
+    ) -> pd.Series:
+        """Evaluate the rule for every session (vectorized)."""
+        if quantities is None:
+            quantities = get_session_quantities(sessions, self.quantities)
+        result = pd.eval(self.expression, local_dict=quantities, engine="python")
+        return pd.Series(result, index=sessions.index, dtype="bool")
+
+
+def get_session_quantities(
+    sessions: pd.DataFrame, names: List[str] | None = None
+) -> Dict[str, pd.Series]:
+    """Compute session quantities (all of them by default)."""
+    quantities: Dict[str, pd.Series] = {}
+    for name, quantity in SESSION_QUANTITIES.items():
+        if names is None or name in names:
+            quantities[name] = quantity.compute(sessions, quantities)
+    return quantities
+
+
+def evaluate_rules(
+    sessions: pd.DataFrame,
+    rules: List[SessionRule],
+    quantities: Dict[str, pd.Series] | None = None,
+) -> pd.DataFrame:
+    """Evaluate all rules in a single pass.
+
+    Required quantities are computed once (unless provided) and shared by all rules.
+    Returns a boolean DataFrame with a column per rule (lowercased rule code).
+    """
+    if quantities is None:
+        names = [name for rule in rules for name in rule.quantities]
+        quantities = get_session_quantities(sessions, names)
+    return pd.DataFrame(
+        {rule.code.lower(): rule.evaluate(sessions, quantities) for rule in rules},
+        index=sessions.index,
+    )
+
+
+# Expectations sessions rules
+NEGS_RULE = SessionRule(code=NEGS.code, expression="duration < 0")
+ENEU_RULE = SessionRule(
+    code=ENEU.code,
+    expression=Template("energy > $highest_energy_kwh").substitute(ENERGY),
+)
+ENEX_RULE = SessionRule(
+    code=ENEX.code,
+    expression=Template(
+        "duration != 0"
+        " and energy > $excess_threshold_kWh"
+        " and energy <= $highest_energy_kwh"
+        " and energy > max_energy * $excess_coef"
+    ).substitute(ENEX.params | ENERGY),
+)
+ENEA_RULE = SessionRule(
+    code=ENEA.code,
+    expression=Template(
+        "duration != 0"
+        " and energy > $lowest_energy_kwh"
+        " and energy <= $highest_energy_kwh"
+        " and max_power > $min_power_kw"
+        " and energy > max_energy * $abnormal_coef"
+        " and (energy < max_energy * $excess_coef or energy <= $excess_threshold_kWh)"
+    ).substitute(ENEA.params | ENEX.params | ENERGY),
+)
+
+
+def flag_overlaps(
+    sessions: pd.DataFrame,
+    pdc_field: str = "id_pdc_itinerance",
+    from_field: str = "from",
+    to_field: str = "to",
+    id_field: str = "session_id",
+) -> pd.DataFrame:
+    """Flag duplicated and overlapping sessions of a point of charge.
+
+    Sessions do not need to be sorted. Per point of charge, sessions are sorted by
+    (from, to) and the running maximum of previous sessions end is computed using a
+    numpy cumulative max: a session overlaps if it starts before this maximum, and
+    it is a duplicate if a previous session has the same start and end. Exact
+    duplicates with a positive duration are also flagged as overlaps.
+
+    Returns a DataFrame (with the `sessions` index) with the `duplicate` and
+    `overlap` boolean columns and the `overlapped` column containing the `id_field`
+    value (or index label if missing) of the previous session the session overlaps
+    (the one that ends last).
+    """
+    n = len(sessions)
+    if not n:
+        return pd.DataFrame(
+            {"duplicate": [], "overlap": [], "overlapped": []},
+            index=sessions.index,
+        ).astype({"duplicate": "bool", "overlap": "bool"})
+
+    codes, _ = pd.factorize(sessions[pdc_field], sort=False)
+    starts = pd.to_datetime(sessions[from_field], utc=True).to_numpy("datetime64[ns]")
+    ends = pd.to_datetime(sessions[to_field], utc=True).to_numpy("datetime64[ns]")
+    order = np.lexsort((ends, starts, codes))
+    codes, starts, ends = codes[order], starts[order], ends[order]
+
+    # Per group cumulative max: ends are converted to dense ranks, offset by group
+    # so that a single global cumulative max never crosses groups.
+    uniques, ranks = np.unique(ends, return_inverse=True)
+    keys = codes.astype("int64") * (len(uniques) + 1) + ranks
+    running = np.maximum.accumulate(keys)
+
+    first = np.ones(n, dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    previous = np.empty(n, dtype="int64")
+    previous[1:] = running[:-1] - codes[1:].astype("int64") * (len(uniques) + 1)
+    previous[first] = 0
+    previous_end = uniques[previous]
+
+    overlap = ~first & (starts < previous_end)
+    duplicate = np.zeros(n, dtype=bool)
+    duplicate[1:] = ~first[1:] & (starts[1:] == starts[:-1]) & (ends[1:] == ends[:-1])
+
+    # Position of the previous session holding the running maximum end (or of the
+    # previous session for duplicates)
+    positions = np.arange(n)
+    holders = np.maximum.accumulate(np.where(running == keys, positions, 0))
+    overlapped_position = np.zeros(n, dtype="int64")
+    overlapped_position[1:] = np.where(duplicate[1:], positions[:-1], holders[:-1])
+    ids = (
+        sessions[id_field].to_numpy()
+        if id_field in sessions
+        else sessions.index.to_numpy()
+    )
+    overlapped = pd.Series(ids[order][overlapped_position]).where(overlap | duplicate)
+
+    result = pd.DataFrame(
+        {
+            "duplicate": duplicate,
+            "overlap": overlap,
+            "overlapped": overlapped.to_numpy(),
+        }
+    )
+    restore = np.empty(n, dtype="int64")
+    restore[order] = np.arange(n)
+    return result.iloc[restore].set_index(sessions.index)
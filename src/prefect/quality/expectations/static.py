@@ -2,6 +2,7 @@
 
 from copy import copy
 from string import Template
+from typing import Dict, Tuple
 
 import great_expectations as gx
 import great_expectations.expectations as gxe
@@ -91,6 +92,7 @@ localisation_expectations = [
     gxe.UnexpectedRowsExpectation(
         unexpected_rows_query=Template("""
 SELECT
+  id_pdc_itinerance,
   id_station_itinerance,
   ST_X ("coordonneesXY"::geometry) AS longitude,
   ST_Y ("coordonneesXY"::geometry) AS latitude
@@ -110,6 +112,7 @@ AFIREV_expectations = [
     gxe.UnexpectedRowsExpectation(
         unexpected_rows_query="""
 SELECT
+  id_pdc_itinerance,
   id_station_itinerance
 FROM
   {batch}
@@ -339,6 +342,122 @@ WHERE
 ]
 
 
+# Grouped by operational unit queries of expectations without key (ratios over the
+# whole batch). The batch has a `unit` column and each query returns failing units
+# with a single unexpected row (the ratio), as unit checkpoints do.
+GROUPED_QUERIES: Dict[str, str] = {
+    PDCM.code: Template("""
+WITH
+  stat_nb_pdc AS (
+    SELECT
+      unit,
+      count(*) AS nb_pdc
+    FROM
+      {batch}
+    GROUP BY
+      unit,
+      id_station_itinerance
+  )
+SELECT
+  unit,
+  1 AS unexpected_count,
+  jsonb_build_object(
+    'ratio', count(*) FILTER (WHERE nb_pdc > $max_pdc_per_station)::float / count(*)
+  ) AS first_row
+FROM
+  stat_nb_pdc
+GROUP BY
+  unit
+HAVING
+  count(*) FILTER (
+    WHERE nb_pdc > $max_pdc_per_station
+  )::float > $threshold_percent * count(*)
+    """).substitute(PDCM.params),
+    LOCP.code: Template("""
+SELECT
+  unit,
+  1 AS unexpected_count,
+  jsonb_build_object(
+    'ratio',
+    count(DISTINCT id_station_itinerance)::float / count(DISTINCT "coordonneesXY")
+  ) AS first_row
+FROM
+  {batch}
+GROUP BY
+  unit
+HAVING
+  count(DISTINCT id_station_itinerance)::float
+    > $ratio_stations_per_location * count(DISTINCT "coordonneesXY")
+    """).substitute(LOCP.params),
+    NE10.code: Template("""
+WITH
+  stat_dc AS (
+    SELECT
+      unit,
+      bool_or(num_pdl NOT SIMILAR TO '[0-9]{{14}}') AS numpdl_not14
+    FROM
+      {batch}
+    WHERE
+      (raccordement IS NULL OR raccordement = 'Direct')
+      AND $IS_DC
+    GROUP BY
+      unit,
+      id_station_itinerance
+  )
+SELECT
+  unit,
+  1 AS unexpected_count,
+  jsonb_build_object(
+    'ratio', count(*) FILTER (WHERE numpdl_not14)::float / count(*)
+  ) AS first_row
+FROM
+  stat_dc
+GROUP BY
+  unit
+HAVING
+  count(*) FILTER (WHERE numpdl_not14)::float > $threshold_percent * count(*)
+    """).substitute({"IS_DC": IS_DC} | NE10.params),  # type: ignore
+}
+
+# Unexpected rows columns used to find the rows of the batch (points of charge and
+# operational units) that fail an expectation (grouped and incremental
+# evaluations). The first key column should not be null in unexpected rows.
+# Expectations comparing ratios over the whole batch (PDCM, LOCP and NE10) have no
+# key: they are evaluated by operational unit (see `GROUPED_QUERIES`).
+PDC_KEYS: Dict[str, Tuple[str, ...]] = {
+    POWL.code: ("id_pdc_itinerance",),
+    POWU.code: ("id_pdc_itinerance",),
+    "SIRI": ("siren_amenageur", "nom_amenageur", "nom_operateur"),
+    CRDF.code: ("id_pdc_itinerance",),
+    "AFIP": ("id_pdc_itinerance",),
+    "AFIE": ("id_pdc_itinerance",),
+    "PDCL": ("id_station_itinerance",),
+    "INSE": ("code_insee_commune",),
+    "ADDR": ("id_station_itinerance",),
+    "PDLM": ("id_station_itinerance",),
+}
+
+# Expectations evaluated for updated points of charge only (incremental
+# evaluation): their unexpected rows only depend on the point of charge row. Station
+# level expectations (PDCL, ADDR and PDLM) depend on other points of charge of the
+# station, that may be deleted or moved: they are evaluated for the whole table.
+# Ratios (see `GROUPED_QUERIES`) are evaluated for all units.
+INCREMENTAL_CODES: Tuple[str, ...] = (
+    POWL.code,
+    POWU.code,
+    "AMEM1",
+    "AMEM2",
+    "AMEM3",
+    "SIRI",
+    "OPEM1",
+    "OPEM2",
+    CRDF.code,
+    "AFIP",
+    "AFIE",
+    "INSE",
+)
+
+
 def get_suite():
     """Get static expectation suite."""
     suite = gx.ExpectationSuite(name=NAME)
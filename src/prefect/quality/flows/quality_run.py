@@ -1,8 +1,9 @@
 """Prefect flows: quality static and dynamic."""
 
 import os
-from datetime import date
-from typing import Generator, List
+from datetime import date, datetime, timezone
+from string import Template
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
 
 import great_expectations as gx
 import pandas as pd
@@ -11,17 +12,107 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 from prefect import task
 from prefect.artifacts import create_markdown_artifact
 from prefect.cache_policies import NONE
+from prefect.logging import get_run_logger
 from pydantic import BaseModel
-from sqlalchemy import create_engine, text
+from sqlalchemy import (
+    create_engine,
+    delete,
+    exists,
+    insert,
+    select,
+    text,
+)
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
+from indicators.db import get_api_db_engine, get_indicators_db_engine
 from indicators.models import IndicatorPeriod, Level
 from indicators.types import Environment as Environment_enum
 from indicators.utils import export_indicators
 from quality.expectations.parameters import EVALUABLE_PARAMS
+from quality.schemas import StaticResult, StaticRun, stale_pdc_table
 
 API_DATA_SOURCE_NAME: str = "api-{environment}"
+UNIT_EXPRESSION: str = "substring(id_pdc_itinerance from 1 for 5)"
+
+UNITS_SELECTABLE_TEMPLATE = Template("(VALUES $rows) AS units (unit)")
+
+# Grouped evaluation: expectations queries are evaluated for all units in a single
+# query, grouped by unit. Only failing units are returned with the number of
+# unexpected rows and the first unexpected row.
+#
+# Expectations with keys are evaluated once for the whole `statique` table:
+# unexpected rows are assigned to units of batch rows with the same keys.
+GROUPED_KEYED_QUERY_TEMPLATE = Template("""
+SELECT
+  batch.unit,
+  count(*) AS unexpected_count,
+  (array_agg(to_jsonb(unexpected)))[1] AS first_row
+FROM
+  ($query) AS unexpected
+  INNER JOIN (
+    SELECT DISTINCT $columns, $unit_expression AS unit FROM statique
+  ) AS batch ON $condition
+WHERE
+  batch.unit IN (SELECT unit FROM $units)
+GROUP BY
+  batch.unit
+""")
+# Expectations without key (ratios over the whole batch) have a dedicated grouped
+# query (see `quality.expectations.static.GROUPED_QUERIES`) evaluated on the units
+# batch.
+GROUPED_BATCH_QUERY_TEMPLATE = Template("""
+SELECT *, $unit_expression AS unit FROM statique
+WHERE $unit_expression IN (SELECT unit FROM $units)
+""")
+GROUPED_NOT_NULL_QUERY_TEMPLATE = Template("""
+SELECT
+  $unit_expression AS unit,
+  count(*) AS unexpected_count,
+  NULL AS first_row
+FROM
+  statique
+WHERE
+  "$column" IS NULL
+  AND $unit_expression IN (SELECT unit FROM $units)
+GROUP BY
+  unit
+""")
+
+# Incremental evaluation: point of charge level expectations are only evaluated for
+# points of charge updated since the last run. Failing points of charge are selected
+# by joining the batch with unexpected rows on key columns, along with the
+# unexpected row they belong to (as the failure key).
+CHANGED_BATCH_QUERY_TEMPLATE = Template("""
+SELECT * FROM statique WHERE pdc_updated_at > '$since'
+""")
+BATCH_PDCS_QUERY_TEMPLATE = Template("""
+SELECT id_pdc_itinerance FROM ($batch) AS batch
+""")
+FAILING_PDCS_QUERY_TEMPLATE = Template("""
+SELECT DISTINCT
+  batch.id_pdc_itinerance,
+  to_jsonb(unexpected)::text AS key
+FROM
+  ($batch) AS batch
+  INNER JOIN ($query) AS unexpected ON $condition
+""")
+NOT_NULL_FAILING_PDCS_QUERY_TEMPLATE = Template("""
+SELECT
+  id_pdc_itinerance,
+  id_pdc_itinerance AS key
+FROM
+  ($batch) AS batch
+WHERE
+  "$column" IS NULL
+""")
+
+# Grouped results: {code: {unit: (unexpected count, first unexpected row)}}
+GroupedResults = Dict[str, Dict[str, Tuple[int, Optional[dict]]]]
+# Expectations keys: {code: unexpected rows key columns}
+ExpectationsKeys = Dict[str, Tuple[str, ...]]
+# Expectations grouped queries: {code: grouped by unit query of the `{batch}`}
+GroupedQueries = Dict[str, str]
 
 
 class QCExpectationResult(BaseModel):
@@ -219,17 +310,48 @@ def run_api_db_checkpoint_by_unit(  # noqa: PLR0913
                     if code in EVALUABLE_PARAMS and "details" in r.result:
                         value = r.result["details"]["unexpected_rows"][0]["ratio"]
                     if value > 0:
-                        indicators.loc[len(indicators)] = {
-                            "value": value,
-                            "level": Level.OPERATIONALUNIT,
-                            "target": unit,
-                            "category": code,
-                            "code": "qua",
-                            "period": period,
-                            "timestamp": check_date.isoformat(),
-                        }
+                        indicators.loc[len(indicators)] = _get_indicator(
+                            value, unit, code, period, check_date
+                        )
         report.results.append(qc_results)
 
+    _publish_by_unit_report(
+        report,
+        indicators,
+        environment,
+        quality_type,
+        comment,
+        create_artifact=create_artifact,
+        persist=persist,
+    )
+    return report
+
+
+def _get_indicator(
+    value: float, unit: str, code: str, period: IndicatorPeriod, check_date: date
+) -> dict:
+    """Get a quality indicator for an operational unit failed expectation."""
+    return {
+        "value": value,
+        "level": Level.OPERATIONALUNIT,
+        "target": unit,
+        "category": code,
+        "code": "qua",
+        "period": period,
+        "timestamp": check_date.isoformat(),
+    }
+
+
+def _publish_by_unit_report(  # noqa: PLR0913
+    report: QCReport,
+    indicators: pd.DataFrame,
+    environment: str,
+    quality_type: str,
+    comment: str,
+    create_artifact: bool,
+    persist: bool,
+):
+    """Create the by unit report markdown artifact and save quality indicators."""
     # Generate report
     jinja_env = Environment(
         loader=FileSystemLoader("quality/templates"), autoescape=select_autoescape()
@@ -252,4 +374,428 @@ def run_api_db_checkpoint_by_unit(  # noqa: PLR0913
         create_artifact=create_artifact,
         persist=persist,
     )
+
+
+def get_units_selectable(units: List[str]) -> str:
+    """Get the `units (unit)` VALUES selectable SQL for operational units."""
+    rows = ", ".join(
+        "({})".format(
+            text(":unit")
+            .bindparams(unit=unit)
+            .compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        for unit in units
+    )
+    return UNITS_SELECTABLE_TEMPLATE.substitute({"rows": rows})
+
+
+def format_batch_query(
+    expectation: gx.expectations.UnexpectedRowsExpectation, batch: str
+) -> str:
+    """Substitute the batch query in an expectation unexpected rows query."""
+    query = str(expectation.unexpected_rows_query)
+    # Mimic GX batch substitution for query assets
+    selectable = "({})" if "JOIN" in query.upper() else "({}) AS subselect"
+    return query.format(batch=selectable.format(batch))
+
+
+def get_keys_condition(keys: Tuple[str, ...]) -> str:
+    """Get the join condition of batch and unexpected rows on key columns.
+
+    The first key column is compared with the equality operator (allowing hash
+    joins), other key columns may be null.
+    """
+    first, *others = keys
+    return " AND ".join(
+        [f'batch."{first}" = unexpected."{first}"']
+        + [f'batch."{key}" IS NOT DISTINCT FROM unexpected."{key}"' for key in others]
+    )
+
+
+def get_grouped_query(
+    expectation: gx.expectations.Expectation,
+    units: str,
+    keys: Optional[ExpectationsKeys] = None,
+    queries: Optional[GroupedQueries] = None,
+) -> str:
+    """Get an expectation grouped by unit evaluation query.
+
+    `units` is the operational units selectable (see `get_units_selectable`).
+    Supported expectations are `ExpectColumnValuesToNotBeNull` and
+    `UnexpectedRowsExpectation` with a `keys` entry (evaluated once for all units)
+    or a grouped query in `queries` (evaluated on the units batch).
+    """
+    if isinstance(expectation, gx.expectations.ExpectColumnValuesToNotBeNull):
+        return GROUPED_NOT_NULL_QUERY_TEMPLATE.substitute(
+            {
+                "unit_expression": UNIT_EXPRESSION,
+                "column": expectation.column,
+                "units": units,
+            }
+        )
+    if isinstance(expectation, gx.expectations.UnexpectedRowsExpectation):
+        code = expectation.meta["code"]
+        key = (keys or {}).get(code)
+        if key:
+            return GROUPED_KEYED_QUERY_TEMPLATE.substitute(
+                {
+                    "query": format_batch_query(expectation, "SELECT * FROM statique"),
+                    "columns": ", ".join(f'"{column}"' for column in key),
+                    "unit_expression": UNIT_EXPRESSION,
+                    "condition": get_keys_condition(key),
+                    "units": units,
+                }
+            )
+        query = (queries or {}).get(code)
+        if query:
+            batch = GROUPED_BATCH_QUERY_TEMPLATE.substitute(
+                {"unit_expression": UNIT_EXPRESSION, "units": units}
+            )
+            return query.format(batch=f"({batch}) AS batch")
+    raise NotImplementedError(
+        f"Grouped evaluation is not supported for {type(expectation).__name__}"
+    )
+
+
+def get_units_results(
+    units: List[str],
+    codes: List[str],
+    grouped: GroupedResults,
+    period: IndicatorPeriod,
+    check_date: date,
+) -> Tuple[List[QCExpectationsSuiteResult], pd.DataFrame]:
+    """Split grouped expectations results by operational unit.
+
+    Returns suite results and quality indicators, as the checkpoint by unit does.
+    """
+    results: List[QCExpectationsSuiteResult] = []
+    indicators = []
+    for unit in units:
+        suite = []
+        for code in codes:
+            failure = grouped.get(code, {}).get(unit)
+            suite.append(QCExpectationResult(code=code, success=failure is None))
+            if failure is None:
+                continue
+            value, first_row = failure
+            if code in EVALUABLE_PARAMS and first_row and "ratio" in first_row:
+                value = first_row["ratio"]
+            if value > 0:
+                indicators.append(_get_indicator(value, unit, code, period, check_date))
+        results.append(
+            QCExpectationsSuiteResult(
+                unit=unit, success=all(r.success for r in suite), suite=suite
+            )
+        )
+    return results, pd.DataFrame(
+        indicators,
+        columns=["value", "level", "target", "category", "code", "period", "timestamp"],
+    )
+
+
+@task(cache_policy=NONE)
+def run_api_db_grouped_by_unit(  # noqa: PLR0913
+    suite: gx.ExpectationSuite,
+    environment: str,
+    period: IndicatorPeriod,
+    check_date: date,
+    quality_type: str,
+    comment: str = "",
+    create_artifact: bool = False,
+    persist: bool = False,
+    keys: Optional[ExpectationsKeys] = None,
+    queries: Optional[GroupedQueries] = None,
+) -> QCReport:
+    """Run API DB expectations by unit in a single pass.
+
+    Instead of running a GX checkpoint per operational unit, every expectation
+    query is run once for all units: expectations with a `keys` entry are evaluated
+    once for the whole table, others need a grouped by unit query in `queries` (see
+    `get_grouped_query`). The report and indicators are the same as the
+    `run_api_db_checkpoint_by_unit` ones.
+    """
+    logger = get_run_logger()
+    report = QCReport(name=f"{quality_type}-{environment}")
+    units = list(get_db_units(environment))
+    codes: List[str] = [e.meta["code"] for e in suite.expectations]
+
+    grouped: GroupedResults = {}
+    engine = get_api_db_engine(Environment_enum(environment))
+    with engine.connect() as connection:
+        for expectation, code in zip(suite.expectations, codes, strict=True):
+            if not units:
+                break
+            query = get_grouped_query(
+                expectation, get_units_selectable(units), keys, queries
+            )
+            rows = connection.execute(text(query)).all()
+            grouped[code] = {unit: (count, row) for unit, count, row in rows}
+            logger.debug(f"Expectation {code} failed for {len(rows)} units")
+
+    results, indicators = get_units_results(units, codes, grouped, period, check_date)
+    report.results = results
+    _publish_by_unit_report(
+        report,
+        indicators,
+        environment,
+        quality_type,
+        comment,
+        create_artifact=create_artifact,
+        persist=persist,
+    )
+    return report
+
+
+def get_changed_batch_query(since: Optional[datetime]) -> str:
+    """Get the batch query of points of charge updated since a date.
+
+    Without date, the batch is the whole `statique` table.
+    """
+    if since is None:
+        return "SELECT * FROM statique"
+    return CHANGED_BATCH_QUERY_TEMPLATE.substitute({"since": since.isoformat()})
+
+
+def get_failing_pdcs_query(
+    expectation: gx.expectations.Expectation, batch: str, keys: ExpectationsKeys
+) -> Optional[str]:
+    """Get the query of the batch points of charge failing an expectation.
+
+    `keys` maps expectation codes to the unexpected rows columns identifying failing
+    points of charge. Returns `None` for expectations without key (population level
+    expectations).
+    """
+    if isinstance(expectation, gx.expectations.ExpectColumnValuesToNotBeNull):
+        return NOT_NULL_FAILING_PDCS_QUERY_TEMPLATE.substitute(
+            {"batch": batch, "column": expectation.column}
+        )
+    key = keys.get(expectation.meta["code"])
+    if key is None or not isinstance(
+        expectation, gx.expectations.UnexpectedRowsExpectation
+    ):
+        return None
+    return FAILING_PDCS_QUERY_TEMPLATE.substitute(
+        {
+            "batch": batch,
+            "query": format_batch_query(expectation, batch),
+            "condition": get_keys_condition(key),
+        }
+    )
+
+
+def get_stored_grouped_results(results: pd.DataFrame) -> GroupedResults:
+    """Group stored static results by expectation code and operational unit.
+
+    The unexpected count of an operational unit is its number of distinct failure
+    keys (unexpected rows), as counted by the grouped evaluation. Population level
+    results (without point of charge) keep their stored value, also used as the
+    ratio of evaluable expectations.
+    """
+    grouped: GroupedResults = {}
+    for (code, unit), failures in results.groupby(["code", "unit"]):
+        keys = failures.loc[failures["id_pdc_itinerance"].notna(), "key"]
+        if not keys.empty:
+            grouped.setdefault(str(code), {})[str(unit)] = (int(keys.nunique()), None)
+            continue
+        value = failures["value"].iloc[0]
+        grouped.setdefault(str(code), {})[str(unit)] = (value, {"ratio": value})
+    return grouped
+
+
+def _save_static_results(  # noqa: PLR0913
+    environment: str,
+    failures: List[dict],
+    incremental_codes: Optional[Sequence[str]],
+    changed_pdcs: Sequence[str],
+    current_pdcs: Sequence[str],
+    run: Optional[StaticRun],
+) -> pd.DataFrame:
+    """Replace stored static results and return all environment results.
+
+    In incremental mode (with `incremental_codes`), results of other expectations
+    are all replaced, but only re-evaluated and deleted points of charge results of
+    incremental expectations are.
+    """
+    with Session(get_indicators_db_engine()) as session:
+        stale = delete(StaticResult).where(StaticResult.environment == environment)
+        if incremental_codes is not None:
+            stored = session.scalars(
+                select(StaticResult.id_pdc_itinerance)
+                .distinct()
+                .where(
+                    StaticResult.environment == environment,
+                    StaticResult.id_pdc_itinerance.is_not(None),
+                )
+            ).all()
+            current = set(current_pdcs)
+            stale_pdcs = set(changed_pdcs) | {
+                pdc for pdc in stored if pdc not in current
+            }
+            stale_pdc_table.create(session.connection())
+            if stale_pdcs:
+                session.execute(
+                    insert(stale_pdc_table),
+                    [{"id_pdc_itinerance": pdc} for pdc in stale_pdcs],
+                )
+            stale = stale.where(
+                StaticResult.code.not_in(incremental_codes)
+                | exists().where(
+                    stale_pdc_table.c.id_pdc_itinerance
+                    == StaticResult.id_pdc_itinerance
+                )
+            )
+        session.execute(stale)
+        if failures:
+            session.execute(insert(StaticResult), failures)
+        if run is not None:
+            session.merge(run)
+        session.commit()
+
+        return pd.read_sql(
+            select(
+                StaticResult.code,
+                StaticResult.unit,
+                StaticResult.id_pdc_itinerance,
+                StaticResult.key,
+                StaticResult.value,
+            ).where(StaticResult.environment == environment),
+            session.connection(),
+        )
+
+
+@task(cache_policy=NONE)
+def run_api_db_incremental_by_unit(  # noqa: PLR0913
+    suite: gx.ExpectationSuite,
+    keys: ExpectationsKeys,
+    queries: GroupedQueries,
+    incremental_codes: Sequence[str],
+    environment: str,
+    period: IndicatorPeriod,
+    check_date: date,
+    quality_type: str,
+    comment: str = "",
+    create_artifact: bool = False,
+    persist: bool = False,
+) -> QCReport:
+    """Run API DB expectations by unit for updated points of charge only.
+
+    Expectations listed in `incremental_codes` (point of charge level expectations)
+    are evaluated for points of charge updated since the last run (`pdc_updated_at`
+    watermark), other expectations with a `keys` entry (comparing points of charge
+    of a station) for the whole table. Failing points of charge are stored in the
+    indicators database. Expectations without `keys` entry (ratios over the whole
+    batch) are evaluated for all units using their grouped `queries` (see
+    `run_api_db_grouped_by_unit`). The report and indicators are then rebuilt from
+    stored results.
+
+    Changes that do not update points of charge (e.g. cities) are ignored until the
+    point of charge is updated: delete the environment run to force a full
+    evaluation.
+    """
+    logger = get_run_logger()
+    report = QCReport(name=f"{quality_type}-{environment}")
+    units = list(get_db_units(environment))
+    codes: List[str] = [e.meta["code"] for e in suite.expectations]
+    checked_at = datetime.now(timezone.utc)
+
+    with Session(get_indicators_db_engine()) as session:
+        last_run = session.get(StaticRun, environment)
+        since = last_run.watermark if last_run is not None else None
+    batch = get_changed_batch_query(since)
+    logger.info(f"Evaluating points of charge updated since {since}")
+
+    failures: List[dict] = []
+    engine = get_api_db_engine(Environment_enum(environment))
+    with engine.connect() as connection:
+        watermark = connection.execute(
+            text("SELECT max(pdc_updated_at) FROM statique")
+        ).scalar()
+        current_pdcs = (
+            connection.execute(text("SELECT id_pdc_itinerance FROM statique"))
+            .scalars()
+            .all()
+        )
+        changed_pdcs = (
+            connection.execute(
+                text(BATCH_PDCS_QUERY_TEMPLATE.substitute({"batch": batch}))
+            )
+            .scalars()
+            .all()
+        )
+        logger.info(f"{len(changed_pdcs)} points of charge to evaluate")
+
+        for expectation, code in zip(suite.expectations, codes, strict=True):
+            result = {
+                "environment": environment,
+                "code": code,
+                "checked_at": checked_at,
+            }
+            query = get_failing_pdcs_query(
+                expectation,
+                batch if code in incremental_codes else "SELECT * FROM statique",
+                keys,
+            )
+            if query is not None:
+                pdcs = connection.execute(text(query)).all()
+                # Operational unit: see UNIT_EXPRESSION
+                failures += [
+                    result
+                    | {
+                        "unit": pdc[:5],
+                        "id_pdc_itinerance": pdc,
+                        "key": key,
+                        "value": 1,
+                    }
+                    for pdc, key in pdcs
+                ]
+                logger.debug(f"Expectation {code} failed for {len(pdcs)} PDCs")
+                continue
+            if not units:
+                continue
+            query = get_grouped_query(
+                expectation, get_units_selectable(units), queries=queries
+            )
+            rows = connection.execute(text(query)).all()
+            for unit, count, first_row in rows:
+                value = count
+                if code in EVALUABLE_PARAMS and first_row and "ratio" in first_row:
+                    value = first_row["ratio"]
+                failures.append(
+                    result
+                    | {
+                        "unit": unit,
+                        "id_pdc_itinerance": None,
+                        "key": None,
+                        "value": value,
+                    }
+                )
+            logger.debug(f"Expectation {code} failed for {len(rows)} units")
+
+    run = None
+    if watermark is not None:
+        run = StaticRun(
+            environment=environment, watermark=watermark, checked_at=checked_at
+        )
+    stored = _save_static_results(
+        environment,
+        failures,
+        incremental_codes if since is not None else None,
+        changed_pdcs,
+        current_pdcs,
+        run,
+    )
+    grouped = get_stored_grouped_results(stored)
+    results, indicators = get_units_results(units, codes, grouped, period, check_date)
+    report.results = results
+    _publish_by_unit_report(
+        report,
+        indicators,
+        environment,
+        quality_type,
+        comment,
+        create_artifact=create_artifact,
+        persist=persist,
+    )
     return report
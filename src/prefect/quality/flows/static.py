@@ -12,6 +12,8 @@ from quality.flows.quality_run import (
     QCReport,
     run_api_db_checkpoint,
     run_api_db_checkpoint_by_unit,
+    run_api_db_grouped_by_unit,
+    run_api_db_incremental_by_unit,
 )
 
 
@@ -41,14 +43,22 @@ def run_api_db_validation(
 
 
 @flow(log_prints=True)
-def run_api_db_validation_by_unit(
+def run_api_db_validation_by_unit(  # noqa: PLR0913
     environment: str,
     period: IndicatorPeriod = IndicatorPeriod.DAY,
     report_by_email: bool = False,
     create_artifact: bool = False,
     persist: bool = False,
+    grouped: bool = False,
+    incremental: bool = False,
 ) -> QCReport:
-    """Run API DB checkpoint by operational unit."""
+    """Run API DB checkpoint by operational unit.
+
+    In `grouped` mode, expectations are evaluated for all units in a single pass
+    (without GX checkpoints, hence no email report). In `incremental` mode, they
+    are only evaluated for points of charge updated since the last incremental run
+    and the report is rebuilt from stored results.
+    """
     # Context
     context = gx.get_context(mode="ephemeral")
 
@@ -62,6 +72,33 @@ def run_api_db_validation_by_unit(
     suite = static.get_suite()
     context.suites.add(suite)
 
+    if incremental:
+        return run_api_db_incremental_by_unit(
+            suite,
+            static.PDC_KEYS,
+            static.GROUPED_QUERIES,
+            static.INCREMENTAL_CODES,
+            environment,
+            period,
+            date.today(),
+            "static",
+            create_artifact=create_artifact,
+            persist=persist,
+        )
+
+    if grouped:
+        return run_api_db_grouped_by_unit(
+            suite,
+            environment,
+            period,
+            date.today(),
+            "static",
+            create_artifact=create_artifact,
+            persist=persist,
+            keys=static.PDC_KEYS,
+            queries=static.GROUPED_QUERIES,
+        )
+
     # Checkpoints
     report = run_api_db_checkpoint_by_unit(
         context,
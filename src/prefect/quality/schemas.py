@@ -0,0 +1,79 @@
+"""QualiCharge prefect quality: schemas."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.types import DateTime, Float, String, Text
+
+from indicators.db import get_indicators_db_engine
+
+
+class BaseQuality(DeclarativeBase):
+    """Base quality model."""
+
+
+class StaticResult(BaseQuality):
+    """Stored static expectation failure.
+
+    Failures are stored per point of charge and unexpected row (`key`), or per
+    operational unit (without point of charge) for population level expectations.
+    """
+
+    __tablename__ = "quality_static_result"
+
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid4
+    )
+    environment: Mapped[str] = mapped_column(String(20), index=True)
+    code: Mapped[str] = mapped_column(String(5), index=True)
+    unit: Mapped[str] = mapped_column(String(5), index=True)
+    id_pdc_itinerance: Mapped[Optional[str]] = mapped_column(
+        String(100), nullable=True, index=True
+    )
+    key: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    value: Mapped[float] = mapped_column(Float)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    def __repr__(self) -> str:
+        """Static result representation."""
+        return (
+            f"{self.__tablename__}/{self.id}: "
+            f"{self.environment}-{self.code}-{self.unit}-{self.id_pdc_itinerance}"
+        )
+
+
+class StaticRun(BaseQuality):
+    """Last incremental static evaluation of an environment.
+
+    The `watermark` is the latest `pdc_updated_at` value of the evaluated points of
+    charge.
+    """
+
+    __tablename__ = "quality_static_run"
+
+    environment: Mapped[str] = mapped_column(String(20), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+# Points of charge with stale static results (incremental evaluation). This
+# temporary table is bound to the indicators database session and dropped on commit.
+stale_pdc_table = Table(
+    "quality_static_stale_pdc",
+    MetaData(),
+    Column("id_pdc_itinerance", String(100), primary_key=True),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def create_tables():
+    """Create quality tables in the indicators database.
+
+    Tables are created when deploying (see `post-deploy.sh`), not by flows.
+    """
+    BaseQuality.metadata.create_all(get_indicators_db_engine())
@@ -13,6 +13,7 @@ from indicators.conf import settings
 from indicators.db import get_indicators_db_engine
 from indicators.schemas import BaseIndicator
 from indicators.types import Environment
+from quality.schemas import BaseQuality, create_tables
 from tiruert.carbure import CarbureAPISettings, CarbureAPIUser, CarbureClient
 
 
@@ -53,6 +54,14 @@ def indicators_db_engine() -> Generator[Engine, None, None]:
     engine.dispose()
 
 
+@pytest.fixture(scope="function")
+def quality_db_engine(indicators_db_engine) -> Generator[Engine, None, None]:
+    """QualiCharge quality tables fixture (indicators database)."""
+    create_tables()
+    yield indicators_db_engine
+    BaseQuality.metadata.drop_all(indicators_db_engine)
+
+
 @pytest.fixture(scope="function")
 def indicators_db_connection(indicators_db_engine) -> Generator[Connection, None, None]:
     """Test connection fixture for indicators (uses transaction)."""
@@ -0,0 +1,364 @@
+"""QualiCharge prefect cooling tests: utilities."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pyarrow as pa
+import pytest
+from prefect import flow
+from pyarrow import dataset as ds
+from pyarrow import fs
+from pyarrow import parquet as pq
+from sqlalchemy import create_engine
+
+import cooling
+from cooling import (
+    ArchiveOptions,
+    compact_archive,
+    get_archive_path,
+    get_archive_watermark,
+    get_day_query_params,
+    get_days_with_deltas,
+    get_delta_path,
+    get_delta_paths,
+    read_archives,
+    stream_query_to_parquet,
+    write_archive_metadata,
+)
+from indicators.types import Environment
+
+
+def test_get_day_query_params():
+    """Test the `get_day_query_params` utility."""
+    assert get_day_query_params(date(2024, 12, 31)) == {
+        "date": "2024-12-31",
+        "start": "2024-12-31T00:00:00+00:00",
+        "end": "2025-01-01T00:00:00+00:00",
+    }
+
+
+def test_get_day_query_params_with_timezone(monkeypatch):
+    """Test the `get_day_query_params` utility with a configured timezone."""
+    monkeypatch.setattr(cooling.settings, "COOLING_TIMEZONE", "Europe/Paris")
+    assert get_day_query_params(date(2024, 7, 13)) == {
+        "date": "2024-07-13",
+        "start": "2024-07-13T00:00:00+02:00",
+        "end": "2024-07-14T00:00:00+02:00",
+    }
+    # Daylight saving time change
+    assert get_day_query_params(date(2024, 10, 27)) == {
+        "date": "2024-10-27",
+        "start": "2024-10-27T00:00:00+02:00",
+        "end": "2024-10-28T00:00:00+01:00",
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_stream_query_to_parquet(chunk_size):
+    """Test the `stream_query_to_parquet` utility."""
+    engine = create_engine("sqlite://")
+    query = " UNION ALL ".join(
+        f"SELECT {i} AS id, 'pdc-{i}' AS name" for i in range(10)
+    )
+    output = pa.BufferOutputStream()
+    n_rows = stream_query_to_parquet(engine, query, output, chunk_size=chunk_size)
+    expected = 10
+    assert n_rows == expected
+
+    table = pq.read_table(pa.BufferReader(output.getvalue()))
+    assert table.num_rows == expected
+    assert table.column_names == ["id", "name"]
+    assert table.column("name").to_pylist()[-1] == "pdc-9"
+
+
+def test_stream_query_to_parquet_without_rows():
+    """Test the `stream_query_to_parquet` utility when the query returns no row."""
+    engine = create_engine("sqlite://")
+    output = pa.BufferOutputStream()
+    assert stream_query_to_parquet(engine, "SELECT 1 AS id WHERE 1 = 0", output) == 0
+    assert output.getvalue().size == 0
+
+
+def test_get_archive_path():
+    """Test the `get_archive_path` utility."""
+    assert get_archive_path("bucket", date(2024, 7, 3), Environment.TEST) == (
+        "bucket/year=2024/month=07/day=03/test.parquet"
+    )
+
+
+def test_stream_query_to_parquet_with_options():
+    """Test the `stream_query_to_parquet` utility with archive options."""
+    engine = create_engine("sqlite://")
+    query = " UNION ALL ".join(
+        f"SELECT 'pdc-{i // 4}' AS id_pdc_itinerance, {i} AS horodatage,"
+        f" 'libre' AS occupation_pdc"
+        for i in range(10)
+    )
+    options = ArchiveOptions(
+        sort_by=["id_pdc_itinerance", "horodatage"],
+        dictionary_columns=["id_pdc_itinerance", "occupation_pdc"],
+        row_group_size=4,
+        compression="zstd",
+    )
+    output = pa.BufferOutputStream()
+    expected = 10
+    assert stream_query_to_parquet(engine, query, output, 3, options) == expected
+
+    metadata = pq.read_metadata(pa.BufferReader(output.getvalue()))
+    assert metadata.num_rows == expected
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [
+        4,
+        4,
+        2,
+    ]
+    row_group = metadata.row_group(0)
+    assert [c.column_index for c in row_group.sorting_columns] == [0, 1]
+    columns = {
+        row_group.column(i).path_in_schema: row_group.column(i)
+        for i in range(row_group.num_columns)
+    }
+    assert columns["id_pdc_itinerance"].compression == "ZSTD"
+    assert columns["id_pdc_itinerance"].has_dictionary_page
+    assert not columns["horodatage"].has_dictionary_page
+    assert columns["horodatage"].statistics.min == 0
+    assert columns["horodatage"].statistics.max == 3  # noqa: PLR2004
+
+
+@flow
+def _write_archive_metadata(bucket, environment, filesystem):
+    """Run `write_archive_metadata` in a flow (it requires a run logger)."""
+    return write_archive_metadata(bucket, environment, filesystem)
+
+
+@pytest.fixture
+def archives(tmp_path):
+    """Write local daily archives for two environments."""
+    filesystem = fs.LocalFileSystem()
+    bucket = str(tmp_path / "bucket")
+    for environment in (Environment.TEST, Environment.STAGING):
+        for d in range(3):
+            day = date(2024, 12, 30) + timedelta(days=d)
+            path = get_archive_path(bucket, day, environment)
+            filesystem.create_dir(path.rsplit("/", 1)[0])
+            table = pa.table(
+                {
+                    "id_pdc_itinerance": [f"pdc-{i}" for i in range(4)],
+                    "occupation_pdc": ["libre", "occupe", "libre", "occupe"],
+                    "environment": [str(environment)] * 4,
+                }
+            )
+            pq.write_table(table, path, filesystem=filesystem, row_group_size=2)
+    # Archives stored with another layout are ignored
+    filesystem.create_dir(f"{bucket}/2024/12/30")
+    pq.write_table(table, f"{bucket}/2024/12/30/test.parquet", filesystem=filesystem)
+    return bucket, filesystem
+
+
+def test_write_archive_metadata(archives):
+    """Test the `write_archive_metadata` utility."""
+    bucket, filesystem = archives
+    expected = 3
+    assert _write_archive_metadata(bucket, Environment.TEST, filesystem) == expected
+
+    metadata = pq.read_metadata(f"{bucket}/_test_metadata", filesystem=filesystem)
+    assert metadata.num_row_groups == 2 * expected
+    assert metadata.num_rows == 4 * expected
+    assert metadata.row_group(0).column(0).file_path == (
+        "year=2024/month=12/day=30/test.parquet"
+    )
+    assert _write_archive_metadata(bucket, Environment.PRODUCTION, filesystem) == 0
+
+
+@pytest.mark.parametrize("use_metadata", [False, True])
+def test_read_archives(archives, use_metadata):
+    """Test the `read_archives` reader."""
+    bucket, filesystem = archives
+    _write_archive_metadata(bucket, Environment.TEST, filesystem)
+
+    table = read_archives(
+        bucket,
+        Environment.TEST,
+        date(2024, 12, 31),
+        date(2025, 1, 10),
+        filesystem=filesystem,
+        use_metadata=use_metadata,
+    )
+    assert table.num_rows == 8  # noqa: PLR2004
+    assert set(table.column("environment").to_pylist()) == {"test"}
+    days = table.select(["year", "month", "day"]).to_pylist()
+    assert {tuple(day.values()) for day in days} == {(2024, 12, 31), (2025, 1, 1)}
+
+    table = read_archives(
+        bucket,
+        Environment.TEST,
+        date(2024, 12, 30),
+        date(2025, 1, 1),
+        columns=["id_pdc_itinerance", "day"],
+        filter=(ds.field("id_pdc_itinerance") == "pdc-1") & (ds.field("day") == 1),
+        filesystem=filesystem,
+        use_metadata=use_metadata,
+    )
+    assert table.to_pylist() == [{"id_pdc_itinerance": "pdc-1", "day": 1}]
+
+
+def _write_rows(path, filesystem, ids, created_at, **kwargs):
+    """Write archive rows with identifiers and creation datetimes."""
+    filesystem.create_dir(path.rsplit("/", 1)[0])
+    table = pa.table(
+        {
+            "id": ids,
+            "id_pdc_itinerance": [f"pdc-{i % 3}" for i in range(len(ids))],
+            "created_at": pa.array(created_at, pa.timestamp("us", tz="UTC")),
+            "version": [1] * len(ids),
+        }
+    )
+    pq.write_table(table, path, filesystem=filesystem, **kwargs)
+
+
+def test_get_archive_watermark(tmp_path):
+    """Test the `get_archive_watermark` utility."""
+    filesystem = fs.LocalFileSystem()
+    base = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    archive = str(tmp_path / "archive.parquet")
+    delta = str(tmp_path / "delta.parquet")
+    _write_rows(
+        archive,
+        filesystem,
+        ["a", "b", "c"],
+        [base + timedelta(hours=h) for h in (3, 1, 2)],
+        row_group_size=1,
+    )
+    _write_rows(
+        delta,
+        filesystem,
+        ["d"],
+        [base + timedelta(days=2)],
+        write_statistics=False,
+    )
+    assert get_archive_watermark([archive], filesystem) == base + timedelta(hours=3)
+    assert get_archive_watermark([archive, delta], filesystem) == base + timedelta(
+        days=2
+    )
+    assert get_archive_watermark([], filesystem) is None
+
+
+def test_compact_archive(tmp_path):
+    """Test the `compact_archive` utility."""
+    filesystem = fs.LocalFileSystem()
+    bucket = str(tmp_path / "bucket")
+    day = date(2024, 12, 1)
+    base = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    path = get_archive_path(bucket, day, Environment.TEST)
+    _write_rows(path, filesystem, ["a", "b", "c"], [base] * 3)
+    options = ArchiveOptions(sort_by=["id_pdc_itinerance", "id"])
+
+    # No delta
+    assert compact_archive(bucket, day, Environment.TEST, filesystem, options) is None
+
+    first = get_delta_path(bucket, day, Environment.TEST, base)
+    second = get_delta_path(bucket, day, Environment.TEST, base + timedelta(days=1))
+    _write_rows(first, filesystem, ["d", "b"], [base + timedelta(days=1)] * 2)
+    _write_rows(second, filesystem, ["e", "b"], [base + timedelta(days=2)] * 2)
+    # Another environment delta
+    _write_rows(
+        get_delta_path(bucket, day, Environment.STAGING, base),
+        filesystem,
+        ["z"],
+        [base],
+    )
+    assert get_delta_paths(bucket, day, Environment.TEST, filesystem) == [
+        first,
+        second,
+    ]
+    assert get_days_with_deltas(bucket, Environment.TEST, filesystem) == [day]
+
+    expected = 5
+    assert (
+        compact_archive(bucket, day, Environment.TEST, filesystem, options) == expected
+    )
+    assert get_delta_paths(bucket, day, Environment.TEST, filesystem) == []
+    assert get_days_with_deltas(bucket, Environment.TEST, filesystem) == []
+    assert get_days_with_deltas(bucket, Environment.STAGING, filesystem) == [day]
+    assert [
+        info.base_name
+        for info in filesystem.get_file_info(fs.FileSelector(path.rsplit("/", 1)[0]))
+        if info.base_name.startswith("_")
+    ] == []
+
+    table = pq.read_table(path, filesystem=filesystem, partitioning=None)
+    assert table["id"].to_pylist() == ["a", "d", "e", "b", "c"]
+    # The most recent "b" row version is kept
+    created_at = dict(
+        zip(table["id"].to_pylist(), table["created_at"].to_pylist(), strict=True)
+    )
+    assert created_at["b"] == base + timedelta(days=2)
+
+
+def test_compact_archive_interrupted(tmp_path):
+    """Test an interrupted `compact_archive` can be run again."""
+    filesystem = fs.LocalFileSystem()
+    bucket = str(tmp_path / "bucket")
+    day = date(2024, 12, 1)
+    base = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    path = get_archive_path(bucket, day, Environment.TEST)
+    _write_rows(path, filesystem, ["a", "b", "c"], [base] * 3)
+    options = ArchiveOptions(sort_by=["id_pdc_itinerance", "id"])
+    first = get_delta_path(bucket, day, Environment.TEST, base)
+    second = get_delta_path(bucket, day, Environment.TEST, base + timedelta(days=1))
+    _write_rows(first, filesystem, ["d", "b"], [base + timedelta(days=1)] * 2)
+    _write_rows(second, filesystem, ["e", "b"], [base + timedelta(days=2)] * 2)
+    backup = str(tmp_path / "second.parquet")
+    filesystem.copy_file(second, backup)
+
+    expected = 5
+    assert (
+        compact_archive(bucket, day, Environment.TEST, filesystem, options) == expected
+    )
+    compacted = pq.read_table(path, filesystem=filesystem, partitioning=None)
+
+    # Interrupted after the first (oldest) delta deletion
+    filesystem.move(backup, second)
+    assert (
+        compact_archive(bucket, day, Environment.TEST, filesystem, options) == expected
+    )
+    table = pq.read_table(path, filesystem=filesystem, partitioning=None)
+    assert table.equals(compacted)
+    assert table.column_names == ["id", "id_pdc_itinerance", "created_at", "version"]
+    assert get_delta_paths(bucket, day, Environment.TEST, filesystem) == []
+
+    # Already deleted deltas are ignored
+    cooling._delete_files([first, second], filesystem)
+
+
+def test_read_archives_deltas(tmp_path):
+    """Test the `read_archives` reader merges archives deltas."""
+    filesystem = fs.LocalFileSystem()
+    bucket = str(tmp_path / "bucket")
+    day = date(2024, 12, 1)
+    base = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    _write_rows(
+        get_archive_path(bucket, day, Environment.TEST),
+        filesystem,
+        ["a", "b", "c"],
+        [base] * 3,
+    )
+    _write_rows(
+        get_delta_path(bucket, day, Environment.TEST, base),
+        filesystem,
+        ["d", "b"],
+        [base + timedelta(days=1)] * 2,
+    )
+
+    table = read_archives(
+        bucket, Environment.TEST, day, day, columns=["id"], filesystem=filesystem
+    )
+    assert sorted(table["id"].to_pylist()) == ["a", "b", "c", "d"]
+    table = read_archives(
+        bucket,
+        Environment.TEST,
+        day,
+        day,
+        columns=["created_at"],
+        filter=ds.field("id") == "b",
+        filesystem=filesystem,
+    )
+    assert table.to_pylist() == [{"created_at": base + timedelta(days=1)}]
@@ -33,9 +33,9 @@ def test_cool_sessions_for_period_flow(clean_s3fs):
     assert len(results) == expected_states
     assert all((r.type == StateType.COMPLETED for r in results))
     expected_paths = (
-        "qualicharge-sessions/2024/11/29/test.parquet",
-        "qualicharge-sessions/2024/11/30/test.parquet",
-        "qualicharge-sessions/2024/12/1/test.parquet",
+        "qualicharge-sessions/year=2024/month=11/day=29/test.parquet",
+        "qualicharge-sessions/year=2024/month=11/day=30/test.parquet",
+        "qualicharge-sessions/year=2024/month=12/day=01/test.parquet",
     )
     for result, expected_path in zip(results, expected_paths, strict=True):
         assert (
@@ -74,7 +74,7 @@ def test_cool_sessions_for_period_flow_for_a_single_day(clean_s3fs):
     assert len(results) == expected_states
     result = results[0]
     assert result.type == StateType.COMPLETED
-    expected_path = "qualicharge-sessions/2024/12/2/test.parquet"
+    expected_path = "qualicharge-sessions/year=2024/month=12/day=02/test.parquet"
     assert result.message == f"qualicharge-sessions archive '{expected_path}' created"
 
     # Assert parquet file exists and can be opened
@@ -118,7 +118,7 @@ def test_cool_sessions_for_period_flow_check_fails(clean_s3fs, monkeypatch):
 
     monkeypatch.setattr(cooling, "_check_archive", fake_check)
 
-    expected_path = "qualicharge-sessions/2024/11/30/test.parquet"
+    expected_path = "qualicharge-sessions/year=2024/month=11/day=30/test.parquet"
     expected_message = re.escape(
         "Extraction failed for day: 2024-11-30. Reason: "
         f"qualicharge-sessions archive '{expected_path}' and database content"
@@ -162,7 +162,7 @@ def test_extract_old_sessions_flow_archive_exists(clean_s3fs):
         if_exists=IfExistStrategy.IGNORE,
     )
     result = results[0]
-    expected_path = "qualicharge-sessions/2024/11/30/test.parquet"
+    expected_path = "qualicharge-sessions/year=2024/month=11/day=30/test.parquet"
 
     # We expect a single session older than 6 months
     assert len(results) == 1
@@ -228,10 +228,10 @@ def test_extract_old_sessions_flow_archive_exists(clean_s3fs):
     )
     result = results[0]
     assert len(results) == 1
-    assert result.type == StateType.FAILED
-    assert result.message == (
-        f"qualicharge-sessions archive '{expected_path}' already exists and "
-        "concatenation for S3 has not been implemented yet."
+    assert result.type == StateType.COMPLETED
+    assert (
+        result.message
+        == f"qualicharge-sessions archive '{expected_path}' is up to date"
     )
 
 
@@ -250,7 +250,7 @@ def test_cool_sessions_for_period_flow_archive_exists_check(clean_s3fs, monkeypa
         if_exists=IfExistStrategy.IGNORE,
     )
     result = results[0]
-    expected_path = "qualicharge-sessions/2024/11/30/test.parquet"
+    expected_path = "qualicharge-sessions/year=2024/month=11/day=30/test.parquet"
 
     # We expect a single session older than 6 months
     assert len(results) == 1
@@ -313,7 +313,7 @@ def test_daily_cool_sessions_flow(clean_s3fs):
 
     # We expect an archive to have been generated for 2025-01-01
     assert result.type == StateType.COMPLETED
-    expected_path = "qualicharge-sessions/2025/1/1/test.parquet"
+    expected_path = "qualicharge-sessions/year=2025/month=01/day=01/test.parquet"
     assert result.message == f"qualicharge-sessions archive '{expected_path}' created"
 
     s3_endpoint_url = os.environ.get("S3_ENDPOINT_URL", None)
@@ -2,13 +2,17 @@
 
 import os
 import re
+import threading
+import time
 from datetime import date
 
 import pandas as pd
 import pytest
 from freezegun import freeze_time
+from prefect import task
 from prefect.client.schemas.objects import StateType
 from prefect.exceptions import FailedRun
+from prefect.states import Completed, Failed
 
 import cooling
 from cooling import IfExistStrategy
@@ -33,9 +37,9 @@ def test_cool_statuses_for_period_flow(clean_s3fs):
     assert len(results) == expected_states
     assert all((r.type == StateType.COMPLETED for r in results))
     expected_paths = (
-        "qualicharge-statuses/2024/7/13/test.parquet",
-        "qualicharge-statuses/2024/7/14/test.parquet",
-        "qualicharge-statuses/2024/7/15/test.parquet",
+        "qualicharge-statuses/year=2024/month=07/day=13/test.parquet",
+        "qualicharge-statuses/year=2024/month=07/day=14/test.parquet",
+        "qualicharge-statuses/year=2024/month=07/day=15/test.parquet",
     )
     for result, expected_path in zip(results, expected_paths, strict=True):
         assert (
@@ -69,7 +73,7 @@ def test_cool_statuses_for_period_flow_check_fails(clean_s3fs, monkeypatch):
 
     monkeypatch.setattr(cooling, "_check_archive", fake_check)
 
-    expected_path = "qualicharge-statuses/2024/6/6/test.parquet"
+    expected_path = "qualicharge-statuses/year=2024/month=06/day=06/test.parquet"
     expected_message = re.escape(
         "Extraction failed for day: 2024-06-06. Reason: "
         f"qualicharge-statuses archive '{expected_path}' and database content"
@@ -110,7 +114,7 @@ def test_cool_statuses_for_period_flow_archive_exists(clean_s3fs):
         environment=Environment.TEST,
         if_exists=IfExistStrategy.IGNORE,
     )
-    expected_path = "qualicharge-statuses/2024/6/6/test.parquet"
+    expected_path = "qualicharge-statuses/year=2024/month=06/day=06/test.parquet"
     result = results[0]
 
     # We expect a single status older than a year
@@ -177,10 +181,10 @@ def test_cool_statuses_for_period_flow_archive_exists(clean_s3fs):
     )
     result = results[0]
     assert len(results) == 1
-    assert result.type == StateType.FAILED
-    assert result.message == (
-        f"qualicharge-statuses archive '{expected_path}' already exists and "
-        "concatenation for S3 has not been implemented yet."
+    assert result.type == StateType.COMPLETED
+    assert (
+        result.message
+        == f"qualicharge-statuses archive '{expected_path}' is up to date"
     )
 
 
@@ -196,7 +200,7 @@ def test_cool_statuses_for_period_flow_archive_exists_check(clean_s3fs, monkeypa
         if_exists=IfExistStrategy.IGNORE,
     )
     result = results[0]
-    expected_path = "qualicharge-statuses/2024/6/6/test.parquet"
+    expected_path = "qualicharge-statuses/year=2024/month=06/day=06/test.parquet"
 
     # We expect a single status older than a year
     assert len(results) == 1
@@ -246,6 +250,143 @@ def test_cool_statuses_for_period_flow_archive_exists_check(clean_s3fs, monkeypa
     )
 
 
+@pytest.mark.parametrize(
+    "clean_s3fs", ["qualicharge-statuses"], indirect=["clean_s3fs"]
+)
+def test_cool_statuses_for_period_flow_archive_exists_repair(clean_s3fs, monkeypatch):
+    """Test the `cool_statuses_for_period` flow with the REPAIR strategy."""
+    expected_path = "qualicharge-statuses/year=2024/month=06/day=06/test.parquet"
+    results = cool_statuses_for_period(
+        from_date=date(2024, 6, 6),
+        to_date=date(2024, 6, 6),
+        environment=Environment.TEST,
+        if_exists=IfExistStrategy.REPAIR,
+    )
+    assert (
+        results[0].message == f"qualicharge-statuses archive '{expected_path}' created"
+    )
+
+    # Valid archives are skipped
+    results = cool_statuses_for_period(
+        from_date=date(2024, 6, 6),
+        to_date=date(2024, 6, 6),
+        environment=Environment.TEST,
+        if_exists=IfExistStrategy.REPAIR,
+    )
+    result = results[0]
+    assert result.type == StateType.COMPLETED
+    assert result.message == (
+        f"qualicharge-statuses archive '{expected_path}' already exists "
+        "and is valid. It contains 2 rows."
+    )
+
+    # Invalid archives are overwritten
+    checks = iter([(False, 1, 2), (True, 2, 2)])
+    monkeypatch.setattr(cooling, "_check_archive", lambda *args: next(checks))
+    results = cool_statuses_for_period(
+        from_date=date(2024, 6, 6),
+        to_date=date(2024, 6, 6),
+        environment=Environment.TEST,
+        if_exists=IfExistStrategy.REPAIR,
+    )
+    result = results[0]
+    assert result.type == StateType.COMPLETED
+    assert result.message == f"qualicharge-statuses archive '{expected_path}' created"
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 2, 5])
+def test_cool_statuses_for_period_flow_concurrency(monkeypatch, max_concurrency):
+    """Test the `cool_statuses_for_period` flow extraction concurrency."""
+    running: list[date] = []
+    max_running: list[int] = [0]
+    lock = threading.Lock()
+
+    @task
+    def fake_extract_data_for_day(day, *args, **kwargs):
+        with lock:
+            running.append(day)
+            max_running[0] = max(max_running[0], len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(day)
+        if day == date(2024, 6, 8):
+            return Failed(message="Oops")
+        return Completed(message=f"{day} extracted")
+
+    monkeypatch.setenv("S3_ENDPOINT_URL", "http://localhost:9000")
+
+    @task
+    def fake_update_archive_metadata(*args):
+        return 0
+
+    monkeypatch.setattr(cooling, "extract_data_for_day", fake_extract_data_for_day)
+    monkeypatch.setattr(
+        cooling, "update_archive_metadata", fake_update_archive_metadata
+    )
+    results = cool_statuses_for_period(
+        from_date=date(2024, 6, 1),
+        to_date=date(2024, 6, 10),
+        environment=Environment.TEST,
+        ignore_errors=True,
+        max_concurrency=max_concurrency,
+    )
+    assert max_running[0] == max_concurrency
+    expected = 10
+    assert len(results) == expected
+    assert [r.type for r in results].count(StateType.FAILED) == 1
+    assert results[0].message == "2024-06-01 extracted"
+
+    # Extraction stops submitting days after a failure
+    with pytest.raises(FailedRun, match="Extraction failed for day: 2024-06-08"):
+        cool_statuses_for_period(
+            from_date=date(2024, 6, 1),
+            to_date=date(2024, 6, 10),
+            environment=Environment.TEST,
+            max_concurrency=max_concurrency,
+        )
+
+
+def test_cool_statuses_for_period_flow_first_completed(monkeypatch):
+    """Test a slow extraction does not delay next days extractions."""
+    completed: list[date] = []
+
+    @task
+    def fake_extract_data_for_day(day, *args, **kwargs):
+        time.sleep(0.5 if day == date(2024, 6, 1) else 0.05)
+        completed.append(day)
+        return Completed(message=f"{day} extracted")
+
+    @task
+    def fake_update_archive_metadata(*args):
+        return 0
+
+    monkeypatch.setenv("S3_ENDPOINT_URL", "http://localhost:9000")
+    monkeypatch.setattr(cooling, "extract_data_for_day", fake_extract_data_for_day)
+    monkeypatch.setattr(
+        cooling, "update_archive_metadata", fake_update_archive_metadata
+    )
+    results = cool_statuses_for_period(
+        from_date=date(2024, 6, 1),
+        to_date=date(2024, 6, 5),
+        environment=Environment.TEST,
+        max_concurrency=2,
+    )
+    assert [r.type for r in results] == [StateType.COMPLETED] * 5
+    assert completed[-1] == date(2024, 6, 1)
+
+
+@pytest.mark.parametrize("max_concurrency", [0, -1])
+def test_cool_statuses_for_period_flow_invalid_concurrency(max_concurrency):
+    """Test the `cool_statuses_for_period` flow with an invalid concurrency."""
+    with pytest.raises(ValueError, match="max_concurrency should be a positive"):
+        cool_statuses_for_period(
+            from_date=date(2024, 6, 1),
+            to_date=date(2024, 6, 2),
+            environment=Environment.TEST,
+            max_concurrency=max_concurrency,
+        )
+
+
 @pytest.mark.parametrize(
     "clean_s3fs", ["qualicharge-statuses"], indirect=["clean_s3fs"]
 )
@@ -258,7 +399,7 @@ def test_daily_cool_statuses_flow(clean_s3fs):
 
     # We expect an archive to have been generated for 2024-11-19
     assert result.type == StateType.COMPLETED
-    expected_path = "qualicharge-statuses/2024/11/19/test.parquet"
+    expected_path = "qualicharge-statuses/year=2024/month=11/day=19/test.parquet"
     assert result.message == f"qualicharge-statuses archive '{expected_path}' created"
 
     s3_endpoint_url = os.environ.get("S3_ENDPOINT_URL", None)
@@ -72,6 +72,25 @@ def test_flow_e4_for_level_with_various_chunk_sizes(chunk_size):
     )
 
 
+@pytest.mark.parametrize("level", [Level.NATIONAL, Level.DEPARTMENT])
+def test_flow_e4_for_level_with_store(level):
+    """Test the `e4_for_level` flow when lists are stored as parquet files."""
+    indicators = e4.e4_for_level(level, TIMESPAN, Environment.TEST, chunk_size=50)
+    stored = e4.e4_for_level(
+        level, TIMESPAN, Environment.TEST, chunk_size=50, store=True
+    )
+    assert stored["value"].equals(indicators["value"])
+
+    store_path = e4.get_store_path(level, TIMESPAN, Environment.TEST)
+    assert all(extras == {"store": store_path} for extras in stored["extras"])
+    for (_, row), expected in zip(
+        stored.head(3).iterrows(), indicators.head(3)["extras"], strict=True
+    ):
+        assert sorted(e4.read_stored_list(row["extras"], row["target"])) == sorted(
+            expected["list"]
+        )
+
+
 def test_flow_e4_national():
     """Test the `e4_national` flow."""
     indicators = e4.e4_national(TIMESPAN, TIMESPAN_QUERY, Environment.TEST)
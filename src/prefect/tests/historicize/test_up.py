@@ -202,6 +202,35 @@ def test_to_historicization_up_with_ignored_data():
     assert len(mensuel) == SIZE + 1
 
 
+def test_to_historicization_up_periods():
+    """Test 'to_historicization_up_periods' function."""
+    extras = True
+    duree = 10
+    histo = init_dataframe(SIZE, duree, extras)
+    histos = up.to_historicization_up_periods(
+        histo, IndicatorPeriod.DAY, [IndicatorPeriod.WEEK, IndicatorPeriod.MONTH]
+    )
+    # 2024-01-01 is a monday: 7 days the first week, 3 days the second week
+    assert len(histos) == SIZE * 3
+    assert list(histos["period"].unique()) == ["w", "m"]
+
+    weekly = histos[histos["period"] == "w"]
+    assert sorted(weekly["timestamp"].unique()) == [
+        "2024-01-01T00:00:00+00:00",
+        "2024-01-08T00:00:00+00:00",
+    ]
+    df = pd.json_normalize(list(weekly["extras"]), max_level=0)
+    df = pd.json_normalize(list(df["history"]), max_level=0)
+    assert list(df["size"]) == [7] * SIZE + [3] * SIZE
+
+    # monthly historicization is the same as the one calculated for a timespan
+    monthly = histos[histos["period"] == "m"].reset_index(drop=True)
+    mensuel = up.to_historicization_up(histo, IndicatorPeriod.DAY, TIMESPAN)
+    assert monthly["value"].equals(mensuel["value"])
+    assert list(monthly["extras"]) == list(mensuel["extras"])
+    assert list(monthly["timestamp"].unique()) == ["2024-01-01T00:00:00+00:00"]
+
+
 def test_flow_up():
     """Test the `up` flow."""
     indicators = i1.i1(
@@ -0,0 +1,228 @@
+"""QualiCharge prefect indicators tests: hot and cold data access."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pyarrow import dataset as ds
+from pyarrow import fs
+from pyarrow import parquet as pq
+
+from cooling import get_archive_path, get_delta_path
+from indicators import access
+from indicators.access import (
+    STATUSES,
+    DataSource,
+    DataSpan,
+    get_spans,
+    read_data,
+    scan_archives,
+)
+from indicators.types import Environment
+
+UTC = timezone.utc
+ARCHIVED_DAYS = [date(2024, 12, 1), date(2024, 12, 2), date(2024, 12, 4)]
+
+
+@pytest.fixture
+def archives(tmp_path):
+    """Write local statuses archives (one status per hour)."""
+    filesystem = fs.LocalFileSystem()
+    table = STATUSES.model_copy(update={"bucket": str(tmp_path / STATUSES.bucket)})
+    for day in ARCHIVED_DAYS:
+        path = get_archive_path(table.bucket, day, Environment.TEST)
+        filesystem.create_dir(path.rsplit("/", 1)[0])
+        start = datetime(day.year, day.month, day.day, tzinfo=UTC)
+        pq.write_table(
+            pa.table(
+                {
+                    "id_pdc_itinerance": [f"FR{h % 2}" for h in range(24)],
+                    "horodatage": [start + timedelta(hours=h) for h in range(24)],
+                    "occupation_pdc": ["libre"] * 24,
+                }
+            ),
+            path,
+            filesystem=filesystem,
+        )
+    return table, filesystem
+
+
+def test_get_spans(archives):
+    """Test the `get_spans` planner."""
+    table, filesystem = archives
+    start = datetime(2024, 12, 1, 12, tzinfo=UTC)
+    end = datetime(2024, 12, 5, 6, tzinfo=UTC)
+
+    assert get_spans(table, Environment.TEST, start, end, filesystem=filesystem) == [
+        DataSpan(
+            source=DataSource.ARCHIVE,
+            start=start,
+            end=datetime(2024, 12, 3, tzinfo=UTC),
+        ),
+        DataSpan(
+            source=DataSource.DATABASE,
+            start=datetime(2024, 12, 3, tzinfo=UTC),
+            end=datetime(2024, 12, 4, tzinfo=UTC),
+        ),
+        DataSpan(
+            source=DataSource.ARCHIVE,
+            start=datetime(2024, 12, 4, tzinfo=UTC),
+            end=datetime(2024, 12, 5, tzinfo=UTC),
+        ),
+        DataSpan(
+            source=DataSource.DATABASE,
+            start=datetime(2024, 12, 5, tzinfo=UTC),
+            end=end,
+        ),
+    ]
+
+    spans = get_spans(
+        table, Environment.TEST, start, end, DataSource.ARCHIVE, filesystem
+    )
+    assert [span.source for span in spans] == [DataSource.ARCHIVE] * 2
+
+    spans = get_spans(table, Environment.TEST, start, end, DataSource.DATABASE)
+    assert spans == [DataSpan(source=DataSource.DATABASE, start=start, end=end)]
+    assert get_spans(table, Environment.TEST, end, start, filesystem=filesystem) == []
+
+
+def test_scan_archives(archives):
+    """Test the `scan_archives` reader."""
+    table, filesystem = archives
+    result = scan_archives(
+        table,
+        Environment.TEST,
+        # Naive datetimes are UTC
+        datetime(2024, 12, 1, 22),
+        datetime(2024, 12, 2, 2),
+        filesystem=filesystem,
+    )
+    expected = 4
+    assert result.num_rows == expected
+    assert result.column_names == ["id_pdc_itinerance", "horodatage", "occupation_pdc"]
+
+    result = scan_archives(
+        table,
+        Environment.TEST,
+        datetime(2024, 12, 1, tzinfo=UTC),
+        datetime(2024, 12, 10, tzinfo=UTC),
+        columns=["horodatage"],
+        filter=ds.field("id_pdc_itinerance") == "FR1",
+        filesystem=filesystem,
+    )
+    assert result.num_rows == 12 * len(ARCHIVED_DAYS)
+    assert result.column_names == ["horodatage"]
+
+    result = scan_archives(
+        table,
+        Environment.TEST,
+        datetime(2024, 12, 10, tzinfo=UTC),
+        datetime(2024, 12, 11, tzinfo=UTC),
+        columns=["horodatage"],
+        filesystem=filesystem,
+    )
+    assert result.num_rows == 0
+
+
+def test_scan_archives_with_delta(tmp_path):
+    """Test the `scan_archives` reader merges not yet compacted deltas."""
+    filesystem = fs.LocalFileSystem()
+    table = STATUSES.model_copy(update={"bucket": str(tmp_path / STATUSES.bucket)})
+    day = date(2024, 12, 1)
+    start = datetime(2024, 12, 1, tzinfo=UTC)
+    path = get_archive_path(table.bucket, day, Environment.TEST)
+    filesystem.create_dir(path.rsplit("/", 1)[0])
+    pq.write_table(
+        pa.table(
+            {
+                "id": ["a", "b"],
+                "horodatage": [start, start + timedelta(hours=1)],
+                "occupation_pdc": ["libre", "libre"],
+            }
+        ),
+        path,
+        filesystem=filesystem,
+    )
+    # A late row and a new version of the "b" row
+    pq.write_table(
+        pa.table(
+            {
+                "id": ["c", "b"],
+                "horodatage": [start + timedelta(hours=2), start + timedelta(hours=1)],
+                "occupation_pdc": ["occupe", "occupe"],
+            }
+        ),
+        get_delta_path(table.bucket, day, Environment.TEST, start),
+        filesystem=filesystem,
+    )
+
+    # Days with a pending delta are still read from the archives
+    assert [
+        span.source
+        for span in get_spans(
+            table,
+            Environment.TEST,
+            start,
+            start + timedelta(days=1),
+            filesystem=filesystem,
+        )
+    ] == [DataSource.ARCHIVE]
+
+    result = scan_archives(
+        table,
+        Environment.TEST,
+        start,
+        start + timedelta(days=1),
+        columns=["occupation_pdc", "horodatage"],
+        filesystem=filesystem,
+    )
+    assert result.column_names == ["occupation_pdc", "horodatage"]
+    assert sorted(result.to_pylist(), key=lambda row: row["horodatage"]) == [
+        {"occupation_pdc": "libre", "horodatage": start},
+        {"occupation_pdc": "occupe", "horodatage": start + timedelta(hours=1)},
+        {"occupation_pdc": "occupe", "horodatage": start + timedelta(hours=2)},
+    ]
+
+
+def test_read_data(archives, monkeypatch):
+    """Test the `read_data` reader with hot and cold data."""
+    table, filesystem = archives
+    hot_spans = []
+
+    def fake_read_database(table, environment, start, end, columns):
+        hot_spans.append((start, end))
+        return pd.DataFrame({"horodatage": [start]})
+
+    monkeypatch.setattr(access, "read_database", fake_read_database)
+    start = datetime(2024, 12, 2, 20, tzinfo=UTC)
+    end = datetime(2024, 12, 4, 2, tzinfo=UTC)
+
+    data = read_data(
+        table,
+        Environment.TEST,
+        start,
+        end,
+        columns=["horodatage"],
+        filesystem=filesystem,
+    )
+    assert hot_spans == [
+        (datetime(2024, 12, 3, tzinfo=UTC), datetime(2024, 12, 4, tzinfo=UTC))
+    ]
+    expected = 4 + 1 + 2
+    assert len(data) == expected
+    assert list(data.columns) == ["horodatage"]
+
+    # Backfills do not touch the database
+    hot_spans.clear()
+    data = read_data(
+        table,
+        Environment.TEST,
+        start,
+        end,
+        columns=["horodatage"],
+        source=DataSource.ARCHIVE,
+        filesystem=filesystem,
+    )
+    assert hot_spans == []
+    assert len(data) == expected - 1
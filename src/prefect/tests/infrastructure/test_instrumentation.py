@@ -0,0 +1,167 @@
+"""QualiCharge prefect indicators tests: queries instrumentation."""
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from indicators import instrumentation
+from indicators.conf import settings
+
+PLAN = {
+    "Plan": {
+        "Node Type": "Hash Join",
+        "Plans": [
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "session",
+                "Alias": "session",
+            },
+            {
+                "Node Type": "Hash",
+                "Plans": [
+                    {
+                        "Node Type": "Seq Scan",
+                        "Relation Name": "city",
+                        "Alias": "city",
+                    },
+                    {
+                        "Node Type": "Index Scan",
+                        "Relation Name": "status",
+                        "Alias": "status",
+                    },
+                ],
+            },
+        ],
+    },
+    "Execution Time": 12.3,
+}
+# TimescaleDB hypertable scan (through its chunks)
+CHUNKS_PLAN = {
+    "Plan": {
+        "Node Type": "Custom Scan",
+        "Custom Plan Provider": "ChunkAppend",
+        "Relation Name": "status",
+        "Alias": "status",
+        "Plans": [
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "_hyper_2_10_chunk",
+                "Schema": "_timescaledb_internal",
+                "Alias": "_hyper_2_10_chunk",
+            },
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "_hyper_2_11_chunk",
+                "Schema": "_timescaledb_internal",
+                "Alias": "_hyper_2_11_chunk",
+            },
+            {
+                "Node Type": "Index Scan",
+                "Relation Name": "_hyper_2_12_chunk",
+                "Schema": "_timescaledb_internal",
+                "Alias": "_hyper_2_12_chunk",
+            },
+        ],
+    },
+}
+CHUNKS = {f"_hyper_2_{n}_chunk": "status" for n in (10, 11, 12)}
+
+
+def test_get_query_sha():
+    """Test the `get_query_sha` function."""
+    sha = instrumentation.get_query_sha("SELECT 1")
+    assert len(sha) == 64  # noqa: PLR2004
+    assert sha == instrumentation.get_query_sha("SELECT 1")
+    assert sha != instrumentation.get_query_sha("SELECT 2")
+
+
+def test_find_seq_scans():
+    """Test the `find_seq_scans` function."""
+    assert instrumentation.find_seq_scans(PLAN, ["session", "status"]) == ["session"]
+    assert instrumentation.find_seq_scans(PLAN, ["city"]) == ["city"]
+    assert instrumentation.find_seq_scans(PLAN, ["status"]) == []
+    assert instrumentation.find_seq_scans({"Node Type": "Result"}, ["status"]) == []
+
+
+def test_find_seq_scans_hypertable_chunks():
+    """Test the `find_seq_scans` function with hypertables chunks scans."""
+    assert instrumentation.find_chunk_scans(CHUNKS_PLAN) == [
+        "_hyper_2_11_chunk",
+        "_hyper_2_10_chunk",
+    ]
+    assert instrumentation.find_chunk_scans(PLAN) == []
+    assert instrumentation.find_seq_scans(CHUNKS_PLAN, ["status"]) == []
+    assert instrumentation.find_seq_scans(CHUNKS_PLAN, ["status"], CHUNKS) == ["status"]
+    assert instrumentation.find_seq_scans(CHUNKS_PLAN, ["session"], CHUNKS) == []
+
+
+def test_get_chunks_hypertable():
+    """Test the `get_chunks_hypertable` function without chunks."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        assert instrumentation.get_chunks_hypertable([], connection) == {}
+
+
+def test_read_sql_query(monkeypatch):
+    """Test the `read_sql_query` function."""
+    reported = []
+    monkeypatch.setattr(instrumentation, "report_query_stats", reported.append)
+    engine = create_engine("sqlite://")
+    query = "SELECT 1 AS value UNION SELECT 2 AS value"
+
+    # Instrumentation is not active
+    with engine.connect() as connection:
+        result = instrumentation.read_sql_query(query, connection)
+    assert result.equals(pd.DataFrame({"value": [1, 2]}))
+    assert reported == []
+
+    # Instrumentation is active
+    monkeypatch.setattr(settings, "QUERY_INSTRUMENTATION", True)
+    with engine.connect() as connection:
+        result = instrumentation.read_sql_query(query, connection)
+    assert result.equals(pd.DataFrame({"value": [1, 2]}))
+    assert len(reported) == 1
+    stats = reported[0]
+    assert stats.sha == instrumentation.get_query_sha(query)
+    assert stats.rows == 2  # noqa: PLR2004
+    assert stats.duration > 0
+    assert stats.plan is None
+    assert stats.seq_scans == []
+
+
+def test_read_sql_query_with_explain(monkeypatch):
+    """Test the `read_sql_query` function with query plan analysis."""
+    reported = []
+    monkeypatch.setattr(instrumentation, "report_query_stats", reported.append)
+    monkeypatch.setattr(instrumentation, "explain", lambda query, con: PLAN)
+    monkeypatch.setattr(settings, "QUERY_INSTRUMENTATION", True)
+    monkeypatch.setattr(settings, "QUERY_EXPLAIN", True)
+    engine = create_engine("sqlite://")
+
+    with engine.connect() as connection:
+        instrumentation.read_sql_query("SELECT 1 AS value", connection)
+    stats = reported[0]
+    assert stats.plan == PLAN
+    assert stats.seq_scans == ["session"]
+
+    # Hypertable chunks are resolved
+    monkeypatch.setattr(instrumentation, "explain", lambda query, con: CHUNKS_PLAN)
+    monkeypatch.setattr(
+        instrumentation,
+        "get_chunks_hypertable",
+        lambda chunks, con: {chunk: CHUNKS[chunk] for chunk in chunks},
+    )
+    with engine.connect() as connection:
+        instrumentation.read_sql_query("SELECT 1 AS value", connection)
+    assert reported[1].seq_scans == ["status"]
+
+
+def test_report_query_stats():
+    """Test the `report_query_stats` function."""
+    stats = instrumentation.QueryStats(
+        sha=instrumentation.get_query_sha("SELECT 1"),
+        duration=0.1,
+        rows=1,
+        seq_scans=["session"],
+        plan=PLAN,
+    )
+    instrumentation.report_query_stats(stats)
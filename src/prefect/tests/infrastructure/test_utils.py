@@ -10,7 +10,10 @@ import pytest  # type: ignore
 from indicators.infrastructure import i1
 from indicators.models import IndicatorPeriod, Level
 from indicators.types import Environment
-from indicators.utils import get_period_start_from_pit
+from indicators.utils import (
+    get_num_for_level_query_params,
+    get_period_start_from_pit,
+)
 
 PARAMETERS_GET_TARGETS = [
     (Level.CITY, 35074),
@@ -33,6 +36,35 @@ def test_task_get_targets_for_level_unexpected_level():
         i1.get_targets_for_level.fn(Level.NATIONAL, Environment.TEST)
 
 
+@pytest.mark.parametrize(
+    "level,prefix",
+    [
+        (Level.CITY, "city"),
+        (Level.EPCI, "epci"),
+        (Level.DEPARTMENT, "department"),
+        (Level.REGION, "region"),
+        (Level.OPERATIONALUNIT, "operational_unit"),
+    ],
+)
+def test_get_num_for_level_query_params(level, prefix):
+    """Test the `get_num_for_level_query_params` function."""
+    assert get_num_for_level_query_params(level) == {
+        "level_id": f"PdcLevels.{prefix}_id",
+        "level_code": f"PdcLevels.{prefix}_code",
+        "join_extras": "INNER JOIN PdcLevels ON PdcLevels.pdc_id = statique.pdc_id",
+    }
+    params = get_num_for_level_query_params(level, pdc_id="point_de_charge_id")
+    assert params["join_extras"] == (
+        "INNER JOIN PdcLevels ON PdcLevels.pdc_id = point_de_charge_id"
+    )
+
+
+def test_get_num_for_level_query_params_unexpected_level():
+    """Test the `get_num_for_level_query_params` function (unexpected level)."""
+    with pytest.raises(NotImplementedError, match="Unsupported level"):
+        get_num_for_level_query_params(Level.NATIONAL)
+
+
 def test_get_period_start_from_pit():
     """Test the 'get_period_start_from_pit' function."""
     tst = datetime(2024, 1, 10)
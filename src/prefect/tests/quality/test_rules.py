@@ -0,0 +1,144 @@
+"""QualiCharge prefect quality tests: session rules."""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from quality.expectations.rules import (
+    ENEA_RULE,
+    ENEU_RULE,
+    ENEX_RULE,
+    NEGS_RULE,
+    SessionRule,
+    evaluate_rules,
+    flag_overlaps,
+    get_session_quantities,
+)
+
+SESSIONS = pd.DataFrame(
+    {
+        "from": [
+            datetime(2024, 12, 25, 20, 0, 0),
+            datetime(2024, 12, 25, 20, 0, 0),
+            datetime(2024, 12, 25, 20, 0, 0),
+            datetime(2024, 12, 25, 20, 0, 0),
+            datetime(2024, 12, 25, 20, 0, 0),
+        ],
+        "to": [
+            datetime(2024, 12, 25, 21, 0, 0),
+            datetime(2024, 12, 25, 19, 0, 0),
+            datetime(2024, 12, 25, 21, 0, 0),
+            datetime(2024, 12, 25, 21, 0, 0),
+            datetime(2024, 12, 25, 20, 0, 0),
+        ],
+        "max_power": [22.0, 22.0, 22.0, 22.0, 22.0],
+        "energy": [20.0, 10.0, 1200.0, 30.0, 60.0],
+    },
+    index=[10, 11, 12, 13, 14],
+)
+
+
+def test_get_session_quantities():
+    """Test the `get_session_quantities` function."""
+    quantities = get_session_quantities(SESSIONS)
+    assert list(quantities) == ["duration", "energy", "max_power", "max_energy"]
+    assert list(quantities["duration"]) == [3600.0, -3600.0, 3600.0, 3600.0, 0.0]
+    assert list(quantities["max_energy"]) == [22.0, -22.0, 22.0, 22.0, 0.0]
+
+    quantities = get_session_quantities(SESSIONS[["energy"]], ["energy"])
+    assert list(quantities) == ["energy"]
+
+
+def test_session_rule_quantities():
+    """Test the `SessionRule.quantities` property."""
+    assert NEGS_RULE.quantities == ["duration"]
+    assert ENEU_RULE.quantities == ["energy"]
+    assert ENEA_RULE.quantities == ["duration", "energy", "max_power", "max_energy"]
+
+
+@pytest.mark.parametrize(
+    "rule,expected",
+    [
+        (NEGS_RULE, [False, True, False, False, False]),
+        (ENEU_RULE, [False, False, True, False, False]),
+        (ENEA_RULE, [False, True, False, True, False]),
+        (ENEX_RULE, [False, False, False, False, False]),
+    ],
+)
+def test_session_rule_evaluate(rule, expected):
+    """Test the `SessionRule.evaluate` method."""
+    result = rule.evaluate(SESSIONS)
+    assert list(result.index) == list(SESSIONS.index)
+    assert list(result) == expected
+
+
+def test_session_rule_to_sql():
+    """Test the `SessionRule.to_sql` method."""
+    rule = SessionRule(
+        code="TEST", expression="duration < 0 and energy > max_energy * 2"
+    )
+    assert rule.to_sql() == (
+        "((extract('epoch' FROM (session.end - session.start))) < 0"
+        " and (energy) > (extract('epoch' FROM (session.end - session.start))"
+        " / 3600.0 * puissance_nominale) * 2)"
+    )
+    assert ENEU_RULE.to_sql() == "((energy) > 1000)"
+
+
+def test_evaluate_rules():
+    """Test the `evaluate_rules` function."""
+    flags = evaluate_rules(SESSIONS, [NEGS_RULE, ENEU_RULE])
+    assert list(flags.columns) == ["negs", "eneu"]
+    assert list(flags.index) == list(SESSIONS.index)
+    assert flags.sum().to_dict() == {"negs": 1, "eneu": 1}
+
+
+def test_flag_overlaps():
+    """Test the `flag_overlaps` function."""
+    sessions = pd.DataFrame(
+        {
+            "session_id": ["a", "b", "c", "d", "e", "f", "g"],
+            "id_pdc_itinerance": ["P1", "P1", "P1", "P1", "P2", "P2", "P1"],
+            "from": [
+                datetime(2024, 12, 25, 8, 0, 0),
+                # Contained in "a"
+                datetime(2024, 12, 25, 9, 0, 0),
+                # Overlaps "a" but not "b" (the preceding session)
+                datetime(2024, 12, 25, 11, 0, 0),
+                # Duplicate of "a"
+                datetime(2024, 12, 25, 8, 0, 0),
+                datetime(2024, 12, 25, 8, 0, 0),
+                # Another point of charge: no overlap
+                datetime(2024, 12, 25, 13, 0, 0),
+                # After all P1 sessions
+                datetime(2024, 12, 25, 12, 0, 0),
+            ],
+            "to": [
+                datetime(2024, 12, 25, 12, 0, 0),
+                datetime(2024, 12, 25, 10, 0, 0),
+                datetime(2024, 12, 25, 11, 30, 0),
+                datetime(2024, 12, 25, 12, 0, 0),
+                datetime(2024, 12, 25, 13, 0, 0),
+                datetime(2024, 12, 25, 14, 0, 0),
+                datetime(2024, 12, 25, 13, 0, 0),
+            ],
+        },
+        index=[7, 6, 5, 4, 3, 2, 1],
+    )
+    flags = flag_overlaps(sessions)
+    assert list(flags.index) == list(sessions.index)
+    assert list(flags["duplicate"]) == [False, False, False, True, False, False, False]
+    assert list(flags["overlap"]) == [False, True, True, True, False, False, False]
+    assert list(flags["overlapped"].fillna("")) == ["", "d", "d", "a", "", "", ""]
+
+    # Use index labels when session identifiers are missing
+    flags = flag_overlaps(sessions.drop(columns="session_id"))
+    assert list(flags["overlapped"].fillna(0)) == [0, 4, 4, 7, 0, 0, 0]
+
+
+def test_flag_overlaps_empty():
+    """Test the `flag_overlaps` function with no session."""
+    flags = flag_overlaps(SESSIONS.iloc[:0].assign(id_pdc_itinerance=""))
+    assert flags.empty
+    assert list(flags.columns) == ["duplicate", "overlap", "overlapped"]
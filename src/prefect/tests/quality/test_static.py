@@ -1,10 +1,20 @@
 """QualiCharge prefect quality tests: static data."""
 
+from datetime import date, datetime, timezone
+
+import great_expectations as gx
+import great_expectations.expectations as gxe
+import pandas as pd
 import pytest
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 
+from indicators.models import IndicatorPeriod, Level
 from indicators.types import Environment
+from quality.expectations import static as static_expectations
+from quality.expectations.static import amenageur_expectations, pdc_expectations
 from quality.flows import quality_run, static
+from quality.schemas import StaticRun
 
 
 def test_get_db_units():
@@ -95,3 +105,315 @@ def test_run_indicator_validation_by_unit(indicators_db_engine):
         """
         result = connection.execute(text(query))
         assert result.one()[0] == 1
+
+
+def test_run_api_db_validation_by_unit_grouped(monkeypatch):
+    """Run API database grouped validation by unit.
+
+    Grouped and checkpoint (by unit) validations report and indicators are equal.
+    """
+    units = ["FRTSL", "FRIOY", "FRELC", "FRS63"]
+    monkeypatch.setattr(quality_run, "get_db_units", lambda _: units)
+    indicators = []
+    monkeypatch.setattr(
+        quality_run,
+        "_publish_by_unit_report",
+        lambda report, values, *args, **kwargs: indicators.append(values),
+    )
+    report = static.run_api_db_validation_by_unit(
+        Environment.TEST, report_by_email=False
+    )
+    grouped = static.run_api_db_validation_by_unit(
+        Environment.TEST, report_by_email=False, grouped=True
+    )
+    assert grouped == report
+    expected, values = (
+        values.sort_values(["target", "category"], ignore_index=True)
+        for values in indicators
+    )
+    assert not expected.empty
+    pd.testing.assert_frame_equal(values, expected, check_dtype=False)
+
+
+def test_run_api_db_validation_by_unit_incremental(monkeypatch, quality_db_engine):
+    """Run API database incremental validation by unit."""
+    units = ["FRTSL", "FRIOY", "FRELC", "FRS63"]
+    monkeypatch.setattr(quality_run, "get_db_units", lambda _: units)
+    grouped = static.run_api_db_validation_by_unit(
+        Environment.TEST, report_by_email=False, grouped=True
+    )
+    # Full evaluation (no previous run), then nothing to re-evaluate
+    for _ in range(2):
+        incremental = static.run_api_db_validation_by_unit(
+            Environment.TEST, report_by_email=False, incremental=True
+        )
+        assert incremental == grouped
+    with Session(quality_db_engine) as session:
+        assert session.get(StaticRun, Environment.TEST.value) is not None
+
+
+def test_run_api_db_validation_by_unit_incremental_indicators(
+    monkeypatch, quality_db_engine
+):
+    """Test incremental and grouped validations quality indicators values."""
+    units = ["FRTSL", "FRIOY", "FRELC", "FRS63"]
+    monkeypatch.setattr(quality_run, "get_db_units", lambda _: units)
+    indicators = []
+    monkeypatch.setattr(
+        quality_run,
+        "_publish_by_unit_report",
+        lambda report, values, *args, **kwargs: indicators.append(values),
+    )
+    static.run_api_db_validation_by_unit(
+        Environment.TEST, report_by_email=False, grouped=True
+    )
+    static.run_api_db_validation_by_unit(
+        Environment.TEST, report_by_email=False, incremental=True
+    )
+    grouped, incremental = (
+        values.sort_values(["target", "category"], ignore_index=True)
+        for values in indicators
+    )
+    assert not grouped.empty
+    pd.testing.assert_frame_equal(incremental, grouped, check_dtype=False)
+
+
+def test_get_units_selectable():
+    """Test the `get_units_selectable` utility."""
+    assert quality_run.get_units_selectable(["FRTSL", "FR'XX"]) == (
+        "(VALUES ('FRTSL'), ('FR''XX')) AS units (unit)"
+    )
+
+
+def test_get_grouped_query():
+    """Test the `get_grouped_query` utility."""
+    units = quality_run.get_units_selectable(["FRTSL"])
+    keys = static_expectations.PDC_KEYS
+    queries = static_expectations.GROUPED_QUERIES
+
+    # Expectations with keys are evaluated once for all units
+    query = quality_run.get_grouped_query(pdc_expectations[0], units, keys)
+    assert "LATERAL" not in query
+    assert "(SELECT * FROM statique) AS subselect" in query
+    assert (
+        'SELECT DISTINCT "id_pdc_itinerance",'
+        " substring(id_pdc_itinerance from 1 for 5) AS unit FROM statique"
+    ) in query
+    assert 'ON batch."id_pdc_itinerance" = unexpected."id_pdc_itinerance"' in query
+    assert "batch.unit IN (SELECT unit FROM (VALUES ('FRTSL'))" in query
+    assert "GROUP BY\n  batch.unit" in query
+
+    # Population level expectations are evaluated with their grouped query
+    pdcm = static_expectations.stations_pdc_expectations[0]
+    query = quality_run.get_grouped_query(pdcm, units, keys, queries)
+    assert "LATERAL" not in query
+    assert (
+        "SELECT *, substring(id_pdc_itinerance from 1 for 5) AS unit FROM statique\n"
+        "WHERE substring(id_pdc_itinerance from 1 for 5) IN"
+        " (SELECT unit FROM (VALUES ('FRTSL')) AS units (unit))\n) AS batch"
+    ) in query
+    assert "GROUP BY\n  unit\nHAVING" in query
+    ne10 = static_expectations.num_PDL_expectations[1]
+    query = quality_run.get_grouped_query(ne10, units, keys, queries)
+    assert "NOT SIMILAR TO '[0-9]{14}'" in query
+    with pytest.raises(NotImplementedError, match="UnexpectedRowsExpectation"):
+        quality_run.get_grouped_query(pdcm, units, keys)
+
+    query = quality_run.get_grouped_query(amenageur_expectations[0], units)
+    assert '"nom_amenageur" IS NULL' in query
+    assert "GROUP BY\n  unit" in query
+
+    with pytest.raises(NotImplementedError, match="ExpectColumnValuesToBeUnique"):
+        quality_run.get_grouped_query(
+            gxe.ExpectColumnValuesToBeUnique(column="id_pdc_itinerance"), units
+        )
+
+
+def test_static_grouped_queries():
+    """Test every static expectation can be evaluated grouped by unit."""
+    gx.get_context(mode="ephemeral")
+    units = quality_run.get_units_selectable(["FRTSL"])
+    for expectation in static_expectations.get_suite().expectations:
+        query = quality_run.get_grouped_query(
+            expectation,
+            units,
+            static_expectations.PDC_KEYS,
+            static_expectations.GROUPED_QUERIES,
+        )
+        assert "{batch}" not in query
+
+
+def test_get_units_results():
+    """Test the `get_units_results` utility."""
+    results, indicators = quality_run.get_units_results(
+        ["FRAAA", "FRBBB"],
+        ["POWL", "PDCM", "AMEM1"],
+        {
+            "POWL": {"FRBBB": (3, {"id_pdc_itinerance": "FRBBBE1"})},
+            "PDCM": {"FRBBB": (1, {"ratio": 0.5})},
+        },
+        IndicatorPeriod.DAY,
+        date(2025, 1, 1),
+    )
+    assert [(r.unit, r.success) for r in results] == [
+        ("FRAAA", True),
+        ("FRBBB", False),
+    ]
+    assert [(r.code, r.success) for r in results[1].suite] == [
+        ("POWL", False),
+        ("PDCM", False),
+        ("AMEM1", True),
+    ]
+    assert indicators.to_dict("records") == [
+        {
+            "value": 3,
+            "level": Level.OPERATIONALUNIT,
+            "target": "FRBBB",
+            "category": "POWL",
+            "code": "qua",
+            "period": IndicatorPeriod.DAY,
+            "timestamp": "2025-01-01",
+        },
+        {
+            "value": 0.5,
+            "level": Level.OPERATIONALUNIT,
+            "target": "FRBBB",
+            "category": "PDCM",
+            "code": "qua",
+            "period": IndicatorPeriod.DAY,
+            "timestamp": "2025-01-01",
+        },
+    ]
+
+
+def test_static_pdc_keys():
+    """Test static expectations keys used for incremental evaluation."""
+    gx.get_context(mode="ephemeral")
+    expectations = static_expectations.get_suite().expectations
+    codes = [e.meta["code"] for e in expectations]
+    assert set(static_expectations.PDC_KEYS) <= set(codes)
+    # Population level expectations
+    assert {
+        e.meta["code"]
+        for e in expectations
+        if e.meta["code"] not in static_expectations.PDC_KEYS
+        and not isinstance(e, gxe.ExpectColumnValuesToNotBeNull)
+    } == {"PDCM", "LOCP", "NE10"}
+    assert set(static_expectations.GROUPED_QUERIES) == {"PDCM", "LOCP", "NE10"}
+    # Incremental expectations only depend on the point of charge row
+    assert set(static_expectations.INCREMENTAL_CODES) == {
+        e.meta["code"]
+        for e in expectations
+        if isinstance(e, gxe.ExpectColumnValuesToNotBeNull)
+    } | {"POWL", "POWU", "SIRI", "CRDF", "AFIP", "AFIE", "INSE"}
+
+
+def test_get_keys_condition():
+    """Test the `get_keys_condition` utility."""
+    assert quality_run.get_keys_condition(("id_pdc_itinerance",)) == (
+        'batch."id_pdc_itinerance" = unexpected."id_pdc_itinerance"'
+    )
+    assert quality_run.get_keys_condition(
+        ("siren_amenageur", "nom_amenageur", "nom_operateur")
+    ) == (
+        'batch."siren_amenageur" = unexpected."siren_amenageur"'
+        ' AND batch."nom_amenageur" IS NOT DISTINCT FROM unexpected."nom_amenageur"'
+        ' AND batch."nom_operateur" IS NOT DISTINCT FROM unexpected."nom_operateur"'
+    )
+
+
+def test_get_changed_batch_query():
+    """Test the `get_changed_batch_query` utility."""
+    assert quality_run.get_changed_batch_query(None) == "SELECT * FROM statique"
+    query = quality_run.get_changed_batch_query(
+        datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    )
+    assert query.strip() == (
+        "SELECT * FROM statique WHERE pdc_updated_at > '2025-01-01T12:00:00+00:00'"
+    )
+
+
+def test_get_failing_pdcs_query():
+    """Test the `get_failing_pdcs_query` utility."""
+    batch = "SELECT * FROM statique"
+    keys = static_expectations.PDC_KEYS
+    query = quality_run.get_failing_pdcs_query(pdc_expectations[0], batch, keys)
+    assert query is not None
+    assert "INNER JOIN (\nSELECT\n  id_pdc_itinerance" in query
+    assert "(SELECT * FROM statique) AS subselect" in query
+    assert 'ON batch."id_pdc_itinerance" = unexpected."id_pdc_itinerance"' in query
+    assert "to_jsonb(unexpected)::text AS key" in query
+
+    query = quality_run.get_failing_pdcs_query(amenageur_expectations[0], batch, keys)
+    assert query is not None
+    assert '"nom_amenageur" IS NULL' in query
+    assert "id_pdc_itinerance AS key" in query
+
+    # Population level expectation
+    pdcm = static_expectations.stations_pdc_expectations[0]
+    assert quality_run.get_failing_pdcs_query(pdcm, batch, keys) is None
+
+
+def test_save_static_results(quality_db_engine):
+    """Test stored static results replacement."""
+    checked_at = datetime.now(timezone.utc)
+
+    def failure(code, pdc=None):
+        return {
+            "environment": Environment.TEST.value,
+            "code": code,
+            "checked_at": checked_at,
+            "unit": "FRAAA",
+            "id_pdc_itinerance": pdc,
+            "key": pdc,
+            "value": 1,
+        }
+
+    failures = [failure("POWL", f"FRAAAE{i}") for i in range(1, 4)]
+    failures += [failure("PDCL", "FRAAAE1"), failure("PDCM")]
+    stored = quality_run._save_static_results(
+        Environment.TEST.value, failures, None, [], [], None
+    )
+    assert len(stored) == len(failures)
+
+    # FRAAAE2 has been re-evaluated, FRAAAE3 deleted and PDCL fully re-evaluated
+    stored = quality_run._save_static_results(
+        Environment.TEST.value,
+        [failure("PDCL", "FRAAAE4")],
+        ("POWL",),
+        ["FRAAAE2"],
+        ["FRAAAE1", "FRAAAE2", "FRAAAE4"],
+        None,
+    )
+    assert sorted(zip(stored["code"], stored["id_pdc_itinerance"], strict=True)) == [
+        ("PDCL", "FRAAAE4"),
+        ("POWL", "FRAAAE1"),
+    ]
+
+
+def test_get_stored_grouped_results():
+    """Test the `get_stored_grouped_results` utility."""
+    stored = pd.DataFrame(
+        {
+            "code": ["POWL", "POWL", "POWL", "INSE", "INSE", "INSE", "PDCM"],
+            "unit": ["FRAAA", "FRAAA", "FRBBB", "FRAAA", "FRAAA", "FRAAA", "FRBBB"],
+            "id_pdc_itinerance": [
+                "FRAAAE1",
+                "FRAAAE2",
+                "FRBBBE1",
+                "FRAAAE1",
+                "FRAAAE2",
+                "FRAAAE3",
+                None,
+            ],
+            "key": ["1", "2", "3", "00000", "00000", "99999", None],
+            "value": [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.5],
+        }
+    )
+    # Unexpected rows (e.g. municipalities) are counted once per unit
+    assert quality_run.get_stored_grouped_results(stored) == {
+        "POWL": {"FRAAA": (2, None), "FRBBB": (1, None)},
+        "INSE": {"FRAAA": (2, None)},
+        "PDCM": {"FRBBB": (0.5, {"ratio": 0.5})},
+    }
+    assert quality_run.get_stored_grouped_results(stored.iloc[:0]) == {}
@@ -2,10 +2,12 @@
 
 import datetime
 import os
+import uuid
 
 import pandas as pd
 import pytest
 from prefect.exceptions import ParameterTypeError
+from pyarrow import fs
 from pydantic import TypeAdapter, ValidationError
 from sqlalchemy import text
 
@@ -14,14 +16,19 @@ from indicators.types import Environment
 from tiruert.run import (
     AMENAGEUR_WITH_SESSIONS_TEMPLATE,
     Siren,
+    archive_ignored_sessions_for_day,
+    batch_tiruert_for_day,
     daily_tiruert,
     enea,
     eneu,
     enex,
     filter_sessions,
+    flag_bad_sessions,
     flag_duplicates,
     get_amenageurs_for_period,
     get_sessions,
+    iter_filtered_sessions,
+    iter_sirens_sessions,
     negs,
     odus,
     tiruert_for_day,
@@ -97,6 +104,97 @@ def test_task_get_sessions():
     assert len(sessions) == expected
 
 
+@pytest.mark.parametrize("chunk_size", [1, 2, 4, 10])
+def test_iter_sirens_sessions(chunk_size):
+    """Test the `iter_sirens_sessions` utility."""
+    sessions = pd.DataFrame(
+        {
+            "siren": ["1", "1", "1", "2", "3", "3"],
+            "energy": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    chunks = (
+        sessions.iloc[i : i + chunk_size] for i in range(0, len(sessions), chunk_size)
+    )
+    groups = list(iter_sirens_sessions(chunks))
+
+    # Every SIREN sessions should be yielded in a single group
+    yielded = pd.concat(groups, ignore_index=True)
+    assert yielded.equals(sessions)
+    assert (
+        sum(group["siren"].nunique() for group in groups) == sessions["siren"].nunique()
+    )
+    for group in groups:
+        assert group.index.equals(pd.RangeIndex(len(group)))
+
+
+def test_iter_sirens_sessions_empty():
+    """Test the `iter_sirens_sessions` utility with no session."""
+    assert list(iter_sirens_sessions([])) == []
+    assert list(iter_sirens_sessions([pd.DataFrame({"siren": []})])) == []
+
+
+def test_iter_filtered_sessions_groups(monkeypatch):
+    """Test the `iter_filtered_sessions` utility yields groups of SIRENs."""
+    start = datetime.datetime(2024, 12, 27, 10)
+
+    def sessions(sirens, energies):
+        return pd.DataFrame(
+            {
+                "siren": sirens,
+                "id_pdc_itinerance": [f"FRXXXE{i}" for i in range(len(sirens))],
+                "session_id": [uuid.uuid4() for _ in sirens],
+                "from": [start] * len(sirens),
+                "to": [start + datetime.timedelta(hours=1)] * len(sirens),
+                "energy": energies,
+                "max_power": [22.0] * len(sirens),
+            }
+        )
+
+    groups = [
+        sessions(["891118473", "123456789"], [10.0, 10.0]),
+        sessions(["552032534", "552032534"], [10.0, 100.0]),
+    ]
+    monkeypatch.setattr(tiruert.run, "stream_sessions", lambda *_: iter(groups))
+
+    result = list(iter_filtered_sessions(Environment.TEST, start.date(), start.date()))
+
+    # Sessions of the invalid SIREN are skipped
+    assert [sirens for sirens, _, _ in result] == [["891118473"], ["552032534"]]
+    assert list(result[0][1]["siren"]) == ["891118473"]
+    assert result[0][2].empty
+    # Sessions with too much energy for the point of charge are ignored
+    assert list(result[1][1]["energy"]) == [10.0]
+    assert list(result[1][2]["energy"]) == [100.0]
+
+
+def test_iter_filtered_sessions(monkeypatch):
+    """Test the `iter_filtered_sessions` utility."""
+    # Small chunks to get many groups of SIRENs
+    monkeypatch.setattr(tiruert.run, "SESSIONS_STREAM_CHUNK_SIZE", 1000)
+    groups = list(
+        iter_filtered_sessions(
+            Environment.TEST,
+            datetime.date(2024, 12, 27),
+            datetime.date(2024, 12, 28),
+        )
+    )
+    assert len(groups) > 1
+    all_sirens = [siren for sirens, _, _ in groups for siren in sirens]
+    # Each SIREN belongs to a single group
+    assert len(all_sirens) == len(set(all_sirens))
+    for sirens, filtered, to_ignore in groups:
+        assert set(filtered["siren"]) | set(to_ignore["siren"]) <= set(sirens)
+
+    filtered = pd.concat([group[1] for group in groups])
+    to_ignore = pd.concat([group[2] for group in groups])
+    siren = "891118473"
+    expected = 500
+    assert len(filtered[filtered["siren"] == siren]) == expected
+    expected = 351
+    assert len(to_ignore[to_ignore["siren"] == siren]) == expected
+
+
 def test_negs():
     """Test the `negs` rows filter."""
     # To < From
@@ -106,7 +204,7 @@ def test_negs():
             "to": [datetime.datetime(2024, 12, 25, 20, 48, 38)],
         }
     )
-    assert not negs(df.loc[0])
+    assert not negs(df)[0]
 
     # From > To
     df = pd.DataFrame(
@@ -115,14 +213,14 @@ def test_negs():
             "to": [datetime.datetime(2024, 12, 25, 20, 12, 34)],
         }
     )
-    assert negs(df.loc[0])
+    assert negs(df)[0]
 
 
 def test_eneu():
     """Test the `eneu` rows filter."""
     df = pd.DataFrame(data={"energy": [802.0, 300.0, 1001.0, 400.0, 1200.0]})
     expected = 2
-    assert len(df[df.apply(eneu, axis=1)]) == expected
+    assert len(df[eneu(df)]) == expected
 
 
 def test_enea():
@@ -141,7 +239,7 @@ def test_enea():
             "energy": [28.9, 30.0],
         }
     )
-    assert len(df[df.apply(enea, axis=1)]) == 1
+    assert len(df[enea(df)]) == 1
 
 
 def test_odus():
@@ -154,7 +252,7 @@ def test_odus():
             "energy": [20.0],
         }
     )
-    assert not odus(df.loc[0])
+    assert not odus(df)[0]
 
     # From > To
     df = pd.DataFrame(
@@ -164,7 +262,7 @@ def test_odus():
             "energy": [20.0],
         }
     )
-    assert odus(df.loc[0])
+    assert odus(df)[0]
 
     # From > To and energy < 1
     df = pd.DataFrame(
@@ -174,7 +272,7 @@ def test_odus():
             "energy": [0.2],
         }
     )
-    assert not odus(df.loc[0])
+    assert not odus(df)[0]
 
 
 def test_enex():
@@ -193,7 +291,34 @@ def test_enex():
             "energy": [28.9, 1200.0],
         }
     )
-    assert len(df[df.apply(enex, axis=1)]) == 1
+    assert len(df[enex(df)]) == 1
+
+
+def test_flag_bad_sessions():
+    """Test the `flag_bad_sessions` rows filter."""
+    df = pd.DataFrame(
+        data={
+            "from": [
+                datetime.datetime(2024, 12, 25, 20, 0, 0),
+                datetime.datetime(2024, 12, 25, 20, 0, 0),
+                datetime.datetime(2024, 12, 25, 20, 0, 0),
+            ],
+            "to": [
+                datetime.datetime(2024, 12, 25, 21, 0, 0),
+                datetime.datetime(2024, 12, 25, 19, 0, 0),
+                datetime.datetime(2024, 12, 25, 21, 0, 0),
+            ],
+            "max_power": [22.0, 22.0, 11.0],
+            "energy": [20.0, 10.0, 1200.0],
+        }
+    )
+    flagged = flag_bad_sessions(df)
+    assert list(flagged["enea_max"]) == [22.0, -22.0, 11.0]
+    assert list(flagged["negs"]) == [False, True, False]
+    assert list(flagged["eneu"]) == [False, False, True]
+    assert list(flagged["enea"]) == [False, True, True]
+    assert list(flagged["odus"]) == [False, True, False]
+    assert list(flagged["enex"]) == [False, False, True]
 
 
 def test_flag_duplicates():
@@ -222,7 +347,78 @@ def test_flag_duplicates():
     )
     flagged = flag_duplicates(df)
     assert len(df[flagged["duplicate"]]) == 1
-    assert len(df[flagged["overlap"]]) == 1
+    # The duplicate and the last session (unsorted) overlap the first one
+    expected = 2
+    assert len(df[flagged["overlap"]]) == expected
+    assert list(flagged["overlap"]) == [False, True, False, True]
+    assert list(flagged["overlapped"].fillna(-1)) == [-1, 0, -1, 1]
+
+
+def test_flagged_sessions_to_parquet(tmp_path):
+    """Test flagged sessions with UUID identifiers can be written to parquet."""
+    session_ids = [uuid.uuid4() for _ in range(3)]
+    pdc_id = uuid.uuid4()
+    df = pd.DataFrame(
+        data={
+            "session_id": session_ids,
+            "point_de_charge_id": [pdc_id] * 3,
+            "from": [
+                datetime.datetime(2024, 12, 25, 20, 12, 42),
+                datetime.datetime(2024, 12, 25, 20, 12, 42),
+                datetime.datetime(2024, 12, 26, 20, 12, 42),
+            ],
+            "to": [
+                datetime.datetime(2024, 12, 25, 21, 18, 23),
+                datetime.datetime(2024, 12, 25, 21, 18, 23),
+                datetime.datetime(2024, 12, 26, 21, 18, 23),
+            ],
+            "id_pdc_itinerance": ["FRXXXEYYY1"] * 3,
+        }
+    )
+    flagged = tiruert.run._stringify_uuids(flag_duplicates(df))
+
+    archive = tmp_path / "ignored.parquet"
+    flagged.to_parquet(archive)
+    written = pd.read_parquet(archive)
+    assert list(written["session_id"]) == [str(i) for i in session_ids]
+    assert list(written["point_de_charge_id"]) == [str(pdc_id)] * 3
+    assert written["overlapped"].iloc[1] == str(session_ids[0])
+    assert written["overlapped"].iloc[[0, 2]].isna().all()
+
+
+def test_task_archive_ignored_sessions_for_day(tmp_path, monkeypatch):
+    """Test the `archive_ignored_sessions_for_day` task with flagged sessions."""
+    session_ids = [uuid.uuid4() for _ in range(2)]
+    ignored = flag_duplicates(
+        pd.DataFrame(
+            data={
+                "siren": ["891118473"] * 2,
+                "session_id": session_ids,
+                "point_de_charge_id": [uuid.uuid4()] * 2,
+                "from": [datetime.datetime(2024, 12, 25, 20, 12, 42)] * 2,
+                "to": [datetime.datetime(2024, 12, 25, 21, 18, 23)] * 2,
+                "id_pdc_itinerance": ["FRXXXEYYY1"] * 2,
+            }
+        )
+    )
+    # Write the dataset to a local directory instead of S3
+    monkeypatch.setenv("S3_ENDPOINT_URL", "http://localhost:9000")
+    monkeypatch.setattr(
+        tiruert.run.fs,
+        "S3FileSystem",
+        lambda **kwargs: fs.SubTreeFileSystem(str(tmp_path), fs.LocalFileSystem()),
+    )
+    archive_ignored_sessions_for_day.fn(
+        ignored, datetime.date(2024, 12, 25), ["891118473", "552032534"]
+    )
+
+    # Archives use the per-amenageur layout
+    day_path = tmp_path / "qualicharge-sessions/2024/12/25"
+    written = pd.read_parquet(day_path / "ignored-891118473.parquet")
+    assert list(written["session_id"]) == [str(i) for i in session_ids]
+    assert list(written["overlapped"].fillna("")) == ["", str(session_ids[0])]
+    # An archive is written for SIRENs without ignored session
+    assert pd.read_parquet(day_path / "ignored-552032534.parquet").empty
 
 
 def test_task_filter_sessions():
@@ -346,6 +542,53 @@ def test_flow_tiruert_for_day_with_invalid_siren(
     assert result.one()[0] == n_amenageurs
 
 
+def test_flow_batch_tiruert_for_day(db_connection, indicators_db_engine):
+    """Test the `batch_tiruert_for_day` flow."""
+    day = datetime.date(2024, 12, 27)
+    batch_tiruert_for_day(Environment.TEST, day)
+
+    # Get the number of amenageurs with sessions on that day
+    result = db_connection.execute(
+        text(
+            AMENAGEUR_WITH_SESSIONS_TEMPLATE.substitute(
+                {"from_date": day, "to_date": day + datetime.timedelta(days=1)}
+            )
+        )
+    )
+    n_amenageurs = len(result.all())
+
+    with indicators_db_engine.connect() as connection:
+        result = connection.execute(
+            text("SELECT COUNT(*) FROM test WHERE code = 'tirue'")
+        )
+        # We should have saved as many indicators as distinct amenageurs
+        assert result.one()[0] == n_amenageurs
+
+        # Batched indicators should be the same as per-amenageur indicators
+        result = connection.execute(
+            text("SELECT * FROM test WHERE code = 'tirue' AND target = '891118473'")
+        )
+        indicator = result.one()
+        expected = 15.850909
+        assert indicator.value == pytest.approx(expected)
+        expected = 268
+        assert len(indicator.extras) == expected
+
+    # Check we saved ignored sessions with the per-amenageur layout
+    expected_path = "qualicharge-sessions/2024/12/27/ignored-891118473.parquet"
+    s3_endpoint_url = os.environ.get("S3_ENDPOINT_URL", None)
+    df = pd.read_parquet(
+        f"s3://{expected_path}",
+        engine="pyarrow",
+        dtype_backend="pyarrow",
+        storage_options={
+            "endpoint_url": s3_endpoint_url,
+        },
+    )
+    n_sessions = 351
+    assert len(df) == n_sessions
+
+
 def test__get_daily_tiruert_day():
     """Test the `_get_daily_tiruert_day` utility."""
     assert (
@@ -0,0 +1,285 @@
+"""QualiCharge prefect indicators tests: occupation engine."""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pyarrow import fs
+from pyarrow import parquet as pq
+from sqlalchemy import text
+
+from cooling import get_archive_path
+from indicators import occupation
+from indicators.access import STATUSES as ARCHIVED_STATUSES
+from indicators.models import IndicatorPeriod, IndicatorTimeSpan
+from indicators.occupation import (
+    STATUS_COLUMNS,
+    aggregate_dwell_times,
+    compute_dwell_times,
+    get_carry_over_query,
+    iter_archived_dwell_times,
+    iter_dwell_times,
+)
+from indicators.types import Environment
+
+START = datetime(2024, 12, 1)
+END = datetime(2024, 12, 2)
+HOUR = 3600.0
+
+
+def _statuses(rows):
+    """Build a statuses DataFrame from (pdc, hour, etat, occupation) tuples."""
+    return pd.DataFrame(
+        [
+            (pdc, pd.Timestamp(START, tz="UTC") + pd.Timedelta(hours=hour), etat, occ)
+            for pdc, hour, etat, occ in rows
+        ],
+        columns=STATUS_COLUMNS,
+    )
+
+
+STATUSES = _statuses(
+    [
+        ("FRA", 0, "en_service", "libre"),
+        ("FRA", 6, "en_service", "occupe"),
+        ("FRA", 8, "en_service", "libre"),
+        ("FRB", 12, "hors_service", "inconnu"),
+        ("FRB", 18, "en_service", "libre"),
+    ]
+)
+
+
+def _as_dict(dwell_times):
+    """Convert dwell times to a {(pdc, state): duration} dict."""
+    return {
+        (pdc, state): duration
+        for pdc, state, duration in dwell_times.itertuples(index=False)
+    }
+
+
+def test_compute_dwell_times():
+    """Test the `compute_dwell_times` function."""
+    result = compute_dwell_times(STATUSES.sample(frac=1, random_state=1), START, END)
+    assert _as_dict(result) == {
+        ("FRA", "libre"): 22 * HOUR,
+        ("FRA", "occupe"): 2 * HOUR,
+        ("FRB", "inconnu"): 6 * HOUR,
+        ("FRB", "libre"): 6 * HOUR,
+    }
+
+    result = compute_dwell_times(STATUSES, START, END, field="etat_pdc")
+    assert _as_dict(result) == {
+        ("FRA", "en_service"): 24 * HOUR,
+        ("FRB", "en_service"): 6 * HOUR,
+        ("FRB", "hors_service"): 6 * HOUR,
+    }
+
+
+def test_compute_dwell_times_with_carry_over():
+    """Test the `compute_dwell_times` function with carried over statuses."""
+    carry_over = pd.DataFrame(
+        [
+            ("FRA", pd.Timestamp("2024-11-30 22:00", tz="UTC"), "en_service", "occupe"),
+            ("FRB", pd.Timestamp("2024-11-30 10:00", tz="UTC"), "en_service", "occupe"),
+            ("FRC", pd.Timestamp("2024-11-29 10:00", tz="UTC"), "en_service", "libre"),
+        ],
+        columns=STATUS_COLUMNS,
+    )
+    result = compute_dwell_times(STATUSES, START, END, carry_over=carry_over)
+    assert _as_dict(result) == {
+        # FRA carried over status is immediately replaced
+        ("FRA", "libre"): 22 * HOUR,
+        ("FRA", "occupe"): 2 * HOUR,
+        ("FRB", "inconnu"): 6 * HOUR,
+        ("FRB", "libre"): 6 * HOUR,
+        ("FRB", "occupe"): 12 * HOUR,
+        ("FRC", "libre"): 24 * HOUR,
+    }
+
+
+def test_compute_dwell_times_out_of_timespan():
+    """Test the `compute_dwell_times` function ignores out of timespan statuses."""
+    statuses = pd.concat(
+        [STATUSES, _statuses([("FRA", 25, "en_service", "occupe")])],
+        ignore_index=True,
+    )
+    result = compute_dwell_times(statuses, START, END)
+    assert result["duration"].sum() == 36 * HOUR
+
+    result = compute_dwell_times(statuses.iloc[:0], START, END)
+    assert result.empty
+    assert list(result.columns) == ["id_pdc_itinerance", "state", "duration"]
+
+    with pytest.raises(ValueError, match="Unsupported status field 'foo'"):
+        compute_dwell_times(STATUSES, START, END, field="foo")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 10])
+def test_iter_dwell_times(chunk_size):
+    """Test the `iter_dwell_times` function streams contiguous statuses."""
+    carry_over = _statuses([("FRB", -2, "en_service", "occupe")])
+    carry_over = pd.concat(
+        [carry_over, _statuses([("FRC", -10, "en_service", "libre")])],
+        ignore_index=True,
+    )
+    chunks = (
+        STATUSES.iloc[i : i + chunk_size] for i in range(0, len(STATUSES), chunk_size)
+    )
+    result = pd.concat(
+        iter_dwell_times(chunks, START, END, carry_over=carry_over),
+        ignore_index=True,
+    )
+    expected = compute_dwell_times(STATUSES, START, END, carry_over=carry_over)
+    assert _as_dict(result) == _as_dict(expected)
+    assert result.duplicated(["id_pdc_itinerance", "state"]).sum() == 0
+
+
+def test_iter_archived_dwell_times(tmp_path, monkeypatch):
+    """Test the `iter_archived_dwell_times` function reads archives by day."""
+    filesystem = fs.LocalFileSystem()
+    table = ARCHIVED_STATUSES.model_copy(
+        update={"bucket": str(tmp_path / ARCHIVED_STATUSES.bucket)}
+    )
+    monkeypatch.setattr(occupation, "STATUSES", table)
+    statuses = _statuses(
+        [
+            ("FRA", 6, "en_service", "occupe"),
+            ("FRA", 30, "en_service", "libre"),
+            # FRB is idle for more than two days
+            ("FRB", 12, "en_service", "occupe"),
+            ("FRC", 50, "en_service", "libre"),
+        ]
+    )
+    for day, rows in statuses.groupby(statuses["horodatage"].dt.date):
+        path = get_archive_path(table.bucket, day, Environment.TEST)
+        filesystem.create_dir(path.rsplit("/", 1)[0])
+        pq.write_table(
+            pa.Table.from_pandas(rows, preserve_index=False),
+            path,
+            filesystem=filesystem,
+        )
+    carry_over = _statuses([("FRC", -48, "en_service", "occupe")])
+    timespan = IndicatorTimeSpan(start=START, period=IndicatorPeriod.WEEK)
+
+    result = pd.concat(
+        iter_archived_dwell_times(
+            timespan, Environment.TEST, carry_over=carry_over, s3=filesystem
+        ),
+        ignore_index=True,
+    )
+    result = result.groupby(["id_pdc_itinerance", "state"], as_index=False)[
+        "duration"
+    ].sum()
+    expected = compute_dwell_times(
+        statuses, START, START + timedelta(days=7), carry_over=carry_over
+    )
+    assert _as_dict(result) == _as_dict(expected)
+    assert _as_dict(result)[("FRB", "occupe")] == (7 * 24 - 12) * HOUR
+
+
+def test_get_carry_over_query():
+    """Test the `get_carry_over_query` utility."""
+    query = get_carry_over_query(START)
+    assert "AND horodatage >= timestamp '2024-11-24 00:00:00'" in query
+    assert "AND horodatage < timestamp '2024-12-01 00:00:00'" in query
+    assert "LatestStatus.horodatage >= timestamp '2024-12-01 00:00:00'" in query
+
+    query = get_carry_over_query(START, lookback=timedelta(days=1))
+    assert "AND horodatage >= timestamp '2024-11-30 00:00:00'" in query
+
+
+def test_get_carry_over_statuses_idle_pdc(db_connection):
+    """Test carried over statuses of a point of charge idle for two days."""
+    start = datetime(2030, 1, 1)
+    pdc_id, id_pdc_itinerance = db_connection.execute(
+        text("SELECT id, id_pdc_itinerance FROM _pointdecharge LIMIT 1")
+    ).one()
+    for horodatage, occupation_pdc in (
+        (start - timedelta(days=2), "occupe"),
+        (start + timedelta(hours=1), "libre"),
+    ):
+        db_connection.execute(
+            text(
+                "INSERT INTO status "
+                "(id, horodatage, etat_pdc, occupation_pdc, point_de_charge_id, "
+                "created_at, updated_at) "
+                "VALUES (gen_random_uuid(), :horodatage, 'en_service', "
+                ":occupation_pdc, :pdc_id, now(), now())"
+            ),
+            {
+                "horodatage": horodatage,
+                "occupation_pdc": occupation_pdc,
+                "pdc_id": pdc_id,
+            },
+        )
+    # The point of charge latest status has been received after start
+    db_connection.execute(
+        text(
+            "INSERT INTO lateststatus "
+            "(id_pdc_itinerance, horodatage, etat_pdc, occupation_pdc, "
+            "created_at, updated_at) "
+            "VALUES (:id_pdc_itinerance, :horodatage, 'en_service', 'libre', "
+            "now(), now()) "
+            "ON CONFLICT (id_pdc_itinerance) DO UPDATE "
+            "SET horodatage = excluded.horodatage, "
+            "occupation_pdc = excluded.occupation_pdc"
+        ),
+        {
+            "id_pdc_itinerance": id_pdc_itinerance,
+            "horodatage": start + timedelta(hours=1),
+        },
+    )
+
+    carry_over = pd.read_sql_query(get_carry_over_query(start), db_connection)
+    idle_since = pd.Timestamp(start - timedelta(days=2), tz="UTC")
+    previous = carry_over[carry_over["id_pdc_itinerance"] == id_pdc_itinerance]
+    assert previous["occupation_pdc"].to_list() == ["occupe"]
+    assert previous["horodatage"].iat[0] == idle_since
+
+    # With a one day lookback, the status is lost
+    carry_over = pd.read_sql_query(
+        get_carry_over_query(start, lookback=timedelta(days=1)), db_connection
+    )
+    assert id_pdc_itinerance not in carry_over["id_pdc_itinerance"].to_list()
+
+    # Without status since start, the latest status is carried over
+    carry_over = pd.read_sql_query(
+        get_carry_over_query(start + timedelta(days=1)), db_connection
+    )
+    previous = carry_over[carry_over["id_pdc_itinerance"] == id_pdc_itinerance]
+    assert previous["occupation_pdc"].to_list() == ["libre"]
+
+
+def test_get_dwell_times_unsupported_source(monkeypatch):
+    """Test the `get_dwell_times` task with an unsupported statuses source."""
+    monkeypatch.setattr(
+        occupation,
+        "get_carry_over_statuses",
+        lambda *args: pd.DataFrame(columns=STATUS_COLUMNS),
+    )
+    timespan = IndicatorTimeSpan(start=START, period=IndicatorPeriod.DAY)
+    with pytest.raises(ValueError, match="Unsupported status source 'foo'"):
+        occupation.get_dwell_times.fn(timespan, Environment.TEST, source="foo")
+
+
+def test_aggregate_dwell_times():
+    """Test the `aggregate_dwell_times` function."""
+    dwell_times = compute_dwell_times(STATUSES, START, END)
+    targets = pd.DataFrame(
+        {"id_pdc_itinerance": ["FRA", "FRB"], "target": ["75056", "13055"]}
+    )
+    result = aggregate_dwell_times(dwell_times, targets)
+    assert result.to_dict("records") == [
+        {"target": "13055", "state": "inconnu", "duration": 6 * HOUR, "pdc": 1},
+        {"target": "13055", "state": "libre", "duration": 6 * HOUR, "pdc": 1},
+        {"target": "75056", "state": "libre", "duration": 22 * HOUR, "pdc": 1},
+        {"target": "75056", "state": "occupe", "duration": 2 * HOUR, "pdc": 1},
+    ]
+
+    result = aggregate_dwell_times(dwell_times)
+    assert result.to_dict("records") == [
+        {"target": "00", "state": "inconnu", "duration": 6 * HOUR, "pdc": 1},
+        {"target": "00", "state": "libre", "duration": 28 * HOUR, "pdc": 2},
+        {"target": "00", "state": "occupe", "duration": 2 * HOUR, "pdc": 1},
+    ]
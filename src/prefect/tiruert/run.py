@@ -1,9 +1,10 @@
 """Tiruert calculation flows."""
 
+import logging
 import os
 from datetime import date, datetime, timedelta
 from string import Template
-from typing import Annotated
+from typing import Annotated, Iterable, Iterator
 
 import pandas as pd
 from annotated_types import Len
@@ -19,6 +20,12 @@ from indicators.db import get_api_db_engine
 from indicators.models import IndicatorPeriod, Level
 from indicators.types import Environment
 from indicators.utils import export_indicators
+from quality.expectations.rules import (
+    SessionRule,
+    evaluate_rules,
+    flag_overlaps,
+    get_session_quantities,
+)
 
 AMENAGEUR_WITH_SESSIONS_TEMPLATE = Template("""
     SELECT DISTINCT
@@ -66,6 +73,37 @@ AMENAGEUR_SESSIONS_FOR_A_DAY_TEMPLATE = Template("""
       "from"
     """)
 
+SESSIONS_FOR_A_DAY_TEMPLATE = Template("""
+    SELECT
+      Amenageur.nom_amenageur AS entity,
+      Amenageur.siren_amenageur AS siren,
+      operationalunit.code AS code,
+      _station.id_station_itinerance AS id_station_itinerance,
+      _pointdecharge.id_pdc_itinerance AS id_pdc_itinerance,
+      _pointdecharge.puissance_nominale AS max_power,
+      Session.id AS session_id,
+      Session.start AS "from",
+      Session.end AS "to",
+      Session.energy AS energy,
+      Session.point_de_charge_id
+    FROM
+      Session
+      INNER JOIN _pointdecharge ON _pointdecharge.id = Session.point_de_charge_id
+      INNER JOIN _station ON _station.id = _pointdecharge.station_id
+      LEFT JOIN operationalunit ON operationalunit.id = _station.operational_unit_id
+      INNER JOIN Amenageur ON _station.amenageur_id = amenageur.id
+    WHERE
+      Session.start >= '$from_date'
+      AND Session.start < '$to_date'
+    ORDER BY
+      siren,
+      id_pdc_itinerance,
+      "from"
+    """)
+SESSIONS_STREAM_CHUNK_SIZE: int = 50000
+
+logger = logging.getLogger(__name__)
+
 SESSION_ENE_MAX = 1000.0  # in kWh
 
 
@@ -147,75 +185,136 @@ def get_sessions(
         )
 
 
-def negs(row):
+# TIRUERT sessions rules
+NEGS_RULE = SessionRule(code="NEGS", expression="duration < 0")
+ENEU_RULE = SessionRule(code="ENEU", expression=f"energy > {SESSION_ENE_MAX}")
+ENEA_RULE = SessionRule(code="ENEA", expression="energy > max_energy * 1.1")
+ODUS_RULE = SessionRule(code="ODUS", expression="duration < 0 and energy > 1")
+ENEX_RULE = SessionRule(
+    code="ENEX",
+    expression=f"energy > {SESSION_ENE_MAX} and energy > max_energy * 2.0",
+)
+TIRUERT_RULES = [NEGS_RULE, ENEU_RULE, ENEA_RULE, ODUS_RULE, ENEX_RULE]
+
+
+def iter_sirens_sessions(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Regroup a stream of sessions chunks sorted by SIREN.
+
+    Yielded DataFrames only contain complete SIREN sessions: the sessions of the last
+    SIREN of a chunk are kept pending until the next chunk as they may continue in
+    it. Yielded DataFrames have a fresh RangeIndex.
+    """
+    pending = pd.DataFrame()
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        sessions = (
+            pd.concat([pending, chunk], ignore_index=True)
+            if not pending.empty
+            else chunk.reset_index(drop=True)
+        )
+        tail = sessions["siren"] == sessions["siren"].iat[-1]
+        pending = sessions[tail]
+        if (~tail).any():
+            yield sessions[~tail].reset_index(drop=True)
+    if not pending.empty:
+        yield pending.reset_index(drop=True)
+
+
+def stream_sessions(
+    environment: Environment, from_date: date, to_date: date
+) -> Iterator[pd.DataFrame]:
+    """Stream all amenageurs sessions for a period, grouped by SIREN.
+
+    Sessions are fetched using a server-side cursor and sorted by (siren,
+    id_pdc_itinerance, from).
+
+    Args:
+    environment (Environment): target environment
+    from_date (date): included
+    to_date (date): excluded
+    """
+    query = SESSIONS_FOR_A_DAY_TEMPLATE.substitute(
+        {"from_date": from_date, "to_date": to_date}
+    )
+    engine = get_api_db_engine(environment)
+    with engine.connect().execution_options(stream_results=True) as connection:
+        yield from iter_sirens_sessions(
+            pd.read_sql_query(
+                query, con=connection, chunksize=SESSIONS_STREAM_CHUNK_SIZE
+            )
+        )
+
+
+def negs(sessions: pd.DataFrame) -> pd.Series:
     """NEGS data quality test."""
-    return (row["to"] - row["from"]).total_seconds() < 0
+    return NEGS_RULE.evaluate(sessions)
 
 
-def eneu(row):
+def eneu(sessions: pd.DataFrame) -> pd.Series:
     """ENEU data quality test."""
-    return row["energy"] > SESSION_ENE_MAX
+    return ENEU_RULE.evaluate(sessions)
 
 
-def enea_max(row):
+def enea_max(sessions: pd.DataFrame) -> pd.Series:
     """ENEA data quality test maximal value."""
-    return ((row["to"] - row["from"]).total_seconds() / 3600) * row["max_power"]
+    return get_session_quantities(sessions, ["max_energy"])["max_energy"]
 
 
-def enea(row):
+def enea(sessions: pd.DataFrame) -> pd.Series:
     """ENEA data quality test."""
-    return row["energy"] > enea_max(row) * 1.1
+    return ENEA_RULE.evaluate(sessions)
 
 
-def odus(row):
+def odus(sessions: pd.DataFrame) -> pd.Series:
     """0DUS data quality test."""
-    return negs(row) and row["energy"] > 1
+    return ODUS_RULE.evaluate(sessions)
 
 
-def enex(row):
+def enex(sessions: pd.DataFrame) -> pd.Series:
     """ENEX data quality test."""
-    return row["energy"] > SESSION_ENE_MAX and row["energy"] > enea_max(row) * 2.0
+    return ENEX_RULE.evaluate(sessions)
 
 
 def flag_duplicates(sessions: pd.DataFrame) -> pd.DataFrame:
-    """Flag duplicated or overlaping sessions."""
-    # Ease comparison with previous row (and avoid iterating over dataframe rows)
-    sessions["p_id_pdc_itinerance"] = pd.concat(
-        [pd.Series([None]), sessions["id_pdc_itinerance"][:-1]]
-    ).reset_index(drop=True)
-    sessions["p_from"] = pd.concat(
-        [pd.Series([None]), sessions["from"][:-1]]
-    ).reset_index(drop=True)
-    sessions["p_to"] = pd.concat([pd.Series([None]), sessions["to"][:-1]]).reset_index(
-        drop=True
-    )
-
-    # Real duplicates
-    sessions["duplicate"] = (
-        (sessions["from"] == sessions["p_from"])
-        & (sessions["to"] == sessions["p_to"])
-        & (sessions["id_pdc_itinerance"] == sessions["p_id_pdc_itinerance"])
-    )
-
-    # Overlaps
-    sessions["overlap"] = (sessions["from"] < sessions["p_to"]) & (
-        sessions["id_pdc_itinerance"] == sessions["p_id_pdc_itinerance"]
-    )
+    """Flag duplicated or overlaping sessions.
 
+    Sessions are compared with every previous session of the same point of charge
+    (not only the preceding row), and the `overlapped` column contains the
+    `session_id` of the overlapped session.
+    """
+    flags = flag_overlaps(sessions)
+    sessions[flags.columns] = flags
     return sessions
 
 
 def flag_bad_sessions(sessions: pd.DataFrame) -> pd.DataFrame:
     """Flag bad sessions."""
-    sessions["enea_max"] = sessions.apply(enea_max, axis=1)
-    sessions["negs"] = sessions.apply(negs, axis=1)
-    sessions["eneu"] = sessions.apply(eneu, axis=1)
-    sessions["enea"] = sessions.apply(enea, axis=1)
-    sessions["odus"] = sessions.apply(odus, axis=1)
-    sessions["enex"] = sessions.apply(enex, axis=1)
+    quantities = get_session_quantities(sessions)
+    flags = evaluate_rules(sessions, TIRUERT_RULES, quantities)
+    sessions["enea_max"] = quantities["max_energy"]
+    sessions[flags.columns] = flags
     return sessions
 
 
+def _filter_sessions(sessions: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Flag sessions and split them into (filtered_sessions, ignored_sessions)."""
+    sessions = flag_duplicates(sessions)
+    sessions = flag_bad_sessions(sessions)
+
+    to_ignore = (
+        sessions.negs
+        | sessions.eneu
+        | sessions.enea
+        | sessions.odus
+        | sessions.enex
+        | sessions.overlap
+        | sessions.duplicate
+    )
+
+    return sessions[~to_ignore], sessions[to_ignore]
+
+
 @task
 def filter_sessions(sessions: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Clean sent sessions.
@@ -226,20 +325,70 @@ def filter_sessions(sessions: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]
 
     Returns a tuple with (filtered_sessions, ignored_sessions)
     """
-    sessions = flag_duplicates(sessions)
-    sessions = flag_bad_sessions(sessions)
+    return _filter_sessions(sessions)
+
+
+def iter_filtered_sessions(
+    environment: Environment, from_date: date, to_date: date
+) -> Iterator[tuple[list[str], pd.DataFrame, pd.DataFrame]]:
+    """Get and clean all amenageurs sessions for a period, by groups of SIRENs.
+
+    Sessions are streamed and filtered by groups of complete SIRENs: only one group
+    is held in memory at a time. Sessions from amenageurs with an invalid SIREN are
+    skipped.
+
+    Args:
+    environment (Environment): target environment
+    from_date (date): included
+    to_date (date): excluded
+
+    Yields a tuple with (sirens, filtered_sessions, ignored_sessions) per group
+    """
+    siren_type = TypeAdapter(Siren)
+    for chunk in stream_sessions(environment, from_date, to_date):
+        sirens = []
+        for siren in chunk["siren"].unique():
+            try:
+                siren_type.validate_python(siren)
+            except ValidationError:
+                logger.warning(f"Ignoring amenageur with invalid SIREN: {siren}")
+                continue
+            sirens.append(siren)
+        if not sirens:
+            continue
+        sessions = chunk[chunk["siren"].isin(sirens)].reset_index(drop=True)
+        kept, ignored = _filter_sessions(sessions)
+        yield sirens, kept, ignored
+
+
+def _stringify_uuids(sessions: pd.DataFrame) -> pd.DataFrame:
+    """Convert sessions UUID columns to str for pyarrow (null values are kept)."""
+    for column in ("session_id", "point_de_charge_id", "overlapped"):
+        if column in sessions:
+            sessions[column] = sessions[column].map(str, na_action="ignore")
+    return sessions
+
+
+IGNORED_SESSIONS_BUCKET = "qualicharge-sessions"
 
-    to_ignore = sessions[
-        sessions.negs
-        | sessions.eneu
-        | sessions.enea
-        | sessions.odus
-        | sessions.enex
-        | sessions.overlap
-        | sessions.duplicate
-    ]
 
-    return sessions.iloc[sessions.index.difference(to_ignore.index)], to_ignore
+def _write_ignored_sessions(
+    s3: fs.FileSystem, ignored: pd.DataFrame, day: date, siren: str
+):
+    """Write ignored sessions of an amenageur to its daily archive.
+
+    Archives are stored as `{bucket}/{year}/{month}/{day}/ignored-{siren}.parquet`.
+    """
+    dir_path = f"{IGNORED_SESSIONS_BUCKET}/{day.year}/{day.month}/{day.day}"
+    file_path = f"{dir_path}/ignored-{siren}.parquet"
+
+    # Convert UUID to str for pyarrow
+    ignored = _stringify_uuids(ignored)
+
+    # Start writing dataset to the target bucket
+    s3.create_dir(dir_path)
+    with s3.open_output_stream(file_path) as archive:
+        ignored.to_parquet(archive)
 
 
 @task
@@ -249,27 +398,36 @@ def archive_ignored_session_for_day(
     siren: Siren,
 ):
     """Archive ignored sessions to S3."""
-    bucket = "qualicharge-sessions"
     s3_endpoint_url = os.environ.get("S3_ENDPOINT_URL", None)
     if s3_endpoint_url is None:
         return Failed(message="S3_ENDPOINT_URL environment variable not set.")
 
     # Target bucket
     s3 = fs.S3FileSystem(endpoint_override=s3_endpoint_url)
-    dir_path = f"{bucket}/{day.year}/{day.month}/{day.day}"
-    file_path = f"{dir_path}/ignored-{siren}.parquet"
+    _write_ignored_sessions(s3, ignored, day, siren)
 
-    # Default output stream method
-    s3_open_output_stream = s3.open_output_stream
 
-    # Convert UUID to str for pyarrow
-    ignored["session_id"] = ignored["session_id"].apply(str)
-    ignored["point_de_charge_id"] = ignored["point_de_charge_id"].apply(str)
+@task
+def archive_ignored_sessions_for_day(
+    ignored: pd.DataFrame, day: date, sirens: list[str]
+):
+    """Archive ignored sessions of many amenageurs to S3 (one archive per SIREN).
 
-    # Start writing dataset to the target bucket
-    s3.create_dir(dir_path)
-    with s3_open_output_stream(file_path) as archive:
-        ignored.to_parquet(archive)
+    Archives use the same layout as `archive_ignored_session_for_day`: an archive
+    is written for every SIREN, even without ignored session.
+    """
+    s3_endpoint_url = os.environ.get("S3_ENDPOINT_URL", None)
+    if s3_endpoint_url is None:
+        return Failed(message="S3_ENDPOINT_URL environment variable not set.")
+
+    # Target bucket
+    s3 = fs.S3FileSystem(endpoint_override=s3_endpoint_url)
+    by_siren = dict(iter(ignored.groupby("siren")))
+    empty = ignored.iloc[:0]
+    for siren in sirens:
+        _write_ignored_sessions(
+            s3, by_siren.get(siren, empty).reset_index(drop=True), day, siren
+        )
 
 
 def _sessions_by_station(sessions: pd.DataFrame) -> pd.DataFrame:
@@ -314,6 +472,42 @@ def save_indicator_for_day(
     )
 
 
+@task
+def save_indicators_for_day(
+    sessions: pd.DataFrame, environment: Environment, day: date, sirens: list[str]
+):
+    """Save cumulated sessions of all amenageurs as indicators (one per SIREN)."""
+    # Sum by EVSE pool for all amenageurs for the day
+    by_station_report_df = _sessions_by_station(sessions)
+    by_siren = dict(iter(by_station_report_df.groupby("siren")))
+    empty = by_station_report_df.iloc[:0]
+    reports = [by_siren.get(siren, empty) for siren in sirens]
+
+    # Build result DataFrame
+    indicators = pd.DataFrame(
+        {
+            "target": sirens,
+            # total for period in MWh
+            "value": [report["energy"].sum() for report in reports],
+            "code": "tirue",
+            "level": Level.AMENAGEUR,
+            "period": IndicatorPeriod.DAY,
+            "timestamp": datetime(day.year, day.month, day.day).isoformat(),
+            "category": None,
+            "extras": [report.to_dict(orient="records") for report in reports],
+        }
+    )
+
+    export_indicators(
+        indicators=indicators,
+        environment=environment,
+        flow_name="tiruert-for-period",
+        description="Sessions that will be used for TIRUERT calculation.",
+        create_artifact=False,
+        persist=True,
+    )
+
+
 @flow(flow_run_name="{siren}-on-{day:%x}")
 def tiruert_for_day_and_amenageur(environment: Environment, day: date, siren: Siren):
     """Calculate the TIRUERT for a defined day and an amenageur."""
@@ -323,9 +517,32 @@ def tiruert_for_day_and_amenageur(environment: Environment, day: date, siren: Si
     archive_ignored_session_for_day(ignored, day, siren)
 
 
+@flow(flow_run_name="batch-on-{day:%x}")
+def batch_tiruert_for_day(environment: Environment, day: date):
+    """Calculate the TIRUERT for a defined day and all amenageurs at once.
+
+    The day sessions are fetched by a single streaming query and processed by groups
+    of SIRENs: for each group, indicators are saved in a single transaction and
+    ignored sessions are archived (one archive per SIREN, as for the
+    `tiruert_for_day_and_amenageur` flow).
+    """
+    for sirens, sessions, ignored in iter_filtered_sessions(
+        environment, day, day + timedelta(days=1)
+    ):
+        save_indicators_for_day(sessions, environment, day, sirens)
+        archive_ignored_sessions_for_day(ignored, day, sirens)
+
+
 @flow
-def tiruert_for_day(environment: Environment, day: date):
-    """Calculate the TIRUERT for a defined day."""
+def tiruert_for_day(environment: Environment, day: date, batch: bool = False):
+    """Calculate the TIRUERT for a defined day.
+
+    If `batch` is set, the TIRUERT is calculated for all amenageurs at once (see the
+    `batch_tiruert_for_day` flow) instead of running a subflow per amenageur.
+    """
+    if batch:
+        batch_tiruert_for_day(environment, day)
+        return
     amenageurs = get_amenageurs_for_period(environment, day, day + timedelta(days=1))
     siren_type = TypeAdapter(Siren)
     logger = get_run_logger()
@@ -345,6 +562,7 @@ def tiruert_for_day_over_period(
     environment: Environment,
     from_date: date,
     to_date: date,
+    batch: bool = False,
 ):
     """Calculate the TIRUERT for a defined period.
 
@@ -354,7 +572,7 @@ def tiruert_for_day_over_period(
         from_date + timedelta(days=d) for d in range((to_date - from_date).days + 1)
     ]
     for day in days:
-        tiruert_for_day(environment, day)
+        tiruert_for_day(environment, day, batch=batch)
 
 
 def _get_daily_tiruert_day() -> date:
@@ -363,14 +581,16 @@ def _get_daily_tiruert_day() -> date:
 
 
 @flow
-def daily_tiruert(environment: Environment = Environment.PRODUCTION):
+def daily_tiruert(
+    environment: Environment = Environment.PRODUCTION, batch: bool = False
+):
     """A wrapper around the tiruert for a day flow that hardcodes deployment parameters.
 
     This flow should be a ran on a daily basis as a cronjob. It will calculate the
     TIRUERT for now - 21 days for all amenageurs on that day only in production
     environment.
     """
-    tiruert_for_day(environment, _get_daily_tiruert_day())
+    tiruert_for_day(environment, _get_daily_tiruert_day(), batch=batch)
 
 
 @flow(flow_run_name="{siren}-from-{from_date:%x}-to-{to_date:%x}")